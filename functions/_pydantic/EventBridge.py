@@ -1,9 +1,15 @@
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 from botocore.client import BaseClient
+from botocore.exceptions import ClientError
+
+from _pydantic.dynamodb_helpers import _backoff_delay
 
 from pydantic import BaseModel, Field, EmailStr, model_validator #! This means all eventbridge events need models even if they dont deal with Pydantic Entities, I think it's too tightly coupled, can we pass in Pydantic if needed 
 
@@ -109,30 +115,20 @@ def trigger_eventbridge_event(
     logger = logging.getLogger()
 
     try:
-        event = EventBridgeEvent(
-            source=_resolve_stage_scoped_source(source),
-            detail=EventBridgeEventDetail(
-                timestamp=timestamp or datetime.utcnow(),
-                organisation=organisation,
-                resource_type=resource_type,
-                resource_id=resource_id,
-                action=action,
-                data=data or {},
-                meta=meta if meta else None,
-            )
+        entry = _build_entry(
+            source=source,
+            resource_type=resource_type,
+            action=action,
+            organisation=organisation,
+            resource_id=resource_id,
+            data=data,
+            meta=meta,
+            timestamp=timestamp,
         )
 
-        logger.info("Triggering EventBridge event:\n%s", event.model_dump_json(indent=2))
+        logger.info("Triggering EventBridge event %s for %s/%s", entry["DetailType"], organisation, resource_id)
 
-        response = client.put_events(
-            Entries=[
-                {
-                    "Source": event.source,
-                    "DetailType": event.detail_type,
-                    "Detail": event.detail.model_dump_json(by_alias=True, exclude_unset=True),
-                }
-            ]
-        )
+        response = client.put_events(Entries=[entry])
 
         failed = response.get("FailedEntryCount", 0)
         if failed:
@@ -143,4 +139,228 @@ def trigger_eventbridge_event(
 
     except Exception as e:
         logger.exception("Failed to trigger EventBridge event")
-        return False
\ No newline at end of file
+        return False
+
+
+def _build_entry(
+    *,
+    source: str,
+    resource_type: EventType,
+    action: Action,
+    organisation: str,
+    resource_id: str,
+    data: Optional[Dict[str, Any]] = None,
+    meta: Optional[Dict[str, Any]] = None,
+    timestamp: Optional[datetime] = None,
+) -> dict:
+    """
+    Validate an event and return it as a PutEvents request entry.
+    """
+    event = EventBridgeEvent(
+        source=_resolve_stage_scoped_source(source),
+        detail=EventBridgeEventDetail(
+            timestamp=timestamp or datetime.utcnow(),
+            organisation=organisation,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            action=action,
+            data=data or {},
+            meta=meta if meta else None,
+        )
+    )
+    return {
+        "Source": event.source,
+        "DetailType": event.detail_type,
+        "Detail": event.detail.model_dump_json(by_alias=True, exclude_unset=True),
+    }
+
+
+PUT_EVENTS_MAX_ENTRIES = 10 # PutEvents accepts at most 10 entries per call
+PUT_EVENTS_MAX_BYTES = 256 * 1024 # ... and at most 256 KB per call
+PUT_EVENTS_MAX_ATTEMPTS = 4
+PUT_EVENTS_MAX_WORKERS = 4
+RETRYABLE_PUT_EVENTS_CODES = {"ThrottlingException", "InternalFailure", "InternalException", "ServiceUnavailable"}
+
+
+def put_events_entry_size(entry: dict) -> int:
+    """
+    Size of a PutEvents entry as EventBridge counts it towards the 256 KB limit.
+    """
+    size = 14 if entry.get("Time") else 0
+    for field in ("Source", "DetailType", "Detail", "EventBusName"):
+        if entry.get(field):
+            size += len(entry[field].encode("utf-8"))
+    for resource in entry.get("Resources", []):
+        size += len(resource.encode("utf-8"))
+    return size
+
+
+@dataclass
+class PublishOutcome:
+    key: str
+    status: Literal["published", "failed"]
+    attempts: int
+    event_id: Optional[str] = None
+    error_code: Optional[str] = None
+    error_message: Optional[str] = None
+
+    @property
+    def published(self) -> bool:
+        return self.status == "published"
+
+
+class EventBridgePublisher:
+    """
+    Buffer EventBridge events and publish them with as few PutEvents calls as possible.
+
+    Entries are flushed in batches of up to 10 that stay within the 256 KB
+    request limit, optionally several batches in parallel. Entries that
+    EventBridge reports as throttled or failed internally are retried (only
+    those entries) with jittered backoff. Every added event gets a
+    PublishOutcome keyed by the caller's key, which defaults to the
+    resource_id.
+
+    Usage:
+        publisher = EventBridgePublisher(eventbridge)
+        for ticket in tickets:
+            publisher.add(source=..., resource_type=EventType.ticket, action=Action.requested,
+                          organisation=org, resource_id=ticket_key, data=payload)
+        outcomes = publisher.flush()
+
+    Used as a context manager it flushes on exit and keeps the result in `outcomes`.
+    """
+
+    def __init__(
+        self,
+        client: BaseClient,
+        *,
+        max_attempts: int = PUT_EVENTS_MAX_ATTEMPTS,
+        max_workers: int = PUT_EVENTS_MAX_WORKERS,
+    ):
+        self.client = client
+        self.max_attempts = max_attempts
+        self.max_workers = max_workers
+        # (key, entry) for valid events, (key, PublishOutcome) for events rejected before sending
+        self._pending: list[tuple[str, dict | PublishOutcome]] = []
+        self.outcomes: list[PublishOutcome] = []
+
+    def add(self, *, key: Optional[str] = None, **event) -> str:
+        """
+        Validate and buffer one event. Takes the same keyword arguments as
+        trigger_eventbridge_event plus an optional `key` to identify its outcome.
+
+        Returns:
+        - The key the event's PublishOutcome will carry
+        """
+        key = key or event["resource_id"]
+        try:
+            entry = _build_entry(**event)
+        except Exception as e:
+            logging.getLogger().warning("Invalid EventBridge event %s: %s", key, e)
+            self._pending.append((key, PublishOutcome(key=key, status="failed", attempts=0, error_code="InvalidEvent", error_message=str(e))))
+            return key
+
+        if put_events_entry_size(entry) > PUT_EVENTS_MAX_BYTES:
+            self._pending.append((key, PublishOutcome(key=key, status="failed", attempts=0, error_code="EntryTooLarge", error_message="Entry exceeds the 256 KB PutEvents limit")))
+            return key
+
+        self._pending.append((key, entry))
+        return key
+
+    def flush(self) -> list[PublishOutcome]:
+        """
+        Publish every buffered event.
+
+        Returns:
+        - One PublishOutcome per event added since the last flush, in the order they were added
+        """
+        logger = logging.getLogger()
+        pending, self._pending = self._pending, []
+
+        batches = _batch_entries(pending)
+        if len(batches) <= 1 or self.max_workers <= 1:
+            batch_outcomes = [self._publish_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                batch_outcomes = list(executor.map(self._publish_batch, batches))
+
+        by_position = {position: value for position, (_, value) in enumerate(pending) if isinstance(value, PublishOutcome)}
+        for batch, outcomes in zip(batches, batch_outcomes):
+            for (position, _, _), outcome in zip(batch, outcomes):
+                by_position[position] = outcome
+        outcomes = [by_position[position] for position in range(len(pending))]
+
+        failed = sum(1 for outcome in outcomes if not outcome.published)
+        logger.info("Published %s EventBridge events in %s PutEvents batches (%s failed)", len(outcomes) - failed, len(batches), failed)
+        return outcomes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.outcomes = self.flush()
+
+    def _publish_batch(self, batch: list[tuple[int, str, dict]]) -> list[PublishOutcome]:
+        logger = logging.getLogger()
+        outcomes = {position: PublishOutcome(key=key, status="failed", attempts=0) for position, key, _ in batch}
+        pending = list(batch)
+
+        for attempt in range(self.max_attempts):
+            if attempt:
+                time.sleep(_backoff_delay(attempt - 1))
+            for position, _, _ in pending:
+                outcomes[position].attempts += 1
+
+            try:
+                response = self.client.put_events(Entries=[entry for _, _, entry in pending])
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                logger.warning("PutEvents of %s entries failed with %s (attempt %s)", len(pending), code, attempt + 1)
+                for position, _, _ in pending:
+                    outcomes[position].error_code = code
+                    outcomes[position].error_message = str(e)
+                if code not in RETRYABLE_PUT_EVENTS_CODES:
+                    break
+                continue
+            except Exception as e:
+                logger.exception("PutEvents of %s entries failed", len(pending))
+                for position, _, _ in pending:
+                    outcomes[position].error_code = type(e).__name__
+                    outcomes[position].error_message = str(e)
+                break
+
+            retry = []
+            for (position, key, entry), result in zip(pending, response.get("Entries", [])):
+                outcome = outcomes[position]
+                if result.get("ErrorCode"):
+                    outcome.error_code = result["ErrorCode"]
+                    outcome.error_message = result.get("ErrorMessage")
+                    if result["ErrorCode"] in RETRYABLE_PUT_EVENTS_CODES:
+                        retry.append((position, key, entry))
+                else:
+                    outcome.status = "published"
+                    outcome.event_id = result.get("EventId")
+                    outcome.error_code = outcome.error_message = None
+            pending = retry
+            if not pending:
+                break
+            logger.info("Retrying %s failed EventBridge entries", len(pending))
+
+        return [outcomes[position] for position, _, _ in batch]
+
+
+def _batch_entries(pending: list[tuple[str, dict | PublishOutcome]]) -> list[list[tuple[int, str, dict]]]:
+    batches, batch, batch_size = [], [], 0
+    for position, (key, entry) in enumerate(pending):
+        if isinstance(entry, PublishOutcome):
+            continue
+        size = put_events_entry_size(entry)
+        if batch and (len(batch) == PUT_EVENTS_MAX_ENTRIES or batch_size + size > PUT_EVENTS_MAX_BYTES):
+            batches.append(batch)
+            batch, batch_size = [], 0
+        batch.append((position, key, entry))
+        batch_size += size
+    if batch:
+        batches.append(batch)
+    return batches
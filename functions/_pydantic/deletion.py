@@ -0,0 +1,194 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional
+
+from boto3.dynamodb.conditions import Key
+
+from _pydantic.dynamodb import batch_delete
+from _pydantic.dynamodb_helpers import encode_cursor, decode_cursor
+
+## logger setup
+logger = logging.getLogger()
+logger.setLevel("INFO")
+
+DELETION_CHECKPOINT_ENTITY_TYPE = "DELETION"
+# tickets per gsi1 page; each one costs a key-only gsi2 query
+DELETION_TICKET_PAGE_SIZE = 100
+DELETION_ROW_PAGE_SIZE = 500
+DELETION_QUERY_MAX_WORKERS = 8
+# reservation ledger rows (functions/checkout/reservation_ledger.py) are indexed per event on gsi2 under this many partitions
+RESERVATION_EVENT_INDEX_BUCKETS = 10
+
+
+@dataclass
+class DeletionResult:
+    completed: bool
+    deleted: int
+    tickets: int
+    unprocessed: int = 0
+
+
+def deletion_checkpoint_key(scope: str, event_ksuid: str) -> dict:
+    return {"PK": f"{DELETION_CHECKPOINT_ENTITY_TYPE}#{scope}#{event_ksuid}", "SK": f"{DELETION_CHECKPOINT_ENTITY_TYPE}#{scope}#{event_ksuid}"}
+
+
+def reservation_event_index_pk(event_ksuid: str, bucket: int) -> str:
+    return f"RESERVATIONS#EVENT#{event_ksuid}#{bucket}"
+
+
+def _query_page(table, key_condition, index_name: str, projection: str, names: dict, cursor: Optional[str], limit: int) -> tuple[list[dict], Optional[str]]:
+    kwargs = {
+        "IndexName": index_name,
+        "KeyConditionExpression": key_condition,
+        "ProjectionExpression": projection,
+        "ExpressionAttributeNames": names,
+        "Limit": limit,
+    }
+    start_key = decode_cursor(cursor)
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    # through the client, like batch_get/batch_delete: ticket pages query from worker threads and boto3 resources are not thread-safe
+    response = table.meta.client.query(TableName=table.name, **kwargs)
+    return response.get("Items", []), encode_cursor(response.get("LastEvaluatedKey"))
+
+
+def _ticket_row_keys(table, ticket_ksuid: str) -> list[dict]:
+    """Keys of a ticket, its child records and its creation idempotency record, which all share gsi2PK."""
+    keys, cursor = [], None
+    while True:
+        items, cursor = _query_page(table, Key("gsi2PK").eq(f"TICKET#{ticket_ksuid}"), "gsi2", "#PK, #SK", {"#PK": "PK", "#SK": "SK"}, cursor, DELETION_ROW_PAGE_SIZE)
+        keys.extend({"PK": item["PK"], "SK": item["SK"]} for item in items)
+        if not cursor:
+            return keys
+
+
+def _event_ticket_page(table, event_ksuid: str, cursor: Optional[str], max_workers: int) -> tuple[list[list[dict]], int, Optional[str]]:
+    items, next_cursor = _query_page(
+        table,
+        Key("gsi1PK").eq(f"EVENT#{event_ksuid}") & Key("gsi1SK").begins_with("TICKET#"),
+        "gsi1",
+        "#ksuid",
+        {"#ksuid": "ksuid"},
+        cursor,
+        DELETION_TICKET_PAGE_SIZE,
+    )
+    ticket_ksuids = [item["ksuid"] for item in items]
+    if len(ticket_ksuids) <= 1 or max_workers <= 1:
+        row_keys = [_ticket_row_keys(table, ksuid) for ksuid in ticket_ksuids]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(ticket_ksuids))) as executor:
+            row_keys = list(executor.map(lambda ksuid: _ticket_row_keys(table, ksuid), ticket_ksuids))
+    # ticket items are what gsi1 finds, so they go after their child rows
+    ticket_pks = {f"TICKET#{ksuid}" for ksuid in ticket_ksuids}
+    keys = [key for keys in row_keys for key in keys]
+    return [[key for key in keys if key["PK"] not in ticket_pks], [key for key in keys if key["PK"] in ticket_pks]], len(ticket_ksuids), next_cursor
+
+
+def _event_row_page(table, event_ksuid: str, cursor: Optional[str]) -> tuple[list[list[dict]], Optional[str]]:
+    items, next_cursor = _query_page(table, Key("SK").eq(f"EVENT#{event_ksuid}"), "IDXinv", "#PK, #SK", {"#PK": "PK", "#SK": "SK"}, cursor, DELETION_ROW_PAGE_SIZE)
+    # the event item itself goes last, once everything that hangs off it is gone
+    return [[{"PK": item["PK"], "SK": item["SK"]} for item in items if item["PK"] != f"EVENT#{event_ksuid}"]], next_cursor
+
+
+def _event_capacity_page(table, event_ksuid: str, cursor: Optional[str]) -> tuple[list[list[dict]], Optional[str]]:
+    """
+    Keys of one gsi2 bucket of the event's reservation ledger rows; the first bucket also brings the capacity shards.
+
+    Shards are keyed to the event's ``capacity_shards`` count and ledger
+    rows to the reservation, so neither the ticket nor the IDXinv walk finds
+    them. The cursor is the next bucket to read.
+    """
+    bucket = int(cursor or 0)
+    keys, page_cursor = [], None
+    while True:
+        items, page_cursor = _query_page(table, Key("gsi2PK").eq(reservation_event_index_pk(event_ksuid, bucket)), "gsi2", "#PK, #SK", {"#PK": "PK", "#SK": "SK"}, page_cursor, DELETION_ROW_PAGE_SIZE)
+        keys.extend({"PK": item["PK"], "SK": item["SK"]} for item in items)
+        if not page_cursor:
+            break
+    if bucket == 0:
+        event = table.get_item(Key={"PK": f"EVENT#{event_ksuid}", "SK": f"EVENT#{event_ksuid}"}, ProjectionExpression="capacity_shards", ConsistentRead=True).get("Item") or {}
+        # same keys as functions/checkout/sharded_capacity.shard_key
+        keys.extend({"PK": f"CAPACITY#{event_ksuid}#{shard:02d}", "SK": f"CAPACITY#{event_ksuid}"} for shard in range(int(event.get("capacity_shards") or 0)))
+    next_bucket = bucket + 1
+    return [keys], str(next_bucket) if next_bucket < RESERVATION_EVENT_INDEX_BUCKETS else None
+
+
+def delete_event_rows(
+    table,
+    event_ksuid: str,
+    current_time: str,
+    scope: Literal["EVENT", "TICKETS"] = "EVENT",
+    has_time: Callable[[], bool] = lambda: True,
+    max_workers: int = DELETION_QUERY_MAX_WORKERS,
+) -> DeletionResult:
+    """
+    Delete an event's tickets and, for the ``EVENT`` scope, every row keyed to the event, then the event itself.
+
+    Keys are read page by page with key-only projections: tickets from gsi1,
+    each ticket's rows from gsi2 (in parallel), the reservation ledger from
+    its gsi2 buckets along with the capacity shards, and the event's rows
+    from IDXinv. Every page is deleted with ``batch_delete`` before the next one
+    is read, and the rows the listings find (ticket items, the event) go
+    after the rows hanging off them. A checkpoint item records the phase
+    and cursor reached: when ``has_time`` returns False, or keys are still
+    unprocessed after the retries, the pass stops and a later call resumes
+    from there.
+    """
+    checkpoint_key = deletion_checkpoint_key(scope, event_ksuid)
+    checkpoint = table.get_item(Key=checkpoint_key, ConsistentRead=True).get("Item") or {
+        **checkpoint_key,
+        "entity_type": DELETION_CHECKPOINT_ENTITY_TYPE,
+        "parent_event_ksuid": event_ksuid,
+        "phase": "tickets",
+        "deleted": 0,
+        "tickets": 0,
+        "created_at": current_time,
+    }
+    phases = ["tickets", "capacity", "event"] if scope == "EVENT" else ["tickets"]
+    phase, cursor = checkpoint["phase"], checkpoint.get("cursor")
+    deleted, tickets = int(checkpoint["deleted"]), int(checkpoint["tickets"])
+
+    def _save():
+        item = {**checkpoint, "phase": phase, "deleted": deleted, "tickets": tickets, "updated_at": current_time}
+        item.pop("cursor", None)
+        if cursor:
+            item["cursor"] = cursor
+        table.put_item(Item=item)
+
+    while phase:
+        if phase == "tickets":
+            key_batches, page_tickets, next_cursor = _event_ticket_page(table, event_ksuid, cursor, max_workers)
+        elif phase == "capacity":
+            (key_batches, next_cursor), page_tickets = _event_capacity_page(table, event_ksuid, cursor), 0
+        else:
+            (key_batches, next_cursor), page_tickets = _event_row_page(table, event_ksuid, cursor), 0
+
+        for keys in key_batches:
+            result = batch_delete(table, keys)
+            deleted += len(result.successful)
+            if result.unprocessed:
+                # keep the cursor of this page so the next pass reads it again
+                _save()
+                logger.warning(f"Deletion of {scope} {event_ksuid} stopped in phase {phase} with {len(result.unprocessed)} unprocessed keys")
+                return DeletionResult(completed=False, deleted=deleted, tickets=tickets, unprocessed=len(result.unprocessed))
+
+        tickets += page_tickets
+        cursor = next_cursor
+        if not cursor:
+            remaining = phases[phases.index(phase) + 1:]
+            phase = remaining[0] if remaining else None
+        if phase and not has_time():
+            _save()
+            logger.info(f"Deletion of {scope} {event_ksuid} paused in phase {phase} after {deleted} rows")
+            return DeletionResult(completed=False, deleted=deleted, tickets=tickets)
+
+    final_keys = [checkpoint_key] + ([{"PK": f"EVENT#{event_ksuid}", "SK": f"EVENT#{event_ksuid}"}] if scope == "EVENT" else [])
+    result = batch_delete(table, final_keys)
+    if result.unprocessed:
+        _save()
+        return DeletionResult(completed=False, deleted=deleted, tickets=tickets, unprocessed=len(result.unprocessed))
+    deleted += len(final_keys) - 1
+
+    logger.info(f"Deleted {scope} {event_ksuid}: {deleted} rows, {tickets} tickets")
+    return DeletionResult(completed=True, deleted=deleted, tickets=tickets)
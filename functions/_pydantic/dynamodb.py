@@ -1,18 +1,27 @@
 import re
-from typing import Dict, Any, Union, Literal, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Union, Literal, Optional, Iterator, List, ClassVar, Iterable
 from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Attr
 import logging
 from datetime import datetime, timezone
 import traceback
 from dataclasses import dataclass
 
-from pydantic import BaseModel, field_validator, Field
+from pydantic import BaseModel, field_validator, Field, create_model
 from ksuid import KsuidMs
 
 from _pydantic.EventBridge import Action, EventType
 from _pydantic.dynamodb_helpers import (
     convert_datetime_to_iso_8601_with_z_suffix,
     convert_floats_to_decimals,
+    construct_from_item,
+    decode_cursor,
+    encode_cursor,
+    _annotation_may_hold_float,
+    _backoff_delay,
     _get_failed_item_field,
     _repair_string_number_field,
 )
@@ -20,12 +29,157 @@ from _pydantic.dynamodb_helpers import (
 logger = logging.getLogger()
 logger.setLevel("INFO")
 
+BATCH_WRITE_MAX_BATCH_SIZE = 25 # DynamoDB's maximum batch size is 25 items (stricly enforced)
+BATCH_WRITE_MAX_ATTEMPTS = 8
+BATCH_WRITE_MAX_WORKERS = 4
+BATCH_GET_MAX_BATCH_SIZE = 100 # DynamoDB's maximum BatchGetItem size is 100 keys
+BATCH_GET_MAX_ATTEMPTS = 8
+BATCH_GET_MAX_WORKERS = 4
+RETRYABLE_ERROR_CODES = {"ProvisionedThroughputExceededException", "ThrottlingException", "RequestLimitExceeded", "InternalServerError"}
+
 @dataclass
 class UpsertResult:
     success: bool
     item: Optional[dict]
     error: Optional[str]
 
+@dataclass
+class AtomicAddResult:
+    success: bool
+    item: Optional[dict]
+    code: Optional[str] = None
+    dynamodb_code: Optional[str] = None
+    message: Optional[str] = None
+    old_item: Optional[dict[str, Any]] = None
+    inferred: Optional[str] = None
+
+@dataclass
+class QueryPage:
+    items: List[Any]
+    cursor: Optional[str]
+
+@dataclass(frozen=True)
+class SerializationPlan:
+    properties: tuple[str, ...]
+    float_free_fields: frozenset[str]
+
+_NON_ITEM_PROPERTIES = {"__fields_set__", "model_fields_set", "model_extra", "related_entities"}
+
+@lru_cache(maxsize=None)
+def _stored_fields(model: type) -> frozenset[str]:
+    relations = {attribute for attribute, _, _ in model.model_construct().related_entities.values()}
+    return frozenset(model.model_fields) - relations
+
+@lru_cache(maxsize=256)
+def _summary_model(model: type, fields: frozenset[str]) -> type[BaseModel]:
+    unknown = fields - _stored_fields(model)
+    if unknown:
+        raise ValueError(f"Unknown fields for {model.__name__}: {', '.join(sorted(unknown))}")
+    # every field optional: a projected item only carries the attributes it has
+    return create_model(
+        f"{model.__name__}Summary",
+        __config__=model.model_config,
+        **{name: (Optional[model.model_fields[name].annotation], None) for name in sorted(fields)},
+    )
+
+def projection_expression(fields: Iterable[str]) -> tuple[str, dict[str, str]]:
+    """Build a ``ProjectionExpression`` and its ``#name`` map for a set of attributes (``entity_type`` is always kept)."""
+    names = {f"#p_{name}": name for name in sorted({*fields, "entity_type"})}
+    return ", ".join(names), names
+
+@dataclass(frozen=True)
+class UpdateExpressionTemplate:
+    update_expression: str
+    condition_expression: Optional[str]
+    attribute_names: Dict[str, str]
+    value_placeholders: tuple[tuple[str, str], ...]
+
+    def attribute_values(self, item: dict) -> dict:
+        return {placeholder: item[key] for key, placeholder in self.value_placeholders}
+
+@lru_cache(maxsize=512)
+def compile_update_expression(
+    keys: tuple[str, ...],
+    only_set_once: frozenset[str] = frozenset(),
+    add_fields: frozenset[str] = frozenset(),
+    remove_keys: tuple[str, ...] = (),
+    condition_expression: Optional[str] = None,
+    versioned: bool = False,
+) -> UpdateExpressionTemplate:
+    """
+    Compile (and cache) the expression strings for an UpdateItem request.
+
+    Items that share a field shape produce identical ``SET``/``ADD``/``REMOVE``
+    expressions and ``#name`` maps, so these are built once per shape and only
+    the ``:value`` map has to be filled in per item.
+
+    Parameters
+    ----------
+    keys : tuple[str, ...]
+        The attribute names being written, in item order.
+    only_set_once : frozenset[str], optional
+        Attributes written with ``if_not_exists``.
+    add_fields : frozenset[str], optional
+        Attributes written with ``ADD`` instead of ``SET``.
+    remove_keys : tuple[str, ...], optional
+        Attributes to ``REMOVE``.
+    condition_expression : str, optional
+        An additional condition to AND onto the generated conditions.
+    versioned : bool, optional
+        Whether to add the optimistic locking condition on ``version``.
+
+    Returns
+    -------
+    UpdateExpressionTemplate
+        The compiled expressions. ``attribute_names`` is shared between
+        callers and must be copied before being modified.
+    """
+    set_parts: list[str] = []
+    add_parts: list[str] = []
+    remove_parts: list[str] = []
+    attribute_names: dict[str, str] = {}
+    value_placeholders: list[tuple[str, str]] = []
+
+    for key in remove_keys:
+        name_placeholder = f"#{key}"
+        attribute_names[name_placeholder] = key
+        remove_parts.append(name_placeholder)
+
+    for key in keys:
+        name_placeholder = f"#{key}"
+        value_placeholder = f":{key}"
+        attribute_names[name_placeholder] = key
+        value_placeholders.append((key, value_placeholder))
+
+        if key in add_fields:
+            add_parts.append(f"{name_placeholder} {value_placeholder}")
+        elif key in only_set_once:
+            set_parts.append(f"{name_placeholder} = if_not_exists({name_placeholder}, {value_placeholder})")
+        else:
+            set_parts.append(f"{name_placeholder} = {value_placeholder}")
+
+    parts = []
+    if set_parts:
+        parts.append("SET " + ", ".join(set_parts))
+    if add_parts:
+        parts.append("ADD " + ", ".join(add_parts))
+    if remove_parts:
+        parts.append("REMOVE " + ", ".join(remove_parts))
+
+    conditions = []
+    if versioned:
+        attribute_names["#version"] = "version"
+        conditions.append("attribute_not_exists(#version) OR #version <= :incoming_version")
+    if condition_expression:
+        conditions.append(f"{condition_expression}")
+
+    return UpdateExpressionTemplate(
+        update_expression=" ".join(parts),
+        condition_expression=" AND ".join(conditions) if conditions else None,
+        attribute_names=attribute_names,
+        value_placeholders=tuple(value_placeholders),
+    )
+
 class DynamoModel(BaseModel):
     """
     A base model for DynamoDB interactions using Pydantic.
@@ -53,14 +207,28 @@ class DynamoModel(BaseModel):
     -------
     query_gsi(table, key_condition, index_name=None, filter_expression=None, assemble_entites=False)
         Queries the DynamoDB table using the specified key condition and optional filters.
+    iter_query(table, key_condition, index_name=None, limit=None, cursor=None)
+        Lazily yields validated pages of a query, following LastEvaluatedKey.
+    query_page(table, key_condition, index_name=None, limit=None, cursor=None)
+        Returns a single page of validated items plus an opaque cursor.
+    summary_model(fields)
+        Returns a lightweight model holding only ``fields``, for projected reads.
+    from_dynamo(item)
+        Builds an instance from a stored item without running validators.
     to_dynamo(exclude_keys=True)
         Serializes the model instance to a dictionary suitable for DynamoDB.
     upsert(table, only_set_once=[], condition_expression=None)
         Inserts or updates the item in the DynamoDB table.
+    atomic_add(table, key, deltas, conditions=None)
+        Adds deltas to numeric attributes of one item with a single UpdateItem.
+    batch_get(table, keys)
+        Fetches many items by primary key, keyed by (PK, SK).
     assemble_from_items(items)
         Assembles a model instance from a list of DynamoDB items.
     """
     entity_type: Optional[str] = Field(default=None)
+    # what ?fields=summary returns on list routes, the columns the admin tables show
+    SUMMARY_FIELDS: ClassVar[frozenset[str]] = frozenset()
 
     class Config:
         json_encoders = {
@@ -80,6 +248,49 @@ class DynamoModel(BaseModel):
     @property
     def related_entities(self) -> dict:
         return {}
+
+    @classmethod
+    def stored_fields(cls) -> frozenset[str]:
+        """The fields held on the entity's own item, i.e. every field but the assembled relations."""
+        return _stored_fields(cls)
+
+    @classmethod
+    def from_dynamo(cls, item: dict) -> "DynamoModel":
+        """
+        Build an instance from an item read back from DynamoDB.
+
+        Items were validated when they were written, so this skips
+        validation: each field goes through a per-class converter compiled
+        on first use (Decimals to int or float, strings to enums and
+        datetimes, maps to nested models) and the instance is made with
+        ``model_construct``. Field and model validators do not run. Data
+        from a request must still go through ``model_validate``.
+
+        Parameters
+        ----------
+        item : dict
+            The item as returned by boto3. Attributes that are not fields,
+            such as PK, SK and the gsi keys, are ignored.
+
+        Returns
+        -------
+        DynamoModel
+            The model instance, with ``model_fields_set`` holding the fields
+            present on the item.
+        """
+        return construct_from_item(cls, item)
+
+    @classmethod
+    def summary_model(cls, fields: Iterable[str]) -> type[BaseModel]:
+        """
+        A cached model with only ``fields`` of this model, all optional.
+
+        Raises
+        ------
+        ValueError
+            If a field is not one of ``stored_fields()``.
+        """
+        return _summary_model(cls, frozenset(fields))
     
     @property
     def PK(self) -> str:
@@ -97,7 +308,7 @@ class DynamoModel(BaseModel):
     def gsi1SK(self) -> str:
         raise NotImplementedError()
     
-    def query_gsi(self, table, key_condition, index_name=None, assemble_entites=False) -> list:
+    def query_gsi(self, table, key_condition, index_name=None, assemble_entites=False, include=None, fields=None) -> list:
         """
         Query a DynamoDB table using a Global Secondary Index (GSI).
 
@@ -111,11 +322,20 @@ class DynamoModel(BaseModel):
             The name of the Global Secondary Index to query (default is None).
         assemble_entites : bool, optional
             Whether to assemble entities from the items (default is False).
+        include : set[str], optional
+            When assembling, the related entity types (keys of ``related_entities``)
+            to load. Other entity types are filtered out by DynamoDB before
+            they are returned. Default is None, which loads every relation.
+        fields : set[str], optional
+            Only read these attributes of this entity type's items, validated
+            into ``summary_model(fields)``. Related items are skipped and
+            nothing is assembled. Default is None, which reads whole items.
 
         Returns
         -------
         list
-            A list of validated items retrieved from the DynamoDB table.
+            A list of validated items retrieved from the DynamoDB table. With
+            ``fields`` this is always a list of summaries.
 
         Raises
         ------
@@ -123,28 +343,135 @@ class DynamoModel(BaseModel):
             If the query fails, an exception is raised and logged.
         """
         try:
-            kwargs = {
-                "KeyConditionExpression":key_condition
-            }
-            if index_name:
-                kwargs["IndexName"] = index_name
-
-            logger.info(f"query kwargs: {kwargs}")
-            
-            response = table.query(**kwargs)
-            items = response.get("Items", None)
-            
-            logger.info(f"Fetched {len(items)} from dynamodb: {items}")
+            if fields is not None:
+                items = []
+                for page in self.iter_query(table, key_condition, index_name=index_name, filter_expression=Attr("entity_type").eq(self.entity_type), fields=fields):
+                    items.extend(page.items)
+                logger.info(f"Fetched {len(items)} projected items from dynamodb")
+                return items or None
+
+            filter_expression = None
+            if assemble_entites and include is not None:
+                filter_expression = Attr("entity_type").is_in([self.entity_type, *sorted(include)])
+
+            items = []
+            for page in self.iter_query(table, key_condition, index_name=index_name, validate=False, filter_expression=filter_expression):
+                items.extend(page.items)
+
+            logger.info(f"Fetched {len(items)} from dynamodb")
             if not items:
                 return None
             if assemble_entites:
-                return self.assemble_from_items(items)
+                return self.assemble_from_items(items, include=include)
             else:
-                return [self.model_validate(item) for item in items] if len(items) > 1 else self.model_validate(items[0])
+                return [self.from_dynamo(item) for item in items] if len(items) > 1 else self.from_dynamo(items[0])
         except Exception as e:
             logger.error("Query failed: %s", str(e), exc_info=True)
             raise
-    
+
+    def iter_query(self, table, key_condition, index_name=None, limit=None, cursor=None, validate=True, filter_expression=None, fields=None) -> Iterator[QueryPage]:
+        """
+        Lazily query a DynamoDB table page by page.
+
+        Each DynamoDB response page is yielded as soon as it arrives, so
+        callers can stream large partitions with bounded memory instead of
+        loading every item up front.
+
+        Parameters
+        ----------
+        table : boto3.dynamodb.table.Table
+            The DynamoDB table resource to query.
+        key_condition : str
+            The condition that specifies the key values for items to be retrieved.
+        index_name : str, optional
+            The name of the index to query (default is None).
+        limit : int, optional
+            Maximum number of items DynamoDB evaluates per page (default is None).
+        cursor : str, optional
+            Opaque cursor returned by a previous page to resume from (default is None).
+        validate : bool, optional
+            Whether to build models of this class with ``from_dynamo`` (default is True).
+            Pass False to receive raw DynamoDB items.
+        filter_expression : boto3.dynamodb.conditions.ConditionBase, optional
+            A filter applied by DynamoDB after the key condition (default is None).
+            Filtered pages may be smaller than ``limit`` or even empty.
+        fields : set[str], optional
+            Only read these attributes (plus ``entity_type``) and validate
+            items into ``summary_model(fields)`` (default is None).
+
+        Yields
+        ------
+        QueryPage
+            The items of the page and the cursor to resume after it, which is
+            None once the query is exhausted.
+
+        Raises
+        ------
+        ValueError
+            If the cursor cannot be decoded.
+        """
+        kwargs = {
+            "KeyConditionExpression": key_condition
+        }
+        if index_name:
+            kwargs["IndexName"] = index_name
+        if limit:
+            kwargs["Limit"] = limit
+        if filter_expression is not None:
+            kwargs["FilterExpression"] = filter_expression
+        model = self.__class__
+        if fields is not None:
+            model = self.summary_model(fields)
+            kwargs["ProjectionExpression"], kwargs["ExpressionAttributeNames"] = projection_expression(fields)
+        exclusive_start_key = decode_cursor(cursor)
+
+        while True:
+            if exclusive_start_key:
+                kwargs["ExclusiveStartKey"] = exclusive_start_key
+            logger.info(f"query kwargs: {kwargs}")
+
+            response = table.query(**kwargs)
+            items = response.get("Items", [])
+            exclusive_start_key = response.get("LastEvaluatedKey")
+            if validate:
+                items = [construct_from_item(model, item) for item in items]
+
+            yield QueryPage(items=items, cursor=encode_cursor(exclusive_start_key))
+            if not exclusive_start_key:
+                return
+
+    def query_page(self, table, key_condition, index_name=None, limit=None, cursor=None, validate=True, filter_expression=None, fields=None) -> QueryPage:
+        """
+        Fetch a single page of a query.
+
+        Parameters
+        ----------
+        table : boto3.dynamodb.table.Table
+            The DynamoDB table resource to query.
+        key_condition : str
+            The condition that specifies the key values for items to be retrieved.
+        index_name : str, optional
+            The name of the index to query (default is None).
+        limit : int, optional
+            Maximum number of items to return (default is None).
+        cursor : str, optional
+            Opaque cursor returned by a previous page to resume from (default is None).
+        validate : bool, optional
+            Whether to build models of this class with ``from_dynamo`` (default is True).
+        filter_expression : boto3.dynamodb.conditions.ConditionBase, optional
+            A filter applied by DynamoDB after the key condition (default is None).
+
+        Returns
+        -------
+        QueryPage
+            Up to ``limit`` items and the cursor for the next page, which is
+            None when there are no more items.
+        """
+        for page in self.iter_query(table, key_condition, index_name=index_name, limit=limit, cursor=cursor, validate=validate, filter_expression=filter_expression, fields=fields):
+            if page.items or not page.cursor:
+                return page
+        return QueryPage(items=[], cursor=None)
+
     def _slugify(self, string) -> str:
         """
         Convert a string into a URL-friendly slug.
@@ -190,35 +517,80 @@ class DynamoModel(BaseModel):
             A dictionary representation of the instance, formatted for 
             DynamoDB, with optional exclusion of specified keys.
         """
+        plan = self.serialization_plan()
         base = self.model_dump(
             mode="json",
             exclude_none=True,
             exclude_unset=exclude_unset,
         )
 
+        for key, value in base.items():
+            if key not in plan.float_free_fields:
+                base[key] = convert_floats_to_decimals(value)
+
         entity_type = getattr(self, "entity_type", None)
         if entity_type is not None and "entity_type" not in base:
             base["entity_type"] = entity_type
 
-        if exclude_keys:
-            exclude_props = {"__fields_set__", "model_fields_set", "model_extra", "related_entities", "PK", "SK"}
-        else:
-            exclude_props = {"__fields_set__", "model_fields_set", "model_extra", "related_entities"}
+        for name in plan.properties:
+            if exclude_keys and name in ("PK", "SK"):
+                continue
+            try:
+                value = getattr(self, name)
+            except NotImplementedError:
+                continue
+            if value is not None:
+                base[name] = convert_floats_to_decimals(value)
+
+        return base
+
+    @classmethod
+    def serialization_plan(cls) -> SerializationPlan:
+        """
+        Return the cached serialization plan for this model class.
 
-        props = {}
-        for name in dir(self.__class__):
-            if name in exclude_props:
+        The plan records which computed properties (PK, SK, gsi keys, ...)
+        are written alongside the fields and which fields can never hold
+        floats after a JSON-mode dump, so ``to_dynamo`` does not have to
+        inspect the class or walk every value on each call. It is built on
+        first use and stored on the class itself.
+
+        Returns
+        -------
+        SerializationPlan
+            The property names to evaluate and the fields that can skip
+            float to Decimal conversion.
+        """
+        plan = cls.__dict__.get("__dynamo_serialization_plan__")
+        if plan is None:
+            plan = cls._build_serialization_plan()
+            cls.__dynamo_serialization_plan__ = plan
+        return plan
+
+    @classmethod
+    def _build_serialization_plan(cls) -> SerializationPlan:
+        properties = []
+        for name in dir(cls):
+            if name in _NON_ITEM_PROPERTIES:
+                continue
+            attr = getattr(cls, name, None)
+            if not isinstance(attr, property):
                 continue
-            attr = getattr(self.__class__, name)
-            if isinstance(attr, property):
-                try:
-                    value = getattr(self, name)
-                    if value is not None:
-                        props[name] = value
-                except NotImplementedError:
-                    continue
-
-        return convert_floats_to_decimals({**base, **props})
+            # the abstract key properties on DynamoModel always raise NotImplementedError
+            if attr is DynamoModel.__dict__.get(name):
+                continue
+            properties.append(name)
+
+        # custom serializers can emit anything, so their fields are always walked
+        decorators = cls.__pydantic_decorators__
+        serialized_fields = {
+            name for serializer in decorators.field_serializers.values() for name in serializer.info.fields
+        }
+        float_free_fields = frozenset() if decorators.model_serializers else frozenset(
+            name for name, field in cls.model_fields.items()
+            if name not in serialized_fields and not _annotation_may_hold_float(field.annotation)
+        )
+        return SerializationPlan(properties=tuple(properties), float_free_fields=float_free_fields)
     
     def upsert(self, 
                table, 
@@ -258,72 +630,51 @@ class DynamoModel(BaseModel):
             An object containing the result of the upsert operation, including success status,
             the updated item if successful, and any error message if not successful.
         """
-        update_parts = []
-        remove_parts = []
-        expression_attr_names = {}
-        expression_attr_values = {}
         extra_expression_attr_names = dict(extra_expression_attr_names or {})
         extra_expression_attr_values = dict(extra_expression_attr_values or {})            
         
         item = self.to_dynamo(exclude_unset=explicit_fields_only)
 
+        remove_keys = ()
         if explicit_fields_only:
             explicit_values = self.model_dump(mode="json", exclude_unset=True, exclude_none=False)
-            for key, value in explicit_values.items():
-                if value is None:
-                    name_placeholder = f"#{key}"
-                    expression_attr_names[name_placeholder] = key
-                    remove_parts.append(name_placeholder)
+            remove_keys = tuple(key for key, value in explicit_values.items() if value is None)
 
-        if self.uses_versioning():
+        versioned = self.uses_versioning()
+        if versioned:
             incoming_version = item.get('version', 0)
             item['version'] = incoming_version + 1
-        
-        for key, value in item.items():
-            name_placeholder = f"#{key}"
-            value_placeholder = f":{key}"
-            expression_attr_names[name_placeholder] = key
-            expression_attr_values[value_placeholder] = value
-
-            if key in only_set_once:
-                update_parts.append(f"{name_placeholder} = if_not_exists({name_placeholder}, {value_placeholder})")
-            else:
-                update_parts.append(f"{name_placeholder} = {value_placeholder}")
+
+        template = compile_update_expression(
+            tuple(item),
+            only_set_once=frozenset(only_set_once or ()),
+            remove_keys=remove_keys,
+            condition_expression=condition_expression,
+            versioned=versioned,
+        )
+        expression_attr_names = dict(template.attribute_names)
+        expression_attr_values = template.attribute_values(item)
+        if versioned:
+            expression_attr_values[":incoming_version"] = incoming_version
 
         for k, v in extra_expression_attr_names.items():
             expression_attr_names.setdefault(k, v)
         for k, v in extra_expression_attr_values.items():
             expression_attr_values.setdefault(k, v)                
 
-        update_expression_parts = []
-        if update_parts:
-            update_expression_parts.append("SET " + ", ".join(update_parts))
-        if remove_parts:
-            update_expression_parts.append("REMOVE " + ", ".join(remove_parts))
-
-        update_expression = " ".join(update_expression_parts)
-
         kwargs = dict(
             Key={"PK": self.PK, "SK": self.SK},
-            UpdateExpression=update_expression,
+            UpdateExpression=template.update_expression,
             ExpressionAttributeNames=expression_attr_names,
             ExpressionAttributeValues=expression_attr_values,
             ReturnValues="ALL_NEW"
         )
 
-        conditions = []
-        
-        if self.uses_versioning():
-            expression_attr_names["#version"] = "version"
-            expression_attr_values[":incoming_version"] = incoming_version
-            conditions.append("attribute_not_exists(#version) OR #version <= :incoming_version")
+        if versioned:
             # Ask DynamoDB to include the prior item in a condition check failure response.
             kwargs["ReturnValuesOnConditionCheckFailure"] = "ALL_OLD"
-        if condition_expression:
-            conditions.append(f"{condition_expression}")
-        
-        if conditions:
-            kwargs["ConditionExpression"] = " AND ".join(conditions)
+        if template.condition_expression:
+            kwargs["ConditionExpression"] = template.condition_expression
 
         try:
             result = table.update_item(**kwargs)
@@ -422,7 +773,165 @@ class DynamoModel(BaseModel):
             )
             # raise
 
-    def assemble_from_items(self, items: list[dict]) -> "DynamoModel":
+    @classmethod
+    def atomic_add(cls,
+                   table,
+                   key: dict[str, str],
+                   deltas: dict[str, int],
+                   conditions: str | None = None,
+                   set_fields: dict[str, object] | None = None,
+                   extra_expression_attr_names: dict[str, str] | None = None,
+                   extra_expression_attr_values: dict[str, object] | None = None,
+                   ) -> AtomicAddResult:
+        """
+        Add deltas to counters on a single item with one ``UpdateItem``.
+
+        Nothing is validated or serialised through the model, and no
+        transaction is used, so this is the cheap path for hot counters.
+        A failed condition returns the prior item (``ALL_OLD``) with the same
+        ``remaining_capacity_insufficient`` inference as ``transact_upsert``.
+
+        Parameters
+        ----------
+        table : boto3.dynamodb.table.Table
+            The DynamoDB table holding the item.
+        key : dict[str, str]
+            The ``{"PK": ..., "SK": ...}`` key of the item.
+        deltas : dict[str, int]
+            Attribute name to the amount added with ``ADD`` (may be negative).
+        conditions : str, optional
+            A condition expression; placeholders for the ``deltas`` and
+            ``set_fields`` attributes (``#name``) may be used in it.
+        set_fields : dict[str, object], optional
+            Attributes written with ``SET`` alongside the counters, e.g. ``updated_at``.
+        extra_expression_attr_names : dict[str, str], optional
+            Extra expression attribute names used by ``conditions``.
+        extra_expression_attr_values : dict[str, object], optional
+            Extra expression attribute values used by ``conditions``.
+
+        Returns
+        -------
+        AtomicAddResult
+            ``item`` holds the updated attributes on success. On a failed
+            condition ``code`` is ``conditional_failed``; throttling gives
+            ``throttled``. Other errors are raised.
+        """
+        if not deltas:
+            raise ValueError("atomic_add: no deltas given")
+        set_fields = dict(set_fields or {})
+
+        names = {f"#{field}": field for field in (*deltas, *set_fields)}
+        values = {f":add_{field}": int(delta) for field, delta in deltas.items()}
+        values.update({f":set_{field}": value for field, value in set_fields.items()})
+        update_expression = "ADD " + ", ".join(f"#{field} :add_{field}" for field in deltas)
+        if set_fields:
+            update_expression += " SET " + ", ".join(f"#{field} = :set_{field}" for field in set_fields)
+
+        for k, v in (extra_expression_attr_names or {}).items():
+            names.setdefault(k, v)
+        for k, v in (extra_expression_attr_values or {}).items():
+            values.setdefault(k, v)
+
+        kwargs = dict(
+            Key=key,
+            UpdateExpression=update_expression,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+            ReturnValues="UPDATED_NEW",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
+        )
+        if conditions:
+            kwargs["ConditionExpression"] = conditions
+
+        try:
+            result = table.update_item(**kwargs)
+            return AtomicAddResult(success=True, item=result.get("Attributes", None))
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            message = e.response.get("Error", {}).get("Message")
+            if code == "ConditionalCheckFailedException":
+                old_item = e.response.get("Item")
+                logger.warning(f"Conditional check failed on atomic add for PK: {key.get('PK')}, SK: {key.get('SK')}")
+                return AtomicAddResult(
+                    success=False,
+                    item=None,
+                    code="conditional_failed",
+                    dynamodb_code=code,
+                    message=message,
+                    old_item=old_item,
+                    inferred=_infer_capacity_failure(old_item),
+                )
+            if code in RETRYABLE_ERROR_CODES - {"InternalServerError"}:
+                return AtomicAddResult(success=False, item=None, code="throttled", dynamodb_code=code, message=message)
+            raise
+
+    @classmethod
+    def batch_get(cls,
+                  table,
+                  keys,
+                  consistent_read: bool = False,
+                  validate: bool = True,
+                  max_attempts: int = BATCH_GET_MAX_ATTEMPTS,
+                  max_workers: int = BATCH_GET_MAX_WORKERS,
+                  ) -> dict[tuple[str, str], Any]:
+        """
+        Fetch many items by primary key with BatchGetItem.
+
+        Keys are de-duplicated and split into chunks of 100, which are
+        fetched concurrently from a bounded thread pool. ``UnprocessedKeys``
+        and throttling errors are retried with jittered exponential backoff.
+
+        Parameters
+        ----------
+        table : boto3.dynamodb.table.Table
+            The DynamoDB table to read from.
+        keys : iterable
+            ``(PK, SK)`` tuples or ``{"PK": ..., "SK": ...}`` dictionaries.
+        consistent_read : bool, optional
+            Whether to use strongly consistent reads (default is False).
+        validate : bool, optional
+            Whether to build models of this class with ``from_dynamo`` (default is True).
+            Pass False to receive raw DynamoDB items.
+        max_attempts : int, optional
+            Maximum number of BatchGetItem calls per chunk.
+        max_workers : int, optional
+            Maximum number of chunks fetched in parallel.
+
+        Returns
+        -------
+        dict[tuple[str, str], DynamoModel]
+            The found items keyed by ``(PK, SK)``. Keys that do not exist
+            are absent from the result.
+
+        Raises
+        ------
+        BatchGetIncompleteError
+            If some keys are still unprocessed after ``max_attempts``.
+        """
+        client = table.meta.client
+        table_name = table.name
+
+        unique_keys = list(dict.fromkeys(
+            (key["PK"], key["SK"]) if isinstance(key, dict) else tuple(key) for key in keys
+        ))
+        chunks = [unique_keys[i:i+BATCH_GET_MAX_BATCH_SIZE] for i in range(0, len(unique_keys), BATCH_GET_MAX_BATCH_SIZE)]
+        logger.info(f"Batch getting {len(unique_keys)} keys from {table_name} in {len(chunks)} chunks")
+
+        def get_chunk(chunk):
+            return _get_chunk(client, table_name, chunk, consistent_read, max_attempts)
+
+        if len(chunks) <= 1 or max_workers <= 1:
+            chunk_items = [get_chunk(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                chunk_items = list(executor.map(get_chunk, chunks))
+
+        return {
+            (item["PK"], item["SK"]): cls.from_dynamo(item) if validate else item
+            for items in chunk_items for item in items
+        }
+
+    def assemble_from_items(self, items: list[dict], include=None) -> "DynamoModel":
         """
         Assemble a DynamoModel instance from a list of item dictionaries.
 
@@ -431,6 +940,10 @@ class DynamoModel(BaseModel):
         items : list[dict]
             A list of dictionaries representing items, each containing an 
             'entity_type' key and other relevant data for model validation.
+        include : set[str], optional
+            The related entity types to attach. Items of other related types
+            are skipped without being validated. Default is None, which
+            attaches every relation.
 
         Returns
         -------
@@ -455,7 +968,7 @@ class DynamoModel(BaseModel):
         if not root_item:
             raise ValueError(f"No {root_entity_type} item found in items.")
         
-        base = self.model_validate(root_item)
+        base = self.from_dynamo(root_item)
 
         mapping = self.related_entities
         for item in items:
@@ -463,11 +976,11 @@ class DynamoModel(BaseModel):
             if etype == root_entity_type:
                 continue
 
-            if etype not in mapping:
+            if etype not in mapping or (include is not None and etype not in include):
                 continue
 
             attr, mode, ModelClass = mapping[etype]
-            parsed = ModelClass.model_validate(item)
+            parsed = ModelClass.from_dynamo(item)
 
             if mode == "single":
                 setattr(base, attr, parsed)
@@ -480,6 +993,39 @@ class DynamoModel(BaseModel):
             
         return base
 
+class BatchGetIncompleteError(Exception):
+    def __init__(self, unprocessed_keys: list[dict]):
+        self.unprocessed_keys = unprocessed_keys
+        super().__init__(f"{len(unprocessed_keys)} keys were still unprocessed after retrying BatchGetItem")
+
+def _get_chunk(client, table_name: str, keys: list[tuple[str, str]], consistent_read: bool, max_attempts: int) -> list[dict]:
+    items = []
+    pending = [{"PK": pk, "SK": sk} for pk, sk in keys]
+
+    for attempt in range(max_attempts):
+        if attempt:
+            time.sleep(_backoff_delay(attempt - 1))
+
+        request = {"Keys": pending}
+        if consistent_read:
+            request["ConsistentRead"] = True
+        try:
+            response = client.batch_get_item(RequestItems={table_name: request})
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            logger.warning(f"Batch get of {len(pending)} keys from {table_name} failed with {code} (attempt {attempt + 1})")
+            if code not in RETRYABLE_ERROR_CODES:
+                raise
+            continue
+
+        items.extend(response.get("Responses", {}).get(table_name, []))
+        pending = response.get("UnprocessedKeys", {}).get(table_name, {}).get("Keys", [])
+        if not pending:
+            return items
+        logger.info(f"{len(pending)} unprocessed keys returned by {table_name}, retrying")
+
+    raise BatchGetIncompleteError(pending)
+
 class VersionConflictError(Exception):
     def __init__(self, model: DynamoModel | list[DynamoModel], incoming_version: int | list[int] = None):
         if isinstance(model, list):
@@ -526,47 +1072,194 @@ class HistoryModel(DynamoModel):
     def gsi1SK(self) -> str:
         return None
 
-def batch_write(table, items: list, overwrite: bool = True):
+@dataclass
+class BatchWriteOutcome:
+    item: Any
+    pk: str
+    sk: str
+    status: Literal["written", "unprocessed", "failed"]
+    attempts: int
+    error: Optional[str] = None
+
+@dataclass
+class BatchWriteResult:
+    successful: list[Any]
+    unprocessed: list[Any]
+    outcomes: list[BatchWriteOutcome]
+
+    def __iter__(self):
+        # keeps `successful, unprocessed = batch_write(...)` working
+        return iter((self.successful, self.unprocessed))
+
+def _write_chunk(client, table_name: str, chunk: list[tuple[Any, dict]], max_attempts: int, request_type: str = "PutRequest") -> list[BatchWriteOutcome]:
+    # puts carry the whole item, deletes only its key
+    field = "Item" if request_type == "PutRequest" else "Key"
+    pending = {(dynamo_item["PK"], dynamo_item["SK"]): dynamo_item for _, dynamo_item in chunk}
+    attempts = {key: 0 for key in pending}
+    errors: dict[tuple[str, str], str] = {}
+
+    for attempt in range(max_attempts):
+        if attempt:
+            time.sleep(_backoff_delay(attempt - 1))
+        for key in pending:
+            attempts[key] += 1
+
+        try:
+            response = client.batch_write_item(RequestItems={
+                table_name: [{request_type: {field: dynamo_item}} for dynamo_item in pending.values()]
+            })
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            logger.warning(f"Batch write of {len(pending)} items to {table_name} failed with {code} (attempt {attempt + 1})")
+            if code not in RETRYABLE_ERROR_CODES:
+                errors.update({key: str(e) for key in pending})
+                break
+            continue
+
+        unprocessed = response.get("UnprocessedItems", {}).get(table_name, [])
+        pending = {
+            (entry[request_type][field]["PK"], entry[request_type][field]["SK"]): entry[request_type][field]
+            for entry in unprocessed
+        }
+        if not pending:
+            break
+        logger.info(f"{len(pending)} unprocessed items returned by {table_name}, retrying")
+
+    outcomes = []
+    for item, dynamo_item in chunk:
+        key = (dynamo_item["PK"], dynamo_item["SK"])
+        if key not in pending:
+            status = "written"
+        elif key in errors:
+            status = "failed"
+        else:
+            status = "unprocessed"
+        outcomes.append(BatchWriteOutcome(
+            item=item,
+            pk=key[0],
+            sk=key[1],
+            status=status,
+            attempts=attempts[key],
+            error=errors.get(key),
+        ))
+    return outcomes
+
+def batch_write(table, 
+                items: list, 
+                overwrite: bool = True,
+                max_attempts: int = BATCH_WRITE_MAX_ATTEMPTS,
+                max_workers: int = BATCH_WRITE_MAX_WORKERS,
+                ) -> BatchWriteResult:
     """
-    
+    Put many items with BatchWriteItem.
+
+    Items are split into chunks of 25 which are sent concurrently from a
+    bounded thread pool. Any ``UnprocessedItems`` (and throttling errors)
+    are retried with jittered exponential backoff, so only items that are
+    still unprocessed after ``max_attempts`` are reported as such.
+
+    Parameters
+    ----------
+    table : boto3.dynamodb.table.Table
+        The DynamoDB table to write to.
+    items : list[DynamoModel]
+        The models to write.
+    overwrite : bool, optional
+        Unused, kept for backwards compatibility.
+    max_attempts : int, optional
+        Maximum number of BatchWriteItem calls per chunk.
+    max_workers : int, optional
+        Maximum number of chunks written in parallel.
+
+    Returns
+    -------
+    BatchWriteResult
+        The written and unprocessed items plus a per-item outcome report.
+        Unpacks as ``(successful, unprocessed)``.
     """
-    MAX_BATCH_SIZE = 25 # DynamoDB's maximum batch size is 25 items (stricly enforced)
     client = table.meta.client
     table_name = table.name
 
-    batches = [items[i:i+MAX_BATCH_SIZE] for i in range(0, len(items), MAX_BATCH_SIZE)]
-    successful_items = []
-    unprocessed_items = []
+    serialized = [(item, item.to_dynamo(exclude_keys=False)) for item in items]
+    chunks = [serialized[i:i+BATCH_WRITE_MAX_BATCH_SIZE] for i in range(0, len(serialized), BATCH_WRITE_MAX_BATCH_SIZE)]
+    logger.info(f"Batch writing {len(items)} items to {table_name} in {len(chunks)} chunks")
+
+    if len(chunks) <= 1 or max_workers <= 1:
+        chunk_outcomes = [_write_chunk(client, table_name, chunk, max_attempts) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            chunk_outcomes = list(executor.map(lambda chunk: _write_chunk(client, table_name, chunk, max_attempts), chunks))
+
+    outcomes = [outcome for chunk in chunk_outcomes for outcome in chunk]
+    result = BatchWriteResult(
+        successful=[o.item for o in outcomes if o.status == "written"],
+        unprocessed=[o.item for o in outcomes if o.status != "written"],
+        outcomes=outcomes,
+    )
+    if result.unprocessed:
+        logger.warning(f"Batch write left {len(result.unprocessed)} of {len(items)} items unprocessed in {table_name}")
+    return result
+
+def batch_delete(table,
+                 keys: list[dict],
+                 max_attempts: int = BATCH_WRITE_MAX_ATTEMPTS,
+                 max_workers: int = BATCH_WRITE_MAX_WORKERS,
+                 ) -> BatchWriteResult:
+    """
+    Delete many items by key with BatchWriteItem.
 
-    for batch in batches:
-        request_items = {
-            table_name: [
-                {"PutRequest": {"Item": item.to_dynamo(exclude_keys=False)}} for item in batch
-            ]
-        } 
-        logger.info(f"Batch write request for {len(batch)} items to {table_name} with request items: {request_items}")
+    Works like ``batch_write``: chunks of 25 keys are sent concurrently and
+    unprocessed deletes are retried with backoff.
 
-        try:
-            response = client.batch_write_item(RequestItems=request_items)
-            unprocessed = response.get('UnprocessedItems', {}).get(table_name, [])
-
-            unprocessed_keys = {
-                tuple(entry["PutRequest"]["Item"][k] for k in ("PK", "SK"))
-                for entry in unprocessed
-            }
-
-            for item in batch:
-                dynamo_item = item.to_dynamo(exclude_keys=False)
-                this_item_keys = tuple(dynamo_item[k] for k in ("PK", "SK"))
-                if this_item_keys in unprocessed_keys:
-                    unprocessed_items.append(item)
-                else:
-                    successful_items.append(item)
-        except ClientError as e:
-            logger.error(f"Batch write failed: {e}")
-            raise Exception(e)
-        
-    return successful_items, unprocessed_items
+    Parameters
+    ----------
+    table : boto3.dynamodb.table.Table
+        The DynamoDB table to delete from.
+    keys : list[dict]
+        ``{"PK": ..., "SK": ...}`` keys of the items to delete. Duplicates
+        are dropped, since BatchWriteItem rejects them in one request.
+    max_attempts : int, optional
+        Maximum number of BatchWriteItem calls per chunk.
+    max_workers : int, optional
+        Maximum number of chunks deleted in parallel.
+
+    Returns
+    -------
+    BatchWriteResult
+        The deleted and unprocessed keys plus a per-key outcome report.
+    """
+    client = table.meta.client
+    table_name = table.name
+
+    unique = list({(key["PK"], key["SK"]): {"PK": key["PK"], "SK": key["SK"]} for key in keys}.values())
+    chunks = [[(key, key) for key in unique[i:i+BATCH_WRITE_MAX_BATCH_SIZE]] for i in range(0, len(unique), BATCH_WRITE_MAX_BATCH_SIZE)]
+    logger.info(f"Batch deleting {len(unique)} items from {table_name} in {len(chunks)} chunks")
+
+    if len(chunks) <= 1 or max_workers <= 1:
+        chunk_outcomes = [_write_chunk(client, table_name, chunk, max_attempts, request_type="DeleteRequest") for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            chunk_outcomes = list(executor.map(lambda chunk: _write_chunk(client, table_name, chunk, max_attempts, request_type="DeleteRequest"), chunks))
+
+    outcomes = [outcome for chunk in chunk_outcomes for outcome in chunk]
+    result = BatchWriteResult(
+        successful=[o.item for o in outcomes if o.status == "written"],
+        unprocessed=[o.item for o in outcomes if o.status != "written"],
+        outcomes=outcomes,
+    )
+    if result.unprocessed:
+        logger.warning(f"Batch delete left {len(result.unprocessed)} of {len(unique)} keys unprocessed in {table_name}")
+    return result
+
+def _infer_capacity_failure(old_item: Optional[dict]) -> Optional[str]:
+    """Infer why a counter condition failed from the low-level ``ALL_OLD`` item."""
+    if isinstance(old_item, dict):
+        rc = old_item.get("remaining_capacity", None)
+        if rc is not None:
+            logger.info(f"Old item remaining capacity: {rc}, {type(rc)}")
+            if "N" in rc and rc.get("N") is not None and int(rc["N"]) < 1: 
+                return "remaining_capacity_insufficient"
+    return None
 
 @dataclass
 class TransactUpsertFailure:
@@ -598,8 +1291,10 @@ def transact_upsert(table,
     MAX_BATCH_SIZE = 25 # DynamoDB's maximum batch size is 25 items (stricly enforced)
     client = table.meta.client
 
-    add_fields = set(add_fields or [])
-    only_set_once = list(only_set_once or [])
+    add_fields = frozenset(add_fields or ())
+    only_set_once = frozenset(only_set_once or ())
+    extra_expression_attr_names = dict(extra_expression_attr_names or {})
+    extra_expression_attr_values = dict(extra_expression_attr_values or {})
 
     batches = [items[i:i+MAX_BATCH_SIZE] for i in range(0, len(items), MAX_BATCH_SIZE)]
     successful_items: list[DynamoModel] = []
@@ -608,73 +1303,49 @@ def transact_upsert(table,
 
     for batch in batches:
         transact_items = []
+        incoming_versions = []
 
         for item in batch:
-            conditions: list[str] = []
-            set_parts:  list[str] = []
-            add_parts:  list[str] = []
-
-            extra_expression_attr_names = dict(extra_expression_attr_names or {})
-            extra_expression_attr_values = dict(extra_expression_attr_values or {})
-
-            expression_attr_names = {}
-            expression_attr_values = {}
-
             item_dict = item.to_dynamo(
                 exclude_keys=True,
                 exclude_unset=explicit_fields_only,
             )
 
-            if item.uses_versioning() and not version_override:
-                incoming_version = item_dict.get('version', 0)
+            incoming_version = item_dict.get('version', 0)
+            incoming_versions.append(incoming_version)
+            versioned = item.uses_versioning() and not version_override
+            if versioned:
                 item_dict['version'] = incoming_version + 1
 
-                expression_attr_names["#version"] = "version"
-                expression_attr_values[":incoming_version"] = incoming_version
-                conditions.append("attribute_not_exists(#version) OR #version <= :incoming_version")
-
-            if condition_expression:
-                conditions.append(f"{condition_expression}")
-
-            for key, value in item_dict.items():
-                name_placeholder = f"#{key}"
-                value_placeholder = f":{key}"
-                expression_attr_names[name_placeholder] = key
-                expression_attr_values[value_placeholder] = value
-
-                if key in add_fields:
-                    add_parts.append(f"{name_placeholder} {value_placeholder}")
-                    continue                
+            template = compile_update_expression(
+                tuple(item_dict),
+                only_set_once=only_set_once,
+                add_fields=add_fields,
+                condition_expression=condition_expression,
+                versioned=versioned,
+            )
+            if not template.update_expression:
+                raise ValueError(f"transact_upsert: no updatable attributes for item {item!r}")
 
-                if key in only_set_once:
-                    set_parts.append(f"{name_placeholder} = if_not_exists({name_placeholder}, {value_placeholder})")
-                else:
-                    set_parts.append(f"{name_placeholder} = {value_placeholder}")
+            expression_attr_names = dict(template.attribute_names)
+            expression_attr_values = template.attribute_values(item_dict)
+            if versioned:
+                expression_attr_values[":incoming_version"] = incoming_version
 
             for k, v in extra_expression_attr_names.items():
                 expression_attr_names.setdefault(k, v)
             for k, v in extra_expression_attr_values.items():
                 expression_attr_values.setdefault(k, v)
 
-            parts = []
-            if set_parts:
-                parts.append("SET " + ", ".join(set_parts))
-            if add_parts:
-                parts.append("ADD " + ", ".join(add_parts))
-            if not parts:
-                raise ValueError(f"transact_upsert: no updatable attributes for item {item!r}")
-            
-            update_expression = " ".join(parts)
-
             transact_items.append({
                 "Update": {
                     "TableName": table.name,
                     "Key": {"PK": item.PK, "SK": item.SK},
-                    "UpdateExpression": update_expression,
+                    "UpdateExpression": template.update_expression,
                     "ExpressionAttributeNames": expression_attr_names,
                     "ExpressionAttributeValues": expression_attr_values,
                     "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
-                    **({"ConditionExpression": " AND ".join(conditions)} if conditions else {})
+                    **({"ConditionExpression": template.condition_expression} if template.condition_expression else {})
                 }
             })
 
@@ -718,10 +1389,7 @@ def transact_upsert(table,
                     normalised = "conditional_failed"
 
                     if (not version_override) and batch[i].uses_versioning():
-                        incoming_version = batch[i].to_dynamo(
-                            exclude_keys=True,
-                            exclude_unset=explicit_fields_only,
-                        ).get("version", 0)
+                        incoming_version = incoming_versions[i]
                         old_version = None
                         if isinstance(old_item, dict):
                             old_version = old_item.get("version", None)
@@ -730,14 +1398,7 @@ def transact_upsert(table,
                         if isinstance(old_version, dict) and "N" in old_version and old_version.get("N") is not None and int(old_version["N"]) > incoming_version:
                             inferred = "version_conflict"
 
-                    if isinstance(old_item, dict):
-                        rc = old_item.get("remaining_capacity", None)
-                        if rc is not None:
-                            logger.info(f"Old item remaining capacity: {rc}, {type(rc)}")
-                            if "N" in rc and rc.get("N") is not None and int(rc["N"]) < 1: 
-                            # if isinstance(rc, (int, float)) and rc < 1:
-                                logger.info(f"current inffered problem is {inferred} and remaining capacity is {rc}")
-                                inferred = inferred or "remaining_capacity_insufficient"
+                    inferred = inferred or _infer_capacity_failure(old_item)
                 
                 elif code == "TransactionConflict":
                     normalised = "transaction_conflict"
@@ -1,8 +1,18 @@
 from __future__ import annotations
 
-from datetime import datetime
+import base64
+import binascii
+import json
+import random
+import types
+import uuid
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
-from typing import Any, Optional, Union
+from enum import Enum
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Literal, Optional, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
 
 
 def convert_datetime_to_iso_8601_with_z_suffix(dt: Union[datetime, str]) -> str:
@@ -26,6 +36,141 @@ def convert_floats_to_decimals(obj: Any) -> Any:
     return obj
 
 
+_FLOAT_FREE_TYPES = (str, int, bool, bytes, type(None), datetime, date, time, timedelta, Decimal, uuid.UUID)
+
+
+def _annotation_may_hold_float(annotation: Any, _seen: Optional[set] = None) -> bool:
+    """Whether a JSON-mode dump of a field with this annotation can contain a float.
+
+    Unknown annotations (Any, forward references, arbitrary classes) are
+    treated as possibly holding floats so the caller falls back to walking
+    the value.
+    """
+    _seen = set() if _seen is None else _seen
+    origin = get_origin(annotation)
+
+    if origin is Annotated:
+        return _annotation_may_hold_float(get_args(annotation)[0], _seen)
+    if origin is Literal:
+        return any(isinstance(arg, float) for arg in get_args(annotation))
+    if origin is not None:
+        if origin in (Union, types.UnionType, list, tuple, set, frozenset, dict):
+            return any(
+                arg is not Ellipsis and _annotation_may_hold_float(arg, _seen)
+                for arg in get_args(annotation)
+            ) or not get_args(annotation)
+        return True
+    if not isinstance(annotation, type):
+        return True
+    if annotation is float:
+        return True
+    if issubclass(annotation, Enum):
+        return any(isinstance(member.value, float) for member in annotation)
+    if issubclass(annotation, _FLOAT_FREE_TYPES):
+        return False
+    if issubclass(annotation, BaseModel):
+        if annotation in _seen:
+            return False
+        _seen.add(annotation)
+        if annotation.model_config.get("extra") == "allow":
+            return True
+        return any(
+            _annotation_may_hold_float(field.annotation, _seen)
+            for field in annotation.model_fields.values()
+        )
+    if annotation.__module__ == "pydantic.networks":
+        return False
+    return True
+
+
+_STORED_AS_IS_TYPES = (str, bool, bytes, Decimal)
+
+
+def _parse_datetime(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return TypeAdapter(datetime).validate_python(value)
+
+
+def _item_converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """How a value read back from DynamoDB becomes the field's Python type, or None when it is used as stored.
+
+    Only the conversions that storage needs are done: numbers come back as
+    Decimal, enums and datetimes as strings, sets as sets and nested models
+    as maps. Anything more involved goes through a pydantic TypeAdapter.
+    """
+    origin = get_origin(annotation)
+
+    if origin is Annotated:
+        return _item_converter(get_args(annotation)[0])
+    if origin is Literal or annotation is Any:
+        return None
+    if origin in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return _item_converter(args[0])
+        return TypeAdapter(annotation).validate_python
+    if origin in (list, set, frozenset):
+        args = get_args(annotation)
+        convert = _item_converter(args[0]) if args else None
+        # a single value stored where a list is expected, as EventModel.category allows
+        if convert is None:
+            return lambda value: origin([value] if isinstance(value, str) else value)
+        return lambda value: origin(convert(v) for v in ([value] if isinstance(value, str) else value))
+    if origin is dict:
+        args = get_args(annotation)
+        return None if not args or args[1] is Any else TypeAdapter(annotation).validate_python
+    if origin is not None or not isinstance(annotation, type):
+        return TypeAdapter(annotation).validate_python
+
+    # str-based enums are strs too, so they are checked first
+    if issubclass(annotation, Enum):
+        return lambda value: value if isinstance(value, annotation) else annotation(value)
+    if issubclass(annotation, _STORED_AS_IS_TYPES):
+        return None
+    if annotation is int:
+        return _to_int
+    if annotation is float:
+        return float
+    if annotation is datetime:
+        return _parse_datetime
+    if annotation is date:
+        return lambda value: value if isinstance(value, date) else date.fromisoformat(value)
+    if issubclass(annotation, BaseModel):
+        return lambda value: construct_from_item(annotation, value) if isinstance(value, dict) else value
+    return TypeAdapter(annotation).validate_python
+
+
+_validate_int = TypeAdapter(int).validate_python
+
+
+def _to_int(value: Any) -> int:
+    """Convert a stored whole number to int; anything else (e.g. ``Decimal("1.5")``) is left to pydantic to accept or reject."""
+    if type(value) is int:
+        return value
+    if isinstance(value, Decimal) and value.is_finite() and value == value.to_integral_value():
+        return int(value)
+    return _validate_int(value)
+
+
+@lru_cache(maxsize=None)
+def _item_plan(model: type[BaseModel]) -> tuple[tuple[str, Optional[Callable[[Any], Any]]], ...]:
+    return tuple((field.alias or name, _item_converter(field.annotation)) for name, field in model.model_fields.items())
+
+
+def construct_from_item(model: type[BaseModel], item: dict[str, Any]) -> BaseModel:
+    """Build ``model`` from a stored item with ``model_construct``, converting each field once and running no validators."""
+    values = {}
+    for key, convert in _item_plan(model):
+        if key in item:
+            value = item[key]
+            values[key] = value if convert is None or value is None else convert(value)
+    return model.model_construct(**values)
+
+
 def _decode_dynamodb_attr_value(value: Any) -> tuple[Any, Optional[str]]:
     """Decode low-level DynamoDB AttributeValue shapes when present."""
     if isinstance(value, dict) and len(value) == 1:
@@ -91,3 +236,30 @@ def _repair_string_number_field(
         },
     )
     return True
+
+
+def encode_cursor(last_evaluated_key: dict[str, Any] | None) -> Optional[str]:
+    """Encode a DynamoDB LastEvaluatedKey as an opaque, URL-safe cursor."""
+    if not last_evaluated_key:
+        return None
+    payload = json.dumps(last_evaluated_key, separators=(",", ":"), sort_keys=True, default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> Optional[dict[str, Any]]:
+    """Decode a cursor produced by encode_cursor back into an ExclusiveStartKey."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(key, dict) or not all(isinstance(v, str) for v in key.values()):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return key
+
+
+def _backoff_delay(attempt: int, base: float = 0.05, cap: float = 2.0) -> float:
+    """Full-jitter exponential backoff delay in seconds for a 0-based retry attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
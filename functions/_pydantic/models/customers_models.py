@@ -35,3 +35,4 @@ class UpdateCustomerRequest(CreateCustomerRequest):
 
 class CustomerListResponse(BaseModel):
     customers: Optional[List[CustomerObject]] = None
+    next_cursor: Optional[str] = None
@@ -103,6 +103,7 @@ class EventResponse(BaseModel):
 
 class EventListResponse(BaseModel):
     events: Optional[List[EventObject]] = None
+    next_cursor: Optional[str] = None
 
 
 class EventResponsePublic(BaseModel):
@@ -111,3 +112,4 @@ class EventResponsePublic(BaseModel):
 
 class EventListResponsePublic(BaseModel):
     events: Optional[List[EventObjectPublic]] = None
+    next_cursor: Optional[str] = None
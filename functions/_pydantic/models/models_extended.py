@@ -7,7 +7,7 @@ from _pydantic.models.events_models import EventObject as EventBase, LocationObj
 from _pydantic.dynamodb import DynamoModel, HistoryModel
 from datetime import datetime, timezone
 from pydantic import model_validator, field_validator, Field
-from typing import Optional, Literal
+from typing import ClassVar, Optional, Literal
 
 class BundleModel(BundleBase, DynamoModel):
     organisation: str
@@ -15,6 +15,7 @@ class BundleModel(BundleBase, DynamoModel):
     created_at: datetime = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
     updated_at: datetime = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
     entity_type: Literal["BUNDLE"] = "BUNDLE"
+    SUMMARY_FIELDS: ClassVar[frozenset[str]] = frozenset({"ksuid", "name", "status", "primary_price", "includes"})
 
     @property
     def PK(self): return f"BUNDLE#{self.ksuid}"
@@ -35,6 +36,7 @@ class ItemModel(ItemBase, DynamoModel):
     created_at: datetime = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
     updated_at: datetime = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
     entity_type: Literal["ITEM"] = "ITEM"
+    SUMMARY_FIELDS: ClassVar[frozenset[str]] = frozenset({"ksuid", "name", "status", "primary_price", "individually_purchaseable"})
     
     @property
     def PK(self): return f"ITEM#{self.ksuid}"
@@ -102,6 +104,9 @@ class EventModel(EventBase, DynamoModel):
     remaining_capacity: int = 0
     reserved: int = 0
     entity_type: Literal["EVENT"] = "EVENT"    
+    # relations needed to sell and render an event; HISTORY is only loaded on request
+    CORE_RELATIONS: ClassVar[frozenset[str]] = frozenset({"LOCATION", "ITEM", "BUNDLE"})
+    SUMMARY_FIELDS: ClassVar[frozenset[str]] = frozenset({"ksuid", "name", "status", "category", "starts_at", "ends_at", "capacity", "remaining_capacity", "number_sold", "updated_at"})
 
     @property
     def related_entities(self):
@@ -223,6 +228,7 @@ class TicketModel(TicketBase, DynamoModel):
     includes: list[str] = []
     qr_token: Optional[str] = None
     entity_type: Literal["TICKET"] = "TICKET"
+    SUMMARY_FIELDS: ClassVar[frozenset[str]] = frozenset({"ksuid", "name", "name_on_ticket", "customer_email", "ticket_status", "financial_status", "admission_status", "checked_in_at", "created_at"})
     creation_idempotency: Optional[TicketCreationIdempotencyModel] = None
     # Set some explicit defaults for compatibility with older tickets
     check_in_count: Optional[int] = Field(0)
@@ -296,6 +302,7 @@ class CustomerModel(CustomerBase, DynamoModel):
     updated_at: datetime = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
     version: int = 0
     entity_type: Literal["CUSTOMER"] = "CUSTOMER"
+    SUMMARY_FIELDS: ClassVar[frozenset[str]] = frozenset({"ksuid", "name", "email", "phone"})
 
     @property
     def related_entities(self):
@@ -74,10 +74,15 @@ class TicketObject(BaseModel):
 
 class TicketListResponse(BaseModel):
     tickets: Optional[List[TicketObject]] = None
+    next_cursor: Optional[str] = None
 
 
 class SendTicketEmailRequest(BaseModel):
-    tickets: List[str]
+    tickets: Optional[List[str]] = None
+    all_tickets: Optional[bool] = Field(
+        None,
+        description='Resend every active ticket of the event in the background instead of the listed tickets.',
+    )
 
 
 class LineItem(BaseModel):
@@ -152,3 +157,108 @@ class TicketAdmissionRequest(BaseModel):
         ...,
         description='Email of the customer who owns the ticket. Required to address the ticket record directly.',
     )
+
+
+class JtiFilter(BaseModel):
+    bits: int
+    hashes: int
+    data: str = Field(..., description='Base64 of the filter bits.')
+
+
+class DoorManifestResponse(BaseModel):
+    format: int = Field(..., description='Manifest layout version.')
+    version: str = Field(
+        ...,
+        description='Hash of the manifest content. Unchanged while no ticket or token changes.',
+    )
+    organisation: str
+    event: str
+    generated_at: datetime
+    ticket_count: int
+    tickets: str = Field(
+        ..., description='Base64 of the sorted ticket KSUIDs, 20 bytes each.'
+    )
+    statuses: str = Field(
+        ...,
+        description='Base64 of one status byte per ticket, in ticket order. Bits: 1 active, 2 checked in, 4 denied.',
+    )
+    jti_filter: JtiFilter = Field(
+        ...,
+        description="Bloom filter over the jti claims of the tickets' QR tokens.",
+    )
+    key_id: str = Field(
+        ...,
+        description='Id of the Ed25519 key the manifest is signed with, as returned by GET /public/tickets/manifest-key.',
+    )
+    signature: str = Field(
+        ...,
+        description='Base64url Ed25519 signature of the manifest without its signature, as compact JSON with sorted keys.',
+    )
+
+
+class DoorManifestKeyResponse(BaseModel):
+    algorithm: str = Field(..., description='Signature algorithm, Ed25519.')
+    key_id: str = Field(
+        ..., description='Id of the key, carried by every manifest it signs.'
+    )
+    public_key: str = Field(
+        ..., description='Base64url of the raw 32 byte Ed25519 public key.'
+    )
+
+
+class CheckIn(BaseModel):
+    ticket_ksuid: str = Field(..., description='KSUID of the scanned ticket.')
+    scanned_at: datetime = Field(
+        ..., description='When the ticket was scanned. Recorded as the check-in time.'
+    )
+    scanner_id: Optional[str] = Field(
+        None,
+        description='Identifier of the scanning device. Recorded as checked in by, defaults to the account.',
+    )
+    customer_email: Optional[str] = Field(
+        None,
+        description="Email of the ticket's customer, if known. Saves a lookup per ticket.",
+    )
+
+
+class BulkCheckInRequest(BaseModel):
+    check_ins: List[CheckIn] = Field(..., max_length=500, min_length=1)
+
+
+class Outcome(Enum):
+    admitted = 'admitted'
+    already_admitted = 'already_admitted'
+    denied = 'denied'
+    inactive = 'inactive'
+    not_found = 'not_found'
+    duplicate = 'duplicate'
+    error = 'error'
+
+
+class Result(BaseModel):
+    ticket_ksuid: str
+    outcome: Outcome = Field(
+        ...,
+        description='error is transient and the check-in can be retried; every other outcome is final.',
+    )
+    checked_in_at: Optional[str] = Field(
+        None,
+        description='For already_admitted, when the ticket was first checked in.',
+    )
+    checked_in_by: Optional[str] = Field(
+        None, description='For already_admitted, who first checked the ticket in.'
+    )
+
+
+class BulkCheckInResponse(BaseModel):
+    results: List[Result] = Field(
+        ..., description='One result per submitted check-in, in request order.'
+    )
+    admitted: int
+    conflicts: int = Field(
+        ...,
+        description='Check-ins rejected as already admitted, denied, inactive, not found or duplicate.',
+    )
+    failed: int = Field(
+        ..., description='Check-ins that hit a transient error and can be retried.'
+    )
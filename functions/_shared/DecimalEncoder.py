@@ -30,12 +30,16 @@ class DecimalEncoder(json.JSONEncoder):
             Returns an int if the Decimal is a whole number, 
             a float if it has a fractional part, 
             or the default encoding for other types.
+
+        Raises
+        ------
+        OverflowError
+            If the Decimal is infinite.
+        ValueError
+            If the Decimal is NaN.
         """
         if isinstance(obj, Decimal):
-            if float(obj) == int(obj):
-                return int(obj)
-            elif str(float(obj)) == str(obj):
-                return float(obj)
-            else:
-                return float(obj)
+            # one exact conversion decides int or float, and rejects NaN and infinity
+            numerator, denominator = obj.as_integer_ratio()
+            return numerator if denominator == 1 else float(obj)
         return super().default(obj)
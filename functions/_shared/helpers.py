@@ -1,5 +1,8 @@
 import json
+import os
+import hashlib
 from _shared.DecimalEncoder import DecimalEncoder
+from _shared.cache import TTLCache
 import logging
 from boto3.dynamodb.conditions import Key
 
@@ -7,7 +10,23 @@ from boto3.dynamodb.conditions import Key
 logger = logging.getLogger()
 logger.setLevel("INFO")
 
-def make_response(status_code, body):
+# public routes are the same for every caller, so shared caches may keep them briefly;
+# admin responses are per-caller and must be revalidated (cheaply, via the ETag) on every poll
+PUBLIC_CACHE_CONTROL = "public, max-age=30"
+ADMIN_CACHE_CONTROL = "private, no-cache"
+
+def make_etag(body_json):
+    """Strong ETag for a serialised response body."""
+    return '"' + hashlib.sha256(body_json.encode("utf-8")).hexdigest()[:32] + '"'
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+def make_response(status_code, body, event=None, cache_control=None, exclude_none=False):
     """
     Creates a standardised HTTP response.
 
@@ -15,8 +34,18 @@ def make_response(status_code, body):
     ----------
     status_code : int
         The HTTP status code for the response.
-    body : dict
-        The body of the response, which will be serialised to JSON.
+    body : dict or pydantic.BaseModel
+        The body of the response, which will be serialised to JSON. A model
+        is serialised once, by its own ``model_dump_json``; a dict goes
+        through ``json.dumps`` with the ``DecimalEncoder``.
+    event : dict, optional
+        The API Gateway event being answered. When given for a successful
+        GET, the response carries an ``ETag`` and ``Cache-Control`` and is
+        turned into an empty 304 if the request's ``If-None-Match`` matches.
+    cache_control : str, optional
+        Overrides the route based ``Cache-Control`` policy.
+    exclude_none : bool, optional
+        Leave out unset (None) fields when ``body`` is a model. Default is False.
 
     Returns
     -------
@@ -24,12 +53,105 @@ def make_response(status_code, body):
         A dictionary representing the HTTP response, including status code,
         headers, and a JSON-encoded body.
     """
+    headers = {"Content-Type": "application/json", "Allow-Origin": "*"}
+    if hasattr(body, "model_dump_json"):
+        # the generated response objects type relations as dicts while the entity models hold models;
+        # the output is the same, and building a warning per related item costs more than encoding it
+        body_json = body.model_dump_json(exclude_none=exclude_none, warnings=False)
+    else:
+        body_json = json.dumps(body, cls=DecimalEncoder)
+
+    method = ((event or {}).get("requestContext") or {}).get("http", {}).get("method")
+    if status_code == 200 and method in ("GET", "HEAD"):
+        is_public = (event.get("rawPath") or "").startswith("/public")
+        headers["ETag"] = make_etag(body_json)
+        headers["Cache-Control"] = cache_control or (PUBLIC_CACHE_CONTROL if is_public else ADMIN_CACHE_CONTROL)
+        request_headers = {name.lower(): value for name, value in (event.get("headers") or {}).items()}
+        if _etag_matches(request_headers.get("if-none-match"), headers["ETag"]):
+            del headers["Content-Type"]
+            return {"statusCode": 304, "headers": headers, "body": ""}
+
     return {
         "statusCode": status_code,
-        "headers": {"Content-Type": "application/json", "Allow-Origin": "*"},
-        "body": json.dumps(body, cls=DecimalEncoder)
+        "headers": headers,
+        "body": body_json
     }
 
+MAX_PAGE_LIMIT = 1000
+
+def get_pagination_params(event):
+    """
+    Reads the optional ``limit`` and ``cursor`` query string parameters.
+
+    Parameters
+    ----------
+    event : dict
+        The API Gateway event.
+
+    Returns
+    -------
+    tuple
+        ``(limit, cursor)``, either of which may be None.
+
+    Raises
+    ------
+    ValueError
+        If ``limit`` is not an integer between 1 and MAX_PAGE_LIMIT.
+    """
+    query = event.get("queryStringParameters") or {}
+    limit = query.get("limit")
+    cursor = query.get("cursor") or None
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid limit: {limit!r}")
+        if not 1 <= limit <= MAX_PAGE_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    return limit, cursor
+
+def get_fields_param(event, model, allowed=None):
+    """
+    Reads the optional ``fields`` query string parameter of a list route.
+
+    Parameters
+    ----------
+    event : dict
+        The API Gateway event.
+    model : type[DynamoModel]
+        The entity being listed. ``summary`` selects its ``SUMMARY_FIELDS``.
+    allowed : Iterable[str], optional
+        The fields the route may return, e.g. those of its response object.
+        Only the entity's stored fields are ever allowed.
+
+    Returns
+    -------
+    frozenset or None
+        The requested fields, always including ``ksuid``, or None when the
+        parameter is absent.
+
+    Raises
+    ------
+    ValueError
+        If a requested field is unknown or not allowed.
+    """
+    raw = ((event.get("queryStringParameters") or {}).get("fields") or "").strip()
+    if not raw:
+        return None
+    fields = set(model.SUMMARY_FIELDS) if raw == "summary" else {field.strip() for field in raw.split(",") if field.strip()}
+    permitted = model.stored_fields() if allowed is None else model.stored_fields() & set(allowed)
+    unknown = fields - permitted
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return frozenset(fields | {"ksuid"})
+
+def summary_body(key, items, cursor=None):
+    """Response body of a list read with ``fields``: the summaries as sent, leaving out unset attributes."""
+    body = {key: [item.model_dump(mode="json", exclude_none=True) for item in items]}
+    if cursor:
+        body["next_cursor"] = cursor
+    return body
+
 import functools
 import warnings
 
@@ -46,18 +168,62 @@ def deprecated(reason="This function is deprecated."):
         return wrapper
     return decorator
 
-def get_organisation_settings(organisationSlug: str, db, OrganisationModel, ORG_TABLE_NAME_TEMPLATE):
+# Organisation settings rarely change but are read on the checkout and email hot paths.
+# The cache is per container; organisation.updated invalidates it where it is handled,
+# elsewhere the TTL bounds how stale an entry can get.
+ORGANISATION_SETTINGS_CACHE_TTL = float(os.environ.get("ORGANISATION_SETTINGS_CACHE_TTL", "60"))
+organisation_settings_cache = TTLCache(maxsize=128, ttl=ORGANISATION_SETTINGS_CACHE_TTL)
+
+def get_organisation_settings(organisationSlug: str, db, OrganisationModel, ORG_TABLE_NAME_TEMPLATE, use_cache: bool = True):
+    """
+    Loads an organisation with its theme from the organisation's table.
+
+    Results are cached per container for ORGANISATION_SETTINGS_CACHE_TTL
+    seconds. Each call returns a copy, so callers may modify it freely.
+
+    Parameters
+    ----------
+    organisationSlug : str
+        The organisation to load.
+    db : boto3.resources.base.ServiceResource
+        The DynamoDB resource.
+    OrganisationModel : type
+        The organisation model class used for assembly.
+    ORG_TABLE_NAME_TEMPLATE : str
+        The organisation table name template.
+    use_cache : bool, optional
+        Set to False to always read from DynamoDB (the result still
+        refreshes the cache). Default is True.
+
+    Returns
+    -------
+    OrganisationModel
+        The assembled organisation.
+    """
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
-    table = db.Table(TABLE_NAME)
-    logger.info(f"Getting settings of {organisationSlug} from {TABLE_NAME} / ")
+
+    cached = organisation_settings_cache.get(TABLE_NAME) if use_cache else None
+    if cached is None:
+        cached = _load_organisation_settings(organisationSlug, db.Table(TABLE_NAME), OrganisationModel)
+        organisation_settings_cache.set(TABLE_NAME, cached)
+    else:
+        logger.info(f"Using cached settings of {organisationSlug} from {TABLE_NAME}")
+
+    return cached.model_copy(deep=True)
+
+def invalidate_organisation_settings(organisationSlug: str, ORG_TABLE_NAME_TEMPLATE: str):
+    """Drops the cached settings of an organisation, e.g. after it was updated."""
+    organisation_settings_cache.invalidate(ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisationSlug))
+
+def _load_organisation_settings(organisationSlug: str, table, OrganisationModel):
+    logger.info(f"Getting settings of {organisationSlug} from {table.name} / ")
     blank_model = OrganisationModel(name="blank", organisation=organisationSlug)
-    logger.info(f"Querying DynamoDB for settings of {blank_model.model_dump(mode='json')}")
 
     try:
         result = blank_model.query_gsi(
             table=table,
             index_name="IDXinv", 
-            key_condition=Key('PK').eq(f'{blank_model.PK}') & Key('SK').eq(f'{blank_model.SK}'),
+            key_condition=Key('SK').eq(f'{blank_model.SK}'),
             assemble_entites=True
             )
         logger.info(f"Found settings for {organisationSlug}: {result}")
@@ -65,4 +231,4 @@ def get_organisation_settings(organisationSlug: str, db, OrganisationModel, ORG_
         logger.error(f"DynamoDB query failed to get settings for {organisationSlug}: {e}")
         raise Exception
 
-    return OrganisationModel.model_validate(result)
\ No newline at end of file
+    return OrganisationModel.model_validate(result)
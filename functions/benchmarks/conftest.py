@@ -0,0 +1,177 @@
+"""
+Fixtures for the model/serialization microbenchmarks.
+
+Raw items are built through the models' own ``to_dynamo`` so they have the
+same shape (Decimal numbers, computed keys) as items returned by boto3.
+All data is deterministic so runs are comparable against the stored
+baseline; see README.md in this directory for how to run and compare.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from _pydantic.dynamodb import HistoryModel
+from _pydantic.EventBridge import Action, EventType
+from _pydantic.models.models_extended import (
+    BundleModel,
+    EventModel,
+    ItemModel,
+    LocationModel,
+    TicketChildModel,
+    TicketModel,
+)
+
+ORGANISATION = "benchmark-org"
+EVENT_KSUID = "2Zb7Xm0zY3o1Q9n8R6t4U2v0W1x"
+CREATED_AT = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+EVENT_ITEM_COUNT = 300
+EVENT_BUNDLE_COUNT = 60
+EVENT_HISTORY_COUNT = 100
+TICKET_COUNT = 200
+
+
+def _ksuid(prefix: str, n: int) -> str:
+    return f"{prefix}{n:0{27 - len(prefix)}d}"
+
+
+def make_event() -> EventModel:
+    return EventModel(
+        ksuid=EVENT_KSUID,
+        organisation=ORGANISATION,
+        name="Benchmark Weekender",
+        description="A long weekend of classes and socials. " * 20,
+        status="live",
+        category=["workshop", "party"],
+        starts_at=CREATED_AT,
+        ends_at=CREATED_AT,
+        capacity=500,
+        remaining_capacity=320,
+        number_sold=180,
+        version=12,
+        created_at=CREATED_AT,
+        updated_at=CREATED_AT,
+    )
+
+
+def make_ticket(n: int) -> TicketModel:
+    return TicketModel(
+        ksuid=_ksuid("TKT", n),
+        organisation=ORGANISATION,
+        parent_event_ksuid=EVENT_KSUID,
+        customer_email=f"dancer{n}@example.com",
+        name_on_ticket=f"Dancer {n}",
+        name="Full Pass with Friday Party",
+        includes=[_ksuid("ITM", i) for i in range(4)],
+        qr_token=f"qr-{n}",
+        check_in_count=n % 2,
+        created_at=CREATED_AT,
+        updated_at=CREATED_AT,
+    )
+
+
+def _raw(model) -> dict:
+    return model.to_dynamo(exclude_keys=False)
+
+
+@pytest.fixture(scope="session")
+def raw_event() -> dict:
+    return _raw(make_event())
+
+
+@pytest.fixture(scope="session")
+def raw_ticket() -> dict:
+    return _raw(make_ticket(1))
+
+
+@pytest.fixture(scope="session")
+def tickets() -> list[TicketModel]:
+    return [make_ticket(n) for n in range(TICKET_COUNT)]
+
+
+@pytest.fixture(scope="session")
+def raw_ticket_with_children() -> list[dict]:
+    ticket = make_ticket(1)
+    children = [
+        TicketChildModel(
+            child_ksuid=ksuid,
+            child_type="ITEM",
+            parent_ticket_ksuid=ticket.ksuid,
+            organisation=ORGANISATION,
+            name=f"Item {i}",
+            created_at=CREATED_AT,
+            updated_at=CREATED_AT,
+        )
+        for i, ksuid in enumerate(ticket.includes)
+    ]
+    return [_raw(ticket), *(_raw(child) for child in children)]
+
+
+@pytest.fixture(scope="session")
+def raw_event_collection() -> list[dict]:
+    """An event partition as returned by the IDXinv query: the event plus hundreds of related items."""
+    items = [
+        ItemModel(
+            ksuid=_ksuid("ITM", n),
+            organisation=ORGANISATION,
+            parent_event_ksuid=EVENT_KSUID,
+            name=f"Class {n}",
+            description="Footwork fundamentals",
+            status="live",
+            primary_price=Decimal("25.50"),
+            secondary_price=Decimal("30"),
+            primary_price_name="Early bird",
+            secondary_price_name="Standard",
+            created_at=CREATED_AT,
+            updated_at=CREATED_AT,
+        )
+        for n in range(EVENT_ITEM_COUNT)
+    ]
+    bundles = [
+        BundleModel(
+            ksuid=_ksuid("BND", n),
+            organisation=ORGANISATION,
+            parent_event_ksuid=EVENT_KSUID,
+            name=f"Pass {n}",
+            status="live",
+            primary_price=Decimal("120"),
+            includes=[item.ksuid for item in items[n:n + 10]],
+            created_at=CREATED_AT,
+            updated_at=CREATED_AT,
+        )
+        for n in range(EVENT_BUNDLE_COUNT)
+    ]
+    history = [
+        HistoryModel(
+            ksuid=_ksuid("HST", n),
+            organisation=ORGANISATION,
+            resource_type=EventType.event,
+            resource_id=f"EVENT#{EVENT_KSUID}",
+            action=Action.updated,
+            timestamp=CREATED_AT,
+            actor="admin@example.com",
+            data={"capacity": 500, "remaining_capacity": 320 - n},
+        )
+        for n in range(EVENT_HISTORY_COUNT)
+    ]
+    location = LocationModel(
+        ksuid=_ksuid("LOC", 1),
+        organisation=ORGANISATION,
+        parent_event_ksuid=EVENT_KSUID,
+        name="The Ballroom",
+        lat=Decimal("51.5"),
+        lng=Decimal("-0.12"),
+    )
+    return [_raw(make_event()), _raw(location), *map(_raw, items), *map(_raw, bundles), *map(_raw, history)]
+
+
+@pytest.fixture
+def null_table():
+    """A table whose client accepts every write, so only the CPU side of a call is measured."""
+    client = SimpleNamespace(
+        transact_write_items=lambda **kwargs: {},
+        exceptions=SimpleNamespace(TransactionCanceledException=type("TransactionCanceledException", (Exception,), {})),
+    )
+    return SimpleNamespace(name="benchmark-table", meta=SimpleNamespace(client=client))
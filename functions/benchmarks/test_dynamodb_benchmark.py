@@ -0,0 +1,22 @@
+from _pydantic.dynamodb import compile_update_expression, transact_upsert
+
+# --- transact_upsert expression building ---
+
+def test_transact_upsert_builds_25_updates(benchmark, null_table, tickets):
+    batch = tickets[:25]
+
+    result = benchmark(transact_upsert, null_table, batch, explicit_fields_only=False)
+
+    assert len(result.successful) == 25
+
+def test_transact_upsert_builds_200_updates(benchmark, null_table, tickets):
+    result = benchmark(transact_upsert, null_table, tickets, add_fields={"check_in_count"}, explicit_fields_only=False)
+
+    assert len(result.successful) == len(tickets)
+
+def test_compile_update_expression_uncached(benchmark, tickets):
+    keys = tuple(tickets[0].to_dynamo(exclude_keys=True))
+
+    template = benchmark(compile_update_expression.__wrapped__, keys, only_set_once=frozenset({"created_at"}), versioned=True)
+
+    assert template.update_expression.startswith("SET ")
@@ -0,0 +1,69 @@
+from _pydantic.models.models_extended import EventModel, TicketModel
+
+from conftest import EVENT_BUNDLE_COUNT, EVENT_ITEM_COUNT, make_event, make_ticket
+
+# --- model_validate on raw DynamoDB items ---
+
+def test_ticket_model_validate(benchmark, raw_ticket):
+    ticket = benchmark(TicketModel.model_validate, raw_ticket)
+
+    assert ticket.ksuid == raw_ticket["ksuid"]
+
+def test_event_model_validate(benchmark, raw_event):
+    event = benchmark(EventModel.model_validate, raw_event)
+
+    assert event.capacity == 500
+
+# --- from_dynamo on the same items ---
+
+def test_ticket_from_dynamo(benchmark, raw_ticket):
+    ticket = benchmark(TicketModel.from_dynamo, raw_ticket)
+
+    assert ticket.ksuid == raw_ticket["ksuid"]
+
+def test_event_from_dynamo(benchmark, raw_event):
+    event = benchmark(EventModel.from_dynamo, raw_event)
+
+    assert event.capacity == 500
+
+# --- to_dynamo ---
+
+def test_ticket_to_dynamo(benchmark):
+    ticket = make_ticket(1)
+
+    item = benchmark(ticket.to_dynamo, exclude_keys=False)
+
+    assert item["gsi1PK"] == f"EVENT#{ticket.parent_event_ksuid}"
+
+def test_event_to_dynamo(benchmark):
+    event = make_event()
+
+    item = benchmark(event.to_dynamo, exclude_keys=False)
+
+    assert item["PK"] == event.PK
+
+# --- assemble_from_items ---
+
+def test_event_assemble_all_relations(benchmark, raw_event_collection):
+    blank = make_event()
+
+    event = benchmark(blank.assemble_from_items, raw_event_collection)
+
+    assert len(event.items) == EVENT_ITEM_COUNT
+    assert len(event.bundles) == EVENT_BUNDLE_COUNT
+    assert event.history
+
+def test_event_assemble_core_relations(benchmark, raw_event_collection):
+    blank = make_event()
+
+    event = benchmark(blank.assemble_from_items, raw_event_collection, include=EventModel.CORE_RELATIONS)
+
+    assert len(event.items) == EVENT_ITEM_COUNT
+    assert event.history is None
+
+def test_ticket_assemble_with_children(benchmark, raw_ticket_with_children):
+    blank = make_ticket(1)
+
+    ticket = benchmark(blank.assemble_from_items, raw_ticket_with_children)
+
+    assert len(ticket.expanded_includes) == len(raw_ticket_with_children) - 1
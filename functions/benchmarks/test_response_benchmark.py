@@ -0,0 +1,90 @@
+import json
+
+from _shared.DecimalEncoder import DecimalEncoder
+from _shared.helpers import make_response
+from _pydantic.models.events_models import EventResponse
+from _pydantic.models.tickets_models import TicketListResponse
+from functions.tickets.shared.import_preview import analyse_import
+from functions.tickets.shared.shared_tickets import build_ticket_creation_key
+
+from conftest import EVENT_KSUID, ORGANISATION, make_event, make_ticket
+
+# --- make_response / DecimalEncoder ---
+
+def test_make_response_ticket_list(benchmark, tickets):
+    body = {"tickets": [ticket.to_dynamo() for ticket in tickets]}
+
+    response = benchmark(make_response, 200, body)
+
+    assert response["statusCode"] == 200
+
+# the handlers' previous path, a JSON-mode dump encoded again by json.dumps, against the model encoding itself
+def test_make_response_ticket_list_response_dumped(benchmark, tickets):
+    response = TicketListResponse(tickets=tickets)
+
+    result = benchmark(lambda: make_response(200, response.model_dump(mode="json")))
+
+    assert result["statusCode"] == 200
+
+def test_make_response_ticket_list_response(benchmark, tickets):
+    response = TicketListResponse(tickets=tickets)
+
+    result = benchmark(make_response, 200, response)
+
+    assert result["statusCode"] == 200
+
+def test_make_response_event_response_dumped(benchmark, raw_event_collection):
+    response = EventResponse(event=make_event().assemble_from_items(raw_event_collection))
+
+    result = benchmark(lambda: make_response(200, response.model_dump(mode="json", exclude_none=True)))
+
+    assert result["statusCode"] == 200
+
+def test_make_response_event_response(benchmark, raw_event_collection):
+    response = EventResponse(event=make_event().assemble_from_items(raw_event_collection))
+
+    result = benchmark(make_response, 200, response, exclude_none=True)
+
+    assert result["statusCode"] == 200
+
+def test_decimal_encoder_event_collection(benchmark, raw_event_collection):
+    encoded = benchmark(json.dumps, raw_event_collection, cls=DecimalEncoder)
+
+    assert encoded.startswith("[")
+
+# --- build_ticket_creation_key ---
+
+_ticket_data = {
+    "customer_email": "dancer@example.com",
+    "name_on_ticket": "Dancer",
+    "line_items": [{"ksuid": f"ITEM{i}", "entity_type": "item", "name": f"Class {i}"} for i in range(6)],
+}
+
+def test_build_ticket_creation_key_fallback_hash(benchmark):
+    key = benchmark(build_ticket_creation_key, ticket_data=_ticket_data, organisation_slug=ORGANISATION, event_ksuid=EVENT_KSUID, index=3)
+
+    assert key.startswith("payload:")
+
+def test_build_ticket_creation_key_from_session(benchmark):
+    key = benchmark(build_ticket_creation_key, ticket_data={**_ticket_data, "session_id": "cs_test_123"})
+
+    assert key == "checkout:cs_test_123"
+
+# --- bulk import preview ---
+
+def test_import_preview_2000_rows_against_3000_tickets(benchmark):
+    existing = [make_ticket(n) for n in range(3000)]
+    requests = [
+        {
+            "ticket_creation_key": f"bulk_import:{n}",
+            "customer_email": f"dancer{n * 2}@example.com",
+            "name_on_ticket": f"Dancer {n}",
+            "line_items": _ticket_data["line_items"],
+        }
+        for n in range(2000)
+    ]
+    line_items = {line_item["ksuid"]: line_item for line_item in _ticket_data["line_items"]}
+
+    results = benchmark(lambda: list(analyse_import(requests, line_items, existing, {})))
+
+    assert len(results) == 2000
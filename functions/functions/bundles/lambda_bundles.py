@@ -17,11 +17,11 @@ import stripe
 sys.path.append(os.path.dirname(__file__))
 from _shared.parser import parse_event
 from _shared.DecimalEncoder import DecimalEncoder
-from _shared.helpers import make_response, get_organisation_settings
+from _shared.helpers import make_response, get_organisation_settings, get_fields_param, summary_body
 from _shared.stripe_catalog import create_stripe_catalog, rollback_stripe_created
 from _pydantic.models.bundles_models import BundleObject, BundleResponse, CreateBundleRequest, BundleListResponse, BundleResponsePublic, BundleListResponsePublic, UpdateBundleRequest, PublishBundlesRequest, Status
-from _pydantic.models.models_extended import BundleModel, OrganisationModel
-#from _pydantic.EventBridge import triggerEBEvent, trigger_eventbridge_event, EventType, Action # pydantic layer
+from _pydantic.models.models_extended import BundleModel, ItemModel, OrganisationModel
+from _pydantic.EventBridge import EventBridgePublisher, EventType, Action # pydantic layer
 from _pydantic.dynamodb import DynamoModel # pydantic layer
 from _pydantic.dynamodb import batch_write, transact_upsert # pydantic layer
 
@@ -45,17 +45,11 @@ def _validate_includes(table, models: list[DynamoModel], eventId: str, check_liv
     logger.info(f"Validating included items for bundles")
     item_ids = {item_id for m in models if m.includes for item_id in m.includes}
     if item_ids:
-        client = table.meta.client
-        request_keys = [
-            {'PK': f'ITEM#{item_id}', 'SK': f'EVENT#{eventId}'}
-            for item_id in item_ids
-        ]
-        resp = client.batch_get_item(RequestItems={table.name: {'Keys': request_keys}})
-        found = resp.get('Responses', {}).get(table.name, [])
-        found_ids = {it['PK'].split('#', 1)[1] for it in found}
+        found = ItemModel.batch_get(table, [(f'ITEM#{item_id}', f'EVENT#{eventId}') for item_id in item_ids])
+        found_ids = {item.ksuid for item in found.values()}
         logger.info(f"Included item IDs: {item_ids}, Found item IDs: {found_ids}")
         missing = list(item_ids - found_ids)
-        non_live_items = [item_id for item_id in found_ids if not any(it['status'] == 'live' for it in found if it['PK'] == f'ITEM#{item_id}')] if check_live_items else []
+        non_live_items = [item.ksuid for item in found.values() if getattr(item.status, "value", item.status) != 'live'] if check_live_items else []
 
         response = {}
 
@@ -104,7 +98,7 @@ def get_one(organisationSlug: str,  eventId: str,  bundleId: str, public: bool =
 
     return result.to_public() if public else result
 
-def get_all(organisationSlug: str,  eventId: str, public: bool = False, actor: str = "unknown"):
+def get_all(organisationSlug: str,  eventId: str, public: bool = False, actor: str = "unknown", fields: frozenset = None):
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisationSlug)
     table = db.Table(TABLE_NAME)
     logger.info(f"Getting bundles for {eventId} of {organisationSlug} from {TABLE_NAME}")
@@ -114,12 +108,16 @@ def get_all(organisationSlug: str,  eventId: str, public: bool = False, actor: s
         bundles = blank_model.query_gsi(
             table=table,
             index_name="IDXinv",
-            key_condition=Key("SK").eq(blank_model.SK) & Key("PK").begins_with(f"{blank_model.PK.split('#')[0]}#")
+            key_condition=Key("SK").eq(blank_model.SK) & Key("PK").begins_with(f"{blank_model.PK.split('#')[0]}#"),
+            fields=fields,
         )
         logger.info(f"Found bundles for {eventId} of {organisationSlug}: {bundles}")
     except Exception as e:
         logger.error(f"DynamoDB query failed to get bundles for {eventId} of {organisationSlug}: {e}")
         raise Exception
+
+    if fields:
+        return bundles or []
     
     #! temporary fix this needs review
     if isinstance(bundles, BundleModel):
@@ -235,14 +233,19 @@ def create(request: CreateBundleRequest, organisationSlug: str, eventId: str, ac
     if resp: return resp
 
     try:
-        successful_bundles, unprocessed_bundles = batch_write(table, bundles_models)
+        write_result = batch_write(table, bundles_models)
+        successful_bundles, unprocessed_bundles = write_result.successful, write_result.unprocessed
 
         if len(unprocessed_bundles) > 0:
             logger.warning(f"Unprocessed bundles: {unprocessed_bundles}")
             return make_response(207, {
                 "message": "Bundles created with some unprocessed bundles.",
                 "bundles": [bundle.model_dump_json() for bundle in successful_bundles],
-                "unprocessed": [bundle.model_dump_json() for bundle in unprocessed_bundles]
+                "unprocessed": [bundle.model_dump_json() for bundle in unprocessed_bundles],
+                "failures": [
+                    {"pk": o.pk, "sk": o.sk, "status": o.status, "attempts": o.attempts, "error": o.error}
+                    for o in write_result.outcomes if o.status != "written"
+                ]
             })
         else:
             return make_response(201, {
@@ -350,6 +353,20 @@ def publish(request: PublishBundlesRequest, organisationSlug: str, eventId: str,
         logger.error(traceback.format_exc())
         return make_response(500, {"message": "Something went wrong."})
     
+    # lets the public catalog snapshots pick up the newly live bundles
+    publisher = EventBridgePublisher(eventbridge)
+    for bundle in successful_bundles:
+        publisher.add(source="dance-engine.core",
+                      resource_type=EventType.bundle,
+                      action=Action.published,
+                      organisation=organisationSlug,
+                      resource_id=bundle.PK,
+                      data={"bundle": bundle.model_dump(mode="json", exclude_none=True)},
+                      meta={"accountId": actor})
+    for outcome in publisher.flush():
+        if not outcome.published:
+            logger.warning(f"Failed to publish bundle.published for {outcome.key}: {outcome.error_code} {outcome.error_message}")
+
     response = {
         "successful_bundles": [bundle.model_dump(mode="json", exclude_none=True) for bundle in successful_bundles],
         "failed_bundles": [
@@ -413,10 +430,18 @@ def lambda_handler(event, context):
                     return make_response(404, {"message": "Bundle not found."})
                 response = response_cls(bundle=result)
             else:
+                if (event.get("queryStringParameters") or {}).get("fields"):
+                    if is_public:
+                        return make_response(400, {"message": "fields is not supported on public routes."})
+                    try:
+                        fields = get_fields_param(event, BundleModel, BundleObject.model_fields)
+                    except ValueError as e:
+                        return make_response(400, {"message": str(e)})
+                    return make_response(200, summary_body("bundles", get_all(organisationSlug, eventId, actor=actor, fields=fields)), event=event)
                 result = get_all(organisationSlug, eventId, public=is_public)
                 response = list_response_cls(bundles=result)
 
-            return make_response(200, response.model_dump(mode="json", exclude_none=True))
+            return make_response(200, response, event=event, exclude_none=True)
 
         elif http_method == "PUT":
             validated_request = UpdateBundleRequest(**parsed_event)
@@ -0,0 +1,85 @@
+## python libraries
+import os
+import json
+import boto3 # not a python library but is included in lambda without need to install it
+import logging
+import traceback
+import sys
+from datetime import datetime, timezone
+
+## installed packages
+from boto3.dynamodb.conditions import Key
+
+## custom scripts
+sys.path.append(os.path.dirname(__file__))
+from _shared.DecimalEncoder import DecimalEncoder
+from _shared.helpers import make_response
+from _pydantic.models.models_extended import OrganisationModel
+from functions.checkout.sharded_capacity import enable_sharded_capacity, list_sharded_events, compact_event_shards, event_key
+from functions.checkout.reservation_ledger import sweep_expired_reservations
+
+## logger setup
+logger = logging.getLogger()
+logger.setLevel("INFO")
+
+## aws resources an clients
+db = boto3.resource("dynamodb")
+
+## ENV variables
+# will throw an error if the env variable does not exist
+ORG_TABLE_NAME_TEMPLATE = os.environ.get('ORG_TABLE_NAME_TEMPLATE') or (_ for _ in ()).throw(KeyError("Environment variable 'ORG_TABLE_NAME_TEMPLATE' not found"))
+CORE_TABLE_NAME = os.environ.get('CORE_TABLE_NAME') or (_ for _ in ()).throw(KeyError("Environment variable 'CORE_TABLE_NAME' not found"))
+
+def _organisation_slugs() -> list[str]:
+    blank_model = OrganisationModel(name="blank", organisation="blank")
+    slugs = []
+    for page in blank_model.iter_query(
+        table=db.Table(CORE_TABLE_NAME),
+        index_name="typeIDX",
+        key_condition=Key('entity_type').eq(blank_model.entity_type) & Key('PK').begins_with(f"{blank_model.PK.split('#')[0]}#"),
+    ):
+        slugs.extend(org.org_slug for org in page.items)
+    return slugs
+
+def compact_organisation(organisation_slug: str, current_time: str) -> dict:
+    table = db.Table(ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisation_slug))
+    # release stranded holds first so compaction rebalances the returned stock
+    counts = {"swept": sweep_expired_reservations(table, current_time, current_time)["released"], "compacted": 0, "cancelled": 0}
+    for event_ksuid, shards in list_sharded_events(table).items():
+        event_item = table.get_item(Key=event_key(event_ksuid)).get("Item")
+        if compact_event_shards(table, event_ksuid, shards, current_time, event_item=event_item):
+            counts["compacted"] += 1
+        else:
+            counts["cancelled"] += 1
+    return counts
+
+def lambda_handler(event, context):
+    """
+    Scheduled: release expired reservation holds and rebalance the capacity
+    shards of every sharded event.
+
+    Invoked directly with ``{"organisation", "event_ksuid", "shards"}``: move
+    that event's capacity onto ``shards`` counter items.
+    """
+    logger.info("Received event: %s", json.dumps(event, indent=2, cls=DecimalEncoder))
+    current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+    if event.get("event_ksuid"):
+        table = db.Table(ORG_TABLE_NAME_TEMPLATE.replace("org_name", event.get("organisation", "")))
+        try:
+            enable_sharded_capacity(table, event["event_ksuid"], int(event.get("shards") or 0), current_time)
+        except ValueError as e:
+            return make_response(400, {"message": str(e)})
+        return make_response(200, {"message": "Capacity sharded.", "event_ksuid": event["event_ksuid"], "shards": int(event["shards"])})
+
+    results = {}
+    for organisation_slug in _organisation_slugs():
+        try:
+            results[organisation_slug] = compact_organisation(organisation_slug, current_time)
+        except Exception as e:
+            logger.error(f"Capacity compaction failed for {organisation_slug}: {e}")
+            logger.error(traceback.format_exc())
+            results[organisation_slug] = {"error": str(e)}
+
+    logger.info(f"Capacity compaction results: {results}")
+    return make_response(200, {"message": "Capacity compacted.", "results": results})
@@ -7,10 +7,12 @@ import traceback
 import sys
 from datetime import datetime, timezone
 import time
+import random
 
 ## installed packages
 from pydantic import AfterValidator, ValidationError # layer: pydantic
 import stripe # layer: stripe
+from ksuid import KsuidMs # layer: utils
 
 ## custom scripts
 sys.path.append(os.path.dirname(__file__))
@@ -19,8 +21,10 @@ from _shared.DecimalEncoder import DecimalEncoder
 from _shared.helpers import make_response, get_organisation_settings
 from _pydantic.models.checkout_models import CreateCheckoutRequest, CheckoutObjectPublic, LineItemObjectPublic
 from _pydantic.models.models_extended import EventModel, OrganisationModel
-from _pydantic.dynamodb import transact_upsert
-from _pydantic.EventBridge import trigger_eventbridge_event, EventType, Action # pydantic layer
+from _pydantic.EventBridge import EventBridgePublisher, EventType, Action # pydantic layer
+from functions.checkout.sharded_capacity import get_capacity_shard_count, is_sharded_failure, release_capacity_shard, event_key
+from functions.checkout.reservation_ledger import hold_reservation, settle_reservation, settle_reservations
+from functions.checkout.stripe_event_dedupe import processed_event_ids, mark_events_processed
 
 ## logger setup
 logger = logging.getLogger()
@@ -35,9 +39,12 @@ eventbridge = boto3.client('events')
 STAGE_NAME = os.environ.get('STAGE_NAME') or (_ for _ in ()).throw(KeyError("Environment variable 'STAGE_NAME' not found"))
 ORG_TABLE_NAME_TEMPLATE = os.environ.get('ORG_TABLE_NAME_TEMPLATE') or (_ for _ in ()).throw(KeyError("Environment variable 'ORG_TABLE_NAME_TEMPLATE' not found"))
 STRIPE_API_KEY = os.environ.get('STRIPE_API_KEY') or (_ for _ in ()).throw(KeyError("Environment variable 'STRIPE_API_KEY' not found"))
+STRIPE_EVENT_DEDUPE_TABLE_NAME = os.environ.get('STRIPE_EVENT_DEDUPE_TABLE_NAME') or (_ for _ in ()).throw(KeyError("Environment variable 'STRIPE_EVENT_DEDUPE_TABLE_NAME' not found"))
+
+# Stripe normally expires the session first; the sweeper only catches lost expiry events
+RESERVATION_SWEEP_GRACE_SECONDS = 5 * 60
 
 def _event_capacity_mutation(table, *,
-                             organisation_slug: str,
                              event_ksuid: str,
                              reserved_delta: int,
                              remaining_capacity_delta: int,
@@ -45,43 +52,77 @@ def _event_capacity_mutation(table, *,
                              require_remaining_at_least: int | None = None,
                              number_sold_delta: int | None = None):
     """
-
+    Add counter deltas to the event item with a single conditional UpdateItem.
     """
-    extra_names = {"#remaining_capacity": "remaining_capacity"}
+    extra_names = {"#capacity_shards": "capacity_shards"}
     extra_values = {}
-    add_fields = {"reserved", "remaining_capacity"}
+    deltas = {"reserved": int(reserved_delta), "remaining_capacity": int(remaining_capacity_delta)}
+    if number_sold_delta is not None:
+        deltas["number_sold"] = int(number_sold_delta)
 
-    condition_expr = None
+    # once capacity is sharded the event counters are only a summary, so containers
+    # that have not seen the switch yet must not write to them
+    condition_expr = "attribute_not_exists(#capacity_shards)"
     if require_remaining_at_least is not None:
-        condition_expr = "attribute_exists(#remaining_capacity) AND #remaining_capacity >= :min"
+        condition_expr += " AND attribute_exists(#remaining_capacity) AND #remaining_capacity >= :min"
         extra_values[":min"] = int(require_remaining_at_least)
 
-    model_data = {
-            "name": "placeholder", 
-            "organisation": organisation_slug,
-            "ksuid": event_ksuid,
-            "reserved": int(reserved_delta),
-            "remaining_capacity": int(remaining_capacity_delta),
-            "updated_at": current_time
-        }
-    
-    if number_sold_delta is not None:
-        model_data["number_sold"] = int(number_sold_delta)
-        add_fields.add("number_sold")
-
-    event_models = [EventModel.model_validate(model_data)]
-
-    result = transact_upsert(
+    return EventModel.atomic_add(
         table,
-        event_models,
-        condition_expression=condition_expr,
-        add_fields=add_fields,
+        event_key(event_ksuid),
+        deltas,
+        conditions=condition_expr,
+        set_fields={"updated_at": current_time},
         extra_expression_attr_names=extra_names,
         extra_expression_attr_values=extra_values,
-        version_override=True,
-        only_set_once={"created_at", "organisation", "ksuid", "name", "event_slug", "status"}
     )
-    return result
+
+def _capacity_failure_response(result):
+    if result.inferred == "remaining_capacity_insufficient":
+        return make_response(409, {"message": "Event is at capacity."})
+    if result.code == "throttled":
+        return make_response(503, {"message": "Database throttled, retry."})
+    return make_response(409, {
+        "message": "Reservation failed.",
+        "reason": result.code,
+        "dynamodb_code": result.dynamodb_code,
+        "detail": result.message,
+    })
+
+def _release_capacity(table, *, event_ksuid: str, capacity_shard: int | None, current_time: str,
+                      reserved_delta: int, remaining_capacity_delta: int, number_sold_delta: int | None = None):
+    """
+    Apply counter deltas for a session without a reservation ledger item (created before the ledger),
+    where the reservation was taken: the given capacity shard, else the event item.
+
+    Sharded events without a recorded shard (reserved before sharding) use a
+    random shard; only the shard totals matter. Returns an error response or None.
+    """
+    if capacity_shard is None and not get_capacity_shard_count(table, event_ksuid):
+        result = _event_capacity_mutation(
+            table,
+            event_ksuid=event_ksuid, 
+            reserved_delta=reserved_delta, 
+            remaining_capacity_delta=remaining_capacity_delta, 
+            current_time=current_time,
+            number_sold_delta=number_sold_delta
+        )
+        if result.success:
+            return None
+        if not is_sharded_failure(result.old_item):
+            return _capacity_failure_response(result)
+
+    if capacity_shard is None:
+        capacity_shard = random.randrange(get_capacity_shard_count(table, event_ksuid, use_cache=False))
+    release_capacity_shard(table, event_ksuid, capacity_shard, current_time,
+                           reserved_delta=reserved_delta,
+                           remaining_capacity_delta=remaining_capacity_delta,
+                           number_sold_delta=number_sold_delta or 0)
+    return None
+
+def _metadata_capacity_shard(metadata: dict) -> int | None:
+    capacity_shard = (metadata or {}).get("capacity_shard")
+    return int(capacity_shard) if capacity_shard not in (None, "") else None
 
 def start(validated_request: CreateCheckoutRequest, organisation_slug: str, actor: str):
     logger.info("Starting checkout process for organisation: %s", organisation_slug)
@@ -139,33 +180,18 @@ def start(validated_request: CreateCheckoutRequest, organisation_slug: str, acto
             "ignored_checkouts": [c.model_dump_json() for c in ignored_checkouts]
         })
 
-    try:
-        result = _event_capacity_mutation(
-            table, 
-            organisation_slug=organisation_slug, 
-            event_ksuid=event_ksuid, 
-            reserved_delta=1, 
-            remaining_capacity_delta=-1, 
-            current_time=current_time, 
-            require_remaining_at_least=1
-        )
+    reservation_id = str(KsuidMs())
+    expires_at = int(time.time()) + 30 * 60  # 30 minutes 
+    # the sweeper releases the hold if Stripe's expired event never arrives
+    hold_expires_at = datetime.fromtimestamp(expires_at + RESERVATION_SWEEP_GRACE_SECONDS, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
 
-        logger.info(f"Event capacity mutation result: {result}")
-
-        if result.failed:
-            f = result.failures[0]
-            if f.inferred == "remaining_capacity_insufficient":
-                return make_response(409, {"message": "Event is at capacity."})
-            if f.inferred == "version_conflict":
-                return make_response(409, {"message": "Version conflict."})
-            if f.code == "throttled":
-                return make_response(503, {"message": "Database throttled, retry."})
-            return make_response(409, {
-                "message": "Reservation failed.",
-                "reason": f.code,
-                "dynamodb_code": f.dynamodb_code,
-                "detail": f.message,
-            })
+    try:
+        hold = hold_reservation(table, event_ksuid, reservation_id, hold_expires_at, current_time)
+        logger.info(f"Reservation hold result: {hold}")
+        if hold.outcome == "sold_out":
+            return make_response(409, {"message": "Event is at capacity."})
+        if hold.outcome == "throttled":
+            return make_response(503, {"message": "Database throttled, retry."})
 
     except ValidationError as e:
         logger.error("Validation error: %s", str(e))
@@ -233,8 +259,6 @@ def start(validated_request: CreateCheckoutRequest, organisation_slug: str, acto
             } for item in line_items
         ]
 
-        expires_at = int(time.time()) + 30 * 60  # 30 minutes 
-
         session = stripe.checkout.Session.create(
             mode="payment",
             payment_method_types=["card"],
@@ -246,7 +270,12 @@ def start(validated_request: CreateCheckoutRequest, organisation_slug: str, acto
             discounts=[{"coupon": checkout.coupon_code}] if checkout.coupon_code else None,
             allow_promotion_codes = True,
             stripe_account = account_id,
-            metadata={"organisation": organisation_slug, "event_ksuid": event_ksuid, **extra_metadata},
+            metadata={
+                "organisation": organisation_slug,
+                "event_ksuid": event_ksuid,
+                "reservation_id": reservation_id,
+                **extra_metadata
+            },
             **stripe_customer_fields
         )
 
@@ -265,14 +294,7 @@ def start(validated_request: CreateCheckoutRequest, organisation_slug: str, acto
         logger.error(traceback.format_exc())
 
         try:
-            _event_capacity_mutation(
-                table, 
-                organisation_slug=organisation_slug, 
-                event_ksuid=event_ksuid, 
-                reserved_delta=-1, 
-                remaining_capacity_delta=1, 
-                current_time=current_time
-            )
+            settle_reservation(table, reservation_id, "released", current_time)
         except Exception as rb_e:
             logger.error("Rollback failed (reserved may be stranded): %s", str(rb_e))
             logger.error(traceback.format_exc())
@@ -284,159 +306,178 @@ def start(validated_request: CreateCheckoutRequest, organisation_slug: str, acto
             "ignored_checkouts": ignored_checkouts if ignored_checkouts else None
         })
     
-def unreserve(stripe_event: dict):
-    logger.info("Unreserving tickets for expired checkout session.")
-    
+# Stripe event type -> reservation status it settles to
+SETTLING_EVENT_TYPES = {
+    "checkout.session.expired": "released",
+    "checkout.session.completed": "completed",
+}
+
+def _release_legacy_capacity(table, metadata: dict, status: str, current_time: str):
+    """Settle a session created before the reservation ledger. Returns an error response or None."""
+    return _release_capacity(
+        table,
+        event_ksuid=metadata.get("event_ksuid"),
+        capacity_shard=_metadata_capacity_shard(metadata),
+        reserved_delta=-1,
+        remaining_capacity_delta=1 if status == "released" else 0,
+        number_sold_delta=1 if status == "completed" else None,
+        current_time=current_time
+    )
+
+def _checkout_completed_event(stripe_event: dict, current_time: str) -> dict:
+    """Fetch the completed Stripe checkout session and build the checkout.completed EventBridge event for it."""
     detail = stripe_event.get("detail", {})
-    data_obj = detail.get("data", {}).get("object", {})
-    
-    metadata = data_obj.get("metadata", {}) or {}
+    session_id = detail.get("data", {}).get("object", {}).get("id")
+
+    stripe.api_key = STRIPE_API_KEY
+    stripe_checkout = stripe.checkout.Session.retrieve(session_id, expand=["line_items", "payment_intent"], stripe_account = detail.get("account"),)
+    logger.info("Retrieved Stripe checkout session: %s", stripe_checkout)
+
+    metadata = stripe_checkout.get("metadata", {})
     organisation_slug = metadata.get("organisation")
     event_ksuid = metadata.get("event_ksuid")
 
-    if not organisation_slug or not event_ksuid:
-        logger.warning("Missing metadata for unreserve. Can't map session to an event.")
-        return make_response(400, {
-            "message": "Missing metadata to unreserve reservation.",
-            "required": ["metadata.organisation", "metadata.event_ksuid"],
-        })
-    
-    TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisation_slug)
-    table = db.Table(TABLE_NAME)
+    line_items = [
+        {
+            "ksuid": it.get("metadata", {}).get("ksuid"),
+            "entity_type":  it.get("metadata", {}).get("entity_type"),
+            "name":  it.get("metadata", {}).get("name"),
+            "includes": json.loads(it.get("metadata", {}).get("includes", "[]")),
+        } for it in stripe_checkout.get("line_items", {}).get("data", [])
+    ]
+
+    name_on_ticket = stripe_checkout.get("custom_fields", [{}])[0].get("text", {}).get("value") if stripe_checkout.get("custom_fields") else metadata.get("customer_name")
+
+    data = {
+        "session_id": session_id,
+        "payment_provider": "stripe",
+        "payment_reference": stripe_checkout.get("payment_intent", {}).get("id"),
+        "event_ksuid": event_ksuid,
+        "line_items": line_items,
+        "customer_email": stripe_checkout.get("customer_email") or stripe_checkout.get("customer_details", {}).get("email"),
+        "name_on_ticket":  name_on_ticket,
+        "source_sale_type": "checkout"
+    }
+
+    meta =  {
+        "idempotency_key": f"checkout:{session_id}",
+        "occurred_at": current_time,
+    }
+
+    return dict(
+        source="dance-engine.core" if not STAGE_NAME == "preview" else "dance-engine.core.preview", 
+        resource_type=EventType.checkout,
+        action=Action.completed,
+        organisation=organisation_slug,
+        resource_id=session_id,
+        data=data,
+        meta=meta,
+    )
 
+def process_stripe_events(stripe_events: dict[str, dict]) -> set[str]:
+    """
+    Apply a batch of Stripe checkout events, keyed by Stripe event id.
+
+    Events already recorded in the dedupe table are skipped. Expired and
+    completed sessions settle their reservations with one counter update
+    per event counter, then every completed session gets a checkout.completed
+    EventBridge event. A session paid after its hold was released takes the
+    capacity back while there is any left. One whose event sold out
+    meanwhile, or whose reservation is unknown, fails without a ticket, so it
+    is retried and ends up on the dead letter queue to be refunded or
+    investigated. Successfully handled events are recorded as processed.
+
+    Returns:
+    - The Stripe event ids that failed and should be retried
+    """
     current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
-    logger.info(f"Current Time: {current_time}")
-
-    try:
-        result = _event_capacity_mutation(
-            table,
-            organisation_slug=organisation_slug,
-            event_ksuid=event_ksuid, 
-            reserved_delta=-1, 
-            remaining_capacity_delta=1, 
-            current_time=current_time 
-        ) 
-        if result.failed: 
-            f = result.failures[0]
-            if f.inferred == "remaining_capacity_insufficient":
-                return make_response(409, {"message": "Event is at capacity."})
-            if f.inferred == "version_conflict":
-                return make_response(409, {"message": "Version conflict."})
-            if f.code == "throttled":
-                return make_response(503, {"message": "Database throttled, retry."})
-            return make_response(409, {
-                "message": "Reservation failed.",
-                "reason": f.code,
-                "dynamodb_code": f.dynamodb_code,
-                "detail": f.message,
-            })
-        
-        logger.info("Successfully unreserved tickets for event %s.", event_ksuid)
-        return make_response(200, {
-            "message": "Successfully unreserved tickets.",
-            "event_ksuid": event_ksuid
-        }) 
-    except Exception as e:
-        logger.error("Error during unreservation: %s", str(e))
-        logger.error(traceback.format_exc())
-        return make_response(500, {
-            "message": "Error during unreservation.",
-            "error": str(e),
-            "event_ksuid": event_ksuid
-        })
-    
-def completed(stripe_event: dict):
-    logger.info("Handling completed checkout session.")
-
-    # What event was the ticket sold for?
-    # Mutate the reserve (-1) and number_sold (+1) on the event. Remaining capacity does not need to be changed.
-    # Put an EventBridge event out to say a ticket has been sold including some details about it.
-    # Done
-
-    try:
-        detail = stripe_event.get("detail", {})
-        data_obj = detail.get("data", {}).get("object", {})
+    dedupe_table = db.Table(STRIPE_EVENT_DEDUPE_TABLE_NAME)
+
+    already_processed = processed_event_ids(dedupe_table, list(stripe_events))
+    if already_processed:
+        logger.info(f"Skipping {len(already_processed)} already processed Stripe events: {sorted(already_processed)}")
+    pending = {stripe_event_id: stripe_event for stripe_event_id, stripe_event in stripe_events.items() if stripe_event_id not in already_processed}
+
+    failed = set()
+    # (organisation, status) -> reservation id -> Stripe event ids
+    reservations: dict[tuple[str, str], dict[str, list[str]]] = {}
+    for stripe_event_id, stripe_event in pending.items():
+        event_type = stripe_event.get("detail-type")
+        status = SETTLING_EVENT_TYPES.get(event_type)
+        if not status:
+            logger.warning(f"Received event type I can not currently process: {event_type}")
+            continue
+
+        metadata = stripe_event.get("detail", {}).get("data", {}).get("object", {}).get("metadata", {}) or {}
+        organisation_slug = metadata.get("organisation")
+        if not organisation_slug or not metadata.get("event_ksuid"):
+            logger.warning(f"Missing metadata on Stripe event {stripe_event_id}. Can't map session to an event.")
+            continue
 
-        session_id = data_obj.get("id")
+        if metadata.get("reservation_id"):
+            reservations.setdefault((organisation_slug, status), {}).setdefault(metadata["reservation_id"], []).append(stripe_event_id)
+            continue
 
         try:
-            stripe.api_key = STRIPE_API_KEY
-            stripe_checkout = stripe.checkout.Session.retrieve(session_id, expand=["line_items", "payment_intent"], stripe_account = detail.get("account"),)
-            logger.info("Retrieved Stripe checkout session: %s", stripe_checkout)
-        except (stripe.error.InvalidRequestError, stripe.error.APIConnectionError) as e:
-            logger.error("Failed to retrieve Stripe checkout session: %s", str(e))
+            table = db.Table(ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisation_slug))
+            error_response = _release_legacy_capacity(table, metadata, status, current_time)
+            if error_response:
+                logger.error(f"Failed to settle legacy session for Stripe event {stripe_event_id}: {error_response['body']}")
+                failed.add(stripe_event_id)
+        except Exception as e:
+            logger.error(f"Failed to settle legacy session for Stripe event {stripe_event_id}: {e}")
             logger.error(traceback.format_exc())
-            return make_response(500, {
-                "message": "Internal Server Error: Failed to retrieve Stripe checkout session.",
-                "error": str(e)
-            })
+            failed.add(stripe_event_id)
 
-        metadata = stripe_checkout.get("metadata", {})
-        organisation_slug = metadata.get("organisation")
-        event_ksuid = metadata.get("event_ksuid")
-        
-        #! Catch an error where metadat is missing
-        logger.info(f"Organisation: {organisation_slug}, Event KSUID: {event_ksuid}")
-
-        TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisation_slug)
-        table = db.Table(TABLE_NAME)
-
-        current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
-        logger.info(f"Current Time: {current_time}")
-
-        result = _event_capacity_mutation(
-            table,
-            organisation_slug=organisation_slug,
-            event_ksuid=event_ksuid, 
-            reserved_delta=-1, 
-            remaining_capacity_delta=0, 
-            current_time=current_time,
-            number_sold_delta=1
-        )
-
-        line_items = [
-            {
-                "ksuid": it.get("metadata", {}).get("ksuid"),
-                "entity_type":  it.get("metadata", {}).get("entity_type"),
-                "name":  it.get("metadata", {}).get("name"),
-                "includes": json.loads(it.get("metadata", {}).get("includes", "[]")),
-            } for it in stripe_checkout.get("line_items", {}).get("data", [])
-        ]
-
-        name_on_ticket = stripe_checkout.get("custom_fields", [{}])[0].get("text", {}).get("value") if stripe_checkout.get("custom_fields") else metadata.get("customer_name")
-
-        data = {
-            "session_id": session_id,
-            "payment_provider": "stripe",
-            "payment_reference": stripe_checkout.get("payment_intent", {}).get("id"),
-            "event_ksuid": event_ksuid,
-            "line_items": line_items,
-            "customer_email": stripe_checkout.get("customer_email") or stripe_checkout.get("customer_details", {}).get("email"),
-            "name_on_ticket":  name_on_ticket,
-            "source_sale_type": "checkout"
-        }
-
-        meta =  {
-            "idempotency_key": f"checkout:{session_id}",
-            "occurred_at": current_time,
-        }
-
-        # Put an EventBridge event out to say a ticket has been sold
-        trigger_eventbridge_event(eventbridge, 
-                            source="dance-engine.core" if not STAGE_NAME == "preview" else "dance-engine.core.preview", 
-                            resource_type=EventType.checkout,
-                            action=Action.completed,
-                            organisation=organisation_slug,
-                            resource_id=session_id,
-                            data=data,
-                            meta=meta)
+    for (organisation_slug, status), by_reservation in reservations.items():
+        table = db.Table(ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisation_slug))
+        try:
+            results = settle_reservations(table, list(by_reservation), status, current_time)
+        except Exception as e:
+            logger.error(f"Failed to settle {len(by_reservation)} reservations for {organisation_slug}: {e}")
+            logger.error(traceback.format_exc())
+            failed.update(stripe_event_id for stripe_event_ids in by_reservation.values() for stripe_event_id in stripe_event_ids)
+            continue
+        for reservation_id, result in results.items():
+            stripe_event_ids = by_reservation[reservation_id]
+            if result.outcome == "not_found":
+                # no ledger item to settle: retry, and leave it to the dead letter queue if it never appears
+                logger.error(f"Reservation {reservation_id} of Stripe events {stripe_event_ids} not found, cannot mark it {status}")
+                failed.update(stripe_event_ids)
+                continue
+            if result.outcome == "sold_out":
+                # paid after the hold was released and resold: no ticket; retried, then left on the dead letter queue for a refund
+                logger.error(f"Reservation {reservation_id} of Stripe events {stripe_event_ids} was paid after its hold was released and the event sold out; needs a refund")
+                failed.update(stripe_event_ids)
+                continue
+            if result.outcome == "settled" and result.previous_status == "released":
+                logger.warning(f"Reservation {reservation_id} was paid after its hold was released; capacity taken back")
+                continue
+            logger.info(f"Reservation {reservation_id} {status} result: {result}")
+
+    publisher = EventBridgePublisher(eventbridge)
+    for stripe_event_id, stripe_event in pending.items():
+        if stripe_event_id in failed or stripe_event.get("detail-type") != "checkout.session.completed":
+            continue
+        try:
+            publisher.add(key=stripe_event_id, **_checkout_completed_event(stripe_event, current_time))
+        except Exception as e:
+            logger.error(f"Failed to build checkout.completed event for Stripe event {stripe_event_id}: {e}")
+            logger.error(traceback.format_exc())
+            failed.add(stripe_event_id)
 
-        return make_response(200, {"message": "Checkout session completed successfully."})
+    for outcome in publisher.flush():
+        if not outcome.published:
+            logger.error(f"Failed to publish checkout.completed for Stripe event {outcome.key}: {outcome.error_code} {outcome.error_message}")
+            failed.add(outcome.key)
 
-    except Exception as e:
-        logger.error("Error handling completed checkout session: %s", str(e))
-        logger.error(traceback.format_exc())
-        return make_response(500, {"message": "Internal server error.", "error": str(e)})
+    processed = {
+        stripe_event_id: stripe_event.get("detail-type")
+        for stripe_event_id, stripe_event in pending.items() if stripe_event_id not in failed
+    }
+    if processed:
+        mark_events_processed(dedupe_table, processed, current_time)
+    return failed
 
 def lambda_handler(event, context):
     try:
@@ -466,14 +507,33 @@ def lambda_handler(event, context):
 def eventbridge_handler(event, context):
     logger.info("Received EventBridge event: %s", json.dumps(event, indent=2, cls=DecimalEncoder))
 
-    type = event.get("detail-type", {})
-
-    if type == "checkout.session.expired":
-        logger.info("Handling checkout.session.expired event.")
-        return unreserve(event)
-    elif type == "checkout.session.completed":
-        logger.info("Received checkout.session.completed event.") 
-        return completed(event)
-    else:
-        logger.warning(f"Received event type I can not currently process: {type}")
-        return make_response(400, {"message": f"Unhandled event type: {type}"})
+    if event.get("Records") and event.get("Records", [])[0].get("eventSource") == "aws:sqs":
+        logger.info("Triggered by SQS")
+        batch_failures = []
+        # Stripe event id -> message ids carrying it (redeliveries can share a batch)
+        message_ids: dict[str, list[str]] = {}
+        stripe_events = {}
+
+        for record in event.get("Records", []):
+            try:
+                stripe_event = parse_event(record.get("body"))
+                stripe_event_id = stripe_event.get("detail", {}).get("id") or stripe_event.get("id")
+                message_ids.setdefault(stripe_event_id, []).append(record.get("messageId"))
+                stripe_events.setdefault(stripe_event_id, stripe_event)
+            except Exception:
+                logger.error("Failed parsing SQS record\n%s", traceback.format_exc())
+                batch_failures.append({"itemIdentifier": record.get("messageId")})
+
+        try:
+            failed = process_stripe_events(stripe_events)
+        except Exception:
+            logger.error("Failed processing Stripe events\n%s", traceback.format_exc())
+            failed = set(stripe_events)
+
+        batch_failures.extend({"itemIdentifier": message_id} for stripe_event_id in failed for message_id in message_ids[stripe_event_id])
+        return {"batchItemFailures": batch_failures}
+
+    stripe_event_id = event.get("detail", {}).get("id") or event.get("id")
+    if process_stripe_events({stripe_event_id: event}):
+        return make_response(500, {"message": "Failed to process Stripe event.", "stripe_event_id": stripe_event_id})
+    return make_response(200, {"message": "Stripe event processed.", "stripe_event_id": stripe_event_id})
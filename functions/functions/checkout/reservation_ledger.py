@@ -0,0 +1,362 @@
+import logging
+import random
+import zlib
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from _pydantic.dynamodb import DynamoModel
+from _pydantic.deletion import reservation_event_index_pk, RESERVATION_EVENT_INDEX_BUCKETS
+from functions.checkout.sharded_capacity import get_capacity_shard_count, is_sharded_failure, event_key, shard_key, MAX_CAPACITY_SHARDS, THROTTLING_CODES
+
+## logger setup
+logger = logging.getLogger()
+logger.setLevel("INFO")
+
+RESERVATION_ENTITY_TYPE = "RESERVATION"
+# held reservations are indexed on gsi1 under this many partitions, so holds spread like the shards do
+HELD_INDEX_BUCKETS = 10
+# a sweep releases at most this many holds of one counter in one transaction (plus the counter)
+SWEEP_BATCH_SIZE = 99
+
+# cancellation reason codes that mean "try again" rather than "condition failed"
+TRANSACTION_RETRY_CODES = {"TransactionConflict", "ThrottlingError", "ProvisionedThroughputExceeded", "RequestLimitExceeded"}
+
+# (from status, to status) -> counter deltas
+SETTLE_DELTAS = {
+    ("held", "released"): {"reserved": -1, "remaining_capacity": 1},
+    ("held", "completed"): {"reserved": -1, "number_sold": 1},
+    # paid after the hold was swept: sold only while the counter still has stock
+    ("released", "completed"): {"remaining_capacity": -1, "number_sold": 1},
+}
+
+
+def reservation_key(reservation_id: str) -> dict:
+    return {"PK": f"RESERVATION#{reservation_id}", "SK": f"RESERVATION#{reservation_id}"}
+
+
+def _held_index_pk(bucket: int) -> str:
+    return f"RESERVATIONS#HELD#{bucket}"
+
+
+def _held_index(reservation_id: str, expires_at: str) -> dict:
+    bucket = zlib.crc32(reservation_id.encode("utf-8")) % HELD_INDEX_BUCKETS
+    return {"gsi1PK": _held_index_pk(bucket), "gsi1SK": f"{expires_at}#{reservation_id}"}
+
+
+def _event_index(event_ksuid: str, reservation_id: str) -> dict:
+    # kept for the ledger item's lifetime, so deleting the event finds every reservation of it
+    bucket = zlib.crc32(reservation_id.encode("utf-8")) % RESERVATION_EVENT_INDEX_BUCKETS
+    return {"gsi2PK": reservation_event_index_pk(event_ksuid, bucket), "gsi2SK": reservation_id}
+
+
+def _counter_update(table, event_ksuid: str, shard: Optional[int], current_time: str, require_remaining: int = 0, **deltas) -> dict:
+    """A transaction Update adding ``deltas`` to the event's counters, on the event item or on one shard, if ``require_remaining`` units are left."""
+    names = {"#updated_at": "updated_at"}
+    values = {":now": current_time}
+    additions = []
+    for field, delta in deltas.items():
+        names[f"#{field}"] = field
+        values[f":{field}"] = delta
+        additions.append(f"#{field} :{field}")
+
+    if shard is None:
+        # the event item only holds counters while the event is not sharded
+        names["#capacity_shards"] = "capacity_shards"
+        conditions = ["attribute_not_exists(#capacity_shards)"]
+    else:
+        names["#PK"] = "PK"
+        conditions = ["attribute_exists(#PK)"]
+    if require_remaining:
+        names["#remaining_capacity"] = "remaining_capacity"
+        values[":required"] = require_remaining
+        conditions.append("#remaining_capacity >= :required")
+
+    return {
+        "Update": {
+            "TableName": table.name,
+            "Key": shard_key(event_ksuid, shard) if shard is not None else event_key(event_ksuid),
+            "UpdateExpression": f"ADD {', '.join(additions)} SET #updated_at = :now",
+            "ConditionExpression": " AND ".join(conditions),
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
+    }
+
+
+def _cancellation_reasons(error: ClientError) -> list[dict]:
+    return error.response.get("CancellationReasons") or []
+
+
+@dataclass
+class HoldResult:
+    outcome: Literal["held", "sold_out", "throttled"]
+    reservation_id: str
+    capacity_shard: Optional[int] = None
+
+    @property
+    def success(self) -> bool:
+        return self.outcome == "held"
+
+
+def hold_reservation(table, event_ksuid: str, reservation_id: str, expires_at: str, current_time: str, rng=random, _refreshed: bool = False) -> HoldResult:
+    """
+    Take one unit of capacity and write its ledger item in the same transaction.
+
+    Sharded events try a random shard first and fall back across the
+    others, so ``sold_out`` is only returned once no counter had stock. The
+    ledger item records where the unit was taken and until when it may be
+    held (``expires_at``); it is indexed as held until it is settled.
+    """
+    shard_count = get_capacity_shard_count(table, event_ksuid, use_cache=not _refreshed)
+    targets = rng.sample(range(shard_count), shard_count) if shard_count else [None]
+    throttled = False
+
+    for shard in targets:
+        ledger_item = {
+            **reservation_key(reservation_id),
+            **_held_index(reservation_id, expires_at),
+            **_event_index(event_ksuid, reservation_id),
+            "entity_type": RESERVATION_ENTITY_TYPE,
+            "reservation_id": reservation_id,
+            "parent_event_ksuid": event_ksuid,
+            "status": "held",
+            "expires_at": expires_at,
+            "created_at": current_time,
+            "updated_at": current_time,
+            **({"capacity_shard": shard} if shard is not None else {}),
+        }
+        try:
+            table.meta.client.transact_write_items(TransactItems=[
+                {"Put": {"TableName": table.name, "Item": ledger_item, "ConditionExpression": "attribute_not_exists(PK)"}},
+                _counter_update(table, event_ksuid, shard, current_time, require_remaining=1, reserved=1, remaining_capacity=-1),
+            ])
+            return HoldResult(outcome="held", reservation_id=reservation_id, capacity_shard=shard)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in THROTTLING_CODES:
+                throttled = True
+                continue
+            if code != "TransactionCanceledException":
+                raise
+            reasons = _cancellation_reasons(e)
+            counter_reason = reasons[1] if len(reasons) > 1 else {}
+            if counter_reason.get("Code") == "ConditionalCheckFailed":
+                if shard is None and is_sharded_failure(counter_reason.get("Item")) and not _refreshed:
+                    # the event was sharded after this container cached its shard count
+                    return hold_reservation(table, event_ksuid, reservation_id, expires_at, current_time, rng, _refreshed=True)
+                continue
+            if any(reason.get("Code") in TRANSACTION_RETRY_CODES for reason in reasons):
+                throttled = True
+                continue
+            raise
+
+    return HoldResult(outcome="throttled" if throttled else "sold_out", reservation_id=reservation_id)
+
+
+@dataclass
+class SettleResult:
+    # sold_out: a released reservation was paid but no counter has a unit left; nothing changed
+    outcome: Literal["settled", "already_settled", "not_found", "sold_out"]
+    previous_status: Optional[str] = None
+
+
+def _required_remaining(deltas: dict, units: int = 1) -> int:
+    """Units a transition takes from remaining capacity, which the counter must still hold."""
+    return units if deltas.get("remaining_capacity", 0) < 0 else 0
+
+
+def _ledger_transition(table, reservation_id: str, previous_status: str, status: str, current_time: str, **extra) -> dict:
+    names = {"#status": "status", "#updated_at": "updated_at", "#gsi1PK": "gsi1PK", "#gsi1SK": "gsi1SK"}
+    values = {":status": status, ":previous": previous_status, ":now": current_time}
+    sets = ["#status = :status", "#updated_at = :now"]
+    for field, value in extra.items():
+        names[f"#{field}"] = field
+        values[f":{field}"] = value
+        sets.append(f"#{field} = :{field}")
+    return {
+        "Update": {
+            "TableName": table.name,
+            "Key": reservation_key(reservation_id),
+            "UpdateExpression": f"SET {', '.join(sets)} REMOVE #gsi1PK, #gsi1SK",
+            "ConditionExpression": "#status = :previous",
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+        }
+    }
+
+
+def settle_reservation(table, reservation_id: str, status: Literal["released", "completed"], current_time: str) -> SettleResult:
+    """
+    Move a reservation to ``released`` or ``completed`` and apply the matching counter change, once.
+
+    The ledger transition is conditioned on the status that was read, so a
+    repeated or concurrent settle of the same session changes the counters
+    at most once and reports ``already_settled``. Completing a released
+    reservation takes a unit back, so it needs a counter with stock: its own
+    shard first, then any other; ``sold_out`` when none has one.
+    """
+    # counters found without stock for a released -> completed transition
+    exhausted = set()
+    for _ in range(len(SETTLE_DELTAS) + MAX_CAPACITY_SHARDS + 1):
+        ledger_item = table.get_item(Key=reservation_key(reservation_id), ConsistentRead=True).get("Item")
+        if not ledger_item:
+            return SettleResult(outcome="not_found")
+        deltas = SETTLE_DELTAS.get((ledger_item["status"], status))
+        if deltas is None:
+            return SettleResult(outcome="already_settled", previous_status=ledger_item["status"])
+
+        shard = int(ledger_item["capacity_shard"]) if ledger_item.get("capacity_shard") is not None else None
+        extra = {"settled_at": current_time}
+        if shard in exhausted:
+            shard_count = get_capacity_shard_count(table, ledger_item["parent_event_ksuid"], use_cache=False) if shard is not None else 0
+            untried = [other for other in range(shard_count) if other not in exhausted]
+            if not untried:
+                return SettleResult(outcome="sold_out", previous_status=ledger_item["status"])
+            shard = extra["capacity_shard"] = untried[0]
+        required = _required_remaining(deltas)
+        try:
+            table.meta.client.transact_write_items(TransactItems=[
+                _ledger_transition(table, reservation_id, ledger_item["status"], status, current_time, **extra),
+                _counter_update(table, ledger_item["parent_event_ksuid"], shard, current_time, require_remaining=required, **deltas),
+            ])
+            return SettleResult(outcome="settled", previous_status=ledger_item["status"])
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+                raise
+            reasons = _cancellation_reasons(e)
+            counter_reason = reasons[1] if len(reasons) > 1 else {}
+            if shard is None and counter_reason.get("Code") == "ConditionalCheckFailed" and is_sharded_failure(counter_reason.get("Item")):
+                # held on the event item before the event was sharded: settle on any shard
+                shard_count = get_capacity_shard_count(table, ledger_item["parent_event_ksuid"], use_cache=False)
+                table.update_item(
+                    Key=reservation_key(reservation_id),
+                    UpdateExpression="SET capacity_shard = :shard",
+                    ConditionExpression="attribute_not_exists(capacity_shard)",
+                    ExpressionAttributeValues={":shard": random.randrange(shard_count)},
+                )
+                continue
+            if reasons and reasons[0].get("Code") == "ConditionalCheckFailed":
+                # settled concurrently; read the new status and decide again
+                continue
+            if required and counter_reason.get("Code") == "ConditionalCheckFailed":
+                exhausted.add(shard)
+                continue
+            raise
+
+    raise RuntimeError(f"Could not settle reservation {reservation_id}")
+
+
+def _settle_group(table, items: list[dict], previous_status: str, status: str, current_time: str) -> dict[str, SettleResult]:
+    """
+    Settle ledger items that share a counter and a status with one transaction per SWEEP_BATCH_SIZE items.
+
+    The counter gets the summed deltas with a single ``ADD``. When a batch
+    is cancelled (an item was settled meanwhile, the counter moved to
+    shards or has fewer units left than the batch takes back) its items are
+    settled one by one instead.
+    """
+    first = items[0]
+    event_ksuid = first["parent_event_ksuid"]
+    shard = int(first["capacity_shard"]) if first.get("capacity_shard") is not None else None
+    deltas = SETTLE_DELTAS[(previous_status, status)]
+
+    results = {}
+    for start in range(0, len(items), SWEEP_BATCH_SIZE):
+        batch = items[start:start + SWEEP_BATCH_SIZE]
+        try:
+            table.meta.client.transact_write_items(TransactItems=[
+                *[_ledger_transition(table, item["reservation_id"], previous_status, status, current_time, settled_at=current_time) for item in batch],
+                _counter_update(table, event_ksuid, shard, current_time, require_remaining=_required_remaining(deltas, len(batch)),
+                                **{field: delta * len(batch) for field, delta in deltas.items()}),
+            ])
+            results.update({item["reservation_id"]: SettleResult(outcome="settled", previous_status=previous_status) for item in batch})
+            continue
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+                raise
+            logger.info(f"Batch {status} of {len(batch)} reservations on event {event_ksuid} shard {shard} cancelled, settling one by one")
+
+        for item in batch:
+            results[item["reservation_id"]] = settle_reservation(table, item["reservation_id"], status, current_time)
+    return results
+
+
+def _counter_groups(items) -> dict[tuple[str, Optional[int], str], list[dict]]:
+    groups: dict[tuple[str, Optional[int], str], list[dict]] = {}
+    for item in items:
+        shard = int(item["capacity_shard"]) if item.get("capacity_shard") is not None else None
+        groups.setdefault((item["parent_event_ksuid"], shard, item["status"]), []).append(item)
+    return groups
+
+
+def _get_ledger_items(table, reservation_ids: list[str]) -> list[dict]:
+    """Read ledger items with BatchGetItem; raises BatchGetIncompleteError if keys stay unprocessed after the retries."""
+    found = DynamoModel.batch_get(table, [reservation_key(reservation_id) for reservation_id in reservation_ids], consistent_read=True, validate=False)
+    return list(found.values())
+
+
+def settle_reservations(table, reservation_ids: list[str], status: Literal["released", "completed"], current_time: str) -> dict[str, SettleResult]:
+    """
+    Settle many reservations at once, with one counter update per event counter.
+
+    Returns a SettleResult per reservation id, with the same outcomes as
+    ``settle_reservation``.
+    """
+    reservation_ids = list(dict.fromkeys(reservation_ids))
+    ledger_items = _get_ledger_items(table, reservation_ids)
+
+    results = {}
+    pending = []
+    for item in ledger_items:
+        if (item["status"], status) in SETTLE_DELTAS:
+            pending.append(item)
+        else:
+            results[item["reservation_id"]] = SettleResult(outcome="already_settled", previous_status=item["status"])
+
+    for (_, _, previous_status), items in _counter_groups(pending).items():
+        results.update(_settle_group(table, items, previous_status, status, current_time))
+
+    for reservation_id in reservation_ids:
+        results.setdefault(reservation_id, SettleResult(outcome="not_found"))
+    return results
+
+
+def expired_holds(table, now: str):
+    """Yield held ledger items whose ``expires_at`` is before ``now``, bucket by bucket."""
+    for bucket in range(HELD_INDEX_BUCKETS):
+        kwargs = {
+            "IndexName": "gsi1",
+            "KeyConditionExpression": Key("gsi1PK").eq(_held_index_pk(bucket)) & Key("gsi1SK").lt(now),
+        }
+        while True:
+            response = table.query(**kwargs)
+            yield from response.get("Items", [])
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def sweep_expired_reservations(table, now: str, current_time: str) -> dict:
+    """
+    Release every hold that expired before ``now``.
+
+    Holds taken from the same counter are released together: one
+    transaction moves up to SWEEP_BATCH_SIZE ledger items from held to
+    released and adds their total back to the counter with a single ``ADD``.
+    The index is read eventually consistently, so each transition is
+    conditioned on the hold still being held; a hold settled meanwhile
+    cancels its batch, which is then released one by one.
+    """
+    holds = [{**item, "status": "held"} for item in expired_holds(table, now)]
+
+    counts = {"released": 0, "skipped": 0}
+    for items in _counter_groups(holds).values():
+        for result in _settle_group(table, items, "held", "released", current_time).values():
+            counts["released" if result.outcome == "settled" else "skipped"] += 1
+
+    logger.info(f"Swept expired reservations: {counts}")
+    return counts
@@ -0,0 +1,217 @@
+import logging
+from typing import Optional
+
+from boto3.dynamodb.conditions import Key
+
+from _pydantic.dynamodb import DynamoModel
+from _shared.cache import TTLCache
+
+## logger setup
+logger = logging.getLogger()
+logger.setLevel("INFO")
+
+CAPACITY_SHARD_ENTITY_TYPE = "CAPACITY_SHARD"
+# compaction writes every shard plus the event in one transaction (max 100 items)
+MAX_CAPACITY_SHARDS = 50
+SHARD_COUNT_CACHE_TTL = 30
+
+# event ksuid -> shard count (0 when the event is not sharded), per container
+shard_count_cache = TTLCache(maxsize=256, ttl=SHARD_COUNT_CACHE_TTL)
+
+THROTTLING_CODES = {"ProvisionedThroughputExceededException", "ThrottlingException", "RequestLimitExceeded"}
+
+
+def event_key(event_ksuid: str) -> dict:
+    return {"PK": f"EVENT#{event_ksuid}", "SK": f"EVENT#{event_ksuid}"}
+
+
+def shard_key(event_ksuid: str, shard: int) -> dict:
+    # one partition per shard, so reservations spread over partitions instead of one hot key
+    return {"PK": f"CAPACITY#{event_ksuid}#{shard:02d}", "SK": f"CAPACITY#{event_ksuid}"}
+
+
+def get_capacity_shard_count(table, event_ksuid: str, use_cache: bool = True) -> int:
+    """Return the event's capacity shard count, 0 when its capacity lives on the event item."""
+    cache_key = (table.name, event_ksuid)
+    cached = shard_count_cache.get(cache_key) if use_cache else None
+    if cached is None:
+        item = table.get_item(Key=event_key(event_ksuid), ProjectionExpression="capacity_shards").get("Item") or {}
+        cached = int(item.get("capacity_shards") or 0)
+        shard_count_cache.set(cache_key, cached)
+    return cached
+
+
+def is_sharded_failure(old_item: Optional[dict]) -> bool:
+    """Whether an ALL_OLD event item from a failed event-level mutation shows the event is sharded."""
+    return isinstance(old_item, dict) and "capacity_shards" in old_item
+
+
+def release_capacity_shard(table, event_ksuid: str, shard: int, current_time: str, reserved_delta: int, remaining_capacity_delta: int, number_sold_delta: int = 0):
+    """Apply counter deltas to one shard, e.g. to release or complete a reservation taken from it."""
+    table.update_item(
+        Key=shard_key(event_ksuid, shard),
+        UpdateExpression="ADD #reserved :reserved, #remaining_capacity :remaining, #number_sold :sold SET #updated_at = :now",
+        ConditionExpression="attribute_exists(#PK)",
+        ExpressionAttributeNames={"#PK": "PK", "#reserved": "reserved", "#remaining_capacity": "remaining_capacity", "#number_sold": "number_sold", "#updated_at": "updated_at"},
+        ExpressionAttributeValues={":reserved": reserved_delta, ":remaining": remaining_capacity_delta, ":sold": number_sold_delta, ":now": current_time},
+    )
+
+
+def _split(total: int, parts: int) -> list[int]:
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+def _unchanged_condition(field: str, item: dict, names: dict, values: dict) -> str:
+    names[f"#{field}"] = field
+    if field not in item:
+        return f"attribute_not_exists(#{field})"
+    values[f":{field}"] = item[field]
+    return f"#{field} = :{field}"
+
+
+def enable_sharded_capacity(table, event_ksuid: str, shard_count: int, current_time: str):
+    """
+    Move an event's capacity counters onto ``shard_count`` shard items.
+
+    The remaining capacity is split evenly; shard 0 takes over the reserved
+    and sold counts so the shard totals equal the event's counters. The
+    event keeps ``capacity_shards`` and, from then on, its counters are a
+    summary written by the compactor. The transaction only goes through if
+    the counters did not move since they were read.
+    """
+    if not 1 < shard_count <= MAX_CAPACITY_SHARDS:
+        raise ValueError(f"shard_count must be between 2 and {MAX_CAPACITY_SHARDS}")
+
+    event_item = table.get_item(Key=event_key(event_ksuid), ConsistentRead=True).get("Item")
+    if not event_item:
+        raise ValueError(f"Event {event_ksuid} not found")
+    if event_item.get("capacity_shards"):
+        raise ValueError(f"Event {event_ksuid} already has sharded capacity")
+
+    names = {"#capacity_shards": "capacity_shards", "#updated_at": "updated_at"}
+    values = {":shards": shard_count, ":now": current_time}
+    conditions = ["attribute_not_exists(#capacity_shards)"] + [
+        _unchanged_condition(field, event_item, names, values)
+        for field in ("remaining_capacity", "reserved", "number_sold")
+    ]
+
+    remaining = _split(int(event_item.get("remaining_capacity") or 0), shard_count)
+    transact_items = [{
+        "Update": {
+            "TableName": table.name,
+            "Key": event_key(event_ksuid),
+            "UpdateExpression": "SET #capacity_shards = :shards, #updated_at = :now",
+            "ConditionExpression": " AND ".join(conditions),
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+        }
+    }]
+    for shard in range(shard_count):
+        transact_items.append({
+            "Put": {
+                "TableName": table.name,
+                "Item": {
+                    **shard_key(event_ksuid, shard),
+                    "entity_type": CAPACITY_SHARD_ENTITY_TYPE,
+                    "parent_event_ksuid": event_ksuid,
+                    "shard": shard,
+                    "remaining_capacity": remaining[shard],
+                    "reserved": int(event_item.get("reserved") or 0) if shard == 0 else 0,
+                    "number_sold": int(event_item.get("number_sold") or 0) if shard == 0 else 0,
+                    "created_at": current_time,
+                    "updated_at": current_time,
+                },
+                "ConditionExpression": "attribute_not_exists(PK)",
+            }
+        })
+
+    table.meta.client.transact_write_items(TransactItems=transact_items)
+    shard_count_cache.invalidate((table.name, event_ksuid))
+    logger.info(f"Sharded capacity of event {event_ksuid} over {shard_count} shards: {remaining}")
+
+
+def get_event_shards(table, event_ksuid: str, shard_count: int) -> list[dict]:
+    """Return every shard of one event with consistent reads; raises rather than returning a partial set."""
+    keys = [shard_key(event_ksuid, shard) for shard in range(shard_count)]
+    return list(DynamoModel.batch_get(table, keys, consistent_read=True, validate=False).values())
+
+
+def list_sharded_events(table) -> dict[str, list[dict]]:
+    """Return every shard in the table grouped by event ksuid (one paginated typeIDX query)."""
+    events: dict[str, list[dict]] = {}
+    kwargs = {"IndexName": "typeIDX", "KeyConditionExpression": Key("entity_type").eq(CAPACITY_SHARD_ENTITY_TYPE)}
+    while True:
+        response = table.query(**kwargs)
+        for item in response.get("Items", []):
+            events.setdefault(item["parent_event_ksuid"], []).append(item)
+        if "LastEvaluatedKey" not in response:
+            return events
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def compact_event_shards(table, event_ksuid: str, shards: list[dict], current_time: str, event_item: Optional[dict] = None) -> bool:
+    """
+    Rebalance remaining capacity across an event's shards and refresh the event's summary counters.
+
+    Stock is moved with ``ADD`` deltas that sum to zero, so reservations
+    made while compacting are never lost. Only shards that give stock away
+    are conditioned (on still holding it), which keeps every shard at zero
+    or more. Nothing is written when the shards are balanced and
+    ``event_item`` already holds the summary. Returns False when the
+    transaction was cancelled; the next run tries again.
+    """
+    shards = sorted(shards, key=lambda item: int(item["shard"]))
+    remaining = [int(item.get("remaining_capacity") or 0) for item in shards]
+    targets = _split(sum(remaining), len(shards))
+    summary = {
+        "remaining_capacity": sum(remaining),
+        "reserved": sum(int(item.get("reserved") or 0) for item in shards),
+        "number_sold": sum(int(item.get("number_sold") or 0) for item in shards),
+    }
+
+    transact_items = []
+    for item, observed, target in zip(shards, remaining, targets):
+        delta = target - observed
+        if delta == 0:
+            continue
+        update = {
+            "TableName": table.name,
+            "Key": {"PK": item["PK"], "SK": item["SK"]},
+            "UpdateExpression": "ADD #remaining_capacity :delta SET #updated_at = :now",
+            "ExpressionAttributeNames": {"#remaining_capacity": "remaining_capacity", "#updated_at": "updated_at"},
+            "ExpressionAttributeValues": {":delta": delta, ":now": current_time},
+        }
+        if delta < 0:
+            update["ConditionExpression"] = "#remaining_capacity >= :take"
+            update["ExpressionAttributeValues"][":take"] = -delta
+        transact_items.append({"Update": update})
+
+    if not transact_items and event_item is not None and all(int(event_item.get(field) or 0) == value for field, value in summary.items()):
+        return True
+
+    transact_items.append({
+        "Update": {
+            "TableName": table.name,
+            "Key": event_key(event_ksuid),
+            "UpdateExpression": "SET #remaining_capacity = :remaining_capacity, #reserved = :reserved, #number_sold = :number_sold, #updated_at = :now",
+            "ConditionExpression": "attribute_exists(#capacity_shards)",
+            "ExpressionAttributeNames": {
+                "#remaining_capacity": "remaining_capacity",
+                "#reserved": "reserved",
+                "#number_sold": "number_sold",
+                "#updated_at": "updated_at",
+                "#capacity_shards": "capacity_shards",
+            },
+            "ExpressionAttributeValues": {**{f":{field}": value for field, value in summary.items()}, ":now": current_time},
+        }
+    })
+
+    try:
+        table.meta.client.transact_write_items(TransactItems=transact_items)
+    except table.meta.client.exceptions.TransactionCanceledException as e:
+        reasons = [reason.get("Code") for reason in e.response.get("CancellationReasons", [])]
+        logger.info(f"Compaction of event {event_ksuid} cancelled: {reasons}")
+        return False
+
+    logger.info(f"Compacted {len(shards)} shards of event {event_ksuid}: {remaining} -> {targets}, summary {summary}")
+    return True
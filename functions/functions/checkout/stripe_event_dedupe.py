@@ -0,0 +1,55 @@
+import logging
+import time
+
+from _pydantic.dynamodb import BatchGetIncompleteError, BATCH_GET_MAX_ATTEMPTS
+from _pydantic.dynamodb_helpers import _backoff_delay
+
+## logger setup
+logger = logging.getLogger()
+logger.setLevel("INFO")
+
+# Stripe retries a delivery for up to three days; keep ids a little longer
+DEDUPE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def processed_event_ids(table, stripe_event_ids: list[str], max_attempts: int = BATCH_GET_MAX_ATTEMPTS) -> set[str]:
+    """
+    Return the Stripe event ids that were already processed (one BatchGetItem per 100 ids).
+
+    Unprocessed keys are retried with backoff, up to ``max_attempts`` calls
+    per chunk. After that BatchGetIncompleteError is raised so the whole
+    SQS batch is retried rather than processed without its dedupe check.
+    """
+    stripe_event_ids = list(dict.fromkeys(stripe_event_ids))
+    processed = set()
+    for start in range(0, len(stripe_event_ids), 100):
+        request = {table.name: {
+            "Keys": [{"stripe_event_id": stripe_event_id} for stripe_event_id in stripe_event_ids[start:start + 100]],
+            "ProjectionExpression": "stripe_event_id",
+            "ConsistentRead": True,
+        }}
+        for attempt in range(max_attempts):
+            if attempt:
+                time.sleep(_backoff_delay(attempt - 1))
+            response = table.meta.client.batch_get_item(RequestItems=request)
+            processed.update(item["stripe_event_id"] for item in response.get("Responses", {}).get(table.name, []))
+            request = response.get("UnprocessedKeys") or None
+            if not request:
+                break
+        if request:
+            raise BatchGetIncompleteError(request[table.name]["Keys"])
+    return processed
+
+
+def mark_events_processed(table, stripe_events: dict[str, str], current_time: str):
+    """Record Stripe event ids (mapped to their event type) as processed; DynamoDB's TTL removes them later."""
+    expires_at = int(time.time()) + DEDUPE_TTL_SECONDS
+    with table.batch_writer(overwrite_by_pkeys=["stripe_event_id"]) as batch:
+        for stripe_event_id, event_type in stripe_events.items():
+            batch.put_item(Item={
+                "stripe_event_id": stripe_event_id,
+                "event_type": event_type,
+                "processed_at": current_time,
+                "expires_at": expires_at,
+            })
+    logger.info(f"Marked {len(stripe_events)} Stripe events as processed")
@@ -15,10 +15,10 @@ sys.path.append(os.path.dirname(__file__))
 from _shared.parser import parse_event
 from _shared.DecimalEncoder import DecimalEncoder
 from _shared.naming import getOrganisationTableName
-from _shared.helpers import make_response
+from _shared.helpers import make_response, get_pagination_params, get_fields_param, summary_body
 from _pydantic.EventBridge import trigger_eventbridge_event, EventType, Action # pydantic layer
 from _pydantic.dynamodb import VersionConflictError # pydantic layer
-from _pydantic.models.customers_models import CreateCustomerRequest, UpdateCustomerRequest, CustomerListResponse
+from _pydantic.models.customers_models import CreateCustomerRequest, UpdateCustomerRequest, CustomerListResponse, CustomerObject
 from _pydantic.models.models_extended import CustomerModel
 
 logger = logging.getLogger()
@@ -128,7 +128,7 @@ def update_customer(request_data: UpdateCustomerRequest, organisation_slug: str,
         logger.error(traceback.format_exc())
         return make_response(500, {"message": "Something went wrong."})
     
-def get_customers(organisationSlug):
+def get_customers(organisationSlug, fields=None):
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
     table = db.Table(TABLE_NAME)
     logger.info(f"Getting Customers for {organisationSlug} from {TABLE_NAME}")
@@ -139,11 +139,15 @@ def get_customers(organisationSlug):
             table=table,
             index_name="gsi1",
             key_condition=Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with(f"{blank_model.gsi1SK.split('#')[0]}#"),
+            fields=fields,
         )
         logger.info(f"Found customers for {organisationSlug}: {customers}")
     except Exception as e:
         logger.error(f"DynamoDB query failed to get customers for {organisationSlug}: {e}")
         raise Exception
+
+    if fields:
+        return customers or []
     
     #! temporary fix this needs review
     if isinstance(customers, CustomerModel):
@@ -151,6 +155,21 @@ def get_customers(organisationSlug):
 
     return customers
 
+def get_customers_page(organisationSlug, limit=None, cursor=None, fields=None):
+    TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
+    table = db.Table(TABLE_NAME)
+    logger.info(f"Getting page of Customers for {organisationSlug} from {TABLE_NAME} (limit={limit})")
+    blank_model = CustomerModel(name="blank", organisation=organisationSlug)
+
+    return blank_model.query_page(
+        table=table,
+        index_name="gsi1",
+        key_condition=Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with(f"{blank_model.gsi1SK.split('#')[0]}#"),
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+    )
+
 def get_single_customer(organisationSlug, customerId):
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
     table = db.Table(TABLE_NAME)
@@ -201,12 +220,26 @@ def private_handler(event, context):
             logger.info(f"{organisationSlug}:{customerId}")
             response_cls = CustomerListResponse
 
+            if not customerId:
+                try:
+                    limit, cursor = get_pagination_params(event)
+                    fields = get_fields_param(event, CustomerModel, CustomerObject.model_fields)
+                    page = get_customers_page(organisationSlug, limit, cursor, fields) if (limit or cursor) else None
+                except ValueError as e:
+                    return make_response(400, {"message": str(e)})
+                if fields:
+                    body = summary_body("customers", page.items, page.cursor) if page is not None else summary_body("customers", get_customers(organisationSlug, fields))
+                    return make_response(200, body, event=event)
+                if page is not None:
+                    resposne = response_cls(customers=page.items, next_cursor=page.cursor)
+                    return make_response(200, resposne, event=event, exclude_none=True)
+
             customers = [get_single_customer(organisationSlug,customerId)] if customerId else get_customers(organisationSlug)
             if customers is None:
                 return make_response(404, {"message": "Customer not found."})
             
             resposne = response_cls(customers=customers)
-            return make_response(200, resposne.model_dump(mode="json", exclude_none=True))
+            return make_response(200, resposne, event=event, exclude_none=True)
         
         elif http_method == "PUT":
             if not customerId:
@@ -11,7 +11,6 @@ import uuid
 from email.message import EmailMessage
 
 ## installed packages
-from boto3.dynamodb.conditions import Key
 # from botocore.exceptions import ClientError
 #from ksuid import KsuidMs # layer: utils
 
@@ -19,6 +18,7 @@ from boto3.dynamodb.conditions import Key
 sys.path.append(os.path.dirname(__file__))
 from _shared.parser import parse_event
 from _shared.DecimalEncoder import DecimalEncoder
+from _shared.helpers import get_organisation_settings as _get_organisation_settings
 from _pydantic.models.models_extended import OrganisationModel
 from _pydantic.email_models import EmailTemplates, JobTypes, EmailRecipient, EmailJob
 
@@ -49,24 +49,7 @@ def _build_brevo_idempotency_key(idempotency_key: str) -> str:
     return str(uuid.uuid5(uuid.UUID("7b85d969-417b-4fbf-a11d-95b22d808923"), idempotency_key))
 
 def get_organisation_settings(organisationSlug: str) -> OrganisationModel:
-    TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
-    table = db.Table(TABLE_NAME)
-    logger.info(f"Getting settings of {organisationSlug} from {TABLE_NAME} / ")
-    blank_model = OrganisationModel(name="blank", organisation=organisationSlug)
-
-    try:
-        result = blank_model.query_gsi(
-            table=table,
-            index_name="IDXinv", 
-            key_condition=Key('PK').eq(f'{blank_model.PK}') & Key('SK').eq(f'{blank_model.SK}'),
-            assemble_entites=True
-            )
-        logger.info(f"Found settings for {organisationSlug}: {result}")
-    except Exception as e:
-        logger.error(f"DynamoDB query failed to get settings for {organisationSlug}: {e}")
-        raise Exception
-
-    return OrganisationModel.model_validate(result)
+    return _get_organisation_settings(organisationSlug, db, OrganisationModel, ORG_TABLE_NAME_TEMPLATE)
 
 def _render_tempalte_preview(request: EmailJob):
     logger.info(f"Rendering template preview for template_id: {request.template} with params: {request.params}")
@@ -16,24 +16,30 @@ sys.path.append(os.path.dirname(__file__))
 from _shared.parser import parse_event, validate_event
 from _shared.DecimalEncoder import DecimalEncoder
 from _shared.naming import getOrganisationTableName, generateSlug
-from _shared.helpers import make_response
+from _shared.helpers import make_response, get_pagination_params, get_fields_param, summary_body
 from _pydantic.EventBridge import trigger_eventbridge_event, EventType, Action # pydantic layer
 from _pydantic.dynamodb import VersionConflictError # pydantic layer
+from _pydantic.deletion import delete_event_rows # pydantic layer
 from _pydantic.models.events_models import CreateEventRequest, UpdateEventRequest, DeleteEventRequest, EventListResponse, EventResponse, EventListResponsePublic, EventResponsePublic, EventObjectPublic, EventObject, LocationObject, Status, CategoryEnum
 from _pydantic.models.models_extended import EventModel, LocationModel
 from _pydantic.models.items_models import Status as ItemStatus
 from _pydantic.models.bundles_models import Status as BundleStatus
+from functions.events.public_snapshots import event_list_key, event_detail_key, group_snapshot_triggers, read_snapshot, write_snapshot, delete_snapshot
 
 logger = logging.getLogger()
 logger.setLevel("INFO")
 
 PUBLIC_ITEM_STATUSES = {ItemStatus.live, ItemStatus.sold_out}
+# a deletion pass checkpoints and returns with this much time left
+DELETION_TIME_RESERVE_MS = 5000
 
 db = boto3.resource("dynamodb")
 eventbridge = boto3.client('events')
+s3 = boto3.client("s3")
 
 STAGE_NAME = os.environ.get('STAGE_NAME') or (_ for _ in ()).throw(KeyError("Environment variable 'STAGE_NAME' not found"))
 ORG_TABLE_NAME_TEMPLATE = os.environ.get('ORG_TABLE_NAME_TEMPLATE') or (_ for _ in ()).throw(KeyError("Environment variable 'ORG_TABLE_NAME_TEMPLATE' not found"))
+BUCKET_NAME = os.environ.get('BUCKET_NAME') or (_ for _ in ()).throw(KeyError("Environment variable 'BUCKET_NAME' not found"))
 
 def _preprocess_event_item(item: dict) -> dict:
     if 'status' in item and isinstance(item["status"], str):
@@ -134,9 +140,12 @@ def update_event(request_data: UpdateEventRequest, organisation_slug: str, actor
         logger.error(traceback.format_exc())
         return make_response(500, {"message": "Something went wrong."})            
 
-def delete_event(organisation_slug: str, event_id: str, actor: str = "unknown"):
+def delete_event(organisation_slug: str, event_id: str, actor: str = "unknown", has_time=lambda: True):
     """
-    This function isn't perfect. It may fail in unexpected ways.
+    Delete an event with its tickets and every row keyed to it.
+
+    Runs in bounded passes: when time runs short the progress is checkpointed
+    and a 202 is returned, and repeating the DELETE carries on from there.
     """
     logger.info(f"Deleting Event: {event_id} for org {organisation_slug}")
     if STAGE_NAME.lower() == "prod":
@@ -144,31 +153,32 @@ def delete_event(organisation_slug: str, event_id: str, actor: str = "unknown"):
 
     table_name = ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisation_slug)
     table = db.Table(table_name)
-
-    #! Temporary fix doesnt use actual event models
-    try:
-        response = table.query(
-            IndexName="IDXinv",
-            KeyConditionExpression=Key("SK").eq(f"EVENT#{event_id}")
-        )
-        event_items = response.get("Items", [])
-    except Exception as e:
-        logger.error(f"Failed to fetch items for deletion: {e}", exc_info=True)
-        return make_response(500, {"message": "Failed to fetch event items for deletion.",
-                                   "warning": "This is experimental and may not work as expected."})
+    current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
 
     try:
-        with table.batch_writer() as batch:
-            for item in event_items:
-                batch.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
-        return make_response(200, {"message": "Event and related entities deleted successfully.",
-                                   "warning": "This is experimental and may not work as expected."})
+        result = delete_event_rows(table, event_id, current_time, scope="EVENT", has_time=has_time)
     except Exception as e:
         logger.error(f"Deletion failed: {e}", exc_info=True)
-        return make_response(500, {"message": "Failed to delete event.",
-                                   "warning": "This is experimental and may not work as expected."})
-
-def get_events(organisationSlug: str, public: bool = False):
+        return make_response(500, {"message": "Failed to delete event."})
+
+    if not result.completed:
+        return make_response(202, {"message": "Event deletion in progress, repeat the request to continue.",
+                                   "deleted_record_count": result.deleted,
+                                   "deleted_ticket_count": result.tickets})
+
+    trigger_eventbridge_event(eventbridge,
+                              source="dance-engine.core",
+                              resource_type=EventType.event,
+                              action=Action.deleted,
+                              organisation=organisation_slug,
+                              resource_id=f"EVENT#{event_id}",
+                              data={"event": {"ksuid": event_id}},
+                              meta={"accountId": actor})
+    return make_response(200, {"message": "Event and related entities deleted successfully.",
+                               "deleted_record_count": result.deleted,
+                               "deleted_ticket_count": result.tickets})
+
+def get_events(organisationSlug: str, public: bool = False, fields: frozenset = None):
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
     table = db.Table(TABLE_NAME)
     logger.info(f"Getting events for {organisationSlug} from {TABLE_NAME}")
@@ -178,12 +188,16 @@ def get_events(organisationSlug: str, public: bool = False):
         events = blank_model.query_gsi(
             table=table,
             index_name="gsi1", 
-            key_condition=Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with(f"{blank_model.gsi1SK.split('#')[0]}#")
+            key_condition=Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with(f"{blank_model.gsi1SK.split('#')[0]}#"),
+            fields=fields,
         )
         logger.info(f"Found events for {organisationSlug}: {events}")
     except Exception as e:
         logger.error(f"DynamoDB query failed to get events for {organisationSlug}: {e}")
         raise Exception
+
+    if fields:
+        return events or []
     
     #! temporary fix this needs review
     if isinstance(events, EventModel):
@@ -194,7 +208,28 @@ def get_events(organisationSlug: str, public: bool = False):
 
     return [e.to_public() if public else e for e in events]
 
-def get_single_event(organisationSlug: str, eventId: str, public: bool = False):
+def get_events_page(organisationSlug: str, public: bool = False, limit: int = None, cursor: str = None, fields: frozenset = None):
+    TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
+    table = db.Table(TABLE_NAME)
+    logger.info(f"Getting page of events for {organisationSlug} from {TABLE_NAME} (limit={limit})")
+    blank_model = EventModel(name="blank", organisation=organisationSlug)
+
+    page = blank_model.query_page(
+        table=table,
+        index_name="gsi1",
+        key_condition=Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with(f"{blank_model.gsi1SK.split('#')[0]}#"),
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+    )
+
+    events = page.items
+    if public:
+        events = [i for i in events if getattr(i, "status", None) == Status.live]
+
+    return [e.to_public() if public else e for e in events], page.cursor
+
+def get_single_event(organisationSlug: str, eventId: str, public: bool = False, include_history: bool = False):
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
     table = db.Table(TABLE_NAME)
     logger.info(f"Getting events for {organisationSlug} from {TABLE_NAME}")
@@ -205,7 +240,8 @@ def get_single_event(organisationSlug: str, eventId: str, public: bool = False):
             table=table,
             index_name="IDXinv", 
             key_condition=Key('SK').eq(f'{blank_model.PK}'),
-            assemble_entites=True
+            assemble_entites=True,
+            include=EventModel.CORE_RELATIONS | ({"HISTORY"} if include_history and not public else set()),
         )
         logger.info(f"Found event for {organisationSlug}: {result}")
 
@@ -315,6 +351,68 @@ def create_event(request_data: CreateEventRequest, organisation_slug: str, actor
         logger.error(traceback.format_exc())
         return make_response(500, {"message": "Something went wrong."})
 
+def refresh_public_snapshots(organisation_slug: str, event_ksuids: set[str]):
+    """
+    Rewrite the public catalog snapshots of an organisation on the CDN.
+
+    The event list is always rewritten; each event in ``event_ksuids`` gets
+    its detail snapshot (live items and bundles included) rewritten, or
+    removed when the event is no longer public.
+    """
+    generated_at = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+    for event_ksuid in event_ksuids:
+        key = event_detail_key(organisation_slug, event_ksuid)
+        if not key:
+            logger.warning(f"Skipping snapshot of invalid event id {event_ksuid} for {organisation_slug}")
+            continue
+        result = get_single_event(organisation_slug, event_ksuid, public=True)
+        if result is None:
+            delete_snapshot(s3, BUCKET_NAME, key)
+        else:
+            write_snapshot(s3, BUCKET_NAME, key, EventResponsePublic(event=result).model_dump(mode="json", exclude_none=True), generated_at)
+
+    events = get_events(organisation_slug, public=True)
+    write_snapshot(s3, BUCKET_NAME, event_list_key(organisation_slug), EventListResponsePublic(events=events).model_dump(mode="json", exclude_none=True), generated_at)
+
+def snapshot_handler(event, context):
+    """
+    Refresh the public snapshots for catalog changes (event, item, bundle, checkout) queued on PublicSnapshotQueue.
+
+    The queue's batching window coalesces a burst of changes, such as one
+    checkout per ticket sold, into one refresh per organisation. Invoked
+    directly with ``{"organisation"}``: rebuild every public snapshot of
+    that organisation, e.g. to backfill after a deploy.
+    """
+    logger.info("Received event: %s", json.dumps(event, indent=2, cls=DecimalEncoder))
+
+    if "Records" in event:
+        batch_failures = []
+        for organisation_slug, (event_ksuids, message_ids) in group_snapshot_triggers(event["Records"]).items():
+            try:
+                refresh_public_snapshots(organisation_slug, event_ksuids)
+            except Exception:
+                logger.error("Failed refreshing public snapshots of %s\n%s", organisation_slug, traceback.format_exc())
+                batch_failures.extend({"itemIdentifier": message_id} for message_id in message_ids)
+        return {"batchItemFailures": batch_failures}
+
+    organisation_slug = event.get("organisation")
+    if not organisation_slug:
+        logger.warning("No organisation on snapshot trigger, nothing to refresh.")
+        return make_response(400, {"message": "Missing organisation."})
+
+    event_ksuids = {e.ksuid for e in get_events(organisation_slug)}
+    refresh_public_snapshots(organisation_slug, event_ksuids)
+    return make_response(200, {"message": "Public snapshots refreshed.", "organisation": organisation_slug, "events": sorted(event_ksuids)})
+
+def write_missing_snapshot(key: str, response):
+    """Store a public response built from DynamoDB because its snapshot was missing, unless one was written meanwhile."""
+    generated_at = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    try:
+        write_snapshot(s3, BUCKET_NAME, key, response.model_dump(mode="json", exclude_none=True), generated_at, only_if_missing=True)
+    except Exception as e:
+        logger.warning(f"Failed to write missing public snapshot {key}: {e}")
+
 def lambda_handler(event, context):
     try:
         logger.info("Received event: %s", json.dumps(event, indent=2, cls=DecimalEncoder))
@@ -337,16 +435,49 @@ def lambda_handler(event, context):
             response_cls = EventResponsePublic if is_public else EventResponse
             list_response_cls = EventListResponsePublic if is_public else EventListResponse
 
+            query = event.get("queryStringParameters") or {}
+            if is_public and query.get("fields"):
+                return make_response(400, {"message": "fields is not supported on public routes."})
+            missing_snapshot_key = None
+            if is_public and not query.get("limit") and not query.get("cursor"):
+                # served from the snapshot the catalog builder keeps current; DynamoDB only when there is none yet
+                key = event_detail_key(organisationSlug, eventId) if eventId else event_list_key(organisationSlug)
+                try:
+                    snapshot = read_snapshot(s3, BUCKET_NAME, key)
+                    missing_snapshot_key = key if snapshot is None else None
+                except Exception as e:
+                    logger.warning(f"Failed to read public snapshot {key}, falling back to DynamoDB: {e}")
+                    snapshot = None
+                if snapshot is not None:
+                    return make_response(200, snapshot, event=event)
+
             if eventId:
-                result = get_single_event(organisationSlug, eventId, public=is_public)
+                includes = {i.strip().lower() for i in ((event.get("queryStringParameters") or {}).get("include") or "").split(",")}
+                result = get_single_event(organisationSlug, eventId, public=is_public, include_history="history" in includes)
                 if result is None:
                     return make_response(404, {"message": "Event not found."})
                 response = response_cls(event=result)
             else:
-                result = get_events(organisationSlug, public=is_public)
-                response = list_response_cls(events=result)
-            
-            return make_response(200, response.model_dump(mode="json", exclude_none=True))                
+                try:
+                    limit, cursor = get_pagination_params(event)
+                    fields = get_fields_param(event, EventModel, EventObject.model_fields)
+                    if limit or cursor:
+                        result, next_cursor = get_events_page(organisationSlug, public=is_public, limit=limit, cursor=cursor, fields=fields)
+                        if fields:
+                            return make_response(200, summary_body("events", result, next_cursor), event=event)
+                        response = list_response_cls(events=result, next_cursor=next_cursor)
+                    else:
+                        result = get_events(organisationSlug, public=is_public, fields=fields)
+                        if fields:
+                            return make_response(200, summary_body("events", result), event=event)
+                        response = list_response_cls(events=result)
+                except ValueError as e:
+                    return make_response(400, {"message": str(e)})
+
+            if missing_snapshot_key:
+                # first read after a deploy or a new organisation: the next one is served from S3
+                write_missing_snapshot(missing_snapshot_key, response)
+            return make_response(200, response, event=event, exclude_none=True)                
 
         elif http_method == "PUT":
             if not eventId:
@@ -361,7 +492,7 @@ def lambda_handler(event, context):
             if "*" not in event.get("requestContext", {}).get("authorizer", {}).get("lambda", {}).get("organisations", {}):
                 return make_response(403, {"message": "Forbidden. You do not have permission to delete this event."})
             validated_request = DeleteEventRequest(**parsed_event)
-            return delete_event(organisationSlug, eventId, actor)
+            return delete_event(organisationSlug, eventId, actor, has_time=lambda: context.get_remaining_time_in_millis() > DELETION_TIME_RESERVE_MS)
 
         else:
             return make_response(405, {"message": "Method not allowed."})
@@ -0,0 +1,105 @@
+import json
+import logging
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+## logger setup
+logger = logging.getLogger()
+logger.setLevel("INFO")
+
+# objects under cdn/ are served by CloudFront at the cdn_url root
+SNAPSHOT_PREFIX = "cdn"
+# snapshots are rewritten within a batching window of each change; the TTL only bounds how long an edge serves an old copy
+SNAPSHOT_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+# S3 refused an If-None-Match write because the object exists (or another write to it is in flight)
+SNAPSHOT_EXISTS_CODES = {"PreconditionFailed", "ConditionalRequestConflict"}
+
+
+def event_list_key(organisation_slug: str) -> str:
+    return f"{SNAPSHOT_PREFIX}/{organisation_slug}/public/events.json"
+
+
+def event_detail_key(organisation_slug: str, event_ksuid: str) -> Optional[str]:
+    """Detail snapshot key, or None when ``event_ksuid`` could not be a KSUID (it comes from the URL)."""
+    if not event_ksuid or not event_ksuid.isalnum():
+        return None
+    return f"{SNAPSHOT_PREFIX}/{organisation_slug}/public/events/{event_ksuid}.json"
+
+
+def event_ksuid_from_detail(detail: dict) -> Optional[str]:
+    """Find the event an EventBridge detail is about: an event resource, or the parent event of an item, bundle or checkout."""
+    resource_id = detail.get("resource_id") or ""
+    if detail.get("resource_type") == "event" and resource_id.startswith("EVENT#"):
+        return resource_id.removeprefix("EVENT#")
+
+    data = detail.get("data") or {}
+    entity = data.get(detail.get("resource_type"))
+    if not isinstance(entity, dict):
+        entity = data
+    return entity.get("parent_event_ksuid") or entity.get("event_ksuid")
+
+
+def group_snapshot_triggers(records: list[dict]) -> dict[str, tuple[set[str], list[str]]]:
+    """
+    Coalesce a batch of queued catalog changes into one refresh per organisation.
+
+    Each SQS record carries an EventBridge event. Returns, per organisation,
+    the events whose detail snapshots changed and the message ids to report
+    as failed if that refresh fails. Records without an organisation are
+    logged and dropped, since a retry would not fix them.
+    """
+    triggers: dict[str, tuple[set[str], list[str]]] = {}
+    for record in records:
+        try:
+            detail = json.loads(record.get("body") or "{}").get("detail") or {}
+        except json.JSONDecodeError:
+            detail = {}
+        organisation_slug = detail.get("organisation")
+        if not organisation_slug:
+            logger.warning(f"No organisation on snapshot trigger {record.get('messageId')}, dropping it.")
+            continue
+        event_ksuids, message_ids = triggers.setdefault(organisation_slug, (set(), []))
+        event_ksuid = event_ksuid_from_detail(detail)
+        if event_ksuid:
+            event_ksuids.add(event_ksuid)
+        message_ids.append(record.get("messageId"))
+    return triggers
+
+
+def write_snapshot(s3, bucket: str, key: str, payload: dict, generated_at: str, only_if_missing: bool = False) -> bool:
+    """Write a snapshot; with ``only_if_missing`` an existing one is kept and False is returned."""
+    kwargs = {"IfNoneMatch": "*"} if only_if_missing else {}
+    try:
+        s3.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8"),
+            ContentType="application/json",
+            CacheControl=SNAPSHOT_CACHE_CONTROL,
+            Metadata={"generated-at": generated_at},
+            **kwargs,
+        )
+    except ClientError as e:
+        if not only_if_missing or e.response.get("Error", {}).get("Code") not in SNAPSHOT_EXISTS_CODES:
+            raise
+        logger.info(f"Public snapshot {key} already exists, keeping it")
+        return False
+    logger.info(f"Wrote public snapshot {key}")
+    return True
+
+
+def delete_snapshot(s3, bucket: str, key: str):
+    s3.delete_object(Bucket=bucket, Key=key)
+    logger.info(f"Deleted public snapshot {key}")
+
+
+def read_snapshot(s3, bucket: str, key: Optional[str]) -> Optional[dict]:
+    """Return a snapshot's JSON, or None when there is none yet."""
+    if not key:
+        return None
+    try:
+        response = s3.get_object(Bucket=bucket, Key=key)
+    except s3.exceptions.NoSuchKey:
+        return None
+    return json.loads(response["Body"].read())
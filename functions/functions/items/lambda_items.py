@@ -17,11 +17,11 @@ import stripe
 sys.path.append(os.path.dirname(__file__))
 from _shared.parser import parse_event
 from _shared.DecimalEncoder import DecimalEncoder
-from _shared.helpers import make_response, get_organisation_settings
+from _shared.helpers import make_response, get_organisation_settings, get_fields_param, summary_body
 from _shared.stripe_catalog import create_stripe_catalog, rollback_stripe_created
 from _pydantic.models.items_models import CreateItemRequest, ItemObject, ItemResponse, ItemListResponse, ItemResponsePublic, ItemListResponsePublic, UpdateItemRequest, Status, PublishItemsRequest
 from _pydantic.models.models_extended import ItemModel, OrganisationModel, DynamoModel
-# from _pydantic.EventBridge import triggerEBEvent, trigger_eventbridge_event, EventType, Action # pydantic layer
+from _pydantic.EventBridge import EventBridgePublisher, EventType, Action # pydantic layer
 from _pydantic.dynamodb import batch_write, transact_upsert # pydantic layer
 
 ## logger setup
@@ -69,7 +69,7 @@ def get_one(organisationSlug: str,  eventId: str,  itemId: str, public: bool = F
 
     return result.to_public() if public else result
 
-def get_all(organisationSlug: str,  eventId: str, public: bool = False, actor: str = "unknown"):
+def get_all(organisationSlug: str,  eventId: str, public: bool = False, actor: str = "unknown", fields: frozenset = None):
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
     table = db.Table(TABLE_NAME)
     logger.info(f"Getting events for {organisationSlug} from {TABLE_NAME}")
@@ -79,13 +79,17 @@ def get_all(organisationSlug: str,  eventId: str, public: bool = False, actor: s
         items = blank_model.query_gsi(
             table=table,
             index_name="IDXinv", 
-            key_condition=Key("SK").eq(blank_model.SK) & Key("PK").begins_with(f"{blank_model.PK.split('#')[0]}#")
+            key_condition=Key("SK").eq(blank_model.SK) & Key("PK").begins_with(f"{blank_model.PK.split('#')[0]}#"),
+            fields=fields,
         )
         logger.info(f"Found items for {eventId} of {organisationSlug}: {items}")
     except Exception as e:
         logger.error(f"DynamoDB query failed to get items for {eventId} of {organisationSlug}: {e}")
         raise Exception
 
+    if fields:
+        return items or []
+
     #! temporary fix this needs review
     if isinstance(items, ItemModel):
         items = [items]
@@ -212,14 +216,19 @@ def create(request: CreateItemRequest, organisationSlug: str, eventId: str, acto
         }))
     
     try:
-        successful_items, unprocessed_items = batch_write(table, item_models)
+        write_result = batch_write(table, item_models)
+        successful_items, unprocessed_items = write_result.successful, write_result.unprocessed
 
         if len(unprocessed_items) > 0:
             logger.warning(f"Unprocessed items: {unprocessed_items}")
             return make_response(207, {
                 "message": "Items created with some unprocessed items.",
                 "items": [item.model_dump_json() for item in successful_items],
-                "unprocessed": [item.model_dump_json() for item in unprocessed_items]
+                "unprocessed": [item.model_dump_json() for item in unprocessed_items],
+                "failures": [
+                    {"pk": o.pk, "sk": o.sk, "status": o.status, "attempts": o.attempts, "error": o.error}
+                    for o in write_result.outcomes if o.status != "written"
+                ]
             })
         else:
             return make_response(201, {
@@ -319,6 +328,20 @@ def publish_items(request: PublishItemsRequest, organisationSlug: str, eventId:
         logger.error(traceback.format_exc())
         return make_response(500, {"message": "Something went wrong."})
     
+    # lets the public catalog snapshots pick up the newly live items
+    publisher = EventBridgePublisher(eventbridge)
+    for item in successful_items:
+        publisher.add(source="dance-engine.core",
+                      resource_type=EventType.item,
+                      action=Action.published,
+                      organisation=organisationSlug,
+                      resource_id=item.PK,
+                      data={"item": item.model_dump(mode="json", exclude_none=True)},
+                      meta={"accountId": actor})
+    for outcome in publisher.flush():
+        if not outcome.published:
+            logger.warning(f"Failed to publish item.published for {outcome.key}: {outcome.error_code} {outcome.error_message}")
+
     response = {
         "successful_items": [item.model_dump(mode="json", exclude_none=True) for item in successful_items],
         "failed_items": [
@@ -382,10 +405,18 @@ def lambda_handler(event, context):
                     return make_response(404, {"message": "Item not found."})
                 response = response_cls(item=result)
             else:
+                if (event.get("queryStringParameters") or {}).get("fields"):
+                    if is_public:
+                        return make_response(400, {"message": "fields is not supported on public routes."})
+                    try:
+                        fields = get_fields_param(event, ItemModel, ItemObject.model_fields)
+                    except ValueError as e:
+                        return make_response(400, {"message": str(e)})
+                    return make_response(200, summary_body("items", get_all(organisationSlug, eventId, actor=actor, fields=fields)), event=event)
                 result = get_all(organisationSlug, eventId, public=is_public)
                 response = list_response_cls(items=result)
             
-            return make_response(200, response.model_dump(mode="json", exclude_none=True))
+            return make_response(200, response, event=event, exclude_none=True)
 
         elif http_method == "PUT":
             validated_request = UpdateItemRequest(**parsed_event)
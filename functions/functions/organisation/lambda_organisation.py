@@ -7,7 +7,6 @@ import boto3
 import traceback
 from datetime import datetime, timezone
 from botocore.exceptions import ClientError
-from boto3.dynamodb.conditions import Key
 
 from ksuid import KsuidMs # utils layer
 
@@ -15,7 +14,7 @@ sys.path.append(os.path.dirname(__file__))
 from _shared.parser import parse_event, validate_event
 from _shared.DecimalEncoder import DecimalEncoder
 from _shared.naming import getOrganisationTableName, generateSlug
-from _shared.helpers import make_response
+from _shared.helpers import make_response, get_organisation_settings as _get_organisation_settings, invalidate_organisation_settings
 from _pydantic.EventBridge import trigger_eventbridge_event, EventType, Action # pydantic layer
 from _pydantic.dynamodb import VersionConflictError # pydantic layer
 from _pydantic.models.organisation_models import OrganisationObject, OrganisationResponse, OrganisationResponsePublic, UpdateOrganisationRequest, Status
@@ -70,6 +69,7 @@ def update_organisation(request_data: UpdateOrganisationRequest, organisation_sl
             theme_response = theme_model.upsert(table, ["created_at"])
 
         org_response = org_model.upsert(table, ["organisation", "created_at"])
+        invalidate_organisation_settings(organisation_slug, ORG_TABLE_NAME_TEMPLATE)
 
         if (
             (not org_response.success and org_response.error == "Version conflict")
@@ -116,22 +116,8 @@ def update_organisation(request_data: UpdateOrganisationRequest, organisation_sl
         return make_response(500, {"message": "Something went wrong."})            
 
 def get_organisation_settings(organisationSlug: str, public: bool = False, actor: str = "unknown"):
-    TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
-    table = db.Table(TABLE_NAME)
-    logger.info(f"Getting settings of {organisationSlug} from {TABLE_NAME} / ")
-    blank_model = OrganisationModel(name="blank", organisation=organisationSlug)
-
-    try:
-        result = blank_model.query_gsi(
-            table=table,
-            index_name="IDXinv", 
-            key_condition=Key('SK').eq(f'{blank_model.PK}'),
-            assemble_entites=True
-            )
-        logger.info(f"Found settings for {organisationSlug}: {result}")
-    except Exception as e:
-        logger.error(f"DynamoDB query failed to get settings for {organisationSlug}: {e}")
-        raise Exception
+    # the admin settings screen always reads fresh data, public reads may be served from cache
+    result = _get_organisation_settings(organisationSlug, db, OrganisationModel, ORG_TABLE_NAME_TEMPLATE, use_cache=public)
 
     if public:
         return result.to_public()
@@ -160,7 +146,7 @@ def lambda_handler(event, context):
             
             result = get_organisation_settings(organisationSlug, actor=actor, public=is_public)
             response = response_cls(organisation=result)
-            return make_response(200, response.model_dump(mode="json", exclude_none=True))
+            return make_response(200, response, event=event, exclude_none=True)
         
         # PUT /{organisation}/settings
         elif http_method == "PUT":
@@ -216,4 +202,5 @@ def eventbridge_handler(event, context):
     if not org_response.success:
         raise RuntimeError(org_response.error or "Failed to upsert organisation")
 
+    invalidate_organisation_settings(organisation_slug, ORG_TABLE_NAME_TEMPLATE)
     return True
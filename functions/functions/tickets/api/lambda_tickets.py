@@ -7,6 +7,7 @@ import traceback
 import sys
 from datetime import datetime, timezone
 import jwt
+from ksuid import KsuidMs # layer: utils
 
 ## installed packages
 from pydantic import ValidationError # layer: pydantic
@@ -17,12 +18,16 @@ from botocore.exceptions import ClientError
 sys.path.append(os.path.dirname(__file__))
 from _shared.parser import parse_event
 from _shared.DecimalEncoder import DecimalEncoder
-from _shared.helpers import make_response
+from _shared.helpers import make_response, get_pagination_params, get_fields_param, summary_body
 from _pydantic.dynamodb import transact_upsert
-from _pydantic.EventBridge import trigger_eventbridge_event, EventType, Action
-from _pydantic.models.tickets_models import TicketListResponse, SendTicketEmailRequest, BulkImportTicketsRequest, CreateTicketRequest, CreateTicketQueuedResponse, UpdateTicketRequest, ValidateTicketJwtRequest, ValidateTicketJwtResponse, TicketAdmissionRequest, TicketStatus, AdmissionStatus
+from _pydantic.deletion import delete_event_rows
+from _pydantic.EventBridge import trigger_eventbridge_event, EventBridgePublisher, EventType, Action
+from _pydantic.models.tickets_models import TicketListResponse, TicketObject, SendTicketEmailRequest, BulkImportTicketsRequest, CreateTicketRequest, CreateTicketQueuedResponse, UpdateTicketRequest, ValidateTicketJwtRequest, ValidateTicketJwtResponse, TicketAdmissionRequest, TicketStatus, AdmissionStatus, BulkCheckInRequest, BulkCheckInResponse
 from _pydantic.models.models_extended import TicketModel, EventModel
-from functions.tickets.shared.shared_tickets import create_email_job, get_single_ticket as _get_single_ticket, _build_ticket_name, get_single_event as _get_single_event, build_ticket_creation_key, get_ticket_request_record
+from functions.tickets.shared.shared_tickets import create_email_job, get_single_ticket as _get_single_ticket, _build_ticket_name, get_single_event as _get_single_event, build_ticket_creation_key, get_ticket_request_record, get_ticket_request_records, get_tickets_by_ids, set_ticket_admission, apply_check_ins
+from functions.tickets.shared.import_preview import analyse_import
+from functions.tickets.shared.door_manifest import build_door_manifest, door_manifest_public_key, load_signing_key
+from functions.tickets.shared.bulk_resend import enqueue_email_jobs, start_resend_job, get_resend_job, set_resend_status, resend_event_tickets, RESEND_SEND_REASON
 
 ## logger setup
 logger = logging.getLogger()
@@ -31,12 +36,23 @@ logger.setLevel("INFO")
 ## aws resources an clients
 db = boto3.resource("dynamodb")
 eventbridge = boto3.client('events')
+sqs = boto3.client('sqs')
+lambda_client = boto3.client('lambda')
 
 ## ENV variables
 # will throw an error if the env variable does not exist
 STAGE_NAME = os.environ.get('STAGE_NAME') or (_ for _ in ()).throw(KeyError("Environment variable 'STAGE_NAME' not found"))
 ORG_TABLE_NAME_TEMPLATE = os.environ.get('ORG_TABLE_NAME_TEMPLATE') or (_ for _ in ()).throw(KeyError("Environment variable 'ORG_TABLE_NAME_TEMPLATE' not found"))
 TICKET_QR_JWT_SECRET = os.environ.get('TICKET_QR_JWT_SECRET') or (_ for _ in ()).throw(KeyError("Environment variable 'TICKET_QR_JWT_SECRET' not found"))
+EMAIL_QUEUE_URL = os.environ.get('EMAIL_QUEUE_URL') or (_ for _ in ()).throw(KeyError("Environment variable 'EMAIL_QUEUE_URL' not found"))
+DOOR_MANIFEST_SIGNING_KEY = load_signing_key(os.environ.get('DOOR_MANIFEST_SIGNING_KEY') or (_ for _ in ()).throw(KeyError("Environment variable 'DOOR_MANIFEST_SIGNING_KEY' not found")))
+# the public key only changes when the signing key is rotated, which is a redeploy
+DOOR_MANIFEST_KEY_CACHE_CONTROL = "public, max-age=3600"
+
+# a background resend stops and re-invokes itself with this much time left
+RESEND_TIME_RESERVE_MS = 30000
+# a deletion pass checkpoints and returns with this much time left
+DELETION_TIME_RESERVE_MS = 5000
 
 def _build_bulk_import_ticket(ticket_data: dict, organisation_slug: str, event_id: str, index: int) -> dict:
     line_items = ticket_data.get("line_items", [])
@@ -146,19 +162,41 @@ def get_single_ticket(organisationSlug: str,  eventId: str,  ticketId: str, publ
 
     return _get_single_ticket(table, organisationSlug, eventId, ticketId, public, actor)
 
-def get_tickets(organisationSlug: str,  eventId: str, public: bool = False, actor: str = "unknown"):
+def _blank_ticket_model(organisationSlug: str, eventId: str) -> TicketModel:
+    return TicketModel(ksuid="blank", parent_event_ksuid=eventId, name="blank", organisation=organisationSlug, name_on_ticket="blank", customer_email="blank", email="blank", includes=[])
+
+def _tickets_key_condition(blank_model: TicketModel):
+    return Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with(f"{blank_model.gsi1SK.split('#')[0]}#")
+
+def get_tickets_page(organisationSlug: str, eventId: str, limit: int = None, cursor: str = None, fields: frozenset = None):
+    TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
+    table = db.Table(TABLE_NAME)
+    logger.info(f"Getting page of Tickets for {eventId} of {organisationSlug} from {TABLE_NAME} (limit={limit})")
+    blank_model = _blank_ticket_model(organisationSlug, eventId)
+
+    return blank_model.query_page(
+        table=table,
+        index_name="gsi1",
+        key_condition=_tickets_key_condition(blank_model),
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+    )
+
+def get_tickets(organisationSlug: str,  eventId: str, public: bool = False, actor: str = "unknown", fields: frozenset = None):
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name",organisationSlug)
     table = db.Table(TABLE_NAME)
     logger.info(f"Getting Tickets for {eventId} of {organisationSlug} from {TABLE_NAME}")
-    blank_model = TicketModel(ksuid="blank", parent_event_ksuid=eventId, name="blank", organisation=organisationSlug, name_on_ticket="blank", customer_email="blank", email="blank", includes=[])
+    blank_model = _blank_ticket_model(organisationSlug, eventId)
 
     try:
         tickets = blank_model.query_gsi(
             table=table,
             index_name="gsi1",
-            key_condition=Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with(f"{blank_model.gsi1SK.split('#')[0]}#"),
+            key_condition=_tickets_key_condition(blank_model),
+            fields=fields,
         )
-        logger.info(f"Found tickets for {eventId} of {organisationSlug}: {tickets}")
+        logger.info(f"Found {len(tickets) if isinstance(tickets, list) else 1} tickets for {eventId} of {organisationSlug}")
     except Exception as e:
         logger.error(f"DynamoDB query failed to get tickets for {organisationSlug}: {e}")
         raise Exception
@@ -169,41 +207,30 @@ def get_tickets(organisationSlug: str,  eventId: str, public: bool = False, acto
 
     return tickets
 
-def delete_tickets(organisationSlug: str, eventId: str, actor: str = "unknown"):
-    TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisationSlug)
-    table = db.Table(TABLE_NAME)
-    logger.info(f"Deleting tickets for {eventId} of {organisationSlug} from {TABLE_NAME}")
-
-    tickets = get_tickets(organisationSlug, eventId, actor=actor) or []
-    if len(tickets) == 0:
-        return make_response(404, {"message": "No tickets found for this event."})
-
-    ticket_keys_to_delete: set[tuple[str, str]] = set()
-
+def get_door_manifest(organisationSlug: str, eventId: str, actor: str = "unknown"):
+    logger.info(f"Building door manifest for {organisationSlug}:{eventId} for {actor}")
     try:
-        for ticket in tickets:
-            full_ticket = get_single_ticket(organisationSlug, eventId, str(ticket.ksuid), actor=actor)
-            if full_ticket is None:
-                continue
-
-            ticket_keys_to_delete.add((full_ticket.PK, full_ticket.SK))
+        tickets = get_tickets(organisationSlug, eventId, actor=actor) or []
+    except Exception:
+        return make_response(500, {"message": "Something went wrong."})
 
-            creation_idempotency = getattr(full_ticket, "creation_idempotency", None)
-            if creation_idempotency is not None:
-                ticket_keys_to_delete.add((creation_idempotency.PK, creation_idempotency.SK))
+    generated_at = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    # returned as built, re-serialising through the response model would change the signed bytes
+    manifest = build_door_manifest(tickets, organisationSlug, eventId, TICKET_QR_JWT_SECRET, generated_at, DOOR_MANIFEST_SIGNING_KEY)
+    return make_response(200, manifest)
 
-            for child in getattr(full_ticket, "expanded_includes", []) or []:
-                ticket_keys_to_delete.add((child.PK, child.SK))
+def get_door_manifest_key(event=None):
+    """The Ed25519 public key scanners verify door manifests with offline; it cannot sign them."""
+    return make_response(200, door_manifest_public_key(DOOR_MANIFEST_SIGNING_KEY), event=event, cache_control=DOOR_MANIFEST_KEY_CACHE_CONTROL)
 
-        with table.batch_writer() as batch:
-            for pk, sk in ticket_keys_to_delete:
-                batch.delete_item(Key={"PK": pk, "SK": sk})
+def delete_tickets(organisationSlug: str, eventId: str, actor: str = "unknown", has_time=lambda: True):
+    TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisationSlug)
+    table = db.Table(TABLE_NAME)
+    logger.info(f"Deleting tickets for {eventId} of {organisationSlug} from {TABLE_NAME}")
+    current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
 
-        return make_response(200, {
-            "message": "Tickets deleted successfully.",
-            "deleted_ticket_count": len(tickets),
-            "deleted_record_count": len(ticket_keys_to_delete),
-        })
+    try:
+        result = delete_event_rows(table, eventId, current_time, scope="TICKETS", has_time=has_time)
     except Exception as e:
         logger.error(f"Failed to delete tickets for {organisationSlug}:{eventId}: {e}", exc_info=True)
         return make_response(500, {
@@ -211,71 +238,70 @@ def delete_tickets(organisationSlug: str, eventId: str, actor: str = "unknown"):
             "error": str(e),
         })
 
-def send_tickets(request_data: SendTicketEmailRequest, organisationSlug: str, eventId: str, actor: str = "unknown"):
+    if not result.completed:
+        return make_response(202, {
+            "message": "Ticket deletion in progress, repeat the request to continue.",
+            "deleted_ticket_count": result.tickets,
+            "deleted_record_count": result.deleted,
+        })
+    if result.tickets == 0:
+        return make_response(404, {"message": "No tickets found for this event."})
+
+    return make_response(200, {
+        "message": "Tickets deleted successfully.",
+        "deleted_ticket_count": result.tickets,
+        "deleted_record_count": result.deleted,
+    })
+
+def send_tickets(request_data: SendTicketEmailRequest, organisationSlug: str, eventId: str, actor: str = "unknown", function_name: str | None = None):
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisationSlug)
     table = db.Table(TABLE_NAME)
     logger.info(f"Request to resend tickets for {organisationSlug}:{eventId} from {TABLE_NAME}")
 
-    ticket_ids = request_data.tickets or []
+    if request_data.all_tickets:
+        return start_event_resend(table, organisationSlug, eventId, actor, function_name)
+
+    ticket_ids = list(dict.fromkeys(request_data.tickets or []))
     if len(ticket_ids) == 0:
         return make_response(400, {"message": "No tickets provided."})
 
     current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
-    missing_tickets = []
-    failed_tickets = []
-    queued_tickets = []
+    found_tickets = get_tickets_by_ids(table, organisationSlug, eventId, ticket_ids, actor=actor)
+    missing_tickets = [ticket_id for ticket_id in ticket_ids if ticket_id not in found_tickets]
+    if not found_tickets:
+        return make_response(404, {
+            "message": "Ticket(s) not found.",
+            "missing_tickets": missing_tickets
+        })
 
-    for ticket_id in ticket_ids:
-        ticket = get_single_ticket(organisationSlug, eventId, ticket_id, actor=actor)
+    # every ticket belongs to eventId, so the event is assembled once for all of their emails
+    event_details = (_get_single_event(organisationSlug, eventId, table) or [None])[0]
+    if event_details is None:
+        return make_response(404, {"message": "Event not found."})
 
+    email_jobs = {}
+    failed_tickets = []
+    for ticket_id in ticket_ids:
+        ticket = found_tickets.get(ticket_id)
         if ticket is None:
-            missing_tickets.append(ticket_id)
             continue
-
         try:
-            email_job = create_email_job(
+            email_jobs[ticket_id] = create_email_job(
                 table,
                 ticket,
                 organisationSlug,
                 f"resend:{ticket.ksuid}:{current_time}",
                 actor,
-                send_reason="ticket_email_resend",
-            )
-
-            queued = trigger_eventbridge_event(
-                eventbridge,
-                source="dance-engine.core" if not STAGE_NAME == "preview" else "dance-engine.core.preview",
-                resource_type=EventType.ticket,
-                action=Action.updated,
-                organisation=organisationSlug,
-                resource_id=ticket.PK,
-                data={
-                    "ticket": ticket.model_dump(mode="json"),
-                    "notifications": {
-                        "email_job": email_job.model_dump(mode="json")
-                    },
-                },
-                meta={
-                    "accountId": actor,
-                    "reason": "ticket_email_resend",
-                },
+                send_reason=RESEND_SEND_REASON,
+                event_details=event_details,
             )
-
-            if not queued:
-                failed_tickets.append(ticket_id)
-                continue
-
-            queued_tickets.append(ticket_id)
         except Exception as e:
-            logger.error("Failed to queue resend for ticket %s: %s", ticket_id, str(e))
+            logger.error("Failed to build resend for ticket %s: %s", ticket_id, str(e))
             logger.error(traceback.format_exc())
             failed_tickets.append(ticket_id)
 
-    if missing_tickets and not queued_tickets and not failed_tickets:
-        return make_response(404, {
-            "message": "Ticket(s) not found.",
-            "missing_tickets": missing_tickets
-        })
+    failed_tickets.extend(enqueue_email_jobs(sqs, EMAIL_QUEUE_URL, email_jobs))
+    queued_tickets = [ticket_id for ticket_id in email_jobs if ticket_id not in failed_tickets]
 
     if failed_tickets and not queued_tickets:
         return make_response(500, {
@@ -291,6 +317,82 @@ def send_tickets(request_data: SendTicketEmailRequest, organisationSlug: str, ev
         "missing_tickets": missing_tickets
     })
 
+def start_event_resend(table, organisationSlug: str, eventId: str, actor: str, function_name: str | None):
+    """Record a resend job for every ticket of the event and hand it to an asynchronous invocation of this lambda."""
+    current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    job_id = str(KsuidMs())
+    job = start_resend_job(table, job_id, eventId, actor, current_time)
+    try:
+        lambda_client.invoke(
+            FunctionName=function_name or os.environ.get("AWS_LAMBDA_FUNCTION_NAME"),
+            InvocationType="Event",
+            Payload=json.dumps({"resend_job": {"organisation": organisationSlug, "event": eventId, "job_id": job_id, "actor": actor}}),
+        )
+    except Exception as e:
+        logger.error(f"Failed to start resend job {job_id} for {organisationSlug}:{eventId}: {e}")
+        set_resend_status(table, job_id, "failed", current_time, error="Could not start the background resend.")
+        return make_response(500, {"message": "Failed to start ticket email resend.", "job_id": job_id})
+
+    logger.info(f"Started resend job {job_id} for {organisationSlug}:{eventId} by {actor}")
+    return make_response(202, {"message": "Ticket resend started.", "job": job})
+
+def continue_event_resend(resend_job: dict, context):
+    """
+    Background part of a resend-all: queue pages of tickets until time runs low, then re-invoke to carry on.
+
+    Each invocation resumes from the checkpoint stored on the job rather than
+    from its payload, so Lambda's automatic retries do not count a page
+    twice. Any error marks the job failed instead of leaving it running.
+    """
+    organisationSlug = resend_job["organisation"]
+    eventId = resend_job["event"]
+    job_id = resend_job["job_id"]
+    table = db.Table(ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisationSlug))
+    current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+    try:
+        event_details = (_get_single_event(organisationSlug, eventId, table) or [None])[0]
+        if event_details is None:
+            logger.error(f"Resend job {job_id}: event {organisationSlug}:{eventId} not found")
+            set_resend_status(table, job_id, "failed", current_time, error="Event not found.")
+            return {"job_id": job_id, "status": "failed"}
+
+        cursor = resend_event_tickets(
+            table,
+            sqs,
+            EMAIL_QUEUE_URL,
+            organisationSlug,
+            event_details,
+            job_id,
+            resend_job.get("actor", "unknown"),
+            current_time,
+            has_time=lambda: context.get_remaining_time_in_millis() > RESEND_TIME_RESERVE_MS,
+        )
+        if cursor:
+            lambda_client.invoke(
+                FunctionName=context.function_name,
+                InvocationType="Event",
+                Payload=json.dumps({"resend_job": resend_job}),
+            )
+            return {"job_id": job_id, "status": "running", "cursor": cursor}
+        return {"job_id": job_id, "status": "completed"}
+    except Exception as e:
+        logger.error(f"Resend job {job_id} for {organisationSlug}:{eventId} failed: {e}")
+        logger.error(traceback.format_exc())
+        try:
+            set_resend_status(table, job_id, "failed", current_time, error=str(e))
+        except Exception as status_error:
+            logger.error(f"Could not mark resend job {job_id} as failed: {status_error}")
+        return {"job_id": job_id, "status": "failed"}
+
+def get_resend_progress(organisationSlug: str, eventId: str, job_id: str):
+    table = db.Table(ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisationSlug))
+    job = get_resend_job(table, job_id)
+    if not job or job.get("parent_event_ksuid") != eventId:
+        return make_response(404, {"message": "Resend job not found."})
+    job.pop("cursor", None)
+    return make_response(200, {"job": job})
+
 def import_tickets(request_data: BulkImportTicketsRequest, organisationSlug: str, eventId: str, actor: str = "unknown"):
     # 1. Prepare each potential import ticket payload with creation key for future idempotency
     #   - If not preview, push events to eventbridge 
@@ -315,12 +417,9 @@ def import_tickets(request_data: BulkImportTicketsRequest, organisationSlug: str
 
     # Send tickets if not preview mode
     if not request_data.preview:
-        requested_tickets = []
-        failed_tickets = []
-
+        publisher = EventBridgePublisher(eventbridge)
         for payload in ticket_requests:
-            queued = trigger_eventbridge_event(
-                eventbridge,
+            publisher.add(
                 source="dance-engine.core" if not STAGE_NAME == "preview" else "dance-engine.core.preview",
                 resource_type=EventType.ticket,
                 action=Action.requested,
@@ -333,10 +432,9 @@ def import_tickets(request_data: BulkImportTicketsRequest, organisationSlug: str
                 },
             )
 
-            if queued:
-                requested_tickets.append(payload["ticket_creation_key"])
-            else:
-                failed_tickets.append(payload["ticket_creation_key"])
+        outcomes = publisher.flush()
+        requested_tickets = [outcome.key for outcome in outcomes if outcome.published]
+        failed_tickets = [outcome.key for outcome in outcomes if not outcome.published]
 
         if failed_tickets and not requested_tickets:
             return make_response(500, {
@@ -363,72 +461,13 @@ def import_tickets(request_data: BulkImportTicketsRequest, organisationSlug: str
     ## 3. 
     available_line_items = _line_item_lookup(event_data)
     existing_tickets = get_tickets(organisationSlug, eventId, actor="bulk_import_preview") or []
-    analysed_tickets = []
-
-    for index, ticket_request in enumerate(ticket_requests):
-        issues = []
-        duplicate = False
-        potential_duplicate = False
-
-        for line_item in ticket_request.get("line_items", []):
-            if line_item.get('ksuid') not in available_line_items:
-                issues.append({
-                    "type": "missing_line_item",
-                    "message": "The referenced line item does not exist on this event.",
-                    "line_item": line_item,
-                })
-
-        # 4.
-        idempotency_record = get_ticket_request_record(table, ticket_request["ticket_creation_key"])
-        if idempotency_record:
-            duplicate = True
-            issues.append({
-                "type": "existing_ticket_creation_key",
-                "message": "A ticket creation request already exists for this ticket_creation_key.",
-                "ticket_creation_key": ticket_request["ticket_creation_key"],
-            })
-        
-        # 5. 
-        for existing_ticket in existing_tickets:
-            existing_email = (existing_ticket.customer_email or "").strip().lower()
-            existing_name_on_ticket = (existing_ticket.name_on_ticket or "").strip().lower()
-
-            if ticket_request.get("customer_email") == existing_email and ticket_request.get("name_on_ticket") == existing_name_on_ticket:
-                duplicate = True
-                issues.append({
-                    "type": "exact_existing_ticket_match",
-                    "message": "An existing ticket already matches this customer email and name.",
-                    "existing_ticket": existing_ticket.model_dump(mode="json", exclude_none=True),
-                })
-                continue
-
-            if ticket_request.get("customer_email") == existing_email:
-                potential_duplicate = True
-                issues.append({
-                    "type": "matching_customer_email",
-                    "message": "An existing ticket has the same customer email.",
-                    "existing_ticket": existing_ticket.model_dump(mode="json", exclude_none=True)
-                })
-
-            if ticket_request.get("name_on_ticket") == existing_name_on_ticket:
-                potential_duplicate = True
-                issues.append({
-                    "type": "matching_name_on_ticket",
-                    "message": "An existing ticket has the same name on ticket.",
-                    "existing_ticket": existing_ticket.model_dump(mode="json", exclude_none=True)
-                })
-
-        analysed_tickets.append({
-            "index": index,
-            "ticket": ticket_request,
-            "issues": issues,
-            "duplicate": duplicate,
-            "potential_duplicate": potential_duplicate,
-        })
+    idempotency_records = get_ticket_request_records(table, [ticket_request["ticket_creation_key"] for ticket_request in ticket_requests])
+    # 4. and 5. existing tickets are hash-indexed once, so each row is a lookup rather than a scan
+    analysed_tickets = list(analyse_import(ticket_requests, available_line_items, existing_tickets, idempotency_records))
 
-    logger.info(f"Returning bulk ticket import preview for {organisationSlug}:{eventId} with {len(analysed_tickets)} analysed tickets")
-    logger.info(f"Analysed tickets: {analysed_tickets}")
-    logger.info(f"Analysed tickets: {json.dumps(analysed_tickets, indent=2, cls=DecimalEncoder)}")
+    duplicates = sum(1 for ticket in analysed_tickets if ticket["duplicate"])
+    potential_duplicates = sum(1 for ticket in analysed_tickets if ticket["potential_duplicate"])
+    logger.info(f"Returning bulk ticket import preview for {organisationSlug}:{eventId} with {len(analysed_tickets)} analysed tickets ({duplicates} duplicates, {potential_duplicates} potential duplicates) against {len(existing_tickets)} existing tickets")
     return make_response(200, {
         "preview": request_data.preview,
         "event": event_data.model_dump(mode="json", exclude_none=True),
@@ -490,7 +529,7 @@ def create_ticket(request_data: CreateTicketRequest, organisationSlug: str, even
         ticket_creation_key=payload["ticket_creation_key"],
         status="queued",
     )
-    return make_response(202, response.model_dump(mode="json"))
+    return make_response(202, response)
 
 def _update(request_data: UpdateTicketRequest, organisationSlug: str, eventId: str, actor: str = "unknown", 
             only_set_once: list[str] | None = None, 
@@ -579,23 +618,23 @@ def validate_jwt(request: ValidateTicketJwtRequest, ticketId:str, organisationSl
     except jwt.InvalidTokenError as e:
         logger.info(f"Invalid ticket JWT for {organisationSlug}:{eventId} by {actor}: {str(e)}")
         response = ValidateTicketJwtResponse(**{"valid":False, "ticket": None, "reason": "Invalid token."})
-        return make_response(400, response.model_dump(mode="json"))
+        return make_response(400, response)
     
     if decoded.get("o") != organisationSlug or decoded.get("e") != eventId:
         logger.info(f"Ticket JWT scope mismatch for {organisationSlug}:{eventId} by {actor}. Token organisation={decoded.get('o')} event={decoded.get('e')}")
         response = ValidateTicketJwtResponse(**{"valid":False, "ticket": None, "reason": "Token organisation and/or event do not match request."})
-        return make_response(400, response.model_dump(mode="json"))
+        return make_response(400, response)
     
     if not decoded.get('sub') or decoded.get('sub') != ticketId:
         logger.info(f"Ticket JWT ticket ID mismatch for {organisationSlug}:{eventId} by {actor}. Token ticket ID={decoded.get('sub')}")
         response = ValidateTicketJwtResponse(**{"valid":False, "ticket": None, "reason": "Token ticket ID does not match request."})
-        return make_response(400, response.model_dump(mode="json"))
+        return make_response(400, response)
     
     ticket = get_single_ticket(organisationSlug, eventId, ticketId, actor=actor)
     if ticket is None:
         logger.info(f"Ticket not found for valid JWT for {organisationSlug}:{eventId} by {actor}. Ticket ID={decoded.get('sub')}")
         response = ValidateTicketJwtResponse(**{"valid":False, "ticket": None, "reason": "Ticket not found."})
-        return make_response(404, response.model_dump(mode="json"))
+        return make_response(404, response)
 
     admission_status = ticket.admission_status or AdmissionStatus.not_checked_in
     ticket_status = ticket.ticket_status or TicketStatus.active
@@ -604,159 +643,165 @@ def validate_jwt(request: ValidateTicketJwtRequest, ticketId:str, organisationSl
     if admission_status == AdmissionStatus.checked_in or admission_status == AdmissionStatus.denied:
         logger.info(f"Ticket with invalid admission status for valid JWT for {organisationSlug}:{eventId} by {actor}. Ticket ID={decoded.get('sub')} admission_status={admission_status}")
         response = ValidateTicketJwtResponse(**{"valid":True, "ticket": ticket, "reason": f"Ticket has already been {admission_status.value}."})
-        return make_response(200, response.model_dump(mode="json"))
+        return make_response(200, response)
     
     if ticket_status != TicketStatus.active:
         logger.info(f"Ticket with non-active status for valid JWT for {organisationSlug}:{eventId} by {actor}. Ticket ID={decoded.get('sub')} status={ticket_status}")
         response = ValidateTicketJwtResponse(**{"valid":False, "ticket": ticket, "reason": "Ticket is not active."})
-        return make_response(200, response.model_dump(mode="json"))
+        return make_response(200, response)
 
     # This is already checked above when validating token, I suppose not a bad to check again with db data. 
     # TODO I still want to do a bit more to check validity of the ticket for the event, maybe with warning based on event timing (e.g if the event has past)
     if ticket_event_id != eventId:
         logger.info(f"Ticket event mismatch for valid JWT for {organisationSlug}:{eventId} by {actor}. Ticket ID={decoded.get('sub')} ticket_event={ticket_event_id}")
         response = ValidateTicketJwtResponse(**{"valid":False, "ticket": ticket, "reason": "Ticket does not belong to this event."})
-        return make_response(200, response.model_dump(mode="json"))
+        return make_response(200, response)
 
     logger.info(f"Valid ticket JWT for {organisationSlug}:{eventId} by {actor}. Ticket ID={decoded.get('sub')}")
     response = ValidateTicketJwtResponse(**{"valid":True, "ticket": ticket, "reason": None})
-    return make_response(200, response.model_dump(mode="json"))
-
-def use_ticket(request_data: TicketAdmissionRequest, ticketId: str, organisationSlug: str, eventId: str, actor: str):
-    logger.info(f"Update Ticket: {request_data}")
+    return make_response(200, response)
 
+def _set_admission(request_data: TicketAdmissionRequest, ticketId: str, organisationSlug: str, eventId: str, actor: str, check_in: bool):
     TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisationSlug)
     table = db.Table(TABLE_NAME)
-    logger.info(f"Updating ticket for {eventId} of {organisationSlug} into {TABLE_NAME}")
-
-    current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
-    logger.info(f"Current Time: {current_time}")
-
-    # I would rather not have to get a ticket here, it will slow down checkin
-    # check_in_count was intentionally left blank for this reason.
-    # TODO the solution is to implement the extended functions of transact_upsert here to do the addition on the write and only use conditions to check ticket exists. 
-    existing_ticket = get_single_ticket(organisationSlug, eventId, ticketId, actor=actor)
-    if existing_ticket is None:
-        return make_response(404, {
-            "message": "Ticket not found.",
-        })
+    action_label = "used" if check_in else "reset"
+    logger.info(f"Ticket {ticketId} of {organisationSlug}:{eventId} to be {action_label} by {actor} in {TABLE_NAME}")
 
     customer_email = (request_data.customer_email or "").strip()
     if not customer_email:
         return make_response(400, {
-            "message": "Ticket cannot be used.",
+            "message": f"Ticket cannot be {action_label}.",
             "reason": "A customer email is required.",
         })
 
-    next_check_in_count = (existing_ticket.check_in_count or 0) + 1
+    current_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
 
     try:
-        ticket_model = TicketModel.model_validate({
-                "ksuid": ticketId,
-                "customer_email": customer_email,
-
-                "organisation": organisationSlug,
-                "parent_event_ksuid": eventId,
-
-                "admission_status": AdmissionStatus.checked_in,
-                "ticket_status": TicketStatus.used,
-                "checked_in_at": current_time,
-                "checked_in_by": actor,
-                "check_in_count": next_check_in_count,
-
-                "name": "ishouldnothavethisvalue", # to satisfy validation will not be actualyl changed to this
-                "name_on_ticket": "ishouldnothavethisvalue", # to satisfy validation will not be actualyl changed to this
-            })
-
-        response = ticket_model.upsert(table, 
-                                       explicit_fields_only=True, 
-                                       only_set_once=["created_at", "ticket_creation_key", "ksuid", "qr_token", "name", "name_on_ticket"], 
-                                       condition_expression=(
-                                           # TODO to be depricated later because this assumes tickets without those attributes are valid 
-                                            "(attribute_not_exists(#ticket_status) OR #ticket_status = :active_status) AND "
-                                            "(attribute_not_exists(#admission_status) OR #admission_status = :not_checked_in_status)"
-                                        ), 
-                                       extra_expression_attr_names={
-                                            "#ticket_status": "ticket_status",
-                                            "#admission_status": "admission_status"
-                                       }, 
-                                       extra_expression_attr_values={
-                                           ":active_status": TicketStatus.active.value,
-                                           ":not_checked_in_status": AdmissionStatus.not_checked_in.value,
-                                       }
-                                    )
-        
-        trigger_eventbridge_event(eventbridge, 
-                            source="dance-engine.core" if not STAGE_NAME == "preview" else "dance-engine.core.preview", 
-                                  resource_type=EventType.event,
-                                  action=Action.updated,
-                                  organisation=organisationSlug,
-                                  resource_id=ticket_model.PK,
-                                  data=request_data.model_dump(mode="json"),
-                                  meta={"accountId":actor})
-        return make_response(201, {
-            "message": "Event updated successfully.",
-            "ticket": ticket_model.model_dump(mode="json"),
-        })        
-    except table.meta.client.exceptions.ConditionalCheckFailedException as e:
-        logger.info(f"Ticket use failed conditional check for {organisationSlug}:{eventId} by {actor}. Ticket ID={ticketId}. Reason: {str(e)}")
-        return make_response(400, {
-            "message": "Ticket cannot be used.",
-            "reason": "Ticket may already be used or checked in.",
-        })
-    except ValidationError as e:
-        logger.error("Validation error: %s", str(e))
-        logger.error(traceback.format_exc())
-        return make_response(400, {
-            "message": "Invalid update request",
-            "error": str(e)
-        })
-    except ValueError as e:
-        return make_response(400, {
-            "message": "Invalid update request",
-            "error": str(e)
-        })
+        # one conditional write, the ticket is not read first
+        result = set_ticket_admission(table, ticketId, customer_email, eventId, actor, current_time, check_in=check_in)
     except Exception as e:
         logger.error("Unexpected error: %s", str(e))
         logger.error(traceback.format_exc())
         return make_response(500, {"message": "Something went wrong."})
 
-def unuse_ticket(request_data: TicketAdmissionRequest, ticketId: str, organisationSlug: str, eventId: str, actor: str):
-    # TODO Again this can be done with just handling conditional check fails correctly, but this works for now
-    existing_ticket = get_single_ticket(organisationSlug, eventId, ticketId, actor=actor)
-    if existing_ticket is None:
+    if result.outcome == "not_found":
         return make_response(404, {"message": "Ticket not found."})
-
-    customer_email = (request_data.customer_email or "").strip()
-    if not customer_email:
+    if result.outcome == "already_used":
+        logger.info(f"Ticket use failed for {organisationSlug}:{eventId} by {actor}. Ticket ID={ticketId} already checked in at {result.checked_in_at}")
         return make_response(400, {
-            "message": "Ticket cannot be reset.",
-            "reason": "A customer email is required.",
+            "message": f"Ticket cannot be {action_label}.",
+            "reason": "Ticket has already been used.",
+            "checked_in_at": result.checked_in_at,
+            "checked_in_by": result.checked_in_by,
+        })
+    if result.outcome == "denied":
+        return make_response(400, {
+            "message": f"Ticket cannot be {action_label}.",
+            "reason": "Ticket admission has been denied.",
+        })
+    if result.outcome == "not_active":
+        return make_response(400, {
+            "message": f"Ticket cannot be {action_label}.",
+            "reason": "Ticket is not active.",
         })
 
-    ticket = {
-        "ksuid": ticketId,
-        "customer_email": customer_email,
+    trigger_eventbridge_event(eventbridge, 
+                        source="dance-engine.core" if not STAGE_NAME == "preview" else "dance-engine.core.preview", 
+                              resource_type=EventType.event,
+                              action=Action.updated,
+                              organisation=organisationSlug,
+                              resource_id=result.ticket.PK,
+                              data=request_data.model_dump(mode="json"),
+                              meta={"accountId":actor})
+    return make_response(201, {
+        "message": "Event updated successfully.",
+        "ticket": result.ticket.model_dump(mode="json"),
+    })
 
-        "organisation": organisationSlug,
-        "parent_event_ksuid": eventId,
+def use_ticket(request_data: TicketAdmissionRequest, ticketId: str, organisationSlug: str, eventId: str, actor: str):
+    return _set_admission(request_data, ticketId, organisationSlug, eventId, actor, check_in=True)
 
-        "admission_status": AdmissionStatus.not_checked_in,
-        "ticket_status": TicketStatus.active,
-        "checked_in_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace('+00:00', 'Z'),
-        "checked_in_by": actor,
+def unuse_ticket(request_data: TicketAdmissionRequest, ticketId: str, organisationSlug: str, eventId: str, actor: str):
+    return _set_admission(request_data, ticketId, organisationSlug, eventId, actor, check_in=False)
+
+# AdmissionResult outcome -> bulk check-in outcome
+CHECK_IN_OUTCOMES = {
+    "updated": "admitted",
+    "already_used": "already_admitted",
+    "denied": "denied",
+    "not_active": "inactive",
+    "not_found": "not_found",
+    "duplicate": "duplicate",
+    "error": "error",
+}
+
+def _utc_timestamp(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+def bulk_check_in(request_data: BulkCheckInRequest, organisationSlug: str, eventId: str, actor: str):
+    TABLE_NAME = ORG_TABLE_NAME_TEMPLATE.replace("org_name", organisationSlug)
+    table = db.Table(TABLE_NAME)
+    logger.info(f"Syncing {len(request_data.check_ins)} check-ins for {organisationSlug}:{eventId} by {actor} in {TABLE_NAME}")
+
+    check_ins = [
+        {
+            "ticket_ksuid": check_in.ticket_ksuid,
+            "customer_email": (check_in.customer_email or "").strip() or None,
+            "checked_in_at": _utc_timestamp(check_in.scanned_at),
+            "checked_in_by": check_in.scanner_id,
+        }
+        for check_in in request_data.check_ins
+    ]
 
-        "name": "ishouldnothavethisvalue", # to satisfy validation will not be actualyl changed to this
-        "name_on_ticket": "ishouldnothavethisvalue", # to satisfy validation will not be actualyl changed to this
-    }
+    try:
+        results = apply_check_ins(table, eventId, check_ins, actor)
+    except Exception as e:
+        logger.error("Unexpected error: %s", str(e))
+        logger.error(traceback.format_exc())
+        return make_response(500, {"message": "Something went wrong."})
 
-    validated_request = UpdateTicketRequest(ticket=TicketModel(**ticket))
-    return _update(validated_request, organisationSlug, eventId, actor,only_set_once=["created_at", "ticket_creation_key", "ksuid", "qr_token", "name", "name_on_ticket"])
+    publisher = EventBridgePublisher(eventbridge)
+    for check_in, result in zip(request_data.check_ins, results):
+        if result.success:
+            publisher.add(key=check_in.ticket_ksuid,
+                          source="dance-engine.core" if not STAGE_NAME == "preview" else "dance-engine.core.preview",
+                          resource_type=EventType.event,
+                          action=Action.updated,
+                          organisation=organisationSlug,
+                          resource_id=result.ticket.PK,
+                          data=check_in.model_dump(mode="json"),
+                          meta={"accountId": actor})
+    unpublished = [outcome.key for outcome in publisher.flush() if not outcome.published]
+    if unpublished:
+        logger.error(f"Failed to publish check-in events for tickets {unpublished}")
+
+    outcomes = [CHECK_IN_OUTCOMES[result.outcome] for result in results]
+    response = BulkCheckInResponse(
+        results=[
+            {
+                "ticket_ksuid": check_in.ticket_ksuid,
+                "outcome": outcome,
+                "checked_in_at": result.checked_in_at,
+                "checked_in_by": result.checked_in_by,
+            }
+            for check_in, result, outcome in zip(request_data.check_ins, results, outcomes)
+        ],
+        admitted=outcomes.count("admitted"),
+        conflicts=len(outcomes) - outcomes.count("admitted") - outcomes.count("error"),
+        failed=outcomes.count("error"),
+    )
+    return make_response(200, response, exclude_none=True)
 
 def lambda_handler(event, context):
     logger.info("Received event: %s", json.dumps(event, indent=2, cls=DecimalEncoder))
 
     http_method = event.get('requestContext', {}).get("http", {}).get("method")
+
+    if event.get("resend_job"):
+        logger.info("Invoked to continue a ticket resend")
+        return continue_event_resend(event["resend_job"], context)
     
     if http_method:
         logger.info("Triggered by API Gateway")
@@ -770,15 +815,43 @@ def lambda_handler(event, context):
         raw_path         = event.get("rawPath", "")
 
         if http_method == "GET":
+            if raw_path == "/public/tickets/manifest-key":
+                return get_door_manifest_key(event)
+            if raw_path.endswith("/tickets/manifest"):
+                return get_door_manifest(organisationSlug, eventId, actor)
+            if "/tickets/send/" in raw_path:
+                return get_resend_progress(organisationSlug, eventId, ticketId)
+
             logger.info(f"{organisationSlug}:{eventId}:{ticketId} - Getting ticket(s)")
             response_cls = TicketListResponse
 
+            try:
+                limit, cursor = get_pagination_params(event)
+                fields = None if ticketId else get_fields_param(event, TicketModel, TicketObject.model_fields)
+            except ValueError as e:
+                return make_response(400, {"message": str(e)})
+            if fields and is_public:
+                return make_response(400, {"message": "fields is not supported on public routes."})
+
+            if not ticketId and (limit or cursor):
+                try:
+                    page = get_tickets_page(organisationSlug, eventId, limit, cursor, fields)
+                except ValueError as e:
+                    return make_response(400, {"message": str(e)})
+                if fields:
+                    return make_response(200, summary_body("tickets", page.items, page.cursor), event=event)
+                resposne = response_cls(tickets=page.items, next_cursor=page.cursor)
+                return make_response(200, resposne, event=event)
+
+            if fields:
+                return make_response(200, summary_body("tickets", get_tickets(organisationSlug, eventId, actor=actor, fields=fields) or []), event=event)
+
             tickets = [get_single_ticket(organisationSlug, eventId, ticketId, is_public, actor)] if ticketId else get_tickets(organisationSlug, eventId, is_public, actor)
             if tickets is None:
                 return make_response(404, {"message": "Ticket(s) not found."})
             
             resposne = response_cls(tickets=tickets)
-            return make_response(200, resposne.model_dump(mode="json"))
+            return make_response(200, resposne, event=event)
         elif http_method == "POST":
             if raw_path.endswith("/validate"):
                 validated_request = ValidateTicketJwtRequest(**parsed_event)
@@ -788,7 +861,10 @@ def lambda_handler(event, context):
                 return create_ticket(validated_request, organisationSlug, eventId, actor)
             if raw_path.endswith("/tickets/send"):
                 validated_request = SendTicketEmailRequest(**parsed_event)
-                return send_tickets(validated_request, organisationSlug, eventId, actor)
+                return send_tickets(validated_request, organisationSlug, eventId, actor, function_name=getattr(context, "function_name", None))
+            if raw_path.endswith("/tickets/checkins"):
+                validated_request = BulkCheckInRequest(**parsed_event)
+                return bulk_check_in(validated_request, organisationSlug, eventId, actor)
             if raw_path.endswith("/tickets/import"):
                 validated_request = BulkImportTicketsRequest(**parsed_event)
                 return import_tickets(validated_request, organisationSlug, eventId, actor)
@@ -803,7 +879,7 @@ def lambda_handler(event, context):
             validated_request = UpdateTicketRequest(**parsed_event)
             return update(validated_request, organisationSlug, eventId, actor)        
         elif http_method == "DELETE":
-            return delete_tickets(organisationSlug, eventId, actor)
+            return delete_tickets(organisationSlug, eventId, actor, has_time=lambda: context.get_remaining_time_in_millis() > DELETION_TIME_RESERVE_MS)
         else:
             return make_response(405, {"message": "Method not allowed."})
     else:
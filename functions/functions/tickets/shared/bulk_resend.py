@@ -0,0 +1,227 @@
+import logging
+from typing import Callable, Optional
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from _pydantic.models.models_extended import TicketModel, EventModel
+from _pydantic.models.tickets_models import TicketStatus
+from _pydantic.email_models import EmailJob # pydantic layer
+from functions.tickets.shared.shared_tickets import create_email_job
+
+## logger setup
+logger = logging.getLogger()
+logger.setLevel("INFO")
+
+# SendMessageBatch takes at most ten entries
+SQS_BATCH_SIZE = 10
+SQS_SEND_ATTEMPTS = 3
+RESEND_JOB_ENTITY_TYPE = "RESENDJOB"
+RESEND_PAGE_SIZE = 200
+RESEND_SEND_REASON = "ticket_email_resend"
+
+
+def enqueue_email_jobs(sqs, queue_url: str, email_jobs: dict[str, EmailJob], max_attempts: int = SQS_SEND_ATTEMPTS) -> list[str]:
+    """Send email jobs straight to the email queue, ten per SendMessageBatch, and return the keys that were not queued.
+
+    Entries SQS rejects as the sender's fault are not retried; the others are
+    sent again, up to ``max_attempts`` times in all.
+    """
+    keys = list(email_jobs)
+    failed = []
+    for start in range(0, len(keys), SQS_BATCH_SIZE):
+        pending = {str(index): key for index, key in enumerate(keys[start:start + SQS_BATCH_SIZE])}
+        for _ in range(max_attempts):
+            try:
+                response = sqs.send_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=[{"Id": entry_id, "MessageBody": email_jobs[key].model_dump_json()} for entry_id, key in pending.items()],
+                )
+            except ClientError as e:
+                logger.error(f"SendMessageBatch failed: {e.response.get('Error', {}).get('Code')}")
+                continue
+            retry = {}
+            for failure in response.get("Failed", []):
+                if failure.get("SenderFault"):
+                    logger.error(f"Email job {pending[failure['Id']]} rejected: {failure.get('Code')} {failure.get('Message')}")
+                    failed.append(pending[failure["Id"]])
+                else:
+                    retry[failure["Id"]] = pending[failure["Id"]]
+            pending = retry
+            if not pending:
+                break
+        if pending:
+            logger.error(f"Email jobs not queued after {max_attempts} attempts: {list(pending.values())}")
+            failed.extend(pending.values())
+    return failed
+
+
+def resend_job_key(job_id: str) -> dict:
+    return {"PK": f"{RESEND_JOB_ENTITY_TYPE}#{job_id}", "SK": f"{RESEND_JOB_ENTITY_TYPE}#{job_id}"}
+
+
+def start_resend_job(table, job_id: str, event_ksuid: str, actor: str, current_time: str) -> dict:
+    """Create the progress record of a background resend."""
+    item = {
+        **resend_job_key(job_id),
+        "entity_type": RESEND_JOB_ENTITY_TYPE,
+        "job_id": job_id,
+        "parent_event_ksuid": event_ksuid,
+        "status": "queued",
+        "queued": 0,
+        "failed": 0,
+        "skipped": 0,
+        "requested_by": actor,
+        "created_at": current_time,
+        "updated_at": current_time,
+    }
+    table.put_item(Item=item, ConditionExpression="attribute_not_exists(PK)")
+    return item
+
+
+def get_resend_job(table, job_id: str) -> Optional[dict]:
+    return table.get_item(Key=resend_job_key(job_id), ConsistentRead=True).get("Item")
+
+
+def set_resend_status(table, job_id: str, status: str, current_time: str, error: Optional[str] = None) -> bool:
+    """Set the status of a job that has not finished yet; False when it had already completed or failed."""
+    update_expression = "SET #status = :status, #updated_at = :now"
+    names = {"#status": "status", "#updated_at": "updated_at"}
+    values = {":status": status, ":now": current_time, ":completed": "completed", ":failed": "failed"}
+    if error:
+        update_expression += ", #error = :error"
+        names["#error"] = "error"
+        values[":error"] = error
+    try:
+        table.update_item(
+            Key=resend_job_key(job_id),
+            UpdateExpression=update_expression,
+            ConditionExpression="attribute_exists(PK) AND NOT #status IN (:completed, :failed)",
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+            raise
+        return False
+    return True
+
+
+def record_resend_page(table, job_id: str, from_cursor: Optional[str], next_cursor: Optional[str], current_time: str, queued: int = 0, failed: int = 0, skipped: int = 0) -> bool:
+    """
+    Add a page's counts to the job and move its checkpoint from ``from_cursor`` to ``next_cursor``.
+
+    The update is conditioned on the checkpoint still being ``from_cursor``,
+    so a page that a retried or concurrent invocation already recorded is not
+    counted twice. Returns False in that case. The last page (no
+    ``next_cursor``) removes the checkpoint and completes the job.
+    """
+    update_expression = "ADD #queued :queued, #failed :failed, #skipped :skipped SET #status = :status, #updated_at = :now"
+    names = {"#queued": "queued", "#failed": "failed", "#skipped": "skipped", "#status": "status", "#updated_at": "updated_at", "#cursor": "cursor"}
+    values = {":queued": queued, ":failed": failed, ":skipped": skipped, ":status": "running" if next_cursor else "completed", ":now": current_time, ":running": "running"}
+    if next_cursor:
+        update_expression += ", #cursor = :cursor"
+        values[":cursor"] = next_cursor
+    else:
+        update_expression += " REMOVE #cursor"
+    if from_cursor:
+        condition = "#status = :running AND #cursor = :from"
+        values[":from"] = from_cursor
+    else:
+        condition = "#status = :running AND attribute_not_exists(#cursor)"
+    try:
+        table.update_item(
+            Key=resend_job_key(job_id),
+            UpdateExpression=update_expression,
+            ConditionExpression=condition,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+            raise
+        return False
+    return True
+
+
+def resend_event_tickets(
+    table,
+    sqs,
+    queue_url: str,
+    organisation_slug: str,
+    event_details: EventModel,
+    job_id: str,
+    actor: str,
+    current_time: str,
+    has_time: Callable[[], bool] = lambda: True,
+    page_size: int = RESEND_PAGE_SIZE,
+) -> Optional[str]:
+    """
+    Queue the ticket email of every active ticket of an event, one gsi1 page at a time.
+
+    The event is loaded once by the caller and every page is enqueued in
+    SendMessageBatch chunks. Each call starts from the checkpoint stored on
+    the job, so a retried invocation carries on after the last recorded
+    page, and a page's counts are only added while the checkpoint is still
+    where that page started. Idempotency keys are derived from the job and
+    ticket, so a page sent again before it could be recorded does not send
+    twice. Returns the checkpoint to continue from when ``has_time`` says
+    to stop early, or None once every page is done or the job is finished.
+    """
+    job = get_resend_job(table, job_id)
+    if not job or not set_resend_status(table, job_id, "running", current_time):
+        logger.info(f"Resend job {job_id} is missing or already finished")
+        return None
+    cursor = job.get("cursor")
+
+    blank_model = TicketModel(ksuid="blank", parent_event_ksuid=event_details.ksuid, name="blank", organisation=organisation_slug, name_on_ticket="blank", customer_email="blank", email="blank", includes=[])
+    for page in blank_model.iter_query(
+        table=table,
+        index_name="gsi1",
+        key_condition=Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with("TICKET#"),
+        limit=page_size,
+        cursor=cursor,
+    ):
+        email_jobs = {}
+        failed = []
+        skipped = 0
+        for ticket in page.items:
+            # void and used tickets are not sent again; tickets without a status predate it and are active
+            if (ticket.ticket_status or TicketStatus.active) != TicketStatus.active:
+                skipped += 1
+                continue
+            try:
+                email_jobs[ticket.ksuid] = create_email_job(
+                    table,
+                    ticket,
+                    organisation_slug,
+                    f"resend:{job_id}:{ticket.ksuid}",
+                    actor,
+                    send_reason=RESEND_SEND_REASON,
+                    event_details=event_details,
+                )
+            except Exception as e:
+                logger.error(f"Failed to build resend email job for ticket {ticket.ksuid}: {e}")
+                failed.append(ticket.ksuid)
+        not_queued = enqueue_email_jobs(sqs, queue_url, email_jobs)
+
+        recorded = record_resend_page(
+            table,
+            job_id,
+            cursor,
+            page.cursor,
+            current_time,
+            queued=len(email_jobs) - len(not_queued),
+            failed=len(failed) + len(not_queued),
+            skipped=skipped,
+        )
+        if not recorded:
+            logger.warning(f"Resend job {job_id} page at {cursor} was already recorded by another invocation, stopping")
+            return None
+        cursor = page.cursor
+        if cursor and not has_time():
+            logger.info(f"Resend job {job_id} pausing at cursor {cursor}")
+            return cursor
+
+    logger.info(f"Resend job {job_id} for event {event_details.ksuid} completed")
+    return None
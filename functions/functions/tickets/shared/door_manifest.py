@@ -0,0 +1,211 @@
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import math
+from typing import Iterable, Optional
+
+import jwt
+from cryptography.exceptions import InvalidSignature # layer: auth
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from ksuid import KsuidMs # layer: utils
+
+from _pydantic.models.models_extended import TicketModel
+from _pydantic.models.tickets_models import TicketStatus, AdmissionStatus
+
+## logger setup
+logger = logging.getLogger()
+logger.setLevel("INFO")
+
+MANIFEST_FORMAT = 2
+MANIFEST_SIGNATURE_ALGORITHM = "Ed25519"
+KSUID_BYTES = 20
+KSUID_LENGTH = 27
+MAX_HASHES = 16
+
+# status bits, one byte per ticket in the same order as the ticket ksuids
+STATUS_ACTIVE = 0b001
+STATUS_CHECKED_IN = 0b010
+STATUS_DENIED = 0b100
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+class BloomFilter:
+    """
+    Bloom filter over QR token ``jti`` claims.
+
+    Bit positions are simple to reproduce on a scanner: hash ``i`` sets bit
+    ``word_i % bits``, where ``word_i`` is the ``i``-th big-endian 4 byte word
+    of the SHA-512 digest of the value, least significant bit first within
+    each byte. That gives at most 16 hashes.
+    """
+
+    def __init__(self, bits: int, hashes: int, data: Optional[bytearray] = None):
+        self.bits = bits
+        self.hashes = hashes
+        self.data = data if data is not None else bytearray((bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float = 0.001) -> "BloomFilter":
+        capacity = max(capacity, 1)
+        bits = max(8, math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        hashes = min(MAX_HASHES, max(1, round(bits / capacity * math.log(2))))
+        return cls(bits, hashes)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BloomFilter":
+        return cls(data["bits"], data["hashes"], bytearray(base64.b64decode(data["data"])))
+
+    def _positions(self, value: str):
+        digest = hashlib.sha512(value.encode("utf-8")).digest()
+        for i in range(self.hashes):
+            yield int.from_bytes(digest[i * 4:i * 4 + 4], "big") % self.bits
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.data[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.data[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def to_dict(self) -> dict:
+        return {"bits": self.bits, "hashes": self.hashes, "data": _b64(bytes(self.data))}
+
+
+def ticket_status_bits(ticket: TicketModel) -> int:
+    ticket_status = ticket.ticket_status or TicketStatus.active
+    admission_status = ticket.admission_status or AdmissionStatus.not_checked_in
+
+    bits = 0
+    if ticket_status == TicketStatus.active:
+        bits |= STATUS_ACTIVE
+    if admission_status == AdmissionStatus.checked_in or ticket_status == TicketStatus.used:
+        bits |= STATUS_CHECKED_IN
+    if admission_status == AdmissionStatus.denied:
+        bits |= STATUS_DENIED
+    return bits
+
+
+def _token_jti(token: Optional[str], secret: str) -> Optional[str]:
+    if not token:
+        return None
+    try:
+        decoded = jwt.decode(token, secret, algorithms=["HS256"], audience="1", issuer="DANCEENGINE")
+    except jwt.InvalidTokenError as e:
+        logger.warning(f"Skipping invalid QR token in door manifest: {str(e)}")
+        return None
+    return decoded.get("jti")
+
+
+def load_signing_key(pem: str) -> Ed25519PrivateKey:
+    """Load the Ed25519 private key (PKCS#8 PEM) manifests are signed with."""
+    key = serialization.load_pem_private_key(pem.encode("utf-8"), password=None)
+    if not isinstance(key, Ed25519PrivateKey):
+        raise ValueError("The door manifest signing key must be an Ed25519 private key.")
+    return key
+
+
+def _raw_public_key(public_key: Ed25519PublicKey) -> bytes:
+    return public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+
+
+def door_manifest_public_key(signing_key: Ed25519PrivateKey) -> dict:
+    """
+    The key scanners verify manifests with, published on ``GET /public/tickets/manifest-key``.
+
+    It can only verify, so handing it to every scanner does not let one
+    forge a manifest. ``key_id`` is also written into each manifest: a
+    scanner fetches the key again when a manifest names one it does not hold.
+    """
+    raw = _raw_public_key(signing_key.public_key())
+    return {"algorithm": MANIFEST_SIGNATURE_ALGORITHM, "key_id": hashlib.sha256(raw).hexdigest()[:16], "public_key": _b64url(raw)}
+
+
+def _canonical(manifest: dict) -> bytes:
+    body = {key: value for key, value in manifest.items() if key != "signature"}
+    return json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def sign_door_manifest(manifest: dict, signing_key: Ed25519PrivateKey) -> str:
+    return _b64url(signing_key.sign(_canonical(manifest)))
+
+
+def verify_door_manifest(manifest: dict, public_key: Ed25519PublicKey) -> bool:
+    signature = manifest.get("signature") or ""
+    try:
+        public_key.verify(base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4)), _canonical(manifest))
+    except (InvalidSignature, binascii.Error, ValueError):
+        return False
+    return True
+
+
+def build_door_manifest(
+    tickets: Iterable[TicketModel],
+    organisation: str,
+    event_ksuid: str,
+    secret: str,
+    generated_at: str,
+    signing_key: Ed25519PrivateKey,
+    false_positive_rate: float = 0.001,
+) -> dict:
+    """
+    Build the signed offline door manifest for one event.
+
+    Ticket ksuids are packed as sorted 20 byte binary KSUIDs (binary search
+    with a fixed stride), each with one byte of status bits at the same
+    index. The ``jti`` of every ticket's QR token goes into a Bloom filter so
+    a scanner can reject tokens that were never minted for this event
+    without a network call. ``version`` is a hash of that content only, so a
+    scanner can skip the download when it already holds the same version.
+    ``secret`` reads the QR tokens; the manifest is signed with the Ed25519
+    ``signing_key``, so scanners verify it with the public key alone.
+    """
+    entries = []
+    jtis = []
+    for ticket in tickets:
+        try:
+            packed = bytes(KsuidMs.from_base62(ticket.ksuid)) if len(ticket.ksuid) == KSUID_LENGTH else None
+        except Exception:
+            packed = None
+        if packed is None:
+            logger.warning(f"Skipping ticket with non KSUID id {ticket.ksuid} in door manifest for {organisation}:{event_ksuid}")
+            continue
+        entries.append((packed, ticket_status_bits(ticket)))
+        jti = _token_jti(ticket.qr_token, secret)
+        if jti:
+            jtis.append(jti)
+
+    entries.sort()
+    packed_ksuids = b"".join(packed for packed, _ in entries)
+    statuses = bytes(bits for _, bits in entries)
+
+    jti_filter = BloomFilter.for_capacity(len(jtis), false_positive_rate)
+    for jti in jtis:
+        jti_filter.add(jti)
+
+    version = hashlib.sha256(b"".join([event_ksuid.encode("utf-8"), packed_ksuids, statuses, bytes(jti_filter.data)])).hexdigest()[:16]
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "version": version,
+        "organisation": organisation,
+        "event": event_ksuid,
+        "generated_at": generated_at,
+        "ticket_count": len(entries),
+        "tickets": _b64(packed_ksuids),
+        "statuses": _b64(statuses),
+        "jti_filter": jti_filter.to_dict(),
+        "key_id": door_manifest_public_key(signing_key)["key_id"],
+    }
+    manifest["signature"] = sign_door_manifest(manifest, signing_key)
+    logger.info(f"Built door manifest {version} for {organisation}:{event_ksuid} with {len(entries)} tickets and {len(jtis)} tokens")
+    return manifest
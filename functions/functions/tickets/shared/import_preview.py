@@ -0,0 +1,124 @@
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+from _pydantic.models.models_extended import TicketModel, TicketCreationIdempotencyModel
+
+
+def _normalise(value) -> str:
+    return (value or "").strip().lower()
+
+
+class ExistingTicketIndex:
+    """
+    Hash indexes over an event's existing tickets, keyed by normalised
+    customer email and name on ticket.
+
+    Built once per preview so each imported row is matched by lookup instead
+    of scanning every existing ticket; exact matches are the tickets found
+    under both keys. Tickets are dumped to JSON lazily and at most once,
+    however many rows they match.
+    """
+
+    def __init__(self, tickets: Iterable[TicketModel]):
+        self._tickets = list(tickets)
+        self._dumps: dict[int, dict] = {}
+        self.by_email: dict[str, list[int]] = defaultdict(list)
+        self.by_name: dict[str, list[int]] = defaultdict(list)
+
+        for position, ticket in enumerate(self._tickets):
+            email = _normalise(ticket.customer_email)
+            name = _normalise(ticket.name_on_ticket)
+            if email:
+                self.by_email[email].append(position)
+            if name:
+                self.by_name[name].append(position)
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def dump(self, position: int) -> dict:
+        if position not in self._dumps:
+            self._dumps[position] = self._tickets[position].model_dump(mode="json", exclude_none=True)
+        return self._dumps[position]
+
+    def matches(self, customer_email, name_on_ticket) -> Iterator[tuple[int, bool, bool]]:
+        """Yield ``(position, email_matches, name_matches)`` for matching tickets, in existing ticket order."""
+        email = _normalise(customer_email)
+        name = _normalise(name_on_ticket)
+        email_matches = set(self.by_email.get(email, ())) if email else set()
+        name_matches = set(self.by_name.get(name, ())) if name else set()
+
+        for position in sorted(email_matches | name_matches):
+            yield position, position in email_matches, position in name_matches
+
+
+def analyse_ticket_request(
+    index: int,
+    ticket_request: dict,
+    available_line_items: dict[str, dict],
+    existing: ExistingTicketIndex,
+    idempotency_records: dict[str, TicketCreationIdempotencyModel],
+) -> dict:
+    issues = []
+    duplicate = False
+    potential_duplicate = False
+
+    for line_item in ticket_request.get("line_items", []):
+        if line_item.get("ksuid") not in available_line_items:
+            issues.append({
+                "type": "missing_line_item",
+                "message": "The referenced line item does not exist on this event.",
+                "line_item": line_item,
+            })
+
+    if idempotency_records.get(ticket_request["ticket_creation_key"]):
+        duplicate = True
+        issues.append({
+            "type": "existing_ticket_creation_key",
+            "message": "A ticket creation request already exists for this ticket_creation_key.",
+            "ticket_creation_key": ticket_request["ticket_creation_key"],
+        })
+
+    for position, email_matches, name_matches in existing.matches(ticket_request.get("customer_email"), ticket_request.get("name_on_ticket")):
+        if email_matches and name_matches:
+            duplicate = True
+            issues.append({
+                "type": "exact_existing_ticket_match",
+                "message": "An existing ticket already matches this customer email and name.",
+                "existing_ticket": existing.dump(position),
+            })
+            continue
+
+        potential_duplicate = True
+        if email_matches:
+            issues.append({
+                "type": "matching_customer_email",
+                "message": "An existing ticket has the same customer email.",
+                "existing_ticket": existing.dump(position),
+            })
+        if name_matches:
+            issues.append({
+                "type": "matching_name_on_ticket",
+                "message": "An existing ticket has the same name on ticket.",
+                "existing_ticket": existing.dump(position),
+            })
+
+    return {
+        "index": index,
+        "ticket": ticket_request,
+        "issues": issues,
+        "duplicate": duplicate,
+        "potential_duplicate": potential_duplicate,
+    }
+
+
+def analyse_import(
+    ticket_requests: list[dict],
+    available_line_items: dict[str, dict],
+    existing_tickets: Iterable[TicketModel],
+    idempotency_records: dict[str, TicketCreationIdempotencyModel],
+) -> Iterator[dict]:
+    """Yield the preview analysis for each ticket request, in order, in a single pass over the rows."""
+    existing = ExistingTicketIndex(existing_tickets)
+    for index, ticket_request in enumerate(ticket_requests):
+        yield analyse_ticket_request(index, ticket_request, available_line_items, existing, idempotency_records)
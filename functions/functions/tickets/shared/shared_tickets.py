@@ -1,12 +1,17 @@
 import hashlib
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Literal, Optional
 
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
 from pydantic import ValidationError # layer: pydantic
-from _pydantic.models.models_extended import TicketModel, EventModel, TicketCreationIdempotencyModel
+from _pydantic.models.models_extended import TicketModel, TicketChildModel, EventModel, TicketCreationIdempotencyModel
+from _pydantic.models.tickets_models import TicketStatus, AdmissionStatus
+from _pydantic.dynamodb_helpers import _get_failed_item_field
 from _pydantic.email_models import EmailTemplates, EmailJob, EmailRecipient, JobTypes # pydantic layer
 
 ## logger setup
@@ -21,7 +26,15 @@ def get_ticket_request_record(table, idempotency_key: str):
         }
     )
     item = response.get("Item")
-    return TicketCreationIdempotencyModel.model_validate(item) if item else None
+    return TicketCreationIdempotencyModel.from_dynamo(item) if item else None
+
+
+def get_ticket_request_records(table, idempotency_keys) -> dict[str, TicketCreationIdempotencyModel]:
+    records = TicketCreationIdempotencyModel.batch_get(
+        table,
+        [(f"TICKETCREATIONIDEMPOTENCY#{key}", f"TICKETCREATIONIDEMPOTENCY#{key}") for key in idempotency_keys],
+    )
+    return {record.idempotency_key: record for record in records.values()}
 
 
 def build_ticket_creation_key(
@@ -133,6 +146,231 @@ def get_single_ticket(table, organisationSlug: str,  eventId: str,  ticketId: st
     
     return ticket if ticket else None
 
+# Below this many tickets one gsi2 query per ticket is cheaper than listing the event
+BULK_TICKET_LOOKUP_THRESHOLD = 10
+
+def get_tickets_by_ids(table, organisationSlug: str, eventId: str, ticket_ids: list[str], actor: str = "unknown") -> dict[str, TicketModel]:
+    """Load tickets of one event with their child records, keyed by ticket ksuid.
+
+    Large requests are resolved from the event's gsi1 listing (which stops as
+    soon as every ticket is found) plus one BatchGetItem per 100 child
+    records, instead of one query per ticket. Creation idempotency records
+    are not attached on this path.
+    """
+    wanted = set(ticket_ids)
+    if len(wanted) < BULK_TICKET_LOOKUP_THRESHOLD:
+        tickets = {ticket_id: get_single_ticket(table, organisationSlug, eventId, ticket_id, actor=actor) for ticket_id in wanted}
+        return {ticket_id: ticket for ticket_id, ticket in tickets.items() if ticket is not None}
+
+    blank_model = TicketModel(ksuid="blank", parent_event_ksuid=eventId, name="blank", organisation=organisationSlug, name_on_ticket="blank", customer_email="blank", email="blank", includes=[])
+    ticket_items = {}
+    for page in blank_model.iter_query(
+        table=table,
+        index_name="gsi1",
+        key_condition=Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with("TICKET#"),
+        validate=False,
+    ):
+        for item in page.items:
+            if item.get("ksuid") in wanted:
+                ticket_items[item["ksuid"]] = item
+        if len(ticket_items) == len(wanted):
+            break
+
+    child_items = TicketChildModel.batch_get(
+        table,
+        [(child_pk, f"TICKET#{ksuid}") for ksuid, item in ticket_items.items() for child_pk in item.get("includes") or []],
+        validate=False,
+    )
+    children_by_ticket: dict[str, list[dict]] = {}
+    for (_, sk), child in child_items.items():
+        children_by_ticket.setdefault(sk.split("#", 1)[1], []).append(child)
+
+    return {
+        ksuid: blank_model.assemble_from_items([item, *children_by_ticket.get(ksuid, [])])
+        for ksuid, item in ticket_items.items()
+    }
+
+@dataclass
+class AdmissionResult:
+    outcome: Literal["updated", "not_found", "already_used", "denied", "not_active", "duplicate", "error"]
+    ticket: Optional[TicketModel] = None
+    checked_in_at: Optional[str] = None
+    checked_in_by: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.outcome == "updated"
+
+def set_ticket_admission(table, ticket_ksuid: str, customer_email: str, eventId: str, actor: str, checked_in_at: str, check_in: bool = True) -> AdmissionResult:
+    """Check a ticket in (or reset it) with one conditional UpdateItem, without reading it first.
+
+    Checking in requires an active, not checked in ticket of this event and
+    increments check_in_count atomically. Resetting only requires the ticket
+    to exist on this event. On a failed condition the ALL_OLD item tells a
+    missing ticket apart from one that is already used or not active.
+    """
+    names = {
+        "#PK": "PK",
+        "#parent_event_ksuid": "parent_event_ksuid",
+        "#admission_status": "admission_status",
+        "#ticket_status": "ticket_status",
+        "#checked_in_at": "checked_in_at",
+        "#checked_in_by": "checked_in_by",
+        "#updated_at": "updated_at",
+    }
+    values = {
+        ":event_ksuid": eventId,
+        ":checked_in_at": checked_in_at,
+        ":actor": actor,
+    }
+    update_expression = "SET #admission_status = :admission_status, #ticket_status = :ticket_status, #checked_in_at = :checked_in_at, #checked_in_by = :actor, #updated_at = :checked_in_at"
+    condition_expression = "attribute_exists(#PK) AND #parent_event_ksuid = :event_ksuid"
+
+    if check_in:
+        names["#check_in_count"] = "check_in_count"
+        values.update({
+            ":admission_status": AdmissionStatus.checked_in.value,
+            ":ticket_status": TicketStatus.used.value,
+            ":active_status": TicketStatus.active.value,
+            ":not_checked_in_status": AdmissionStatus.not_checked_in.value,
+            ":one": 1,
+        })
+        update_expression += " ADD #check_in_count :one"
+        # TODO to be depricated later because this assumes tickets without those attributes are valid
+        condition_expression += (
+            " AND (attribute_not_exists(#ticket_status) OR #ticket_status = :active_status)"
+            " AND (attribute_not_exists(#admission_status) OR #admission_status = :not_checked_in_status)"
+        )
+    else:
+        values.update({
+            ":admission_status": AdmissionStatus.not_checked_in.value,
+            ":ticket_status": TicketStatus.active.value,
+        })
+
+    try:
+        # through the client: apply_check_ins calls this from worker threads and boto3 resources are not thread-safe
+        response = table.meta.client.update_item(
+            TableName=table.name,
+            Key={"PK": f"TICKET#{ticket_ksuid}", "SK": f"CUSTOMER#{customer_email}"},
+            UpdateExpression=update_expression,
+            ConditionExpression=condition_expression,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+            ReturnValues="ALL_NEW",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException as e:
+        if not e.response.get("Item"):
+            return AdmissionResult(outcome="not_found")
+
+        parent_event_ksuid, _ = _get_failed_item_field(e.response, "parent_event_ksuid")
+        if parent_event_ksuid != eventId:
+            logger.info(f"Ticket {ticket_ksuid} belongs to event {parent_event_ksuid}, not {eventId}")
+            return AdmissionResult(outcome="not_found")
+
+        admission_status, _ = _get_failed_item_field(e.response, "admission_status")
+        ticket_status, _ = _get_failed_item_field(e.response, "ticket_status")
+        previous_checked_in_at, _ = _get_failed_item_field(e.response, "checked_in_at")
+        previous_checked_in_by, _ = _get_failed_item_field(e.response, "checked_in_by")
+        if admission_status == AdmissionStatus.checked_in.value or ticket_status == TicketStatus.used.value:
+            return AdmissionResult(outcome="already_used", checked_in_at=previous_checked_in_at, checked_in_by=previous_checked_in_by)
+        if admission_status == AdmissionStatus.denied.value:
+            return AdmissionResult(outcome="denied")
+        return AdmissionResult(outcome="not_active")
+
+    return AdmissionResult(outcome="updated", ticket=TicketModel.from_dynamo(response["Attributes"]))
+
+# Conditional check-in writes run this many at a time
+CHECK_IN_MAX_WORKERS = 8
+
+def resolve_ticket_emails(table, eventId: str, ticket_ids: list[str]) -> dict[str, str]:
+    """Map ticket ksuids of one event to their customer email, the sort key of the ticket record.
+
+    Few tickets are looked up by partition key; larger sets come from the
+    event's gsi1 listing, which stops once every ticket is found.
+    """
+    wanted = set(ticket_ids)
+    emails = {}
+    if len(wanted) < BULK_TICKET_LOOKUP_THRESHOLD:
+        for ticket_id in wanted:
+            response = table.query(
+                KeyConditionExpression=Key("PK").eq(f"TICKET#{ticket_id}") & Key("SK").begins_with("CUSTOMER#"),
+                ProjectionExpression="customer_email, parent_event_ksuid",
+            )
+            for item in response.get("Items", []):
+                if item.get("parent_event_ksuid") == eventId:
+                    emails[ticket_id] = item["customer_email"]
+        return emails
+
+    blank_model = TicketModel(ksuid="blank", parent_event_ksuid=eventId, name="blank", organisation="blank", name_on_ticket="blank", customer_email="blank", email="blank", includes=[])
+    for page in blank_model.iter_query(
+        table=table,
+        index_name="gsi1",
+        key_condition=Key("gsi1PK").eq(blank_model.gsi1PK) & Key("gsi1SK").begins_with("TICKET#"),
+        validate=False,
+    ):
+        for item in page.items:
+            if item.get("ksuid") in wanted:
+                emails[item["ksuid"]] = item["customer_email"]
+        if len(emails) == len(wanted):
+            break
+    return emails
+
+def apply_check_ins(table, eventId: str, check_ins: list[dict], actor: str, max_workers: int = CHECK_IN_MAX_WORKERS) -> list[AdmissionResult]:
+    """Apply a batch of buffered scans with parallel conditional check-ins.
+
+    Each entry needs ``ticket_ksuid`` and ``checked_in_at`` and may carry
+    ``customer_email`` and ``checked_in_by``; missing emails are resolved in
+    bulk first. Every entry goes through set_ticket_admission, so conflicts
+    are reported per ticket exactly as for a single scan. A ticket scanned
+    more than once in the batch is written once, from its earliest scan,
+    and the later scans are reported as duplicates. Results are returned in
+    the order of ``check_ins``.
+    """
+    results: list[Optional[AdmissionResult]] = [None] * len(check_ins)
+
+    first_scan: dict[str, int] = {}
+    for position in sorted(range(len(check_ins)), key=lambda i: check_ins[i]["checked_in_at"]):
+        ticket_id = check_ins[position]["ticket_ksuid"]
+        if ticket_id in first_scan:
+            results[position] = AdmissionResult(outcome="duplicate")
+        else:
+            first_scan[ticket_id] = position
+
+    missing = [ticket_id for ticket_id, position in first_scan.items() if not check_ins[position].get("customer_email")]
+    emails = resolve_ticket_emails(table, eventId, missing) if missing else {}
+
+    def _apply(position: int) -> AdmissionResult:
+        check_in = check_ins[position]
+        customer_email = check_in.get("customer_email") or emails.get(check_in["ticket_ksuid"])
+        if not customer_email:
+            return AdmissionResult(outcome="not_found")
+        try:
+            return set_ticket_admission(
+                table,
+                check_in["ticket_ksuid"],
+                customer_email,
+                eventId,
+                check_in.get("checked_in_by") or actor,
+                check_in["checked_in_at"],
+            )
+        except ClientError as e:
+            logger.error(f"Check-in of ticket {check_in['ticket_ksuid']} failed: {e.response.get('Error', {}).get('Code')}")
+            return AdmissionResult(outcome="error")
+
+    positions = list(first_scan.values())
+    if len(positions) <= 1 or max_workers <= 1:
+        applied = [_apply(position) for position in positions]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(positions))) as executor:
+            applied = list(executor.map(_apply, positions))
+
+    for position, result in zip(positions, applied):
+        results[position] = result
+
+    logger.info(f"Applied {len(check_ins)} check-ins for event {eventId}: {sum(1 for result in results if result.success)} admitted")
+    return results
+
 def get_single_event(organisationSlug: str, eventId: str, table):
     logger.info(f"Getting event for {organisationSlug}")
     blank_model = EventModel(ksuid=eventId, name="blank", organisation=organisationSlug)
@@ -142,7 +380,8 @@ def get_single_event(organisationSlug: str, eventId: str, table):
             table=table,
             index_name="IDXinv",
             key_condition=Key('SK').eq(f'{blank_model.PK}'),
-            assemble_entites=True
+            assemble_entites=True,
+            include=EventModel.CORE_RELATIONS,
         )
         # logger.info(f"Found event for {organisationSlug}: {result}")
     except ClientError as e:
@@ -163,8 +402,11 @@ def create_email_job(
     idempotency_suffix: str,
     actor: str,
     send_reason: str = "new_sale",
+    event_details: EventModel | None = None,
 ):
-    event_details: EventModel = get_single_event(organisation_slug, ticket.parent_event_ksuid, table)[0]
+    """Build the EmailJob for a ticket; pass ``event_details`` to reuse an event loaded once for many tickets."""
+    if event_details is None:
+        event_details = get_single_event(organisation_slug, ticket.parent_event_ksuid, table)[0]
 
     logger.info(f"Preparing email send request for ticket {ticket.PK} of event {event_details.name} to be sent to {ticket.customer_email} with QR token {ticket.qr_token}")
     template_params = {
@@ -618,7 +618,7 @@ def lambda_handler(event, context):
 
             result = get(public=is_public)
             response = list_response_cls(organisations=result)
-            return make_response(200, response.model_dump(mode="json", exclude_none=True))     
+            return make_response(200, response, exclude_none=True)     
 
         return make_response(405, {"message": "Method not allowed."})
 
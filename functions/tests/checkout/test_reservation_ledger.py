@@ -0,0 +1,164 @@
+import random
+
+import pytest
+
+from functions.checkout.sharded_capacity import enable_sharded_capacity, get_event_shards, shard_key, event_key
+from functions.checkout.reservation_ledger import (
+    hold_reservation, settle_reservation, settle_reservations, sweep_expired_reservations, expired_holds, reservation_key,
+)
+from _pydantic.dynamodb import BatchGetIncompleteError, BATCH_GET_MAX_ATTEMPTS
+
+NOW = "2026-05-01T10:00:00.000Z"
+EXPIRES = "2026-05-01T10:35:00.000Z"
+LATER = "2026-05-01T11:00:00.000Z"
+
+# --- Fixtures ---
+@pytest.fixture
+def table(table):
+    table.put_item(Item={**event_key("evt"), "entity_type": "EVENT", "remaining_capacity": 3, "reserved": 0, "number_sold": 0})
+    return table
+
+def _event_counters(table):
+    event = table.get_item(Key=event_key("evt"))["Item"]
+    return (event["remaining_capacity"], event["reserved"], event["number_sold"])
+
+def _shard_totals(table, shards):
+    items = get_event_shards(table, "evt", shards)
+    return tuple(sum(item[field] for item in items) for field in ("remaining_capacity", "reserved", "number_sold"))
+
+def _status(table, reservation_id):
+    return table.get_item(Key=reservation_key(reservation_id))["Item"]["status"]
+
+# --- Tests ---
+def test_hold_writes_ledger_and_counter_until_exactly_sold_out(table):
+    holds = [hold_reservation(table, "evt", f"r{n}", EXPIRES, NOW) for n in range(4)]
+
+    assert [hold.outcome for hold in holds] == ["held", "held", "held", "sold_out"]
+    assert _event_counters(table) == (0, 3, 0)
+    assert [_status(table, f"r{n}") for n in range(3)] == ["held"] * 3
+    assert table.get_item(Key=reservation_key("r3")).get("Item") is None
+
+def test_sharded_holds_fall_back_across_shards(table):
+    enable_sharded_capacity(table, "evt", 2, NOW)
+    rng = random.Random(7)
+
+    holds = [hold_reservation(table, "evt", f"r{n}", EXPIRES, NOW, rng=rng) for n in range(4)]
+
+    assert [hold.outcome for hold in holds] == ["held", "held", "held", "sold_out"]
+    assert {hold.capacity_shard for hold in holds[:3]} == {0, 1}
+    assert _shard_totals(table, 2) == (0, 3, 0)
+
+def test_throttled_counter_is_not_reported_as_sold_out(fake, table):
+    fake.inject_error("transact_write_items", "ProvisionedThroughputExceededException")
+
+    assert hold_reservation(table, "evt", "r1", EXPIRES, NOW).outcome == "throttled"
+
+def test_settle_is_idempotent(table):
+    hold_reservation(table, "evt", "r1", EXPIRES, NOW)
+
+    first = settle_reservation(table, "r1", "released", NOW)
+    second = settle_reservation(table, "r1", "released", NOW)
+
+    assert (first.outcome, second.outcome, second.previous_status) == ("settled", "already_settled", "released")
+    assert _event_counters(table) == (3, 0, 0)
+    assert settle_reservation(table, "missing", "released", NOW).outcome == "not_found"
+
+def test_completing_a_released_hold_still_sells_it(table):
+    hold_reservation(table, "evt", "r1", EXPIRES, NOW)
+    settle_reservation(table, "r1", "released", NOW)
+
+    assert settle_reservation(table, "r1", "completed", NOW).outcome == "settled"
+    assert settle_reservation(table, "r1", "released", NOW).outcome == "already_settled"
+    assert _event_counters(table) == (2, 0, 1)
+
+def test_paying_a_released_hold_on_a_sold_out_event_does_not_oversell(table):
+    hold_reservation(table, "evt", "r1", EXPIRES, NOW)
+    settle_reservation(table, "r1", "released", NOW)
+    for n in range(2, 5):
+        hold_reservation(table, "evt", f"r{n}", EXPIRES, NOW)
+
+    assert settle_reservation(table, "r1", "completed", NOW).outcome == "sold_out"
+    assert settle_reservations(table, ["r1", "r2"], "completed", NOW)["r1"].outcome == "sold_out"
+    assert _event_counters(table) == (0, 2, 1)
+    assert _status(table, "r1") == "released"
+
+def test_paying_a_released_hold_takes_stock_from_another_shard(table):
+    enable_sharded_capacity(table, "evt", 2, NOW)
+    rng = random.Random(7)
+    first = hold_reservation(table, "evt", "r1", EXPIRES, NOW, rng=rng)
+    settle_reservation(table, "r1", "released", NOW)
+    # empty the released hold's own shard
+    while table.get_item(Key=shard_key("evt", first.capacity_shard))["Item"]["remaining_capacity"] > 0:
+        table.update_item(Key=shard_key("evt", first.capacity_shard), UpdateExpression="ADD remaining_capacity :minus", ExpressionAttributeValues={":minus": -1})
+    remaining = _shard_totals(table, 2)[0]
+
+    assert settle_reservation(table, "r1", "completed", NOW).outcome == "settled"
+    assert table.get_item(Key=reservation_key("r1"))["Item"]["capacity_shard"] == 1 - first.capacity_shard
+    assert _shard_totals(table, 2)[0] == remaining - 1
+
+def test_hold_on_event_item_settles_on_a_shard_after_sharding(table):
+    hold_reservation(table, "evt", "r1", EXPIRES, NOW)
+    enable_sharded_capacity(table, "evt", 2, NOW)
+
+    assert settle_reservation(table, "r1", "completed", NOW).outcome == "settled"
+    assert _shard_totals(table, 2) == (2, 0, 1)
+
+def test_sweep_releases_expired_holds_in_one_transaction(fake, table):
+    for n in range(3):
+        hold_reservation(table, "evt", f"r{n}", EXPIRES if n < 2 else "2026-05-01T12:00:00.000Z", NOW)
+    fake.reset_calls()
+
+    assert sweep_expired_reservations(table, LATER, LATER) == {"released": 2, "skipped": 0}
+
+    assert fake.calls["transact_write_items"] == 1
+    assert _event_counters(table) == (2, 1, 0)
+    assert [_status(table, f"r{n}") for n in range(3)] == ["released", "released", "held"]
+    assert [item["reservation_id"] for item in expired_holds(table, "2026-05-01T13:00:00.000Z")] == ["r2"]
+
+def test_sweep_falls_back_when_a_hold_was_settled_meanwhile(table):
+    for n in range(3):
+        hold_reservation(table, "evt", f"r{n}", EXPIRES, NOW)
+    stale = list(expired_holds(table, LATER))
+    settle_reservation(table, "r1", "completed", NOW)
+
+    # replay the sweep against what it had read before the completion
+    table.update_item(
+        Key=reservation_key("r1"),
+        UpdateExpression="SET gsi1PK = :pk, gsi1SK = :sk",
+        ExpressionAttributeValues={":pk": next(item for item in stale if item["reservation_id"] == "r1")["gsi1PK"], ":sk": f"{EXPIRES}#r1"},
+    )
+
+    assert sweep_expired_reservations(table, LATER, LATER) == {"released": 2, "skipped": 1}
+    assert _event_counters(table) == (2, 0, 1)
+    assert [_status(table, f"r{n}") for n in range(3)] == ["released", "completed", "released"]
+
+def test_settle_many_applies_one_counter_update_per_counter(fake, table):
+    for n in range(3):
+        hold_reservation(table, "evt", f"r{n}", EXPIRES, NOW)
+    settle_reservation(table, "r2", "released", NOW)
+    fake.reset_calls()
+
+    results = settle_reservations(table, ["r0", "r1", "r2", "r0", "missing"], "completed", NOW)
+
+    assert {reservation_id: result.outcome for reservation_id, result in results.items()} == {
+        "r0": "settled", "r1": "settled", "r2": "settled", "missing": "not_found",
+    }
+    # held and released reservations need different deltas: one transaction each
+    assert fake.calls["transact_write_items"] == 2
+    assert _event_counters(table) == (0, 0, 3)
+    assert settle_reservations(table, ["r0"], "released", NOW)["r0"].outcome == "already_settled"
+
+def test_settle_many_retries_unprocessed_ledger_reads_a_bounded_number_of_times(fake, table, monkeypatch):
+    monkeypatch.setattr("_pydantic.dynamodb.time.sleep", lambda _: None)
+    hold_reservation(table, "evt", "r0", EXPIRES, NOW)
+    fake.inject_unprocessed("batch_get_item", count=1, times=1)
+
+    assert settle_reservations(table, ["r0"], "completed", NOW)["r0"].outcome == "settled"
+
+    hold_reservation(table, "evt", "r1", EXPIRES, NOW)
+    fake.inject_unprocessed("batch_get_item", count=1, times=BATCH_GET_MAX_ATTEMPTS)
+    fake.reset_calls()
+
+    with pytest.raises(BatchGetIncompleteError):
+        settle_reservations(table, ["r1"], "completed", NOW)
+    assert fake.calls["batch_get_item"] == BATCH_GET_MAX_ATTEMPTS
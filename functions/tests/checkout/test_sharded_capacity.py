@@ -0,0 +1,110 @@
+import pytest
+
+from functions.checkout.sharded_capacity import (
+    enable_sharded_capacity, release_capacity_shard, compact_event_shards,
+    get_capacity_shard_count, get_event_shards, list_sharded_events, is_sharded_failure,
+    shard_key, event_key,
+)
+from _pydantic.dynamodb import BatchGetIncompleteError, BATCH_GET_MAX_ATTEMPTS
+
+NOW = "2026-05-01T10:00:00.000Z"
+
+# --- Fixtures ---
+@pytest.fixture
+def table(table):
+    table.put_item(Item={**event_key("evt"), "entity_type": "EVENT", "remaining_capacity": 10, "reserved": 2, "number_sold": 5})
+    return table
+
+def _remaining(table, shards=4):
+    return [table.get_item(Key=shard_key("evt", shard))["Item"]["remaining_capacity"] for shard in range(shards)]
+
+def _take(table, shard, times=1):
+    for _ in range(times):
+        release_capacity_shard(table, "evt", shard, NOW, reserved_delta=1, remaining_capacity_delta=-1)
+
+def _totals(table, shards=4):
+    items = get_event_shards(table, "evt", shards)
+    return tuple(sum(item[field] for item in items) for field in ("remaining_capacity", "reserved", "number_sold"))
+
+# --- Tests ---
+def test_enable_splits_remaining_and_keeps_totals(table):
+    enable_sharded_capacity(table, "evt", 4, NOW)
+
+    assert _remaining(table) == [3, 3, 2, 2]
+    assert _totals(table) == (10, 2, 5)
+    assert get_capacity_shard_count(table, "evt") == 4
+    assert set(list_sharded_events(table)) == {"evt"}
+
+def test_enable_refuses_moved_counters_and_double_enable(fake, table):
+    with pytest.raises(ValueError):
+        enable_sharded_capacity(table, "evt", 1, NOW)
+
+    enable_sharded_capacity(table, "evt", 2, NOW)
+
+    with pytest.raises(ValueError):
+        enable_sharded_capacity(table, "evt", 2, NOW)
+
+def test_get_event_shards_retries_unprocessed_keys_and_never_returns_a_partial_set(fake, table, monkeypatch):
+    monkeypatch.setattr("_pydantic.dynamodb.time.sleep", lambda _: None)
+    enable_sharded_capacity(table, "evt", 4, NOW)
+    fake.inject_unprocessed("batch_get_item", count=2, times=1)
+
+    assert sorted(int(item["shard"]) for item in get_event_shards(table, "evt", 4)) == [0, 1, 2, 3]
+
+    fake.inject_unprocessed("batch_get_item", count=1, times=BATCH_GET_MAX_ATTEMPTS)
+    with pytest.raises(BatchGetIncompleteError):
+        get_event_shards(table, "evt", 4)
+
+def test_release_and_complete_on_one_shard(table):
+    enable_sharded_capacity(table, "evt", 4, NOW)
+    _take(table, 2)
+
+    release_capacity_shard(table, "evt", 2, NOW, reserved_delta=-1, remaining_capacity_delta=0, number_sold_delta=1)
+
+    assert _totals(table) == (9, 2, 6)
+
+def test_compaction_rebalances_and_writes_summary(table):
+    enable_sharded_capacity(table, "evt", 4, NOW)
+    _take(table, 0, times=3)
+    _take(table, 1)
+
+    assert compact_event_shards(table, "evt", get_event_shards(table, "evt", 4), NOW)
+
+    assert _remaining(table) == [2, 2, 1, 1]
+    assert _totals(table) == (6, 6, 5)
+    event = table.get_item(Key=event_key("evt"))["Item"]
+    assert (event["remaining_capacity"], event["reserved"], event["number_sold"]) == (6, 6, 5)
+
+def test_compaction_keeps_reservations_made_after_the_read(table):
+    enable_sharded_capacity(table, "evt", 4, NOW)
+    _take(table, 3, times=2)
+    observed = get_event_shards(table, "evt", 4)
+    _take(table, 1)
+
+    assert compact_event_shards(table, "evt", observed, NOW)
+
+    assert _remaining(table) == [2, 1, 2, 2]
+    assert _totals(table) == (7, 5, 5)
+
+def test_compaction_cancelled_when_a_donor_shard_was_drained(table):
+    enable_sharded_capacity(table, "evt", 4, NOW)
+    _take(table, 3, times=2)
+    observed = get_event_shards(table, "evt", 4)
+    _take(table, 0, times=3)
+
+    assert not compact_event_shards(table, "evt", observed, NOW)
+    assert _remaining(table) == [0, 3, 2, 0]
+
+def test_balanced_compaction_with_current_summary_writes_nothing(fake, table):
+    enable_sharded_capacity(table, "evt", 2, NOW)
+    compact_event_shards(table, "evt", get_event_shards(table, "evt", 2), NOW)
+    event = table.get_item(Key=event_key("evt"))["Item"]
+    fake.reset_calls()
+
+    assert compact_event_shards(table, "evt", get_event_shards(table, "evt", 2), NOW, event_item=event)
+    assert "transact_write_items" not in fake.calls
+
+def test_sharded_failure_detected_from_all_old_item():
+    assert is_sharded_failure({"capacity_shards": {"N": "4"}, "remaining_capacity": {"N": "0"}})
+    assert not is_sharded_failure({"remaining_capacity": {"N": "0"}})
+    assert not is_sharded_failure(None)
@@ -0,0 +1,38 @@
+import pytest
+
+from _pydantic.dynamodb import BatchGetIncompleteError
+from functions.checkout.stripe_event_dedupe import processed_event_ids, mark_events_processed
+from tests.fakes.fake_dynamodb import load_table_schemas, CORE_TABLE_TEMPLATE
+
+NOW = "2026-05-01T10:00:00.000Z"
+
+# --- Fixtures ---
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("functions.checkout.stripe_event_dedupe.time.sleep", lambda _: None)
+
+@pytest.fixture
+def table(fake):
+    return fake.create_table("dev-stripe-event-dedupe", load_table_schemas(CORE_TABLE_TEMPLATE)["StripeEventDedupeTable"])
+
+# --- Tests ---
+def test_processed_ids_round_trip_with_ttl(table):
+    mark_events_processed(table, {"evt_1": "checkout.session.completed", "evt_2": "checkout.session.expired"}, NOW)
+
+    assert processed_event_ids(table, ["evt_1", "evt_3", "evt_1"]) == {"evt_1"}
+    item = table.get_item(Key={"stripe_event_id": "evt_2"})["Item"]
+    assert (item["event_type"], item["processed_at"]) == ("checkout.session.expired", NOW)
+    assert item["expires_at"] > 0
+
+def test_lookup_retries_unprocessed_keys(fake, table, no_sleep):
+    mark_events_processed(table, {f"evt_{n}": "checkout.session.completed" for n in range(150)}, NOW)
+    fake.inject_unprocessed("batch_get_item", count=10)
+
+    assert len(processed_event_ids(table, [f"evt_{n}" for n in range(160)])) == 150
+
+def test_lookup_gives_up_after_max_attempts(fake, table, no_sleep):
+    fake.inject_unprocessed("batch_get_item", count=1, times=3)
+
+    with pytest.raises(BatchGetIncompleteError):
+        processed_event_ids(table, ["evt_1", "evt_2"], max_attempts=3)
+    assert fake.calls["batch_get_item"] == 3
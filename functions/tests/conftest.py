@@ -0,0 +1,18 @@
+import pytest
+
+from functions.checkout.sharded_capacity import shard_count_cache
+from tests.fakes.fake_dynamodb import FakeDynamoDB
+
+# --- Shared fixtures for tests against the in-memory DynamoDB fake ---
+@pytest.fixture
+def fake():
+    shard_count_cache.clear()
+    return FakeDynamoDB()
+
+@pytest.fixture
+def table(fake):
+    return fake.Table("dev-org-demo")
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("_pydantic.dynamodb.time.sleep", lambda _: None)
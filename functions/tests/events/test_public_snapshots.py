@@ -0,0 +1,92 @@
+import io
+import json
+
+import boto3
+import pytest
+from botocore.response import StreamingBody
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+
+from functions.events.public_snapshots import (
+    event_list_key, event_detail_key, event_ksuid_from_detail, group_snapshot_triggers, read_snapshot, write_snapshot,
+    SNAPSHOT_CACHE_CONTROL,
+)
+
+BUCKET = "dev-danceengine-uploads"
+NOW = "2026-05-01T10:00:00.000Z"
+
+# --- Fixtures ---
+@pytest.fixture
+def s3():
+    client = boto3.client("s3", region_name="eu-west-1", aws_access_key_id="test", aws_secret_access_key="test")
+    with Stubber(client) as stubber:
+        client.stubber = stubber
+        yield client
+
+def _record(message_id, detail_type, detail):
+    return {"messageId": message_id, "body": json.dumps({"detail-type": detail_type, "source": "dance-engine.core", "detail": detail})}
+
+# --- Tests ---
+def test_keys_live_under_the_cdn_prefix():
+    assert event_list_key("org-demo") == "cdn/org-demo/public/events.json"
+    assert event_detail_key("org-demo", "2abc") == "cdn/org-demo/public/events/2abc.json"
+    assert event_detail_key("org-demo", "../events") is None
+
+@pytest.mark.parametrize("detail, expected", [
+    ({"resource_type": "event", "resource_id": "EVENT#e1", "data": {"event": {}}}, "e1"),
+    ({"resource_type": "item", "resource_id": "ITEM#i1", "data": {"item": {"parent_event_ksuid": "e2"}}}, "e2"),
+    ({"resource_type": "checkout", "resource_id": "cs_1", "data": {"event_ksuid": "e3"}}, "e3"),
+    ({"resource_type": "bundle", "resource_id": "BUNDLE#b1", "data": {}}, None),
+])
+def test_event_ksuid_from_detail(detail, expected):
+    assert event_ksuid_from_detail(detail) == expected
+
+def test_write_then_read_round_trip(s3):
+    payload = {"events": [{"ksuid": "e1", "name": "Weekender"}]}
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    s3.stubber.add_response("put_object", {}, {
+        "Bucket": BUCKET, "Key": event_list_key("org-demo"), "Body": body,
+        "ContentType": "application/json", "CacheControl": SNAPSHOT_CACHE_CONTROL, "Metadata": {"generated-at": NOW},
+    })
+    s3.stubber.add_response("get_object", {"Body": StreamingBody(io.BytesIO(body), len(body))}, {"Bucket": BUCKET, "Key": event_list_key("org-demo")})
+
+    write_snapshot(s3, BUCKET, event_list_key("org-demo"), payload, NOW)
+
+    assert read_snapshot(s3, BUCKET, event_list_key("org-demo")) == payload
+
+def test_missing_snapshot_reads_as_none(s3):
+    s3.stubber.add_client_error("get_object", service_error_code="NoSuchKey", http_status_code=404)
+
+    assert read_snapshot(s3, BUCKET, event_list_key("org-demo")) is None
+    assert read_snapshot(s3, BUCKET, None) is None
+
+def test_write_only_if_missing_keeps_an_existing_snapshot(s3):
+    payload = {"events": []}
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    expected = {
+        "Bucket": BUCKET, "Key": event_list_key("org-demo"), "Body": body, "ContentType": "application/json",
+        "CacheControl": SNAPSHOT_CACHE_CONTROL, "Metadata": {"generated-at": NOW}, "IfNoneMatch": "*",
+    }
+    s3.stubber.add_response("put_object", {}, expected)
+    s3.stubber.add_client_error("put_object", service_error_code="PreconditionFailed", http_status_code=412, expected_params=expected)
+    s3.stubber.add_client_error("put_object", service_error_code="AccessDenied", http_status_code=403)
+
+    assert write_snapshot(s3, BUCKET, event_list_key("org-demo"), payload, NOW, only_if_missing=True)
+    assert not write_snapshot(s3, BUCKET, event_list_key("org-demo"), payload, NOW, only_if_missing=True)
+    with pytest.raises(ClientError):
+        write_snapshot(s3, BUCKET, event_list_key("org-demo"), payload, NOW, only_if_missing=True)
+
+def test_group_snapshot_triggers_coalesces_a_batch_per_organisation():
+    records = [
+        _record("m1", "checkout.completed", {"organisation": "org-demo", "resource_type": "checkout", "data": {"event_ksuid": "e1"}}),
+        _record("m2", "checkout.completed", {"organisation": "org-demo", "resource_type": "checkout", "data": {"event_ksuid": "e1"}}),
+        _record("m3", "event.updated", {"organisation": "org-demo", "resource_type": "event", "resource_id": "EVENT#e2"}),
+        _record("m4", "bundle.published", {"organisation": "org-other", "resource_type": "bundle", "data": {}}),
+        _record("m5", "checkout.completed", {"resource_type": "checkout", "data": {"event_ksuid": "e1"}}),
+        {"messageId": "m6", "body": "not json"},
+    ]
+
+    assert group_snapshot_triggers(records) == {
+        "org-demo": ({"e1", "e2"}, ["m1", "m2", "m3"]),
+        "org-other": (set(), ["m4"]),
+    }
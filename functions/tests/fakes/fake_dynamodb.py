@@ -0,0 +1,1358 @@
+"""
+In-memory stand-in for the parts of the boto3 DynamoDB resource and client
+APIs that this project uses.
+
+Tables are created from the ``AWS::DynamoDB::Table`` definitions in
+``serverless.resource.yaml`` and ``aws/s3/cloudformation/organisation.yaml``,
+so key schemas and GSIs (IDXinv, gsi1, gsi1inv, gsi2, gsi2inv, typeIDX)
+behave like the deployed tables. Expressions are parsed and evaluated
+(KeyConditionExpression, FilterExpression, ConditionExpression,
+UpdateExpression, ProjectionExpression), values round-trip the way the boto3
+resource returns them (numbers come back as Decimal) and errors are raised
+as ``ClientError`` subclasses with the same codes and response shapes,
+including low-level ``AttributeValue`` items for ALL_OLD condition failures
+and TransactWriteItems cancellation reasons.
+
+Queries are paginated at ``page_size_bytes`` (1 MB by default) and faults
+can be injected per operation to exercise retry paths deterministically.
+Loading the schemas needs PyYAML::
+
+    fake = FakeDynamoDB()
+    table = fake.Table("dev-org-demo")
+    fake.inject_unprocessed("batch_write_item", count=3)
+    fake.inject_error("query", "ProvisionedThroughputExceededException")
+"""
+import copy
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import yaml
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import Binary, TypeSerializer
+from botocore.exceptions import ClientError
+
+FUNCTIONS_DIR = Path(__file__).resolve().parents[2]
+CORE_TABLE_TEMPLATE = FUNCTIONS_DIR / "serverless.resource.yaml"
+ORG_TABLE_TEMPLATE = FUNCTIONS_DIR.parent / "aws" / "s3" / "cloudformation" / "organisation.yaml"
+
+ONE_MB = 1024 * 1024
+MAX_BATCH_WRITE_ITEMS = 25
+MAX_BATCH_GET_KEYS = 100
+MAX_TRANSACT_ITEMS = 100
+
+_MISSING = object()
+_serializer = TypeSerializer()
+
+
+# --- Errors ---
+
+class _FakeClientError(ClientError):
+    code = "InternalServerError"
+
+    def __init__(self, message: str, operation_name: str, **extra):
+        response = {
+            "Error": {"Code": self.code, "Message": message},
+            "ResponseMetadata": {"HTTPStatusCode": 400},
+            **extra,
+        }
+        super().__init__(response, operation_name)
+
+
+def _error_class(code: str) -> type:
+    return type(code, (_FakeClientError,), {"code": code})
+
+
+ERROR_CODES = (
+    "ConditionalCheckFailedException",
+    "TransactionCanceledException",
+    "TransactionConflictException",
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "ResourceNotFoundException",
+    "ValidationException",
+    "ItemCollectionSizeLimitExceededException",
+    "InternalServerError",
+)
+EXCEPTIONS = SimpleNamespace(**{code: _error_class(code) for code in ERROR_CODES})
+EXCEPTIONS.ClientError = ClientError
+
+
+class _ValidationError(Exception):
+    """Raised internally and converted to ValidationException at the API boundary."""
+
+
+# --- Schema ---
+
+@dataclass(frozen=True)
+class KeySchema:
+    hash_key: str
+    range_key: Optional[str] = None
+
+    @property
+    def attributes(self) -> tuple[str, ...]:
+        return (self.hash_key,) if self.range_key is None else (self.hash_key, self.range_key)
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    key: KeySchema
+    indexes: dict[str, KeySchema] = field(default_factory=dict)
+    attribute_types: dict[str, str] = field(default_factory=dict)
+
+
+class _CloudFormationLoader(yaml.SafeLoader):
+    pass
+
+
+def _construct_cfn_tag(loader, tag_suffix, node):
+    if isinstance(node, yaml.ScalarNode):
+        return loader.construct_scalar(node)
+    if isinstance(node, yaml.SequenceNode):
+        return loader.construct_sequence(node, deep=True)
+    return loader.construct_mapping(node, deep=True)
+
+
+_CloudFormationLoader.add_multi_constructor("!", _construct_cfn_tag)
+
+
+def _key_schema(definition: list[dict]) -> KeySchema:
+    keys = {entry["KeyType"]: entry["AttributeName"] for entry in definition}
+    return KeySchema(hash_key=keys["HASH"], range_key=keys.get("RANGE"))
+
+
+def _find_tables(node: Any, found: dict[str, dict]):
+    if isinstance(node, dict):
+        for name, value in node.items():
+            if isinstance(value, dict) and value.get("Type") == "AWS::DynamoDB::Table":
+                found[name] = value.get("Properties", {})
+            else:
+                _find_tables(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _find_tables(value, found)
+
+
+def load_table_schemas(path: Path | str) -> dict[str, TableSchema]:
+    """Read every AWS::DynamoDB::Table in a CloudFormation/serverless template, keyed by logical id."""
+    with open(path) as f:
+        document = yaml.load(f, Loader=_CloudFormationLoader)
+
+    tables: dict[str, dict] = {}
+    _find_tables(document, tables)
+    return {
+        logical_id: TableSchema(
+            key=_key_schema(properties["KeySchema"]),
+            indexes={
+                index["IndexName"]: _key_schema(index["KeySchema"])
+                for index in properties.get("GlobalSecondaryIndexes", []) + properties.get("LocalSecondaryIndexes", [])
+            },
+            attribute_types={
+                attribute["AttributeName"]: attribute["AttributeType"]
+                for attribute in properties.get("AttributeDefinitions", [])
+            },
+        )
+        for logical_id, properties in tables.items()
+    }
+
+
+def org_table_schema() -> TableSchema:
+    return load_table_schemas(ORG_TABLE_TEMPLATE)["organisationTable"]
+
+
+def core_table_schema() -> TableSchema:
+    return load_table_schemas(CORE_TABLE_TEMPLATE)["CoreDanceEngineTable"]
+
+
+# --- Values ---
+
+def _to_storage(value: Any) -> Any:
+    """Normalise a Python value the way the boto3 resource would store and return it."""
+    if isinstance(value, bool) or value is None or isinstance(value, (str, Decimal)):
+        return value
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, (bytes, bytearray)):
+        return Binary(bytes(value))
+    if isinstance(value, Binary):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_to_storage(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_storage(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        if not value:
+            raise _ValidationError("One or more parameter values were invalid: An number set  may not be empty")
+        return {_to_storage(v) for v in value}
+    raise TypeError(f"Unsupported type {type(value)!r} for value {value!r}")
+
+
+def _type_code(value: Any) -> str:
+    if isinstance(value, bool):
+        return "BOOL"
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return "S"
+    if isinstance(value, Decimal):
+        return "N"
+    if isinstance(value, Binary):
+        return "B"
+    if isinstance(value, list):
+        return "L"
+    if isinstance(value, dict):
+        return "M"
+    if isinstance(value, set):
+        sample = next(iter(value))
+        return {"S": "SS", "N": "NS", "B": "BS"}[_type_code(sample)]
+    raise TypeError(f"Unsupported stored value {value!r}")
+
+
+def _sort_value(value: Any):
+    return value.value if isinstance(value, Binary) else value
+
+
+def _value_size(value: Any) -> int:
+    code = _type_code(value)
+    if code == "S":
+        return len(value.encode("utf-8"))
+    if code == "N":
+        digits = len(str(abs(value)).replace(".", "").lstrip("0")) or 1
+        return (digits + 1) // 2 + 1
+    if code == "B":
+        return len(value.value)
+    if code in ("BOOL", "NULL"):
+        return 1
+    if code == "L":
+        return 3 + sum(_value_size(v) + 1 for v in value)
+    if code == "M":
+        return 3 + sum(len(k.encode("utf-8")) + _value_size(v) + 1 for k, v in value.items())
+    return sum(_value_size(v) for v in value)
+
+
+def item_size(item: dict) -> int:
+    """Approximate DynamoDB item size in bytes (attribute names plus values)."""
+    return sum(len(name.encode("utf-8")) + _value_size(value) for name, value in item.items())
+
+
+def to_low_level(item: dict) -> dict:
+    """Serialize an item into the low-level AttributeValue format (e.g. ``{"N": "5"}``)."""
+    return {name: _serializer.serialize(value) for name, value in item.items()}
+
+
+# --- Expression parsing ---
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<name>\#[A-Za-z0-9_]+)
+  | (?P<value>:[A-Za-z0-9_]+)
+  | (?P<number>\d+)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_\-]*)
+  | (?P<op><>|<=|>=|=|<|>)
+  | (?P<punct>[(),.\[\]+\-])
+""", re.VERBOSE)
+
+_KEYWORDS = {"AND", "OR", "NOT", "BETWEEN", "IN", "SET", "REMOVE", "ADD", "DELETE"}
+_CONDITION_FUNCTIONS = {"attribute_exists", "attribute_not_exists", "attribute_type", "begins_with", "contains"}
+
+
+def _tokenize(expression: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match:
+            raise _ValidationError(f"Invalid expression: Syntax error; token: \"{expression[position:]}\"")
+        position = match.end()
+        kind = match.lastgroup
+        text = match.group()
+        if kind == "ws":
+            continue
+        if kind == "ident" and text.upper() in _KEYWORDS:
+            kind, text = "keyword", text.upper()
+        tokens.append((kind, text))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, expression: str, names: dict, values: dict):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+        self.names = names
+        self.values = values
+        self.used_names: set[str] = set()
+        self.used_values: set[str] = set()
+
+    # token helpers
+    def peek(self, offset: int = 0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise _ValidationError(f"Invalid expression: Syntax error; unexpected end of expression \"{self.expression}\"")
+        self.position += 1
+        return token
+
+    def accept(self, kind, text=None) -> bool:
+        token = self.peek()
+        if token[0] == kind and (text is None or token[1] == text):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, kind, text=None):
+        token = self.next()
+        if token[0] != kind or (text is not None and token[1] != text):
+            raise _ValidationError(f"Invalid expression: Syntax error; token: \"{token[1]}\" in \"{self.expression}\"")
+        return token
+
+    def done(self) -> bool:
+        return self.position >= len(self.tokens)
+
+    def ensure_done(self):
+        if not self.done():
+            raise _ValidationError(f"Invalid expression: Syntax error; token: \"{self.peek()[1]}\" in \"{self.expression}\"")
+
+    # operands
+    def path(self) -> tuple:
+        parts = [self._path_element()]
+        while True:
+            if self.accept("punct", "."):
+                parts.append(self._path_element())
+            elif self.accept("punct", "["):
+                parts.append(int(self.expect("number")[1]))
+                self.expect("punct", "]")
+            else:
+                return ("path", tuple(parts))
+
+    def _path_element(self) -> str:
+        kind, text = self.next()
+        if kind == "name":
+            if text not in self.names:
+                raise _ValidationError(f"Value provided in ExpressionAttributeNames unused in expressions or undefined: {text}")
+            self.used_names.add(text)
+            return self.names[text]
+        if kind == "ident":
+            return text
+        raise _ValidationError(f"Invalid expression: Syntax error; token: \"{text}\" in \"{self.expression}\"")
+
+    def value(self) -> tuple:
+        _, text = self.expect("value")
+        if text not in self.values:
+            raise _ValidationError(f"An expression attribute value used in expression is not defined; attribute value: {text}")
+        self.used_values.add(text)
+        return ("value", self.values[text])
+
+    def operand(self) -> tuple:
+        kind, text = self.peek()
+        if kind == "value":
+            return self.value()
+        if kind == "ident" and text == "size" and self.peek(1) == ("punct", "("):
+            self.next()
+            self.expect("punct", "(")
+            path = self.path()
+            self.expect("punct", ")")
+            return ("size", path)
+        return self.path()
+
+    # conditions
+    def condition(self) -> tuple:
+        node = self._and()
+        while self.accept("keyword", "OR"):
+            node = ("or", node, self._and())
+        return node
+
+    def _and(self) -> tuple:
+        node = self._not()
+        while self.accept("keyword", "AND"):
+            node = ("and", node, self._not())
+        return node
+
+    def _not(self) -> tuple:
+        if self.accept("keyword", "NOT"):
+            return ("not", self._not())
+        return self._primary()
+
+    def _primary(self) -> tuple:
+        if self.accept("punct", "("):
+            node = self.condition()
+            self.expect("punct", ")")
+            return node
+
+        kind, text = self.peek()
+        if kind == "ident" and text in _CONDITION_FUNCTIONS and self.peek(1) == ("punct", "("):
+            self.next()
+            self.expect("punct", "(")
+            path = self.path()
+            args = []
+            while self.accept("punct", ","):
+                args.append(self.operand())
+            self.expect("punct", ")")
+            return ("function", text, path, tuple(args))
+
+        left = self.operand()
+        if self.accept("keyword", "BETWEEN"):
+            low = self.operand()
+            self.expect("keyword", "AND")
+            return ("between", left, low, self.operand())
+        if self.accept("keyword", "IN"):
+            self.expect("punct", "(")
+            options = [self.operand()]
+            while self.accept("punct", ","):
+                options.append(self.operand())
+            self.expect("punct", ")")
+            return ("in", left, tuple(options))
+        _, operator = self.expect("op")
+        return ("compare", operator, left, self.operand())
+
+    # update expressions
+    def update(self) -> dict[str, list]:
+        clauses: dict[str, list] = {}
+        while not self.done():
+            _, keyword = self.expect("keyword")
+            if keyword not in ("SET", "REMOVE", "ADD", "DELETE") or keyword in clauses:
+                raise _ValidationError(f"Invalid UpdateExpression: The \"{keyword}\" section can only be used once in an update expression")
+            actions = clauses[keyword] = []
+            while True:
+                path = self.path()
+                if keyword == "SET":
+                    self.expect("op", "=")
+                    actions.append((path, self._set_value()))
+                elif keyword in ("ADD", "DELETE"):
+                    actions.append((path, self.value()))
+                else:
+                    actions.append((path, None))
+                if not self.accept("punct", ","):
+                    break
+        return clauses
+
+    def _set_value(self) -> tuple:
+        node = self._set_operand()
+        if self.accept("punct", "+"):
+            return ("plus", node, self._set_operand())
+        if self.accept("punct", "-"):
+            return ("minus", node, self._set_operand())
+        return node
+
+    def _set_operand(self) -> tuple:
+        kind, text = self.peek()
+        if kind == "ident" and text in ("if_not_exists", "list_append") and self.peek(1) == ("punct", "("):
+            self.next()
+            self.expect("punct", "(")
+            first = self.path() if text == "if_not_exists" else self._set_operand()
+            self.expect("punct", ",")
+            second = self._set_operand()
+            self.expect("punct", ")")
+            return (text, first, second)
+        if kind == "value":
+            return self.value()
+        return self.path()
+
+    def projection(self) -> list[tuple]:
+        paths = [self.path()]
+        while self.accept("punct", ","):
+            paths.append(self.path())
+        return paths
+
+
+@dataclass
+class _Expressions:
+    """Parses every expression of one request and checks that all placeholders are used."""
+    names: dict
+    values: dict
+
+    def __post_init__(self):
+        self.names = dict(self.names or {})
+        self.values = {k: _to_storage(v) for k, v in (self.values or {}).items()}
+        self._used_names: set[str] = set()
+        self._used_values: set[str] = set()
+
+    def _parse(self, expression: str, method: str):
+        parser = _Parser(expression, self.names, self.values)
+        result = getattr(parser, method)()
+        parser.ensure_done()
+        self._used_names |= parser.used_names
+        self._used_values |= parser.used_values
+        return result
+
+    def condition(self, expression: Optional[str]):
+        return self._parse(expression, "condition") if expression else None
+
+    def update(self, expression: Optional[str]):
+        return self._parse(expression, "update") if expression else {}
+
+    def projection(self, expression: Optional[str]):
+        return self._parse(expression, "projection") if expression else None
+
+    def check_all_used(self):
+        unused_names = set(self.names) - self._used_names
+        if unused_names:
+            raise _ValidationError(f"Value provided in ExpressionAttributeNames unused in expressions: keys: {{{', '.join(sorted(unused_names))}}}")
+        unused_values = set(self.values) - self._used_values
+        if unused_values:
+            raise _ValidationError(f"Value provided in ExpressionAttributeValues unused in expressions: keys: {{{', '.join(sorted(unused_values))}}}")
+
+
+def _build_condition(condition, names: Optional[dict], values: Optional[dict], is_key_condition: bool = False, builder=None):
+    """
+    Turn a boto3 condition object into an expression string, merging its placeholders.
+
+    Pass the same ``builder`` for every condition of one request so that
+    placeholders do not collide, as the boto3 resource does.
+    """
+    names = dict(names or {})
+    values = dict(values or {})
+    if isinstance(condition, ConditionBase):
+        built = (builder or ConditionExpressionBuilder()).build_expression(condition, is_key_condition=is_key_condition)
+        names.update(built.attribute_name_placeholders)
+        values.update(built.attribute_value_placeholders)
+        condition = built.condition_expression
+    return condition, names, values
+
+
+# --- Expression evaluation ---
+
+def _resolve(item: dict, path: tuple) -> Any:
+    current: Any = item
+    for part in path[1]:
+        if isinstance(part, int):
+            if not isinstance(current, list) or part >= len(current):
+                return _MISSING
+            current = current[part]
+        else:
+            if not isinstance(current, dict) or part not in current:
+                return _MISSING
+            current = current[part]
+    return current
+
+
+def _operand_value(item: dict, node: tuple) -> Any:
+    if node[0] == "value":
+        return node[1]
+    if node[0] == "path":
+        return _resolve(item, node)
+    if node[0] == "size":
+        target = _resolve(item, node[1])
+        if target is _MISSING:
+            return _MISSING
+        if isinstance(target, str):
+            return Decimal(len(target.encode("utf-8")))
+        if isinstance(target, Binary):
+            return Decimal(len(target.value))
+        if isinstance(target, (list, dict, set)):
+            return Decimal(len(target))
+        return _MISSING
+    raise _ValidationError(f"Unsupported operand {node!r}")
+
+
+def _comparable(a: Any, b: Any) -> bool:
+    return a is not _MISSING and b is not _MISSING and _type_code(a) == _type_code(b) and _type_code(a) in ("S", "N", "B")
+
+
+def _compare(operator: str, a: Any, b: Any) -> bool:
+    if a is _MISSING or b is _MISSING:
+        return False
+    if operator == "=":
+        return _type_code(a) == _type_code(b) and a == b
+    if operator == "<>":
+        return not (_type_code(a) == _type_code(b) and a == b)
+    if not _comparable(a, b):
+        return False
+    a, b = _sort_value(a), _sort_value(b)
+    return {"<": a < b, "<=": a <= b, ">": a > b, ">=": a >= b}[operator]
+
+
+def evaluate_condition(item: Optional[dict], node: Optional[tuple]) -> bool:
+    item = item or {}
+    if node is None:
+        return True
+    kind = node[0]
+    if kind == "and":
+        return evaluate_condition(item, node[1]) and evaluate_condition(item, node[2])
+    if kind == "or":
+        return evaluate_condition(item, node[1]) or evaluate_condition(item, node[2])
+    if kind == "not":
+        return not evaluate_condition(item, node[1])
+    if kind == "compare":
+        return _compare(node[1], _operand_value(item, node[2]), _operand_value(item, node[3]))
+    if kind == "between":
+        value = _operand_value(item, node[1])
+        return _compare(">=", value, _operand_value(item, node[2])) and _compare("<=", value, _operand_value(item, node[3]))
+    if kind == "in":
+        value = _operand_value(item, node[1])
+        return any(_compare("=", value, _operand_value(item, option)) for option in node[2])
+    if kind == "function":
+        name, path, args = node[1], node[2], node[3]
+        target = _resolve(item, path)
+        if name == "attribute_exists":
+            return target is not _MISSING
+        if name == "attribute_not_exists":
+            return target is _MISSING
+        if target is _MISSING:
+            return False
+        argument = _operand_value(item, args[0])
+        if name == "attribute_type":
+            return _type_code(target) == argument
+        if name == "begins_with":
+            if isinstance(target, str) and isinstance(argument, str):
+                return target.startswith(argument)
+            if isinstance(target, Binary) and isinstance(argument, Binary):
+                return target.value.startswith(argument.value)
+            return False
+        if name == "contains":
+            if isinstance(target, str) and isinstance(argument, str):
+                return argument in target
+            if isinstance(target, (set, list)):
+                return argument in target
+            return False
+    raise _ValidationError(f"Unsupported condition {node!r}")
+
+
+def _set_path(item: dict, path: tuple, value: Any):
+    parts = path[1]
+    current: Any = item
+    for part in parts[:-1]:
+        current = current[part] if isinstance(part, int) else current.get(part, _MISSING)
+        if current is _MISSING:
+            raise _ValidationError("The document path provided in the update expression is invalid for update")
+    last = parts[-1]
+    if isinstance(last, int):
+        if last >= len(current):
+            current.append(value)
+        else:
+            current[last] = value
+    else:
+        current[last] = value
+
+
+def _remove_path(item: dict, path: tuple):
+    parts = path[1]
+    current: Any = item
+    for part in parts[:-1]:
+        current = current[part] if isinstance(part, int) else current.get(part, _MISSING)
+        if current is _MISSING:
+            return
+    last = parts[-1]
+    if isinstance(last, int):
+        if last < len(current):
+            del current[last]
+    else:
+        current.pop(last, None)
+
+
+def _set_value(item: dict, node: tuple) -> Any:
+    kind = node[0]
+    if kind in ("value", "path"):
+        value = _operand_value(item, node)
+        if value is _MISSING:
+            raise _ValidationError("The provided expression refers to an attribute that does not exist in the item")
+        return copy.deepcopy(value)
+    if kind == "if_not_exists":
+        existing = _resolve(item, node[1])
+        return copy.deepcopy(existing) if existing is not _MISSING else _set_value(item, node[2])
+    if kind == "list_append":
+        first, second = _set_value(item, node[1]), _set_value(item, node[2])
+        if not isinstance(first, list) or not isinstance(second, list):
+            raise _ValidationError("An operand in the update expression has an incorrect data type")
+        return first + second
+    if kind in ("plus", "minus"):
+        first, second = _set_value(item, node[1]), _set_value(item, node[2])
+        if not isinstance(first, Decimal) or not isinstance(second, Decimal):
+            raise _ValidationError("An operand in the update expression has an incorrect data type")
+        return first + second if kind == "plus" else first - second
+    raise _ValidationError(f"Unsupported update value {node!r}")
+
+
+def apply_update(item: dict, clauses: dict[str, list], key_attributes: tuple[str, ...]) -> dict:
+    """Apply a parsed UpdateExpression to a copy of ``item`` and return the new item."""
+    touched = []
+    for actions in clauses.values():
+        for path, _ in actions:
+            if path[1][0] in key_attributes:
+                raise _ValidationError(f"One or more parameter values were invalid: Cannot update attribute {path[1][0]}. This attribute is part of the key")
+            touched.append(path[1])
+    for i, first in enumerate(touched):
+        for second in touched[i + 1:]:
+            shorter = min(len(first), len(second))
+            if first[:shorter] == second[:shorter]:
+                raise _ValidationError(f"Invalid UpdateExpression: Two document paths overlap with each other; must remove or rewrite one of these paths; path one: {list(first)}, path two: {list(second)}")
+
+    # every SET operand is evaluated against the item as it was before the update
+    new_values = [(path, _set_value(item, value)) for path, value in clauses.get("SET", [])]
+    updated = copy.deepcopy(item)
+
+    for path, value in new_values:
+        _set_path(updated, path, value)
+    for path, _ in clauses.get("REMOVE", []):
+        _remove_path(updated, path)
+    for path, value_node in clauses.get("ADD", []):
+        increment = value_node[1]
+        existing = _resolve(updated, path)
+        if isinstance(increment, Decimal):
+            if existing is _MISSING:
+                _set_path(updated, path, increment)
+            elif isinstance(existing, Decimal):
+                _set_path(updated, path, existing + increment)
+            else:
+                raise _ValidationError("An operand in the update expression has an incorrect data type")
+        elif isinstance(increment, set):
+            if existing is _MISSING:
+                _set_path(updated, path, set(increment))
+            elif isinstance(existing, set) and _type_code(existing) == _type_code(increment):
+                _set_path(updated, path, existing | increment)
+            else:
+                raise _ValidationError("An operand in the update expression has an incorrect data type")
+        else:
+            raise _ValidationError("Incorrect operand type for operator or function; operator: ADD, operand type: " + _type_code(increment))
+    for path, value_node in clauses.get("DELETE", []):
+        existing = _resolve(updated, path)
+        if existing is _MISSING:
+            continue
+        if not isinstance(existing, set) or not isinstance(value_node[1], set):
+            raise _ValidationError("An operand in the update expression has an incorrect data type")
+        remaining = existing - value_node[1]
+        if remaining:
+            _set_path(updated, path, remaining)
+        else:
+            _remove_path(updated, path)
+    return updated
+
+
+def _project(item: dict, paths: Optional[list[tuple]]) -> dict:
+    if paths is None:
+        return item
+    projected: dict = {}
+    for path in paths:
+        value = _resolve(item, path)
+        if value is _MISSING:
+            continue
+        parts = path[1]
+        current = projected
+        for part in parts[:-1]:
+            current = current.setdefault(part, {})
+        current[parts[-1]] = value
+    return projected
+
+
+# --- Tables ---
+
+class _TableState:
+    def __init__(self, name: str, schema: TableSchema):
+        self.name = name
+        self.schema = schema
+        self.items: dict[tuple, dict] = {}
+        self._index_cache: dict[str, dict] = {}
+
+    def key_of(self, key: dict) -> tuple:
+        try:
+            return tuple(key[attribute] for attribute in self.schema.key.attributes)
+        except KeyError as e:
+            raise _ValidationError(f"The provided key element does not match the schema: missing {e.args[0]}")
+
+    def validate_key(self, key: dict, exact: bool = True):
+        if exact and set(key) != set(self.schema.key.attributes):
+            raise _ValidationError("The provided key element does not match the schema")
+        self._validate_key_values(key, self.schema.key.attributes)
+
+    def _validate_key_values(self, item: dict, attributes: tuple[str, ...], required: bool = True):
+        for attribute in attributes:
+            if attribute not in item:
+                if required:
+                    raise _ValidationError(f"One or more parameter values were invalid: Missing the key {attribute} in the item")
+                continue
+            value = item[attribute]
+            expected = self.schema.attribute_types.get(attribute, "S")
+            if _type_code(value) != expected:
+                raise _ValidationError(f"One or more parameter values were invalid: Type mismatch for key {attribute} expected: {expected} actual: {_type_code(value)}")
+            if expected == "S" and value == "":
+                raise _ValidationError(f"One or more parameter values are not valid. The AttributeValue for a key attribute cannot contain an empty string value. Key: {attribute}")
+
+    def validate_item(self, item: dict):
+        self._validate_key_values(item, self.schema.key.attributes)
+        for index in self.schema.indexes.values():
+            self._validate_key_values(item, index.attributes, required=False)
+        if item_size(item) > 400 * 1024:
+            raise _ValidationError("Item size has exceeded the maximum allowed size")
+
+    def get(self, key: dict) -> Optional[dict]:
+        return self.items.get(self.key_of(key))
+
+    def put(self, item: dict):
+        self.validate_item(item)
+        self.items[self.key_of(item)] = item
+        self._index_cache.clear()
+
+    def delete(self, key: dict):
+        if self.items.pop(self.key_of(key), None) is not None:
+            self._index_cache.clear()
+
+    def partition(self, index_name: Optional[str], hash_value: Any) -> list[dict]:
+        """Items of one partition, in sort order (ties broken by table key)."""
+        if index_name is None:
+            schema = self.schema.key
+        elif index_name in self.schema.indexes:
+            schema = self.schema.indexes[index_name]
+        else:
+            raise _ValidationError(f"The table does not have the specified index: {index_name}")
+
+        cache_key = index_name or ""
+        partitions = self._index_cache.get(cache_key)
+        if partitions is None:
+            partitions = defaultdict(list)
+            for item in self.items.values():
+                if all(attribute in item for attribute in schema.attributes):
+                    partitions[item[schema.hash_key]].append(item)
+            for members in partitions.values():
+                members.sort(key=lambda item: self.position(item, schema))
+            self._index_cache[cache_key] = partitions
+        return partitions.get(hash_value, [])
+
+    def position(self, item: dict, schema: KeySchema) -> tuple:
+        range_value = _sort_value(item[schema.range_key]) if schema.range_key else ""
+        return (range_value, *(_sort_value(item[a]) for a in self.schema.key.attributes))
+
+    def last_evaluated_key(self, item: dict, schema: KeySchema) -> dict:
+        attributes = dict.fromkeys(self.schema.key.attributes + schema.attributes)
+        return {attribute: item[attribute] for attribute in attributes}
+
+
+class FakeTable:
+    """A handle on one fake table, mirroring ``boto3.resource("dynamodb").Table``."""
+
+    def __init__(self, resource: "FakeDynamoDB", name: str):
+        self._resource = resource
+        self.name = name
+        self.table_name = name
+        self.meta = SimpleNamespace(client=resource.meta.client)
+
+    def _call(self, operation: str, **kwargs):
+        return getattr(self.meta.client, operation)(TableName=self.name, **kwargs)
+
+    def get_item(self, **kwargs):
+        return self._call("get_item", **kwargs)
+
+    def put_item(self, **kwargs):
+        return self._call("put_item", **kwargs)
+
+    def update_item(self, **kwargs):
+        return self._call("update_item", **kwargs)
+
+    def delete_item(self, **kwargs):
+        return self._call("delete_item", **kwargs)
+
+    def query(self, **kwargs):
+        return self._call("query", **kwargs)
+
+    def scan(self, **kwargs):
+        return self._call("scan", **kwargs)
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return _BatchWriter(self, overwrite_by_pkeys)
+
+    @property
+    def item_count(self) -> int:
+        return len(self._resource._table(self.name).items)
+
+    def all_items(self) -> list[dict]:
+        """Every stored item, in table key order (test helper, not a boto3 API)."""
+        state = self._resource._table(self.name)
+        return [copy.deepcopy(state.items[key]) for key in sorted(state.items, key=lambda k: tuple(map(_sort_value, k)))]
+
+
+class _BatchWriter:
+    """Buffers puts and deletes into BatchWriteItem calls of 25, like boto3's BatchWriter."""
+
+    def __init__(self, table: FakeTable, overwrite_by_pkeys=None):
+        self._table = table
+        self._overwrite_by_pkeys = overwrite_by_pkeys
+        self._buffer: list[dict] = []
+
+    def put_item(self, Item):
+        self._add({"PutRequest": {"Item": Item}})
+
+    def delete_item(self, Key):
+        self._add({"DeleteRequest": {"Key": Key}})
+
+    def _add(self, request: dict):
+        if self._overwrite_by_pkeys:
+            body = request.get("PutRequest", {}).get("Item") or request["DeleteRequest"]["Key"]
+            new_key = [body.get(k) for k in self._overwrite_by_pkeys]
+            self._buffer = [
+                existing for existing in self._buffer
+                if [(existing.get("PutRequest", {}).get("Item") or existing["DeleteRequest"]["Key"]).get(k) for k in self._overwrite_by_pkeys] != new_key
+            ]
+        self._buffer.append(request)
+        if len(self._buffer) >= MAX_BATCH_WRITE_ITEMS:
+            self._flush()
+
+    def _flush(self):
+        while self._buffer:
+            batch, self._buffer = self._buffer[:MAX_BATCH_WRITE_ITEMS], self._buffer[MAX_BATCH_WRITE_ITEMS:]
+            response = self._table.meta.client.batch_write_item(RequestItems={self._table.name: batch})
+            self._buffer.extend(response.get("UnprocessedItems", {}).get(self._table.name, []))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._flush()
+
+
+# --- Client and resource ---
+
+@dataclass
+class _Fault:
+    kind: str
+    remaining: int
+    code: Optional[str] = None
+    message: Optional[str] = None
+    count: int = 0
+
+
+class FakeDynamoDBClient:
+    """Mirrors the subset of ``boto3.client("dynamodb")`` used by the project (resource-style values)."""
+
+    exceptions = EXCEPTIONS
+
+    def __init__(self, resource: "FakeDynamoDB"):
+        self._resource = resource
+
+    def __getattr__(self, name):
+        raise AttributeError(f"FakeDynamoDBClient does not implement {name}")
+
+    # fault handling
+    def _begin(self, operation: str) -> Optional[_Fault]:
+        self._resource.calls[operation] += 1
+        faults = self._resource._faults.get(operation)
+        if not faults:
+            return None
+        fault = faults[0]
+        fault.remaining -= 1
+        if fault.remaining <= 0:
+            faults.pop(0)
+        if fault.kind == "error":
+            raise getattr(EXCEPTIONS, fault.code, _error_class(fault.code))(fault.message or f"Injected {fault.code}", _operation_name(operation))
+        if fault.kind == "transaction_conflict":
+            raise _transaction_cancelled(["TransactionConflict"] * fault.count, [None] * fault.count)
+        return fault
+
+    def _run(self, operation: str, handler, *args, **kwargs):
+        with self._resource._lock:
+            fault = self._begin(operation)
+            try:
+                return handler(fault, *args, **kwargs)
+            except _ValidationError as e:
+                raise EXCEPTIONS.ValidationException(str(e), _operation_name(operation))
+
+    # single item operations
+    def get_item(self, TableName, Key, ProjectionExpression=None, ExpressionAttributeNames=None, ConsistentRead=False, **_):
+        def handler(fault):
+            table = self._resource._table(TableName)
+            table.validate_key(Key)
+            expressions = _Expressions(ExpressionAttributeNames, None)
+            projection = expressions.projection(ProjectionExpression)
+            expressions.check_all_used()
+            item = table.get(Key)
+            return {"Item": copy.deepcopy(_project(item, projection))} if item is not None else {}
+        return self._run("get_item", handler)
+
+    def put_item(self, TableName, Item, ConditionExpression=None, ExpressionAttributeNames=None, ExpressionAttributeValues=None,
+                 ReturnValues="NONE", ReturnValuesOnConditionCheckFailure="NONE", **_):
+        def handler(fault):
+            table = self._resource._table(TableName)
+            item = _to_storage(Item)
+            condition, names, values = _build_condition(ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+            expressions = _Expressions(names, values)
+            parsed = expressions.condition(condition)
+            expressions.check_all_used()
+            table.validate_item(item)
+            old = table.get(item)
+            _check_condition(old, parsed, ReturnValuesOnConditionCheckFailure, "PutItem")
+            table.put(item)
+            return {"Attributes": copy.deepcopy(old)} if ReturnValues == "ALL_OLD" and old else {}
+        return self._run("put_item", handler)
+
+    def update_item(self, TableName, Key, UpdateExpression=None, ConditionExpression=None, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ReturnValues="NONE", ReturnValuesOnConditionCheckFailure="NONE", **_):
+        def handler(fault):
+            table = self._resource._table(TableName)
+            key = _to_storage(Key)
+            table.validate_key(key)
+            condition, names, values = _build_condition(ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+            expressions = _Expressions(names, values)
+            clauses = expressions.update(UpdateExpression)
+            parsed = expressions.condition(condition)
+            expressions.check_all_used()
+            old = table.get(key)
+            _check_condition(old, parsed, ReturnValuesOnConditionCheckFailure, "UpdateItem")
+            new = apply_update(old or dict(key), clauses, table.schema.key.attributes)
+            table.put(new)
+            return _return_values(ReturnValues, old, new, clauses)
+        return self._run("update_item", handler)
+
+    def delete_item(self, TableName, Key, ConditionExpression=None, ExpressionAttributeNames=None, ExpressionAttributeValues=None,
+                    ReturnValues="NONE", ReturnValuesOnConditionCheckFailure="NONE", **_):
+        def handler(fault):
+            table = self._resource._table(TableName)
+            key = _to_storage(Key)
+            table.validate_key(key)
+            condition, names, values = _build_condition(ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+            expressions = _Expressions(names, values)
+            parsed = expressions.condition(condition)
+            expressions.check_all_used()
+            old = table.get(key)
+            _check_condition(old, parsed, ReturnValuesOnConditionCheckFailure, "DeleteItem")
+            table.delete(key)
+            return {"Attributes": copy.deepcopy(old)} if ReturnValues == "ALL_OLD" and old else {}
+        return self._run("delete_item", handler)
+
+    # reads
+    def query(self, TableName, KeyConditionExpression, IndexName=None, FilterExpression=None, ProjectionExpression=None,
+              ExpressionAttributeNames=None, ExpressionAttributeValues=None, Limit=None, ExclusiveStartKey=None,
+              ScanIndexForward=True, Select=None, ConsistentRead=False, **_):
+        def handler(fault):
+            table = self._resource._table(TableName)
+            if ConsistentRead and IndexName:
+                raise _ValidationError("Consistent reads are not supported on global secondary indexes")
+            builder = ConditionExpressionBuilder()
+            key_condition, names, values = _build_condition(KeyConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues, is_key_condition=True, builder=builder)
+            filter_condition, names, values = _build_condition(FilterExpression, names, values, builder=builder)
+            expressions = _Expressions(names, values)
+            parsed_key = expressions.condition(key_condition)
+            parsed_filter = expressions.condition(filter_condition)
+            projection = expressions.projection(ProjectionExpression)
+            expressions.check_all_used()
+
+            schema = table.schema.indexes[IndexName] if IndexName in table.schema.indexes else table.schema.key
+            hash_value, range_condition = _split_key_condition(parsed_key, schema)
+            candidates = [item for item in table.partition(IndexName, hash_value) if evaluate_condition(item, range_condition)]
+            if not ScanIndexForward:
+                candidates.reverse()
+            return self._page(table, schema, candidates, parsed_filter, projection, Limit, ExclusiveStartKey, ScanIndexForward, Select)
+        return self._run("query", handler)
+
+    def scan(self, TableName, IndexName=None, FilterExpression=None, ProjectionExpression=None, ExpressionAttributeNames=None,
+             ExpressionAttributeValues=None, Limit=None, ExclusiveStartKey=None, Select=None, **_):
+        def handler(fault):
+            table = self._resource._table(TableName)
+            filter_condition, names, values = _build_condition(FilterExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+            expressions = _Expressions(names, values)
+            parsed_filter = expressions.condition(filter_condition)
+            projection = expressions.projection(ProjectionExpression)
+            expressions.check_all_used()
+
+            schema = table.schema.indexes[IndexName] if IndexName else table.schema.key
+            candidates = [item for item in table.items.values() if all(a in item for a in schema.attributes)]
+            candidates.sort(key=lambda item: (_sort_value(item[schema.hash_key]), *table.position(item, schema)))
+            return self._page(table, schema, candidates, parsed_filter, projection, Limit, ExclusiveStartKey, True, Select, scan=True)
+        return self._run("scan", handler)
+
+    def _page(self, table, schema, candidates, parsed_filter, projection, limit, exclusive_start_key, forward, select, scan=False):
+        if exclusive_start_key:
+            start = _to_storage(exclusive_start_key)
+            start_position = ((_sort_value(start[schema.hash_key]),) if scan else ()) + table.position(start, schema)
+            def after_start(item):
+                position = ((_sort_value(item[schema.hash_key]),) if scan else ()) + table.position(item, schema)
+                return position > start_position if forward else position < start_position
+            candidates = [item for item in candidates if after_start(item)]
+
+        items, scanned, size, last = [], 0, 0, None
+        for item in candidates:
+            scanned += 1
+            size += item_size(item)
+            if evaluate_condition(item, parsed_filter):
+                items.append(copy.deepcopy(_project(item, projection)))
+            if (limit and scanned >= limit) or size >= self._resource.page_size_bytes:
+                last = item
+                break
+
+        response = {"Count": len(items), "ScannedCount": scanned}
+        if select != "COUNT":
+            response["Items"] = items
+        if last is not None:
+            response["LastEvaluatedKey"] = table.last_evaluated_key(last, schema)
+        return response
+
+    # batches
+    def batch_write_item(self, RequestItems, **_):
+        def handler(fault):
+            requests = [(table_name, request) for table_name, table_requests in RequestItems.items() for request in table_requests]
+            if not requests or len(requests) > MAX_BATCH_WRITE_ITEMS:
+                raise _ValidationError("Too many items requested for the BatchWriteItem call" if requests else "The batch write request list is empty")
+
+            prepared, seen = [], set()
+            for table_name, request in requests:
+                table = self._resource._table(table_name)
+                if "PutRequest" in request:
+                    item = _to_storage(request["PutRequest"]["Item"])
+                    table.validate_item(item)
+                    key = table.key_of(item)
+                else:
+                    item = None
+                    key_dict = _to_storage(request["DeleteRequest"]["Key"])
+                    table.validate_key(key_dict)
+                    key = table.key_of(key_dict)
+                if (table_name, key) in seen:
+                    raise _ValidationError("Provided list of item keys contains duplicates")
+                seen.add((table_name, key))
+                prepared.append((table_name, table, request, item, key))
+
+            unprocessed = defaultdict(list)
+            skip = fault.count if fault and fault.kind == "unprocessed" else 0
+            processed = prepared[:len(prepared) - skip] if skip else prepared
+            for table_name, table, request, item, key in prepared[len(processed):]:
+                unprocessed[table_name].append(request)
+            for table_name, table, request, item, key in processed:
+                if item is not None:
+                    table.put(item)
+                else:
+                    table.items.pop(key, None)
+                    table._index_cache.clear()
+            return {"UnprocessedItems": dict(unprocessed)}
+        return self._run("batch_write_item", handler)
+
+    def batch_get_item(self, RequestItems, **_):
+        def handler(fault):
+            keys = [(table_name, key, request) for table_name, request in RequestItems.items() for key in request.get("Keys", [])]
+            if not keys or len(keys) > MAX_BATCH_GET_KEYS:
+                raise _ValidationError("Too many items requested for the BatchGetItem call" if keys else "The requested key list is empty")
+
+            seen = set()
+            for table_name, key, _request in keys:
+                table = self._resource._table(table_name)
+                table.validate_key(_to_storage(key))
+                if (table_name, table.key_of(key)) in seen:
+                    raise _ValidationError("Provided list of item keys contains duplicates")
+                seen.add((table_name, table.key_of(key)))
+
+            skip = fault.count if fault and fault.kind == "unprocessed" else 0
+            processed = keys[:len(keys) - skip] if skip else keys
+            responses, unprocessed = defaultdict(list), {}
+            for table_name, key, request in keys[len(processed):]:
+                entry = unprocessed.setdefault(table_name, {k: v for k, v in request.items() if k != "Keys"})
+                entry.setdefault("Keys", []).append(key)
+            for table_name, key, request in processed:
+                table = self._resource._table(table_name)
+                expressions = _Expressions(request.get("ExpressionAttributeNames"), None)
+                projection = expressions.projection(request.get("ProjectionExpression"))
+                item = table.get(_to_storage(key))
+                if item is not None:
+                    responses[table_name].append(copy.deepcopy(_project(item, projection)))
+            return {"Responses": dict(responses), "UnprocessedKeys": unprocessed}
+        return self._run("batch_get_item", handler)
+
+    def transact_write_items(self, TransactItems, ClientRequestToken=None, **_):
+        def handler(fault):
+            if not TransactItems or len(TransactItems) > MAX_TRANSACT_ITEMS:
+                raise _ValidationError(f"Member must have length less than or equal to {MAX_TRANSACT_ITEMS}" if TransactItems else "TransactItems must not be empty")
+
+            planned, seen = [], set()
+            for entry in TransactItems:
+                (action, request), = entry.items()
+                table = self._resource._table(request["TableName"])
+                if action == "Put":
+                    key_source = _to_storage(request["Item"])
+                else:
+                    key_source = _to_storage(request["Key"])
+                    table.validate_key(key_source)
+                key = table.key_of(key_source)
+                if (table.name, key) in seen:
+                    raise _ValidationError("Transaction request cannot include multiple operations on one item")
+                seen.add((table.name, key))
+                planned.append((action, request, table, key_source))
+
+            reasons, old_items, results = [], [], []
+            for action, request, table, key_source in planned:
+                old = table.get(key_source)
+                old_items.append(old)
+                try:
+                    condition, names, values = _build_condition(
+                        request.get("ConditionExpression"), request.get("ExpressionAttributeNames"), request.get("ExpressionAttributeValues")
+                    )
+                    expressions = _Expressions(names, values)
+                    clauses = expressions.update(request.get("UpdateExpression")) if action == "Update" else None
+                    parsed = expressions.condition(condition)
+                    expressions.check_all_used()
+                    if action == "ConditionCheck" and parsed is None:
+                        raise _ValidationError("ConditionCheck requires a ConditionExpression")
+                    if not evaluate_condition(old, parsed):
+                        reasons.append("ConditionalCheckFailed")
+                        results.append(None)
+                        continue
+                    if action == "Put":
+                        table.validate_item(key_source)
+                        results.append(key_source)
+                    elif action == "Update":
+                        new = apply_update(old or dict(key_source), clauses, table.schema.key.attributes)
+                        table.validate_item(new)
+                        results.append(new)
+                    else:
+                        results.append(None)
+                    reasons.append("None")
+                except _ValidationError as e:
+                    if len(planned) == 1:
+                        raise
+                    reasons.append("ValidationError")
+                    results.append(str(e))
+
+            if any(reason != "None" for reason in reasons):
+                failed_items = [
+                    old if reason == "ConditionalCheckFailed" and request.get("ReturnValuesOnConditionCheckFailure") == "ALL_OLD" else None
+                    for reason, old, (_, request, _, _) in zip(reasons, old_items, planned)
+                ]
+                raise _transaction_cancelled(reasons, failed_items)
+
+            for (action, request, table, key_source), result in zip(planned, results):
+                if action == "Delete":
+                    table.delete(key_source)
+                elif action in ("Put", "Update"):
+                    table.put(result)
+            return {}
+        return self._run("transact_write_items", handler)
+
+
+def _operation_name(operation: str) -> str:
+    return "".join(part.capitalize() for part in operation.split("_"))
+
+
+def _check_condition(old: Optional[dict], parsed, return_on_failure: str, operation: str):
+    if evaluate_condition(old, parsed):
+        return
+    extra = {"Item": to_low_level(old)} if return_on_failure == "ALL_OLD" and old else {}
+    raise EXCEPTIONS.ConditionalCheckFailedException("The conditional request failed", operation, **extra)
+
+
+def _transaction_cancelled(reasons: list[str], old_items: list[Optional[dict]]):
+    cancellation_reasons = []
+    for reason, old in zip(reasons, old_items):
+        entry = {"Code": reason}
+        if reason == "ConditionalCheckFailed":
+            entry["Message"] = "The conditional request failed"
+        elif reason == "TransactionConflict":
+            entry["Message"] = "Transaction is ongoing for the item"
+        if old:
+            entry["Item"] = to_low_level(old)
+        cancellation_reasons.append(entry)
+    message = f"Transaction cancelled, please refer cancellation reasons for specific reasons [{', '.join(reasons)}]"
+    return EXCEPTIONS.TransactionCanceledException(message, "TransactWriteItems", CancellationReasons=cancellation_reasons)
+
+
+def _return_values(return_values: str, old: Optional[dict], new: dict, clauses: dict) -> dict:
+    if return_values in (None, "NONE"):
+        return {}
+    if return_values == "ALL_NEW":
+        return {"Attributes": copy.deepcopy(new)}
+    if return_values == "ALL_OLD":
+        return {"Attributes": copy.deepcopy(old)} if old else {}
+    updated = {path[1][0] for actions in clauses.values() for path, _ in actions}
+    source = new if return_values == "UPDATED_NEW" else (old or {})
+    return {"Attributes": {k: copy.deepcopy(v) for k, v in source.items() if k in updated}}
+
+
+def _split_key_condition(node: Optional[tuple], schema: KeySchema) -> tuple[Any, Optional[tuple]]:
+    """Return the hash key value and the (optional) sort key condition of a KeyConditionExpression."""
+    terms = []
+
+    def flatten(current):
+        if current[0] == "and":
+            flatten(current[1])
+            flatten(current[2])
+        else:
+            terms.append(current)
+
+    if node is None:
+        raise _ValidationError("Either the KeyConditions or KeyConditionExpression parameter must be specified in the request")
+    flatten(node)
+
+    def attribute(term):
+        target = term[2] if term[0] in ("compare", "function") else term[1]
+        if term[0] == "compare" and target[0] != "path":
+            target = term[3]
+        return target[1][0] if target[0] == "path" else None
+
+    hash_terms = [t for t in terms if t[0] == "compare" and t[1] == "=" and attribute(t) == schema.hash_key]
+    range_terms = [t for t in terms if t not in hash_terms]
+    if len(hash_terms) != 1 or len(range_terms) > 1:
+        raise _ValidationError("Query condition missed key schema element: " + schema.hash_key)
+    if range_terms:
+        term = range_terms[0]
+        allowed = (term[0] == "compare" and term[1] != "<>") or term[0] == "between" or (term[0] == "function" and term[1] == "begins_with")
+        if not allowed or attribute(term) != schema.range_key:
+            raise _ValidationError("Query key condition not supported")
+
+    hash_term = hash_terms[0]
+    hash_value = hash_term[3][1] if hash_term[3][0] == "value" else hash_term[2][1]
+    return hash_value, (range_terms[0] if range_terms else None)
+
+
+class FakeDynamoDB:
+    """
+    In-memory stand-in for ``boto3.resource("dynamodb")``.
+
+    Parameters
+    ----------
+    default_schema : TableSchema, optional
+        Schema for tables that were not created explicitly. Defaults to the
+        organisation table definition, so any ``ORG_TABLE_NAME_TEMPLATE``
+        name just works.
+    page_size_bytes : int, optional
+        Query/Scan page size. Defaults to DynamoDB's 1 MB.
+    """
+
+    def __init__(self, default_schema: Optional[TableSchema] = None, page_size_bytes: int = ONE_MB):
+        self.default_schema = default_schema or org_table_schema()
+        self.page_size_bytes = page_size_bytes
+        self.calls: Counter = Counter()
+        self._tables: dict[str, _TableState] = {}
+        self._faults: dict[str, list[_Fault]] = defaultdict(list)
+        self._lock = threading.RLock()
+        self.meta = SimpleNamespace(client=None)
+        self.meta.client = FakeDynamoDBClient(self)
+
+    def create_table(self, name: str, schema: Optional[TableSchema] = None) -> FakeTable:
+        with self._lock:
+            if name in self._tables:
+                raise EXCEPTIONS.ValidationException(f"Table already exists: {name}", "CreateTable")
+            self._tables[name] = _TableState(name, schema or self.default_schema)
+        return FakeTable(self, name)
+
+    def Table(self, name: str) -> FakeTable:
+        with self._lock:
+            if name not in self._tables:
+                self._tables[name] = _TableState(name, self.default_schema)
+        return FakeTable(self, name)
+
+    def _table(self, name: str) -> _TableState:
+        try:
+            return self._tables[name]
+        except KeyError:
+            raise EXCEPTIONS.ResourceNotFoundException("Requested resource not found", "DescribeTable")
+
+    # fault injection
+    def inject_error(self, operation: str, code: str = "ProvisionedThroughputExceededException", times: int = 1, message: Optional[str] = None):
+        """Make the next ``times`` calls of ``operation`` raise ``code``."""
+        self._faults[operation].append(_Fault("error", times, code=code, message=message))
+
+    def inject_unprocessed(self, operation: str, count: int, times: int = 1):
+        """Leave the last ``count`` requests of the next ``times`` batch calls unprocessed."""
+        if operation not in ("batch_write_item", "batch_get_item"):
+            raise ValueError("Unprocessed items can only be injected into batch_write_item or batch_get_item")
+        self._faults[operation].append(_Fault("unprocessed", times, count=count))
+
+    def inject_transaction_conflict(self, items: int, times: int = 1):
+        """Cancel the next ``times`` transactions with TransactionConflict for ``items`` items."""
+        self._faults["transact_write_items"].append(_Fault("transaction_conflict", times, count=items))
+
+    def reset_calls(self):
+        self.calls.clear()
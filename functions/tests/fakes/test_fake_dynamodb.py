@@ -0,0 +1,363 @@
+import pytest
+from decimal import Decimal
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from tests.fakes.fake_dynamodb import (
+    core_table_schema,
+    item_size,
+    org_table_schema,
+)
+
+TABLE_NAME = "dev-org-demo"
+
+def _ticket(n, event="EVENT#e1", **extra):
+    return {
+        "PK": f"TICKET#{n:03d}",
+        "SK": f"TICKET#{n:03d}",
+        "entity_type": "TICKET",
+        "gsi1PK": f"TICKETS#{event}",
+        "gsi1SK": f"TICKET#{n:03d}",
+        **extra,
+    }
+
+# --- schema ---
+def test_org_schema_is_loaded_from_cloudformation():
+    schema = org_table_schema()
+
+    assert schema.key.attributes == ("PK", "SK")
+    assert set(schema.indexes) == {"IDXinv", "gsi1", "gsi1inv", "gsi2", "gsi2inv", "typeIDX"}
+    assert schema.indexes["IDXinv"].attributes == ("SK", "PK")
+    assert schema.indexes["typeIDX"].attributes == ("entity_type", "PK")
+
+def test_core_schema_matches_org_schema():
+    assert core_table_schema() == org_table_schema()
+
+# --- items and values ---
+def test_put_get_round_trip_returns_resource_types(table):
+    table.put_item(Item={"PK": "A", "SK": "B", "count": 3, "price": Decimal("9.99"), "tags": {"x"}, "data": b"\x00"})
+
+    item = table.get_item(Key={"PK": "A", "SK": "B"})["Item"]
+
+    assert item["count"] == Decimal(3) and isinstance(item["count"], Decimal)
+    assert item["tags"] == {"x"}
+    assert item["data"].value == b"\x00"
+
+def test_get_item_returns_copies(table):
+    table.put_item(Item={"PK": "A", "SK": "B", "nested": {"a": 1}})
+
+    table.get_item(Key={"PK": "A", "SK": "B"})["Item"]["nested"]["a"] = 2
+
+    assert table.get_item(Key={"PK": "A", "SK": "B"})["Item"]["nested"]["a"] == 1
+
+def test_put_rejects_floats_like_boto3(table):
+    with pytest.raises(TypeError):
+        table.put_item(Item={"PK": "A", "SK": "B", "price": 9.99})
+
+@pytest.mark.parametrize("item", [
+    {"PK": "A"},
+    {"PK": "A", "SK": ""},
+    {"PK": "A", "SK": 1},
+    {"PK": "A", "SK": "B", "gsi1PK": 5},
+])
+def test_put_validates_key_attributes(fake, table, item):
+    with pytest.raises(fake.meta.client.exceptions.ValidationException):
+        table.put_item(Item=item)
+
+def test_missing_get_item_returns_no_item(table):
+    assert "Item" not in table.get_item(Key={"PK": "A", "SK": "B"})
+
+def test_item_size_counts_names_and_values():
+    assert item_size({"PK": "abc"}) == 5
+    assert item_size({"n": Decimal(12345)}) == 1 + 4
+
+# --- update expressions ---
+def test_update_set_add_remove_and_return_values(table):
+    table.put_item(Item={"PK": "A", "SK": "B", "sold": 1, "tags": {"a"}, "note": "x"})
+
+    result = table.update_item(
+        Key={"PK": "A", "SK": "B"},
+        UpdateExpression="SET #name = :name, #created = if_not_exists(#created, :now), #list = list_append(if_not_exists(#list, :empty), :one) ADD #sold :two, #tags :tag REMOVE #note",
+        ExpressionAttributeNames={"#name": "name", "#created": "created_at", "#list": "history", "#sold": "sold", "#tags": "tags", "#note": "note"},
+        ExpressionAttributeValues={":name": "n", ":now": "t", ":empty": [], ":one": ["h"], ":two": 2, ":tag": {"b"}},
+        ReturnValues="ALL_NEW",
+    )
+
+    assert result["Attributes"] == {
+        "PK": "A", "SK": "B", "name": "n", "created_at": "t", "history": ["h"], "sold": Decimal(3), "tags": {"a", "b"},
+    }
+
+def test_update_set_arithmetic_reads_the_original_item(table):
+    table.put_item(Item={"PK": "A", "SK": "B", "a": 1, "b": 10})
+
+    table.update_item(
+        Key={"PK": "A", "SK": "B"},
+        UpdateExpression="SET a = b + :one, b = a - :one",
+        ExpressionAttributeValues={":one": 1},
+    )
+
+    item = table.get_item(Key={"PK": "A", "SK": "B"})["Item"]
+    assert (item["a"], item["b"]) == (Decimal(11), Decimal(0))
+
+def test_update_creates_missing_item(table):
+    table.update_item(Key={"PK": "A", "SK": "B"}, UpdateExpression="ADD #c :one", ExpressionAttributeNames={"#c": "c"}, ExpressionAttributeValues={":one": 1})
+
+    assert table.get_item(Key={"PK": "A", "SK": "B"})["Item"] == {"PK": "A", "SK": "B", "c": Decimal(1)}
+
+@pytest.mark.parametrize("kwargs", [
+    dict(UpdateExpression="SET PK = :v", ExpressionAttributeValues={":v": "x"}),
+    dict(UpdateExpression="SET a = :v, a = :v", ExpressionAttributeValues={":v": "x"}),
+    dict(UpdateExpression="SET a = :v", ExpressionAttributeValues={":v": "x", ":unused": "y"}),
+    dict(UpdateExpression="SET a = :v", ExpressionAttributeNames={"#unused": "b"}, ExpressionAttributeValues={":v": "x"}),
+    dict(UpdateExpression="SET a = :missing", ExpressionAttributeValues={":v": "x"}),
+    dict(UpdateExpression="ADD a :v", ExpressionAttributeValues={":v": "x"}),
+    dict(UpdateExpression="SET a = :v SET b = :v", ExpressionAttributeValues={":v": "x"}),
+])
+def test_update_validation_errors(fake, table, kwargs):
+    with pytest.raises(fake.meta.client.exceptions.ValidationException):
+        table.update_item(Key={"PK": "A", "SK": "B"}, **kwargs)
+
+def test_conditional_check_failure_returns_low_level_old_item(fake, table):
+    table.put_item(Item={"PK": "A", "SK": "B", "version": 5})
+
+    with pytest.raises(fake.meta.client.exceptions.ConditionalCheckFailedException) as exc:
+        table.update_item(
+            Key={"PK": "A", "SK": "B"},
+            UpdateExpression="SET #v = :new",
+            ConditionExpression="attribute_not_exists(#v) OR #v <= :incoming",
+            ExpressionAttributeNames={"#v": "version"},
+            ExpressionAttributeValues={":new": 4, ":incoming": 3},
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
+        )
+
+    assert isinstance(exc.value, ClientError)
+    assert exc.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+    assert exc.value.response["Item"] == {"PK": {"S": "A"}, "SK": {"S": "B"}, "version": {"N": "5"}}
+
+# --- conditions ---
+@pytest.mark.parametrize("condition, values, expected", [
+    ("attribute_exists(a)", {}, True),
+    ("attribute_not_exists(zzz)", {}, True),
+    ("a = :v", {":v": 1}, True),
+    ("a = :v", {":v": "1"}, False),
+    ("a <> :v", {":v": "1"}, True),
+    ("zzz <> :v", {":v": "1"}, False),
+    ("a BETWEEN :lo AND :hi", {":lo": 0, ":hi": 1}, True),
+    ("s IN (:x, :y)", {":x": "no", ":y": "hello"}, True),
+    ("begins_with(s, :p)", {":p": "he"}, True),
+    ("contains(s, :p)", {":p": "ll"}, True),
+    ("contains(tags, :p)", {":p": "t"}, True),
+    ("size(s) > :n", {":n": 4}, True),
+    ("attribute_type(m, :t)", {":t": "M"}, True),
+    ("m.inner[0] = :v", {":v": "deep"}, True),
+    ("NOT (a = :v) OR (s = :s AND a > :z)", {":v": 1, ":s": "hello", ":z": 0}, True),
+    ("a < :v", {":v": "x"}, False),
+])
+def test_condition_expressions(table, condition, values, expected):
+    table.put_item(Item={"PK": "A", "SK": "B", "a": 1, "s": "hello", "tags": {"t"}, "m": {"inner": ["deep"]}})
+
+    result = table.query(
+        KeyConditionExpression=Key("PK").eq("A"),
+        FilterExpression=condition,
+        **({"ExpressionAttributeValues": values} if values else {}),
+    )
+
+    assert result["Count"] == (1 if expected else 0)
+    assert result["ScannedCount"] == 1
+
+def test_put_item_accepts_boto3_condition_objects(fake, table):
+    table.put_item(Item={"PK": "A", "SK": "B"}, ConditionExpression=Attr("PK").not_exists())
+
+    with pytest.raises(fake.meta.client.exceptions.ConditionalCheckFailedException):
+        table.put_item(Item={"PK": "A", "SK": "B"}, ConditionExpression=Attr("PK").not_exists())
+
+def test_delete_item_with_condition_and_all_old(table):
+    table.put_item(Item={"PK": "A", "SK": "B", "status": "active"})
+
+    result = table.delete_item(Key={"PK": "A", "SK": "B"}, ConditionExpression=Attr("status").eq("active"), ReturnValues="ALL_OLD")
+
+    assert result["Attributes"]["status"] == "active"
+    assert table.item_count == 0
+
+# --- queries ---
+def test_query_base_table_sort_order_and_range_conditions(table):
+    for sk in ["B#2", "A#1", "B#1", "C#1"]:
+        table.put_item(Item={"PK": "P", "SK": sk})
+    table.put_item(Item={"PK": "OTHER", "SK": "B#3"})
+
+    forward = table.query(KeyConditionExpression=Key("PK").eq("P") & Key("SK").begins_with("B#"))
+    backward = table.query(KeyConditionExpression=Key("PK").eq("P") & Key("SK").gt("A#1"), ScanIndexForward=False)
+
+    assert [i["SK"] for i in forward["Items"]] == ["B#1", "B#2"]
+    assert [i["SK"] for i in backward["Items"]] == ["C#1", "B#2", "B#1"]
+
+@pytest.mark.parametrize("index, key", [
+    ("IDXinv", Key("SK").eq("EVENT#e1")),
+    ("gsi1", Key("gsi1PK").eq("TICKETS#EVENT#e1")),
+    ("typeIDX", Key("entity_type").eq("TICKET")),
+])
+def test_query_gsis_are_sparse(table, index, key):
+    for n in range(3):
+        table.put_item(Item=_ticket(n, SK="EVENT#e1"))
+    table.put_item(Item={"PK": "NOINDEX", "SK": "NOINDEX"})
+
+    result = table.query(IndexName=index, KeyConditionExpression=key)
+
+    assert result["Count"] == 3
+
+def test_query_unknown_index_and_bad_key_conditions(fake, table):
+    errors = fake.meta.client.exceptions.ValidationException
+    with pytest.raises(errors):
+        table.query(IndexName="gsi9", KeyConditionExpression=Key("x").eq("y"))
+    with pytest.raises(errors):
+        table.query(KeyConditionExpression=Key("SK").eq("y"))
+    with pytest.raises(errors):
+        table.query(KeyConditionExpression="PK = :p AND SK <> :s", ExpressionAttributeValues={":p": "a", ":s": "b"})
+
+def test_query_limit_and_exclusive_start_key_on_gsi(table):
+    for n in range(5):
+        table.put_item(Item=_ticket(n))
+
+    seen, start = [], None
+    while True:
+        kwargs = {"ExclusiveStartKey": start} if start else {}
+        page = table.query(IndexName="gsi1", KeyConditionExpression=Key("gsi1PK").eq("TICKETS#EVENT#e1"), Limit=2, **kwargs)
+        seen.extend(i["PK"] for i in page["Items"])
+        start = page.get("LastEvaluatedKey")
+        if not start:
+            break
+        assert set(start) == {"PK", "SK", "gsi1PK", "gsi1SK"}
+
+    assert seen == [f"TICKET#{n:03d}" for n in range(5)]
+
+def test_query_pages_at_one_megabyte(fake, table):
+    blob = "x" * 100_000
+    for n in range(25):
+        table.put_item(Item=_ticket(n, blob=blob))
+
+    first = table.query(IndexName="gsi1", KeyConditionExpression=Key("gsi1PK").eq("TICKETS#EVENT#e1"))
+    second = table.query(IndexName="gsi1", KeyConditionExpression=Key("gsi1PK").eq("TICKETS#EVENT#e1"), ExclusiveStartKey=first["LastEvaluatedKey"])
+
+    assert first["Count"] == 11
+    assert first["Count"] + second["Count"] + len(table.query(
+        IndexName="gsi1", KeyConditionExpression=Key("gsi1PK").eq("TICKETS#EVENT#e1"), ExclusiveStartKey=second["LastEvaluatedKey"]
+    )["Items"]) == 25
+
+def test_query_filter_is_applied_after_the_page_is_read(table):
+    for n in range(4):
+        table.put_item(Item=_ticket(n, status="used" if n % 2 else "active"))
+
+    page = table.query(IndexName="gsi1", KeyConditionExpression=Key("gsi1PK").eq("TICKETS#EVENT#e1"), FilterExpression=Attr("status").eq("used"), Limit=2)
+
+    assert (page["Count"], page["ScannedCount"]) == (1, 2)
+    assert "LastEvaluatedKey" in page
+
+def test_query_projection_and_count(table):
+    table.put_item(Item=_ticket(1, name="n", meta={"a": 1, "b": 2}))
+
+    projected = table.query(
+        KeyConditionExpression=Key("PK").eq("TICKET#001"),
+        ProjectionExpression="#n, meta.a",
+        ExpressionAttributeNames={"#n": "name"},
+    )
+    counted = table.query(KeyConditionExpression=Key("PK").eq("TICKET#001"), Select="COUNT")
+
+    assert projected["Items"] == [{"name": "n", "meta": {"a": Decimal(1)}}]
+    assert counted == {"Count": 1, "ScannedCount": 1}
+
+# --- batches and transactions ---
+def test_batch_write_and_batch_get_limits(fake, table):
+    client = fake.meta.client
+    with pytest.raises(client.exceptions.ValidationException):
+        client.batch_write_item(RequestItems={TABLE_NAME: [{"PutRequest": {"Item": _ticket(n)}} for n in range(26)]})
+    with pytest.raises(client.exceptions.ValidationException):
+        client.batch_get_item(RequestItems={TABLE_NAME: {"Keys": [{"PK": f"A{n}", "SK": "B"} for n in range(101)]}})
+    with pytest.raises(client.exceptions.ValidationException):
+        client.batch_write_item(RequestItems={TABLE_NAME: [{"PutRequest": {"Item": _ticket(1)}}] * 2})
+
+def test_injected_unprocessed_items_are_returned(fake, table):
+    client = fake.meta.client
+    fake.inject_unprocessed("batch_write_item", count=2)
+
+    response = client.batch_write_item(RequestItems={TABLE_NAME: [{"PutRequest": {"Item": _ticket(n)}} for n in range(5)]})
+
+    assert [r["PutRequest"]["Item"]["PK"] for r in response["UnprocessedItems"][TABLE_NAME]] == ["TICKET#003", "TICKET#004"]
+    assert table.item_count == 3
+    assert client.batch_write_item(RequestItems=response["UnprocessedItems"])["UnprocessedItems"] == {}
+    assert table.item_count == 5
+
+def test_batch_get_with_injected_unprocessed_keys(fake, table):
+    client = fake.meta.client
+    for n in range(3):
+        table.put_item(Item=_ticket(n))
+    fake.inject_unprocessed("batch_get_item", count=1)
+
+    response = client.batch_get_item(RequestItems={TABLE_NAME: {"Keys": [{"PK": f"TICKET#{n:03d}", "SK": f"TICKET#{n:03d}"} for n in range(4)], "ConsistentRead": True}})
+
+    assert len(response["Responses"][TABLE_NAME]) == 3
+    assert response["UnprocessedKeys"] == {TABLE_NAME: {"ConsistentRead": True, "Keys": [{"PK": "TICKET#003", "SK": "TICKET#003"}]}}
+
+def test_batch_writer_flushes_in_chunks(fake, table):
+    with table.batch_writer() as writer:
+        for n in range(60):
+            writer.put_item(Item=_ticket(n))
+        writer.delete_item(Key={"PK": "TICKET#000", "SK": "TICKET#000"})
+
+    assert fake.calls["batch_write_item"] == 3
+    assert table.item_count == 59
+
+def test_injected_throttling_raises_then_recovers(fake, table):
+    fake.inject_error("query", times=2)
+
+    for _ in range(2):
+        with pytest.raises(fake.meta.client.exceptions.ProvisionedThroughputExceededException) as exc:
+            table.query(KeyConditionExpression=Key("PK").eq("A"))
+        assert exc.value.response["Error"]["Code"] == "ProvisionedThroughputExceededException"
+
+    assert table.query(KeyConditionExpression=Key("PK").eq("A"))["Count"] == 0
+    assert fake.calls["query"] == 3
+
+def test_transaction_is_all_or_nothing_with_cancellation_reasons(fake, table):
+    client = fake.meta.client
+    table.put_item(Item={"PK": "A", "SK": "A", "version": 3})
+
+    with pytest.raises(client.exceptions.TransactionCanceledException) as exc:
+        client.transact_write_items(TransactItems=[
+            {"Update": {"TableName": TABLE_NAME, "Key": {"PK": "B", "SK": "B"}, "UpdateExpression": "SET x = :x", "ExpressionAttributeValues": {":x": 1}}},
+            {"Update": {
+                "TableName": TABLE_NAME, "Key": {"PK": "A", "SK": "A"}, "UpdateExpression": "SET x = :x",
+                "ConditionExpression": "version <= :v", "ExpressionAttributeValues": {":x": 1, ":v": 2},
+                "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+            }},
+        ])
+
+    reasons = exc.value.response["CancellationReasons"]
+    assert [r["Code"] for r in reasons] == ["None", "ConditionalCheckFailed"]
+    assert reasons[1]["Item"]["version"] == {"N": "3"}
+    assert table.item_count == 1
+
+    client.transact_write_items(TransactItems=[
+        {"Put": {"TableName": TABLE_NAME, "Item": {"PK": "B", "SK": "B"}}},
+        {"Delete": {"TableName": TABLE_NAME, "Key": {"PK": "A", "SK": "A"}}},
+    ])
+    assert [i["PK"] for i in table.all_items()] == ["B"]
+
+def test_transaction_rejects_two_operations_on_one_item(fake, table):
+    client = fake.meta.client
+    with pytest.raises(client.exceptions.ValidationException):
+        client.transact_write_items(TransactItems=[
+            {"Put": {"TableName": TABLE_NAME, "Item": {"PK": "A", "SK": "A"}}},
+            {"Delete": {"TableName": TABLE_NAME, "Key": {"PK": "A", "SK": "A"}}},
+        ])
+
+def test_injected_transaction_conflict(fake, table):
+    fake.inject_transaction_conflict(items=2)
+
+    with pytest.raises(fake.meta.client.exceptions.TransactionCanceledException) as exc:
+        fake.meta.client.transact_write_items(TransactItems=[{"Put": {"TableName": TABLE_NAME, "Item": {"PK": "A", "SK": "A"}}}])
+
+    assert [r["Code"] for r in exc.value.response["CancellationReasons"]] == ["TransactionConflict"] * 2
+
+def test_unknown_table_via_client_is_not_found(fake):
+    with pytest.raises(fake.meta.client.exceptions.ResourceNotFoundException):
+        fake.meta.client.get_item(TableName="missing", Key={"PK": "A", "SK": "B"})
@@ -9,9 +9,12 @@ from _pydantic.EventBridge import (
     trigger_eventbridge_event,
     EventBridgeEventDetail,
     EventBridgeEvent,
+    EventBridgePublisher,
     EventType,
     Action,
+    put_events_entry_size,
 )
+from botocore.exceptions import ClientError
 from _shared.DecimalEncoder import DecimalEncoder
 
 import logging
@@ -127,3 +130,128 @@ def test_trigger_eventbridge_event_exception():
         resource_id="evt_5432",
     )
     assert result is False
+
+# --- Tests for EventBridgePublisher ---
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("_pydantic.EventBridge.time.sleep", lambda _: None)
+
+class RecordingEventBridge:
+    """put_events stand-in that fails entries whose resource_id is listed in `fail`, `times` times each."""
+    def __init__(self, fail=None, code="ThrottlingException"):
+        self.calls = []
+        self.fail = dict(fail or {})
+        self.code = code
+
+    def put_events(self, Entries):
+        assert len(Entries) <= 10
+        assert sum(put_events_entry_size(e) for e in Entries) <= 256 * 1024
+        self.calls.append(Entries)
+        results = []
+        for entry in Entries:
+            resource_id = json.loads(entry["Detail"])["resource_id"]
+            if self.fail.get(resource_id, 0) > 0:
+                self.fail[resource_id] -= 1
+                results.append({"ErrorCode": self.code, "ErrorMessage": "nope"})
+            else:
+                results.append({"EventId": f"id-{resource_id}"})
+        return {"FailedEntryCount": sum(1 for r in results if "ErrorCode" in r), "Entries": results}
+
+def _add(publisher, n, data=None, **kwargs):
+    return publisher.add(
+        source="a",
+        resource_type=EventType.ticket,
+        action=Action.requested,
+        organisation="org-demo",
+        resource_id=f"tkt_{n}",
+        data=data or {"n": n},
+        **kwargs,
+    )
+
+def test_publisher_batches_by_ten_and_reports_in_order(no_sleep):
+    client = RecordingEventBridge()
+    publisher = EventBridgePublisher(client, max_workers=1)
+    for n in range(25):
+        _add(publisher, n)
+
+    outcomes = publisher.flush()
+
+    assert [len(call) for call in client.calls] == [10, 10, 5]
+    assert [o.key for o in outcomes] == [f"tkt_{n}" for n in range(25)]
+    assert all(o.published and o.attempts == 1 for o in outcomes)
+    assert outcomes[3].event_id == "id-tkt_3"
+    assert publisher.flush() == []
+
+def test_publisher_splits_batches_at_256kb(no_sleep):
+    client = RecordingEventBridge()
+    publisher = EventBridgePublisher(client)
+    for n in range(4):
+        _add(publisher, n, data={"blob": "x" * 100_000})
+
+    outcomes = publisher.flush()
+
+    assert sorted(len(call) for call in client.calls) == [2, 2]
+    assert all(o.published for o in outcomes)
+
+def test_publisher_retries_only_failed_entries(no_sleep):
+    client = RecordingEventBridge(fail={"tkt_1": 2, "tkt_3": 1})
+    publisher = EventBridgePublisher(client)
+    for n in range(5):
+        _add(publisher, n, key=f"key-{n}")
+
+    outcomes = publisher.flush()
+
+    assert [len(call) for call in client.calls] == [5, 2, 1]
+    assert [o.attempts for o in outcomes] == [1, 3, 1, 2, 1]
+    assert all(o.published for o in outcomes)
+    assert outcomes[1].key == "key-1"
+
+def test_publisher_gives_up_after_max_attempts_and_on_permanent_errors(no_sleep):
+    throttled = RecordingEventBridge(fail={"tkt_0": 10})
+    publisher = EventBridgePublisher(throttled, max_attempts=3)
+    _add(publisher, 0)
+    [outcome] = publisher.flush()
+    assert (outcome.published, outcome.attempts, outcome.error_code) == (False, 3, "ThrottlingException")
+
+    malformed = RecordingEventBridge(fail={"tkt_0": 10}, code="MalformedDetail")
+    publisher = EventBridgePublisher(malformed)
+    _add(publisher, 0)
+    _add(publisher, 1)
+    outcomes = publisher.flush()
+    assert [(o.published, o.attempts) for o in outcomes] == [(False, 1), (True, 1)]
+
+def test_publisher_retries_throttled_calls_and_fails_batch_on_other_errors(no_sleep):
+    client = MagicMock()
+    client.put_events.side_effect = [
+        ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "PutEvents"),
+        {"FailedEntryCount": 0, "Entries": [{"EventId": "1"}]},
+    ]
+    publisher = EventBridgePublisher(client)
+    _add(publisher, 0)
+    assert publisher.flush()[0].attempts == 2
+
+    client.put_events.side_effect = ClientError({"Error": {"Code": "AccessDeniedException", "Message": "no"}}, "PutEvents")
+    _add(publisher, 1)
+    [outcome] = publisher.flush()
+    assert (outcome.published, outcome.error_code) == (False, "AccessDeniedException")
+
+def test_publisher_rejects_oversized_and_invalid_entries_without_sending(no_sleep):
+    client = RecordingEventBridge()
+    publisher = EventBridgePublisher(client)
+    _add(publisher, 0, data={"blob": "x" * 300_000})
+    publisher.add(source="a", resource_type="nope", action=Action.created, organisation="org-demo", resource_id="bad")
+    _add(publisher, 2)
+
+    outcomes = publisher.flush()
+
+    assert [(o.key, o.error_code) for o in outcomes] == [("tkt_0", "EntryTooLarge"), ("bad", "InvalidEvent"), ("tkt_2", None)]
+    assert [len(call) for call in client.calls] == [1]
+
+def test_publisher_context_manager_flushes():
+    client = RecordingEventBridge()
+    with EventBridgePublisher(client) as publisher:
+        _add(publisher, 0)
+
+    assert len(client.calls) == 1
+    assert [o.key for o in publisher.outcomes] == ["tkt_0"]
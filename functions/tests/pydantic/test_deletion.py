@@ -0,0 +1,120 @@
+import pytest
+from ksuid import KsuidMs
+
+from _pydantic.dynamodb import batch_delete, BATCH_WRITE_MAX_ATTEMPTS
+from _pydantic.deletion import delete_event_rows, deletion_checkpoint_key
+from _pydantic.models.models_extended import EventModel, ItemModel, LocationModel, TicketModel, TicketChildModel, TicketCreationIdempotencyModel
+from functions.checkout.sharded_capacity import enable_sharded_capacity, list_sharded_events
+from functions.checkout.reservation_ledger import hold_reservation, settle_reservation
+
+NOW = "2026-05-01T19:30:00.000Z"
+
+# --- Fixtures ---
+def _put(table, model):
+    table.put_item(Item=model.to_dynamo(exclude_keys=False))
+
+def _seed_event(table, event="evt", tickets=3):
+    item_ksuid = str(KsuidMs())
+    _put(table, EventModel(ksuid=event, name="Spring Ball", organisation="org-demo"))
+    _put(table, ItemModel(ksuid=item_ksuid, name="Full Pass", organisation="org-demo", parent_event_ksuid=event))
+    _put(table, LocationModel(ksuid=str(KsuidMs()), name="Hall", organisation="org-demo", parent_event_ksuid=event))
+    for n in range(tickets):
+        ksuid = str(KsuidMs())
+        _put(table, TicketModel(ksuid=ksuid, organisation="org-demo", parent_event_ksuid=event, customer_email=f"{ksuid}@example.com", name_on_ticket=ksuid, name="Full Pass", includes=[f"ITEM#{item_ksuid}"]))
+        _put(table, TicketChildModel(child_ksuid=item_ksuid, child_type="ITEM", parent_ticket_ksuid=ksuid, organisation="org-demo", name="Full Pass"))
+        _put(table, TicketCreationIdempotencyModel(idempotency_key=f"checkout:{ksuid}", organisation="org-demo", parent_event_ksuid=event, ticket_ksuid=ksuid))
+
+def _entity_types(table):
+    return sorted(item.get("entity_type") for item in table.all_items())
+
+# --- Tests ---
+def test_batch_delete_drops_duplicates_and_reports_keys(fake, table):
+    _seed_event(table, tickets=0)
+    item_key = next({"PK": item["PK"], "SK": item["SK"]} for item in table.all_items() if item["entity_type"] == "ITEM")
+    keys = [{"PK": "EVENT#evt", "SK": "EVENT#evt"}] * 2 + [{**item_key, "extra": 1}]
+
+    result = batch_delete(table, keys)
+
+    assert len(result.successful) == 2 and not result.unprocessed
+    assert _entity_types(table) == ["LOCATION"]
+
+def test_batch_delete_retries_unprocessed_keys(fake, table, no_sleep):
+    _seed_event(table, tickets=0)
+    fake.inject_unprocessed("batch_write_item", count=1, times=1)
+
+    result = batch_delete(table, [{"PK": item["PK"], "SK": item["SK"]} for item in table.all_items()])
+
+    assert not result.unprocessed
+    assert fake.calls["batch_write_item"] == 2
+
+def test_event_deletion_removes_tickets_and_event_rows_only(table):
+    _seed_event(table, tickets=3)
+    _seed_event(table, event="other", tickets=1)
+    before = table.item_count
+
+    result = delete_event_rows(table, "evt", NOW)
+
+    assert (result.completed, result.tickets, result.deleted) == (True, 3, 12)
+    assert table.item_count == before - 12
+    assert {item.get("parent_event_ksuid") for item in table.all_items() if "parent_event_ksuid" in item} == {"other"}
+
+def test_ticket_pages_query_through_the_client_not_the_shared_resource(table, monkeypatch):
+    _seed_event(table, tickets=4)
+    monkeypatch.setattr(table, "query", lambda **_: pytest.fail("resource query used from deletion"))
+
+    assert delete_event_rows(table, "evt", NOW, max_workers=4).completed
+    assert _entity_types(table) == []
+
+def test_event_deletion_removes_capacity_shards_and_reservation_ledger(table):
+    _seed_event(table, tickets=1)
+    _seed_event(table, event="other", tickets=0)
+    for event in ("evt", "other"):
+        table.update_item(Key={"PK": f"EVENT#{event}", "SK": f"EVENT#{event}"}, UpdateExpression="SET remaining_capacity = :ten, reserved = :zero, number_sold = :zero", ExpressionAttributeValues={":ten": 10, ":zero": 0})
+    enable_sharded_capacity(table, "evt", 4, NOW)
+    for n in range(8):
+        hold_reservation(table, "evt", f"r{n}", "2026-05-01T20:00:00.000Z", NOW)
+    settle_reservation(table, "r0", "released", NOW)
+    settle_reservation(table, "r1", "completed", NOW)
+    hold_reservation(table, "other", "r-other", "2026-05-01T20:00:00.000Z", NOW)
+
+    assert delete_event_rows(table, "evt", NOW).completed
+
+    assert list_sharded_events(table) == {}
+    assert [item["reservation_id"] for item in table.all_items() if item.get("entity_type") == "RESERVATION"] == ["r-other"]
+    assert {item.get("parent_event_ksuid") for item in table.all_items() if "parent_event_ksuid" in item} == {"other"}
+
+def test_ticket_scope_keeps_the_event(table):
+    _seed_event(table, tickets=2)
+
+    result = delete_event_rows(table, "evt", NOW, scope="TICKETS")
+
+    assert (result.completed, result.tickets, result.deleted) == (True, 2, 6)
+    assert _entity_types(table) == ["EVENT", "ITEM", "LOCATION"]
+
+def test_deletion_pauses_with_a_checkpoint_and_resumes(table, monkeypatch):
+    monkeypatch.setattr("_pydantic.deletion.DELETION_TICKET_PAGE_SIZE", 2)
+    _seed_event(table, tickets=5)
+
+    first = delete_event_rows(table, "evt", NOW, has_time=lambda: False)
+
+    assert (first.completed, first.tickets) == (False, 2)
+    checkpoint = table.get_item(Key=deletion_checkpoint_key("EVENT", "evt"))["Item"]
+    assert (checkpoint["phase"], checkpoint["tickets"]) == ("tickets", 2) and checkpoint["cursor"]
+    assert table.get_item(Key={"PK": "EVENT#evt", "SK": "EVENT#evt"}).get("Item")
+
+    second = delete_event_rows(table, "evt", NOW)
+
+    assert (second.completed, second.tickets, second.deleted) == (True, 5, 18)
+    assert table.item_count == 0
+
+def test_unprocessed_keys_stop_the_pass_without_advancing(fake, table, no_sleep):
+    _seed_event(table, tickets=1)
+    fake.inject_unprocessed("batch_write_item", count=1, times=BATCH_WRITE_MAX_ATTEMPTS)
+
+    first = delete_event_rows(table, "evt", NOW)
+
+    assert not first.completed and first.unprocessed == 1
+    assert "cursor" not in table.get_item(Key=deletion_checkpoint_key("EVENT", "evt"))["Item"]
+
+    assert delete_event_rows(table, "evt", NOW).completed
+    assert table.item_count == 0
@@ -3,7 +3,7 @@ from unittest.mock import MagicMock
 from datetime import datetime, timezone
 from decimal import Decimal
 from ksuid import KsuidMs
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from _pydantic.dynamodb import (
     convert_datetime_to_iso_8601_with_z_suffix,
@@ -11,10 +11,16 @@ from _pydantic.dynamodb import (
     DynamoModel,
     VersionConflictError,
     HistoryModel,
+    QueryPage,
+    compile_update_expression,
     batch_write,
+    BatchWriteResult,
+    BatchGetIncompleteError,
     transact_upsert,
 )
+from botocore.exceptions import ClientError
 from _pydantic.EventBridge import Action, EventType
+from _pydantic.dynamodb_helpers import encode_cursor, decode_cursor
 import logging
 
 logger = logging.getLogger()
@@ -491,6 +497,157 @@ def test_query_gsi_raises_on_wuery_fail(valid_ksuid, dt):
     with pytest.raises(Exception):
         m.query_gsi(mock_table, key_condition={"PK": m.PK, "SK": m.SK})
 
+def _raw_simple_item(foo, dt):
+    return {"ksuid": str(KsuidMs()), "foo": foo, "bar": 1.5, "timestamp": dt.isoformat()}
+
+def test_query_gsi_follows_last_evaluated_key(valid_ksuid, dt):
+    m = SimpleModel(ksuid=valid_ksuid, foo=1, bar=1.1, timestamp=dt)
+    mock_table = MagicMock()
+    mock_table.query.side_effect = [
+        {"Items": [_raw_simple_item(1, dt)], "LastEvaluatedKey": {"PK": "SIMPLE#a", "SK": "OTHER#1"}},
+        {"Items": [_raw_simple_item(2, dt)]},
+    ]
+
+    resp = m.query_gsi(mock_table, key_condition={"PK": m.PK})
+
+    assert [r.foo for r in resp] == [1, 2]
+    assert mock_table.query.call_count == 2
+    _, second_kwargs = mock_table.query.call_args
+    assert second_kwargs["ExclusiveStartKey"] == {"PK": "SIMPLE#a", "SK": "OTHER#1"}
+
+def test_iter_query_yields_validated_pages(valid_ksuid, dt):
+    m = SimpleModel(ksuid=valid_ksuid, foo=1, bar=1.1, timestamp=dt)
+    mock_table = MagicMock()
+    mock_table.query.side_effect = [
+        {"Items": [_raw_simple_item(1, dt), _raw_simple_item(2, dt)], "LastEvaluatedKey": {"PK": "SIMPLE#a", "SK": "OTHER#2"}},
+        {"Items": [_raw_simple_item(3, dt)]},
+    ]
+
+    pages = list(m.iter_query(mock_table, key_condition={"PK": m.PK}, limit=2))
+
+    assert len(pages) == 2
+    assert all(isinstance(page, QueryPage) for page in pages)
+    assert all(isinstance(item, SimpleModel) for item in pages[0].items)
+    assert decode_cursor(pages[0].cursor) == {"PK": "SIMPLE#a", "SK": "OTHER#2"}
+    assert pages[1].cursor is None
+    _, first_kwargs = mock_table.query.call_args_list[0]
+    assert first_kwargs["Limit"] == 2
+    assert "ExclusiveStartKey" not in first_kwargs
+
+def test_iter_query_is_lazy(valid_ksuid, dt):
+    m = SimpleModel(ksuid=valid_ksuid, foo=1, bar=1.1, timestamp=dt)
+    mock_table = MagicMock()
+    mock_table.query.return_value = {"Items": [_raw_simple_item(1, dt)], "LastEvaluatedKey": {"PK": "SIMPLE#a", "SK": "OTHER#1"}}
+
+    pages = m.iter_query(mock_table, key_condition={"PK": m.PK})
+    next(pages)
+
+    mock_table.query.assert_called_once()
+
+def test_query_page_resumes_from_cursor(valid_ksuid, dt):
+    m = SimpleModel(ksuid=valid_ksuid, foo=1, bar=1.1, timestamp=dt)
+    mock_table = MagicMock()
+    mock_table.query.return_value = {"Items": [_raw_simple_item(3, dt)]}
+    cursor = encode_cursor({"PK": "SIMPLE#a", "SK": "OTHER#2"})
+
+    page = m.query_page(mock_table, key_condition={"PK": m.PK}, limit=10, cursor=cursor)
+
+    assert [item.foo for item in page.items] == [3]
+    assert page.cursor is None
+    _, kwargs = mock_table.query.call_args
+    assert kwargs["ExclusiveStartKey"] == {"PK": "SIMPLE#a", "SK": "OTHER#2"}
+
+def test_query_page_skips_empty_intermediate_pages(valid_ksuid, dt):
+    m = SimpleModel(ksuid=valid_ksuid, foo=1, bar=1.1, timestamp=dt)
+    mock_table = MagicMock()
+    mock_table.query.side_effect = [
+        {"Items": [], "LastEvaluatedKey": {"PK": "SIMPLE#a", "SK": "OTHER#1"}},
+        {"Items": [_raw_simple_item(2, dt)], "LastEvaluatedKey": {"PK": "SIMPLE#b", "SK": "OTHER#2"}},
+    ]
+
+    page = m.query_page(mock_table, key_condition={"PK": m.PK}, limit=1)
+
+    assert [item.foo for item in page.items] == [2]
+    assert decode_cursor(page.cursor) == {"PK": "SIMPLE#b", "SK": "OTHER#2"}
+
+@pytest.mark.parametrize("bad_cursor", ["not base64!", "bm90LWpzb24", "WzEsMl0"])
+def test_query_page_rejects_invalid_cursor(valid_ksuid, dt, bad_cursor):
+    m = SimpleModel(ksuid=valid_ksuid, foo=1, bar=1.1, timestamp=dt)
+    mock_table = MagicMock()
+
+    with pytest.raises(ValueError):
+        m.query_page(mock_table, key_condition={"PK": m.PK}, cursor=bad_cursor)
+    mock_table.query.assert_not_called()
+
+def test_cursor_round_trip():
+    key = {"PK": "TICKET#abc", "SK": "CUSTOMER#a@b.com", "gsi1PK": "EVENT#x", "gsi1SK": "TICKET#abc"}
+    cursor = encode_cursor(key)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+    assert encode_cursor(None) is None
+    assert decode_cursor(None) is None
+
+# to_dynamo serialization plan
+def _legacy_to_dynamo(model, exclude_keys=True):
+    base = model.model_dump(mode="json", exclude_none=True)
+    if model.entity_type is not None and "entity_type" not in base:
+        base["entity_type"] = model.entity_type
+    exclude_props = {"__fields_set__", "model_fields_set", "model_extra", "related_entities"}
+    if exclude_keys:
+        exclude_props |= {"PK", "SK"}
+    props = {}
+    for name in dir(model.__class__):
+        if name in exclude_props or not isinstance(getattr(model.__class__, name), property):
+            continue
+        try:
+            value = getattr(model, name)
+        except NotImplementedError:
+            continue
+        if value is not None:
+            props[name] = value
+    return convert_floats_to_decimals({**base, **props})
+
+class PlannedModel(DynamoModel):
+    entity_type: Literal["PLANNED"] = "PLANNED"
+    ksuid: str
+    name: str
+    price: Optional[float] = None
+    meta: Optional[Dict[str, Any]] = None
+    tags: List[str] = []
+    timestamp: datetime
+
+    @property
+    def PK(self):
+        return f"PLANNED#{self.ksuid}"
+    @property
+    def SK(self):
+        return f"PLANNED#{self.ksuid}"
+    @property
+    def gsi1PK(self):
+        return f"PLANNEDLIST#{self.name}"
+
+@pytest.mark.parametrize("exclude_keys", [True, False])
+def test_to_dynamo_matches_legacy_serialization(valid_ksuid, dt, exclude_keys):
+    m = PlannedModel(ksuid=valid_ksuid, name="a", price=9.99, meta={"weight": 1.25, "nested": [0.5]}, tags=["x"], timestamp=dt)
+
+    result = m.to_dynamo(exclude_keys=exclude_keys)
+
+    assert result == _legacy_to_dynamo(m, exclude_keys=exclude_keys)
+    assert list(result) == list(_legacy_to_dynamo(m, exclude_keys=exclude_keys))
+    assert result["price"] == Decimal("9.99")
+    assert result["meta"] == {"weight": Decimal("1.25"), "nested": [Decimal("0.5")]}
+    assert "gsi1SK" not in result
+
+def test_serialization_plan_is_cached_per_class():
+    plan = PlannedModel.serialization_plan()
+
+    assert PlannedModel.serialization_plan() is plan
+    assert set(plan.properties) == {"PK", "SK", "gsi1PK"}
+    assert {"ksuid", "name", "tags", "timestamp", "entity_type"} <= plan.float_free_fields
+    assert "price" not in plan.float_free_fields
+    assert "meta" not in plan.float_free_fields
+    assert SimpleModel.serialization_plan() is not plan
+
 # history model tests
 def test_history_model_properties_and_to_dynamo(valid_ksuid, dt):
     data = {'key': 'value'}
@@ -694,4 +851,244 @@ def test_transact_upsert_empty_input():
 
     assert success == [] 
     assert failed == []
-    assert not db_client.transact_write_items.called
\ No newline at end of file
+    assert not db_client.transact_write_items.called
+
+# compiled update expressions
+def test_compile_update_expression_builds_set_add_remove():
+    template = compile_update_expression(
+        ("name", "created_at", "number_sold"),
+        only_set_once=frozenset({"created_at"}),
+        add_fields=frozenset({"number_sold"}),
+        remove_keys=("description",),
+        condition_expression="attribute_exists(PK)",
+        versioned=True,
+    )
+
+    assert template.update_expression == (
+        "SET #name = :name, #created_at = if_not_exists(#created_at, :created_at) "
+        "ADD #number_sold :number_sold "
+        "REMOVE #description"
+    )
+    assert template.condition_expression == (
+        "attribute_not_exists(#version) OR #version <= :incoming_version AND attribute_exists(PK)"
+    )
+    assert template.attribute_names == {
+        "#description": "description",
+        "#name": "name",
+        "#created_at": "created_at",
+        "#number_sold": "number_sold",
+        "#version": "version",
+    }
+    assert template.attribute_values({"name": "a", "created_at": "t", "number_sold": 1}) == {
+        ":name": "a", ":created_at": "t", ":number_sold": 1,
+    }
+
+def test_compile_update_expression_is_cached():
+    first = compile_update_expression(("a", "b"), only_set_once=frozenset({"a"}))
+    second = compile_update_expression(("a", "b"), only_set_once=frozenset({"a"}))
+    other = compile_update_expression(("a", "b"))
+
+    assert first is second
+    assert other is not first
+
+def test_transact_upsert_reuses_template_across_batch(valid_ksuid, dt):
+    items = [PlannedModel(ksuid=str(KsuidMs()), name=f"n{i}", price=1.5, timestamp=dt) for i in range(3)]
+    mock_table = MagicMock()
+    mock_table.name = "table"
+
+    result = transact_upsert(mock_table, items, only_set_once=["timestamp"], condition_expression="attribute_exists(PK)", explicit_fields_only=False)
+
+    assert len(result.successful) == 3
+    (_, kwargs), = mock_table.meta.client.transact_write_items.call_args_list
+    updates = [entry["Update"] for entry in kwargs["TransactItems"]]
+    assert len({u["UpdateExpression"] for u in updates}) == 1
+    assert "#timestamp = if_not_exists(#timestamp, :timestamp)" in updates[0]["UpdateExpression"]
+    assert updates[0]["ConditionExpression"] == "attribute_exists(PK)"
+    assert [u["ExpressionAttributeValues"][":name"] for u in updates] == ["n0", "n1", "n2"]
+    assert updates[0]["ExpressionAttributeNames"] is not updates[1]["ExpressionAttributeNames"]
+
+# batch_write retries and outcomes
+@pytest.fixture
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("_pydantic.dynamodb.time.sleep", sleeps.append)
+    return sleeps
+
+def _planned_items(n, dt):
+    return [PlannedModel(ksuid=str(KsuidMs()), name=f"n{i}", timestamp=dt) for i in range(n)]
+
+def test_batch_write_retries_unprocessed_items(dt, no_sleep):
+    items = _planned_items(3, dt)
+    mock_table = MagicMock()
+    mock_table.name = "table"
+    unprocessed_item = items[1].to_dynamo(exclude_keys=False)
+    mock_table.meta.client.batch_write_item.side_effect = [
+        {"UnprocessedItems": {"table": [{"PutRequest": {"Item": unprocessed_item}}]}},
+        {"UnprocessedItems": {}},
+    ]
+
+    result = batch_write(mock_table, items)
+
+    assert isinstance(result, BatchWriteResult)
+    assert result.successful == items
+    assert result.unprocessed == []
+    assert [o.attempts for o in result.outcomes] == [1, 2, 1]
+    _, retry_kwargs = mock_table.meta.client.batch_write_item.call_args
+    assert retry_kwargs["RequestItems"]["table"] == [{"PutRequest": {"Item": unprocessed_item}}]
+    assert len(no_sleep) == 1
+
+def test_batch_write_reports_items_unprocessed_after_max_attempts(dt, no_sleep):
+    items = _planned_items(2, dt)
+    mock_table = MagicMock()
+    mock_table.name = "table"
+    stuck = items[0].to_dynamo(exclude_keys=False)
+    mock_table.meta.client.batch_write_item.return_value = {"UnprocessedItems": {"table": [{"PutRequest": {"Item": stuck}}]}}
+
+    successful, unprocessed = batch_write(mock_table, items, max_attempts=3)
+
+    assert successful == [items[1]]
+    assert unprocessed == [items[0]]
+    assert mock_table.meta.client.batch_write_item.call_count == 3
+
+def test_batch_write_retries_throttling_and_fails_on_other_errors(dt, no_sleep):
+    items = _planned_items(1, dt)
+    mock_table = MagicMock()
+    mock_table.name = "table"
+    throttled = ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "BatchWriteItem")
+    invalid = ClientError({"Error": {"Code": "ValidationException"}}, "BatchWriteItem")
+    mock_table.meta.client.batch_write_item.side_effect = [throttled, invalid]
+
+    result = batch_write(mock_table, items)
+
+    assert result.unprocessed == items
+    assert result.outcomes[0].status == "failed"
+    assert result.outcomes[0].attempts == 2
+    assert "ValidationException" in result.outcomes[0].error
+
+def test_batch_write_sends_chunks_in_parallel_and_keeps_order(dt, no_sleep):
+    items = _planned_items(60, dt)
+    mock_table = MagicMock()
+    mock_table.name = "table"
+    mock_table.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+    result = batch_write(mock_table, items, max_workers=3)
+
+    assert result.successful == items
+    sizes = sorted(len(call.kwargs["RequestItems"]["table"]) for call in mock_table.meta.client.batch_write_item.call_args_list)
+    assert sizes == [10, 25, 25]
+
+# batch_get
+def _stored_planned_item(i, dt):
+    return PlannedModel(ksuid=f"k{i}", name=f"n{i}", timestamp=dt).to_dynamo(exclude_keys=False)
+
+def test_batch_get_returns_models_keyed_by_primary_key(dt, no_sleep):
+    stored = [_stored_planned_item(i, dt) for i in range(2)]
+    mock_table = MagicMock()
+    mock_table.name = "table"
+    mock_table.meta.client.batch_get_item.return_value = {"Responses": {"table": stored}}
+
+    found = PlannedModel.batch_get(mock_table, [("PLANNED#k0", "PLANNED#k0"), {"PK": "PLANNED#k1", "SK": "PLANNED#k1"}, ("PLANNED#k0", "PLANNED#k0"), ("PLANNED#x", "PLANNED#x")])
+
+    assert set(found) == {("PLANNED#k0", "PLANNED#k0"), ("PLANNED#k1", "PLANNED#k1")}
+    assert all(isinstance(model, PlannedModel) for model in found.values())
+    _, kwargs = mock_table.meta.client.batch_get_item.call_args
+    assert len(kwargs["RequestItems"]["table"]["Keys"]) == 3
+
+def test_batch_get_chunks_by_100_and_retries_unprocessed_keys(dt, no_sleep):
+    keys = [(f"PLANNED#k{i}", f"PLANNED#k{i}") for i in range(150)]
+    mock_table = MagicMock()
+    mock_table.name = "table"
+    calls = []
+
+    def batch_get_item(RequestItems):
+        requested = RequestItems["table"]["Keys"]
+        calls.append(len(requested))
+        if len(calls) == 1:
+            return {"Responses": {"table": []}, "UnprocessedKeys": {"table": {"Keys": requested[:5]}}}
+        return {"Responses": {"table": [_stored_planned_item(key["PK"].split("#k")[1], dt) for key in requested]}}
+
+    mock_table.meta.client.batch_get_item.side_effect = batch_get_item
+
+    found = PlannedModel.batch_get(mock_table, keys, max_workers=1)
+
+    assert calls == [100, 5, 50]
+    assert len(found) == 55
+    assert len(no_sleep) == 1
+
+def test_batch_get_raises_when_keys_stay_unprocessed(dt, no_sleep):
+    mock_table = MagicMock()
+    mock_table.name = "table"
+    mock_table.meta.client.batch_get_item.return_value = {"UnprocessedKeys": {"table": {"Keys": [{"PK": "A", "SK": "B"}]}}}
+
+    with pytest.raises(BatchGetIncompleteError) as exc:
+        PlannedModel.batch_get(mock_table, [("A", "B")], max_attempts=2)
+    assert exc.value.unprocessed_keys == [{"PK": "A", "SK": "B"}]
+
+# relation-selective assembly
+class ChildRecordModel(DynamoModel):
+    entity_type: Literal["CHILDRECORD"] = "CHILDRECORD"
+    ksuid: str
+
+class NoteRecordModel(DynamoModel):
+    entity_type: Literal["NOTERECORD"] = "NOTERECORD"
+    ksuid: str
+
+class ParentRecordModel(DynamoModel):
+    entity_type: Literal["PARENTRECORD"] = "PARENTRECORD"
+    ksuid: str
+    children: Optional[List[ChildRecordModel]] = None
+    notes: Optional[List[NoteRecordModel]] = None
+
+    @property
+    def related_entities(self):
+        return {
+            "CHILDRECORD": ("children", "list", ChildRecordModel),
+            "NOTERECORD": ("notes", "list", NoteRecordModel),
+        }
+
+    @property
+    def PK(self):
+        return f"PARENTRECORD#{self.ksuid}"
+    @property
+    def SK(self):
+        return f"PARENTRECORD#{self.ksuid}"
+
+_parent_items = [
+    {"entity_type": "PARENTRECORD", "ksuid": "p"},
+    {"entity_type": "CHILDRECORD", "ksuid": "c1"},
+    {"entity_type": "NOTERECORD", "ksuid": "n1"},
+    {"entity_type": "NOTERECORD", "ksuid": "n2"},
+]
+
+def test_assemble_from_items_only_attaches_included_relations():
+    parent = ParentRecordModel(ksuid="p").assemble_from_items(_parent_items, include={"CHILDRECORD"})
+
+    assert [c.ksuid for c in parent.children] == ["c1"]
+    assert parent.notes is None
+
+def test_assemble_from_items_without_include_attaches_everything():
+    parent = ParentRecordModel(ksuid="p").assemble_from_items(_parent_items)
+
+    assert [n.ksuid for n in parent.notes] == ["n1", "n2"]
+
+def test_query_gsi_pushes_include_down_as_entity_type_filter():
+    mock_table = MagicMock()
+    mock_table.query.return_value = {"Items": _parent_items[:2]}
+
+    parent = ParentRecordModel(ksuid="p").query_gsi(mock_table, key_condition={"SK": "PARENTRECORD#p"}, assemble_entites=True, include={"CHILDRECORD"})
+
+    _, kwargs = mock_table.query.call_args
+    expression = kwargs["FilterExpression"].get_expression()
+    assert expression["operator"] == "IN"
+    assert expression["values"][0].name == "entity_type"
+    assert expression["values"][1] == ["PARENTRECORD", "CHILDRECORD"]
+    assert [c.ksuid for c in parent.children] == ["c1"]
+
+def test_query_gsi_without_include_has_no_filter():
+    mock_table = MagicMock()
+    mock_table.query.return_value = {"Items": _parent_items}
+
+    ParentRecordModel(ksuid="p").query_gsi(mock_table, key_condition={"SK": "PARENTRECORD#p"}, assemble_entites=True)
+
+    _, kwargs = mock_table.query.call_args
+    assert "FilterExpression" not in kwargs
@@ -0,0 +1,181 @@
+import pytest
+from decimal import Decimal
+from typing import List, Literal, Optional
+from boto3.dynamodb.conditions import Key
+
+from _pydantic.dynamodb import DynamoModel, batch_write, transact_upsert
+
+# ORM behaviour against the in-memory table, rather than MagicMock tables
+
+class SeatModel(DynamoModel):
+    entity_type: Literal["SEAT"] = "SEAT"
+    ksuid: str
+    event: str
+    name: str
+    version: int = 0
+    sold: int = 0
+
+    @property
+    def PK(self):
+        return f"SEAT#{self.ksuid}"
+    @property
+    def SK(self):
+        return f"SEAT#{self.ksuid}"
+    @property
+    def gsi1PK(self):
+        return f"SEATS#{self.event}"
+    @property
+    def gsi1SK(self):
+        return f"SEAT#{self.ksuid}"
+
+class VenueModel(DynamoModel):
+    entity_type: Literal["VENUE"] = "VENUE"
+    ksuid: str
+    seats: Optional[List[SeatModel]] = None
+
+    @property
+    def related_entities(self):
+        return {"SEAT": ("seats", "list", SeatModel)}
+    @property
+    def PK(self):
+        return f"VENUE#{self.ksuid}"
+    @property
+    def SK(self):
+        return f"VENUE#{self.ksuid}"
+
+def _seat(n, **extra):
+    return SeatModel(**{"ksuid": f"{n:04d}", "event": "e1", "name": f"seat {n}", **extra})
+
+def test_upsert_increments_version_and_rejects_stale_writes(table):
+    assert _seat(1).upsert(table).item["version"] == Decimal(1)
+    assert _seat(1, version=1, name="renamed").upsert(table).item["version"] == Decimal(2)
+
+    stale = _seat(1, version=0, name="stale").upsert(table)
+
+    assert (stale.success, stale.error) == (False, "Version conflict")
+    assert table.get_item(Key={"PK": "SEAT#0001", "SK": "SEAT#0001"})["Item"]["name"] == "renamed"
+
+def test_upsert_only_set_once_keeps_first_value(table):
+    _seat(1).upsert(table)
+
+    result = _seat(1, version=1, name="second").upsert(table, only_set_once=["name"])
+
+    assert result.item["name"] == "seat 1"
+
+def test_transact_upsert_add_fields_and_cancellation(table):
+    outcome = transact_upsert(table, [_seat(1, sold=2), _seat(2, sold=1)], add_fields={"sold"}, explicit_fields_only=False)
+    assert len(outcome.successful) == 2
+
+    transact_upsert(table, [_seat(1, version=1, sold=3)], add_fields={"sold"}, explicit_fields_only=False)
+    assert table.get_item(Key={"PK": "SEAT#0001", "SK": "SEAT#0001"})["Item"]["sold"] == Decimal(5)
+
+    conflicted = transact_upsert(table, [_seat(2, version=1), _seat(1, version=0)], explicit_fields_only=False)
+
+    assert [f.dynamodb_code for f in conflicted.failures] == ["None", "ConditionalCheckFailed"]
+    assert conflicted.failures[1].inferred == "version_conflict"
+    assert conflicted.failed == [_seat(1, version=0)]
+    assert table.get_item(Key={"PK": "SEAT#0002", "SK": "SEAT#0002"})["Item"]["version"] == Decimal(1)
+
+def test_atomic_add_uses_one_update_and_infers_insufficient_capacity(fake, table):
+    key = {"PK": "EVENT#e1", "SK": "EVENT#e1"}
+    table.put_item(Item={**key, "remaining_capacity": 1, "reserved": 0})
+    take = dict(conditions="#remaining_capacity >= :min", extra_expression_attr_values={":min": 1}, set_fields={"updated_at": "now"})
+    fake.reset_calls()
+
+    first = DynamoModel.atomic_add(table, key, {"reserved": 1, "remaining_capacity": -1}, **take)
+    second = DynamoModel.atomic_add(table, key, {"reserved": 1, "remaining_capacity": -1}, **take)
+
+    assert first.success and first.item["remaining_capacity"] == Decimal(0)
+    assert (second.success, second.code, second.inferred) == (False, "conditional_failed", "remaining_capacity_insufficient")
+    assert second.old_item["reserved"] == {"N": "1"}
+    assert dict(fake.calls) == {"update_item": 2}
+
+def test_atomic_add_reports_throttling(fake, table):
+    fake.inject_error("update_item", "ProvisionedThroughputExceededException")
+
+    result = DynamoModel.atomic_add(table, {"PK": "EVENT#e1", "SK": "EVENT#e1"}, {"reserved": 1})
+
+    assert (result.success, result.code) == (False, "throttled")
+
+def test_batch_write_retries_injected_unprocessed_items(fake, table, no_sleep):
+    fake.inject_unprocessed("batch_write_item", count=5, times=2)
+
+    result = batch_write(table, [_seat(n) for n in range(30)], max_workers=1)
+
+    assert len(result.successful) == 30 and result.unprocessed == []
+    assert table.item_count == 30
+    assert fake.calls["batch_write_item"] == 4
+
+def test_batch_write_retries_injected_throttling(fake, table, no_sleep):
+    fake.inject_error("batch_write_item", "ProvisionedThroughputExceededException", times=2)
+
+    result = batch_write(table, [_seat(n) for n in range(3)])
+
+    assert len(result.successful) == 3
+    assert fake.calls["batch_write_item"] == 3
+
+def test_batch_get_reads_back_written_models(fake, table, no_sleep):
+    batch_write(table, [_seat(n) for n in range(120)])
+    fake.inject_unprocessed("batch_get_item", count=10)
+
+    found = SeatModel.batch_get(table, [{"PK": f"SEAT#{n:04d}", "SK": f"SEAT#{n:04d}"} for n in range(125)])
+
+    assert len(found) == 120
+    assert found[("SEAT#0007", "SEAT#0007")].name == "seat 7"
+
+def test_query_page_walks_a_gsi_with_cursors(table, no_sleep):
+    batch_write(table, [_seat(n) for n in range(7)])
+    blank = SeatModel.model_construct(ksuid="", event="e1", name="")
+
+    names, cursor = [], None
+    while True:
+        page = blank.query_page(table, Key("gsi1PK").eq("SEATS#e1"), index_name="gsi1", limit=3, cursor=cursor)
+        names.extend(seat.name for seat in page.items)
+        cursor = page.cursor
+        if cursor is None:
+            break
+
+    assert names == [f"seat {n}" for n in range(7)]
+
+def test_query_gsi_follows_size_limited_pages(fake, table, no_sleep):
+    fake.page_size_bytes = 200
+    batch_write(table, [_seat(n) for n in range(12)])
+    blank = SeatModel.model_construct(ksuid="", event="e1", name="")
+    fake.reset_calls()
+
+    items = blank.query_gsi(table, Key("gsi1PK").eq("SEATS#e1"), index_name="gsi1")
+
+    assert len(items) == 12
+    assert fake.calls["query"] > 1
+
+def test_query_gsi_assembles_only_included_relations(table, no_sleep):
+    venue = VenueModel(ksuid="v1")
+    table.put_item(Item=venue.to_dynamo(exclude_keys=False))
+    for n in range(2):
+        table.put_item(Item={**_seat(n).to_dynamo(exclude_keys=False), "PK": venue.PK})
+    table.put_item(Item={"PK": venue.PK, "SK": "NOTE#1", "entity_type": "NOTE"})
+
+    assembled = venue.query_gsi(table, Key("PK").eq(venue.PK), assemble_entites=True, include={"SEAT"})
+
+    assert [seat.name for seat in assembled.seats] == ["seat 0", "seat 1"]
+
+def test_query_gsi_with_fields_projects_into_summaries(fake, table, no_sleep):
+    venue = VenueModel(ksuid="v1")
+    table.put_item(Item=venue.to_dynamo(exclude_keys=False))
+    for n in range(3):
+        table.put_item(Item={**_seat(n).to_dynamo(exclude_keys=False), "PK": venue.PK})
+    blank = SeatModel.model_construct(ksuid="", event="e1", name="")
+    fake.reset_calls()
+
+    seats = blank.query_gsi(table, Key("PK").eq(venue.PK), fields={"ksuid", "name"})
+
+    assert [seat.model_dump(exclude_none=True) for seat in seats] == [{"ksuid": f"{n:04d}", "name": f"seat {n}"} for n in range(3)]
+    assert type(seats[0]) is SeatModel.summary_model({"name", "ksuid"})
+    assert fake.calls["query"] == 1
+
+def test_summary_model_rejects_unknown_and_relation_fields():
+    assert VenueModel.stored_fields() == {"entity_type", "ksuid"}
+    with pytest.raises(ValueError):
+        VenueModel.summary_model({"seats"})
+    with pytest.raises(ValueError):
+        SeatModel.summary_model({"price"})
@@ -1,6 +1,8 @@
 import pytest
 from datetime import datetime, timezone
+from decimal import Decimal
 from ksuid import KsuidMs
+from pydantic import ValidationError
 
 from _pydantic.models.models_extended import (
     BundleModel,
@@ -8,12 +10,15 @@ from _pydantic.models.models_extended import (
     OrganisationModel,
     EventModel,
     LocationModel,
+    TicketModel,
+    TicketCreationIdempotencyModel,
 )
 from _pydantic.models.bundles_models import BundleObjectPublic
 from _pydantic.models.items_models import ItemObjectPublic
 from _pydantic.models.organisation_models import OrganisationObjectPublic
 
 from _pydantic.models.events_models import CategoryEnum, Status as EventStatus
+from _pydantic.models.tickets_models import TicketStatus
 from _pydantic.dynamodb import HistoryModel
 
 import logging
@@ -186,3 +191,44 @@ def test_validate_live_validator(valid_ksuid, dt):
         description="The Best Birthday Ever",
     )
     assert isinstance(m, EventModel)
+
+# --- Tests for from_dynamo ---
+
+def test_from_dynamo_matches_model_validate(valid_ksuid, dt):
+    ticket = TicketModel(
+        ksuid=valid_ksuid,
+        organisation="org-demo",
+        parent_event_ksuid="evt_123",
+        customer_email="a@example.com",
+        name_on_ticket="A",
+        name="Full Pass",
+        includes=["ITEM#1"],
+        ticket_status=TicketStatus.void,
+        check_in_count=2,
+        checked_in_at=dt,
+        creation_idempotency=TicketCreationIdempotencyModel(idempotency_key="k", organisation="org-demo", parent_event_ksuid="evt_123", ticket_ksuid=valid_ksuid),
+    )
+    item = ticket.to_dynamo(exclude_keys=False)
+
+    trusted = TicketModel.from_dynamo(item)
+
+    assert trusted == TicketModel.model_validate(item)
+    assert trusted.model_fields_set == TicketModel.model_validate(item).model_fields_set
+    assert (type(trusted.check_in_count), trusted.ticket_status, trusted.checked_in_at) == (int, TicketStatus.void, dt)
+    assert isinstance(trusted.creation_idempotency, TicketCreationIdempotencyModel)
+
+def test_from_dynamo_skips_validators(dt):
+    item = {"ksuid": "not-a-ksuid", "name": "Draft", "organisation": "org-demo", "status": "live", "category": "party", "capacity": 10}
+
+    event = EventModel.from_dynamo(item)
+
+    assert (event.ksuid, event.status, event.category, event.capacity) == ("not-a-ksuid", EventStatus.live, [CategoryEnum.party], 10)
+    with pytest.raises(ValueError):
+        EventModel.model_validate(item)
+
+def test_from_dynamo_rejects_fractional_int_fields():
+    item = {"ksuid": "evt", "name": "Draft", "organisation": "org-demo", "capacity": Decimal("10")}
+
+    assert type(EventModel.from_dynamo(item).capacity) is int
+    with pytest.raises(ValidationError):
+        EventModel.from_dynamo({**item, "capacity": Decimal("1.5")})
@@ -0,0 +1,75 @@
+import pytest
+
+from _shared.cache import TTLCache
+
+# --- Fixtures ---
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+# --- Test Cases ---
+
+def test_get_returns_default_when_missing(clock):
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    assert cache.get("a") is None
+    assert cache.get("a", "fallback") == "fallback"
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == 1
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+def test_invalidate_and_clear(clock):
+    cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert "a" not in cache
+
+    cache.clear()
+    assert len(cache) == 0
+
+def test_get_or_load_only_calls_loader_on_miss(clock):
+    cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_load("a", loader) == "value"
+    assert cache.get_or_load("a", loader) == "value"
+    assert len(calls) == 1
+
+def test_falsy_values_are_cached(clock):
+    cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+    cache.set("a", None)
+    assert "a" in cache
+    assert cache.get_or_load("a", lambda: "reloaded") is None
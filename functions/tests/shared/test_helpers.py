@@ -2,7 +2,12 @@ import json
 from decimal import Decimal
 import pytest
 
-from _shared.helpers import make_response
+from unittest.mock import MagicMock
+from typing import Literal, Optional
+
+from _shared.helpers import make_response, get_pagination_params, get_fields_param, summary_body, get_organisation_settings, invalidate_organisation_settings, organisation_settings_cache
+from _pydantic.dynamodb import DynamoModel
+from _pydantic.models.models_extended import TicketModel
 
 # --- Fictures ---
 
@@ -54,10 +59,59 @@ def test_empty_body():
     resp = make_response(204, {})
     assert json.loads(resp["body"]) == {}
 
+def _get_event(path="/acme/events", **headers):
+    return {"rawPath": path, "requestContext": {"http": {"method": "GET"}}, "headers": headers}
+
+def test_no_validators_without_event(sample_body):
+    resp = make_response(200, sample_body)
+    assert "ETag" not in resp["headers"]
+    assert "Cache-Control" not in resp["headers"]
+
+def test_etag_is_stable_and_follows_body():
+    first = make_response(200, {"version": 1}, event=_get_event())
+    again = make_response(200, {"version": 1}, event=_get_event())
+    changed = make_response(200, {"version": 2}, event=_get_event())
+    assert first["headers"]["ETag"] == again["headers"]["ETag"]
+    assert first["headers"]["ETag"] != changed["headers"]["ETag"]
+    assert first["headers"]["ETag"].startswith('"')
+
+def test_cache_control_per_route():
+    assert make_response(200, {}, event=_get_event("/public/acme/events"))["headers"]["Cache-Control"].startswith("public")
+    assert make_response(200, {}, event=_get_event("/acme/events"))["headers"]["Cache-Control"] == "private, no-cache"
+    assert make_response(200, {}, event=_get_event(), cache_control="no-store")["headers"]["Cache-Control"] == "no-store"
+
+@pytest.mark.parametrize("header", ["{etag}", 'W/{etag}', '"other", {etag}', "*"])
+def test_if_none_match_returns_304(header):
+    etag = make_response(200, {"ok": True}, event=_get_event())["headers"]["ETag"]
+    resp = make_response(200, {"ok": True}, event=_get_event(**{"If-None-Match": header.format(etag=etag)}))
+    assert resp["statusCode"] == 304
+    assert resp["body"] == ""
+    assert resp["headers"]["ETag"] == etag
+
+def test_if_none_match_mismatch_returns_body():
+    resp = make_response(200, {"ok": True}, event=_get_event(**{"if-none-match": '"stale"'}))
+    assert resp["statusCode"] == 200
+    assert json.loads(resp["body"]) == {"ok": True}
+
+def test_conditional_get_ignores_errors_and_writes():
+    not_found = make_response(404, {"message": "Not found."}, event=_get_event(**{"if-none-match": "*"}))
+    assert not_found["statusCode"] == 404 and "ETag" not in not_found["headers"]
+    post = dict(_get_event(**{"if-none-match": "*"}), requestContext={"http": {"method": "POST"}})
+    assert make_response(200, {}, event=post)["statusCode"] == 200
+
 def test_none_body():
     resp = make_response(204, None)
     assert json.loads(resp["body"]) is None    
 
+def test_model_body_is_encoded_by_the_model():
+    summary = TicketModel.summary_model({"ksuid", "name", "check_in_count"})
+    model = summary(ksuid="t1", check_in_count=Decimal("2"))
+
+    resp = make_response(200, model, exclude_none=True)
+
+    assert json.loads(resp["body"]) == model.model_dump(mode="json", exclude_none=True) == {"ksuid": "t1", "check_in_count": 2}
+    assert json.loads(make_response(200, model)["body"])["name"] is None
+
 def test_unserializable_object_raises():
     class Unserializable:
         pass
@@ -68,4 +122,82 @@ def test_unserializable_object_raises():
 def test_input_body_not_mutated(sample_body):
     original = sample_body.copy()
     make_response(200, sample_body)
-    assert sample_body == original
\ No newline at end of file
+    assert sample_body == original
+def test_get_pagination_params_defaults():
+    assert get_pagination_params({}) == (None, None)
+    assert get_pagination_params({"queryStringParameters": None}) == (None, None)
+
+def test_get_pagination_params_parses_values():
+    event = {"queryStringParameters": {"limit": "50", "cursor": "abc"}}
+    assert get_pagination_params(event) == (50, "abc")
+
+@pytest.mark.parametrize("limit", ["0", "-1", "abc", "100000"])
+def test_get_pagination_params_rejects_invalid_limit(limit):
+    with pytest.raises(ValueError):
+        get_pagination_params({"queryStringParameters": {"limit": limit}})
+
+def test_get_fields_param_absent_and_summary():
+    assert get_fields_param({}, TicketModel) is None
+    assert get_fields_param({"queryStringParameters": {"fields": "summary"}}, TicketModel) == TicketModel.SUMMARY_FIELDS
+
+def test_get_fields_param_always_keeps_ksuid():
+    event = {"queryStringParameters": {"fields": "name, ticket_status"}}
+    assert get_fields_param(event, TicketModel) == {"ksuid", "name", "ticket_status"}
+
+@pytest.mark.parametrize("fields", ["nope", "creation_idempotency", "name,qr_token"])
+def test_get_fields_param_rejects_unknown_or_disallowed(fields):
+    with pytest.raises(ValueError):
+        get_fields_param({"queryStringParameters": {"fields": fields}}, TicketModel, allowed={"ksuid", "name"})
+
+def test_summary_body_leaves_out_unset_attributes():
+    summary = TicketModel.summary_model({"ksuid", "name"})
+    body = summary_body("tickets", [summary(ksuid="t1")], cursor="abc")
+    assert body == {"tickets": [{"ksuid": "t1"}], "next_cursor": "abc"}
+
+class FakeOrganisationModel(DynamoModel):
+    entity_type: Literal["ORG"] = "ORG"
+    organisation: str
+    name: str
+    account_id: Optional[str] = None
+
+    @property
+    def PK(self):
+        return f"ORG#{self.organisation}"
+    @property
+    def SK(self):
+        return f"ORG#{self.organisation}"
+
+@pytest.fixture
+def org_db():
+    organisation_settings_cache.clear()
+    db = MagicMock()
+    db.Table.return_value.query.return_value = {"Items": [{"entity_type": "ORG", "organisation": "demo", "name": "Demo", "account_id": "acct_1"}]}
+    yield db
+    organisation_settings_cache.clear()
+
+def test_get_organisation_settings_is_cached(org_db):
+    first = get_organisation_settings("demo", org_db, FakeOrganisationModel, "org-org_name")
+    second = get_organisation_settings("demo", org_db, FakeOrganisationModel, "org-org_name")
+
+    assert first.account_id == second.account_id == "acct_1"
+    assert first is not second
+    org_db.Table.return_value.query.assert_called_once()
+
+def test_get_organisation_settings_returns_copies(org_db):
+    first = get_organisation_settings("demo", org_db, FakeOrganisationModel, "org-org_name")
+    first.account_id = "changed"
+
+    assert get_organisation_settings("demo", org_db, FakeOrganisationModel, "org-org_name").account_id == "acct_1"
+
+def test_get_organisation_settings_after_invalidate_reloads(org_db):
+    get_organisation_settings("demo", org_db, FakeOrganisationModel, "org-org_name")
+    invalidate_organisation_settings("demo", "org-org_name")
+    get_organisation_settings("demo", org_db, FakeOrganisationModel, "org-org_name")
+
+    assert org_db.Table.return_value.query.call_count == 2
+
+def test_get_organisation_settings_can_bypass_cache(org_db):
+    get_organisation_settings("demo", org_db, FakeOrganisationModel, "org-org_name")
+    get_organisation_settings("demo", org_db, FakeOrganisationModel, "org-org_name", use_cache=False)
+
+    assert org_db.Table.return_value.query.call_count == 2
@@ -0,0 +1,152 @@
+import json
+
+import pytest
+
+from _pydantic.models.models_extended import TicketModel, EventModel
+from _pydantic.models.tickets_models import TicketStatus
+from functions.tickets.shared.shared_tickets import create_email_job
+from functions.tickets.shared.bulk_resend import enqueue_email_jobs, start_resend_job, get_resend_job, set_resend_status, record_resend_page, resend_event_tickets, SQS_BATCH_SIZE
+
+NOW = "2026-05-01T19:30:00.000Z"
+QUEUE_URL = "https://sqs.eu-west-1.amazonaws.com/123456789012/dev-email"
+
+
+class FakeSQS:
+    """Records SendMessageBatch calls; ``fail`` maps message ids to (sender_fault, times) failures."""
+
+    def __init__(self, fail=None):
+        self.batches = []
+        self.fail = dict(fail or {})
+
+    def send_message_batch(self, QueueUrl, Entries):
+        assert len(Entries) <= SQS_BATCH_SIZE
+        self.batches.append(Entries)
+        failed = []
+        for entry in Entries:
+            job_id = json.loads(entry["MessageBody"])["job_id"]
+            sender_fault, times = self.fail.get(job_id, (False, 0))
+            if times:
+                self.fail[job_id] = (sender_fault, times - 1)
+                failed.append({"Id": entry["Id"], "SenderFault": sender_fault, "Code": "InternalError"})
+        return {"Successful": [], "Failed": failed}
+
+    @property
+    def queued(self):
+        return [json.loads(entry["MessageBody"]) for entries in self.batches for entry in entries]
+
+
+# --- Fixtures ---
+@pytest.fixture
+def event_details():
+    return EventModel(ksuid="evt", name="Spring Ball", organisation="org-demo")
+
+def _put(table, ksuid, **extra):
+    ticket = TicketModel(
+        ksuid=ksuid,
+        organisation="org-demo",
+        parent_event_ksuid="evt",
+        customer_email=f"{ksuid}@example.com",
+        name_on_ticket=ksuid,
+        name="Full Pass",
+        qr_token=f"qr-{ksuid}",
+        **extra,
+    )
+    table.put_item(Item=ticket.to_dynamo(exclude_keys=False))
+    return ticket
+
+def _jobs(table, event_details, count):
+    return {
+        f"t{n:02d}": create_email_job(table, _put(table, f"t{n:02d}"), "org-demo", f"resend:t{n:02d}", "admin", event_details=event_details)
+        for n in range(count)
+    }
+
+# --- Tests ---
+def test_email_job_reuses_loaded_event(fake, table, event_details):
+    ticket = _put(table, "t1")
+    fake.reset_calls()
+
+    job = create_email_job(table, ticket, "org-demo", "resend:t1", "admin", send_reason="ticket_email_resend", event_details=event_details)
+
+    assert job.params["event_name"] == "Spring Ball"
+    assert job.recipient.email == "t1@example.com"
+    assert sum(fake.calls.values()) == 0
+
+def test_jobs_are_enqueued_in_batches_of_ten(table, event_details):
+    sqs = FakeSQS()
+
+    failed = enqueue_email_jobs(sqs, QUEUE_URL, _jobs(table, event_details, 23))
+
+    assert failed == []
+    assert [len(batch) for batch in sqs.batches] == [10, 10, 3]
+    assert len({job["recipient"]["email"] for job in sqs.queued}) == 23
+
+def test_transient_failures_are_retried_and_sender_faults_are_not(table, event_details):
+    jobs = _jobs(table, event_details, 3)
+    sqs = FakeSQS(fail={jobs["t00"].job_id: (False, 1), jobs["t01"].job_id: (True, 1), jobs["t02"].job_id: (False, 5)})
+
+    failed = enqueue_email_jobs(sqs, QUEUE_URL, jobs, max_attempts=3)
+
+    assert sorted(failed) == ["t01", "t02"]
+    assert [len(batch) for batch in sqs.batches] == [3, 2, 1]
+
+def test_resend_all_queues_active_tickets_and_records_progress(table, event_details):
+    for n in range(5):
+        _put(table, f"t{n}")
+    _put(table, "void", ticket_status=TicketStatus.void)
+    _put(table, "used", ticket_status=TicketStatus.used)
+    start_resend_job(table, "job1", "evt", "admin", NOW)
+    sqs = FakeSQS()
+
+    cursor = resend_event_tickets(table, sqs, QUEUE_URL, "org-demo", event_details, "job1", "admin", NOW, page_size=2)
+
+    assert cursor is None
+    assert sorted(job["recipient"]["email"] for job in sqs.queued) == [f"t{n}@example.com" for n in range(5)]
+    assert {job["idempotency_key"] for job in sqs.queued} == {f"ticket_email:ticket_email_resend:resend:job1:t{n}" for n in range(5)}
+    job = get_resend_job(table, "job1")
+    assert (job["status"], job["queued"], job["failed"], job["skipped"]) == ("completed", 5, 0, 2)
+    assert "cursor" not in job
+
+def test_resend_all_stops_with_cursor_and_continues(table, event_details):
+    for n in range(5):
+        _put(table, f"t{n}")
+    start_resend_job(table, "job1", "evt", "admin", NOW)
+    sqs = FakeSQS()
+
+    cursor = resend_event_tickets(table, sqs, QUEUE_URL, "org-demo", event_details, "job1", "admin", NOW, page_size=2, has_time=lambda: False)
+
+    assert cursor and len(sqs.queued) == 2
+    assert (get_resend_job(table, "job1")["status"], get_resend_job(table, "job1")["cursor"]) == ("running", cursor)
+
+    assert resend_event_tickets(table, sqs, QUEUE_URL, "org-demo", event_details, "job1", "admin", NOW, page_size=2) is None
+    assert len(sqs.queued) == 5
+    assert get_resend_job(table, "job1")["queued"] == 5
+
+def test_retried_invocation_resumes_from_the_checkpoint_without_double_counting(table, event_details):
+    for n in range(4):
+        _put(table, f"t{n}")
+    start_resend_job(table, "job1", "evt", "admin", NOW)
+    resend_event_tickets(table, FakeSQS(), QUEUE_URL, "org-demo", event_details, "job1", "admin", NOW, page_size=2, has_time=lambda: False)
+    sqs = FakeSQS()
+
+    # the first page is recorded, so a stale retry of it is refused
+    assert not record_resend_page(table, "job1", None, "stale", NOW, queued=2)
+    assert resend_event_tickets(table, sqs, QUEUE_URL, "org-demo", event_details, "job1", "admin", NOW, page_size=2) is None
+
+    assert len(sqs.queued) == 2
+    job = get_resend_job(table, "job1")
+    assert (job["status"], job["queued"]) == ("completed", 4)
+
+    # a retry after completion sends nothing
+    assert resend_event_tickets(table, sqs, QUEUE_URL, "org-demo", event_details, "job1", "admin", NOW, page_size=2) is None
+    assert len(sqs.queued) == 2 and get_resend_job(table, "job1")["queued"] == 4
+
+def test_failed_job_is_not_restarted(table, event_details):
+    _put(table, "t0")
+    start_resend_job(table, "job1", "evt", "admin", NOW)
+    assert set_resend_status(table, "job1", "failed", NOW, error="SQS unavailable")
+    sqs = FakeSQS()
+
+    assert resend_event_tickets(table, sqs, QUEUE_URL, "org-demo", event_details, "job1", "admin", NOW) is None
+
+    assert sqs.queued == []
+    assert (get_resend_job(table, "job1")["status"], get_resend_job(table, "job1")["error"]) == ("failed", "SQS unavailable")
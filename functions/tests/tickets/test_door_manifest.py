@@ -0,0 +1,109 @@
+import base64
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from ksuid import KsuidMs
+
+from _pydantic.models.models_extended import TicketModel
+from _pydantic.models.tickets_models import TicketStatus, AdmissionStatus
+from functions.tickets.shared.door_manifest import (
+    BloomFilter, build_door_manifest, verify_door_manifest, door_manifest_public_key, load_signing_key,
+    STATUS_ACTIVE, STATUS_CHECKED_IN, STATUS_DENIED, KSUID_BYTES,
+)
+
+SECRET = "test-secret"
+SIGNING_KEY = Ed25519PrivateKey.generate()
+NOW = "2026-05-01T19:00:00.000Z"
+
+# --- Fixtures ---
+def _token(ksuid, jti, secret=SECRET):
+    return jwt.encode({"v": 1, "iss": "DANCEENGINE", "sub": ksuid, "aud": "1", "o": "org-demo", "e": "evt", "jti": jti, "iat": 0}, secret, algorithm="HS256")
+
+def _ticket(n, **extra):
+    ksuid = str(KsuidMs.from_bytes(bytes([n]) * KSUID_BYTES))
+    return TicketModel(**{
+        "ksuid": ksuid,
+        "organisation": "org-demo",
+        "parent_event_ksuid": "evt",
+        "customer_email": f"dancer{n}@example.com",
+        "name_on_ticket": f"Dancer {n}",
+        "name": "Full Pass",
+        "qr_token": _token(ksuid, f"jti-{n}"),
+        **extra,
+    })
+
+@pytest.fixture
+def tickets():
+    return [
+        _ticket(3),
+        _ticket(1, admission_status=AdmissionStatus.checked_in, ticket_status=TicketStatus.used),
+        _ticket(2, ticket_status=TicketStatus.void),
+        _ticket(4, admission_status=AdmissionStatus.denied),
+    ]
+
+def _decode(manifest):
+    packed = base64.b64decode(manifest["tickets"])
+    ksuids = [str(KsuidMs.from_bytes(packed[i:i + KSUID_BYTES])) for i in range(0, len(packed), KSUID_BYTES)]
+    return dict(zip(ksuids, base64.b64decode(manifest["statuses"])))
+
+# --- Tests ---
+def test_tickets_are_sorted_with_status_bits(tickets):
+    manifest = build_door_manifest(tickets, "org-demo", "evt", SECRET, NOW, SIGNING_KEY)
+
+    statuses = _decode(manifest)
+
+    assert list(statuses) == sorted(t.ksuid for t in tickets)
+    assert [statuses[t.ksuid] for t in tickets] == [
+        STATUS_ACTIVE,
+        STATUS_CHECKED_IN,
+        0,
+        STATUS_ACTIVE | STATUS_DENIED,
+    ]
+    assert manifest["ticket_count"] == 4
+
+def test_jti_filter_contains_minted_tokens_only(tickets):
+    jti_filter = BloomFilter.from_dict(build_door_manifest(tickets, "org-demo", "evt", SECRET, NOW, SIGNING_KEY)["jti_filter"])
+
+    assert all(f"jti-{n}" in jti_filter for n in range(1, 5))
+    assert sum(f"forged-{n}" in jti_filter for n in range(1000)) <= 5
+
+def test_tokens_signed_with_another_secret_and_non_ksuid_tickets_are_skipped(tickets):
+    tickets.append(_ticket(5, qr_token=_token("x", "jti-foreign", secret="other")))
+    tickets.append(TicketModel(ksuid="legacy", organisation="org-demo", parent_event_ksuid="evt", customer_email="l@example.com", name_on_ticket="L", name="Pass"))
+
+    manifest = build_door_manifest(tickets, "org-demo", "evt", SECRET, NOW, SIGNING_KEY)
+
+    assert manifest["ticket_count"] == 5
+    assert "jti-foreign" not in BloomFilter.from_dict(manifest["jti_filter"])
+
+def test_version_tracks_content_not_order_or_time(tickets):
+    first = build_door_manifest(tickets, "org-demo", "evt", SECRET, NOW, SIGNING_KEY)
+    reordered = build_door_manifest(list(reversed(tickets)), "org-demo", "evt", SECRET, "2026-05-01T20:00:00.000Z", SIGNING_KEY)
+    changed = build_door_manifest(tickets[1:], "org-demo", "evt", SECRET, NOW, SIGNING_KEY)
+
+    assert first["version"] == reordered["version"]
+    assert first["version"] != changed["version"]
+
+def test_signature_verifies_with_the_published_public_key_only(tickets):
+    manifest = build_door_manifest(tickets, "org-demo", "evt", SECRET, NOW, SIGNING_KEY)
+    published = door_manifest_public_key(SIGNING_KEY)
+    public_key = Ed25519PublicKey.from_public_bytes(base64.urlsafe_b64decode(published["public_key"] + "="))
+
+    assert (published["algorithm"], manifest["key_id"]) == ("Ed25519", published["key_id"])
+    assert verify_door_manifest(manifest, public_key)
+    assert not verify_door_manifest(manifest, Ed25519PrivateKey.generate().public_key())
+    assert not verify_door_manifest({**manifest, "statuses": base64.b64encode(bytes([1] * 4)).decode()}, public_key)
+    assert not verify_door_manifest({**manifest, "signature": "not base64!"}, public_key)
+
+def test_signing_key_loads_from_pem():
+    pem = SIGNING_KEY.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()).decode()
+
+    assert door_manifest_public_key(load_signing_key(pem)) == door_manifest_public_key(SIGNING_KEY)
+
+def test_empty_event():
+    manifest = build_door_manifest([], "org-demo", "evt", SECRET, NOW, SIGNING_KEY)
+
+    assert (manifest["ticket_count"], manifest["tickets"]) == (0, "")
+    assert "anything" not in BloomFilter.from_dict(manifest["jti_filter"])
@@ -0,0 +1,83 @@
+import pytest
+
+from _pydantic.models.models_extended import TicketModel, TicketCreationIdempotencyModel
+from functions.tickets.shared.import_preview import ExistingTicketIndex, analyse_import
+
+# --- Fixtures ---
+def _existing(ksuid, email, name):
+    return TicketModel(
+        ksuid=ksuid,
+        organisation="org-demo",
+        parent_event_ksuid="evt",
+        customer_email=email,
+        name_on_ticket=name,
+        name="Full Pass",
+    )
+
+def _request(key, email, name, line_items=None):
+    return {
+        "ticket_creation_key": key,
+        "customer_email": email,
+        "name_on_ticket": name,
+        "line_items": line_items if line_items is not None else [{"ksuid": "ITEM1"}],
+    }
+
+@pytest.fixture
+def existing_tickets():
+    return [
+        _existing("t1", "Ann@Example.com ", "Ann Smith"),
+        _existing("t2", "bob@example.com", "Ann Smith"),
+        _existing("t3", "ann@example.com", "Someone Else"),
+    ]
+
+def _analyse(requests, existing, records=None):
+    return list(analyse_import(requests, {"ITEM1": {"ksuid": "ITEM1"}}, existing, records or {}))
+
+# --- Tests ---
+def test_index_normalises_and_skips_blank_values(existing_tickets):
+    index = ExistingTicketIndex(existing_tickets + [_existing("t4", " ", "")])
+
+    assert index.by_email["ann@example.com"] == [0, 2]
+    assert index.by_name["ann smith"] == [0, 1]
+    assert "" not in index.by_email and "" not in index.by_name
+
+def test_exact_and_potential_matches_in_existing_ticket_order(existing_tickets):
+    [result] = _analyse([_request("k1", "ANN@example.com", " ann smith")], existing_tickets)
+
+    assert [(issue["type"], issue["existing_ticket"]["ksuid"]) for issue in result["issues"]] == [
+        ("exact_existing_ticket_match", "t1"),
+        ("matching_name_on_ticket", "t2"),
+        ("matching_customer_email", "t3"),
+    ]
+    assert result["duplicate"] and result["potential_duplicate"]
+
+def test_no_matches_and_missing_line_items(existing_tickets):
+    [result] = _analyse([_request("k1", "new@example.com", "New Person", [{"ksuid": "NOPE"}])], existing_tickets)
+
+    assert [issue["type"] for issue in result["issues"]] == ["missing_line_item"]
+    assert not result["duplicate"] and not result["potential_duplicate"]
+
+def test_blank_email_and_name_do_not_match_each_other():
+    [result] = _analyse([_request("k1", None, "")], [_existing("t1", "", " ")])
+
+    assert result["issues"] == []
+
+def test_existing_idempotency_record_marks_duplicate(existing_tickets):
+    record = TicketCreationIdempotencyModel(idempotency_key="k2", organisation="org-demo", parent_event_ksuid="evt", ticket_ksuid="t9")
+
+    results = _analyse([_request("k1", "x@example.com", "X"), _request("k2", "y@example.com", "Y")], existing_tickets, {"k2": record})
+
+    assert [r["index"] for r in results] == [0, 1]
+    assert [r["duplicate"] for r in results] == [False, True]
+    assert results[1]["issues"][0]["type"] == "existing_ticket_creation_key"
+
+def test_existing_tickets_are_dumped_once(existing_tickets, monkeypatch):
+    index = ExistingTicketIndex(existing_tickets)
+    calls = []
+    original = TicketModel.model_dump
+    monkeypatch.setattr(TicketModel, "model_dump", lambda self, **kwargs: calls.append(self.ksuid) or original(self, **kwargs))
+
+    first = index.dump(0)
+
+    assert index.dump(0) is first
+    assert calls == ["t1"]
@@ -0,0 +1,145 @@
+import pytest
+
+from _pydantic.models.models_extended import TicketModel
+from _pydantic.models.tickets_models import TicketStatus, AdmissionStatus
+from functions.tickets.shared.shared_tickets import set_ticket_admission, apply_check_ins, BULK_TICKET_LOOKUP_THRESHOLD
+
+NOW = "2026-05-01T19:30:00.000Z"
+LATER = "2026-05-01T19:45:00.000Z"
+
+# --- Fixtures ---
+@pytest.fixture
+def table(table):
+    table.put_item(Item=TicketModel(
+        ksuid="t1",
+        organisation="org-demo",
+        parent_event_ksuid="evt",
+        customer_email="ann@example.com",
+        name_on_ticket="Ann Smith",
+        name="Full Pass",
+    ).to_dynamo(exclude_keys=False))
+    return table
+
+def _check_in(table, ticket="t1", email="ann@example.com", event="evt", actor="door-1", at=NOW, check_in=True):
+    return set_ticket_admission(table, ticket, email, event, actor, at, check_in=check_in)
+
+# --- Tests ---
+def test_check_in_is_one_write_and_returns_new_ticket(fake, table):
+    fake.reset_calls()
+
+    result = _check_in(table)
+
+    assert result.success
+    assert (result.ticket.admission_status, result.ticket.ticket_status) == (AdmissionStatus.checked_in, TicketStatus.used)
+    assert (result.ticket.checked_in_by, result.ticket.check_in_count) == ("door-1", 1)
+    assert dict(fake.calls) == {"update_item": 1}
+
+def test_second_check_in_reports_first_one(table):
+    _check_in(table)
+
+    result = _check_in(table, actor="door-2", at=LATER)
+
+    assert (result.outcome, result.checked_in_at, result.checked_in_by) == ("already_used", NOW, "door-1")
+    assert table.get_item(Key={"PK": "TICKET#t1", "SK": "CUSTOMER#ann@example.com"})["Item"]["check_in_count"] == 1
+
+@pytest.mark.parametrize("ticket,email,event", [
+    ("missing", "ann@example.com", "evt"),
+    ("t1", "bob@example.com", "evt"),
+    ("t1", "ann@example.com", "other-evt"),
+])
+def test_missing_or_foreign_ticket_is_not_found(table, ticket, email, event):
+    result = _check_in(table, ticket=ticket, email=email, event=event)
+
+    assert result.outcome == "not_found"
+    assert table.item_count == 1
+
+def test_void_ticket_is_not_active(table):
+    table.update_item(
+        Key={"PK": "TICKET#t1", "SK": "CUSTOMER#ann@example.com"},
+        UpdateExpression="SET ticket_status = :void",
+        ExpressionAttributeValues={":void": "void"},
+    )
+
+    assert _check_in(table).outcome == "not_active"
+
+def test_unuse_resets_status_and_allows_check_in_again(table):
+    _check_in(table)
+
+    reset = _check_in(table, actor="admin", at=LATER, check_in=False)
+    again = _check_in(table, actor="door-2", at=LATER)
+
+    assert (reset.ticket.admission_status, reset.ticket.ticket_status, reset.ticket.check_in_count) == (AdmissionStatus.not_checked_in, TicketStatus.active, 1)
+    assert again.success and again.ticket.check_in_count == 2
+
+def test_unuse_of_missing_ticket_is_not_found(table):
+    assert _check_in(table, ticket="missing", check_in=False).outcome == "not_found"
+
+# --- Bulk check-ins ---
+def _put(table, ksuid, email, event="evt", **extra):
+    table.put_item(Item=TicketModel(
+        ksuid=ksuid,
+        organisation="org-demo",
+        parent_event_ksuid=event,
+        customer_email=email,
+        name_on_ticket=ksuid,
+        name="Full Pass",
+        **extra,
+    ).to_dynamo(exclude_keys=False))
+
+def _scan(ksuid, at, email=None, by="gate-a"):
+    return {"ticket_ksuid": ksuid, "customer_email": email, "checked_in_at": at, "checked_in_by": by}
+
+def test_bulk_check_ins_report_per_ticket_outcomes_in_request_order(table):
+    _put(table, "t2", "bob@example.com")
+    _put(table, "t3", "cat@example.com", admission_status=AdmissionStatus.denied)
+    _put(table, "t4", "dan@example.com", event="other-evt")
+    _check_in(table, ticket="t1")
+
+    results = apply_check_ins(table, "evt", [
+        _scan("t2", LATER),
+        _scan("t1", LATER),
+        _scan("t3", LATER),
+        _scan("t4", LATER),
+        _scan("missing", LATER),
+    ], "account")
+
+    assert [result.outcome for result in results] == ["updated", "already_used", "denied", "not_found", "not_found"]
+    assert results[1].checked_in_at == NOW
+    assert (results[0].ticket.checked_in_by, results[0].ticket.check_in_count) == ("gate-a", 1)
+
+def test_bulk_check_ins_write_through_the_client_not_the_shared_resource(table, monkeypatch):
+    _put(table, "t2", "bob@example.com")
+    monkeypatch.setattr(table, "update_item", lambda **_: pytest.fail("resource update_item used from a worker thread"))
+
+    results = apply_check_ins(table, "evt", [_scan("t1", LATER, email="ann@example.com"), _scan("t2", LATER, email="bob@example.com")], "account")
+
+    assert [result.outcome for result in results] == ["updated", "updated"]
+
+def test_bulk_duplicate_scans_write_the_earliest_once(table):
+    results = apply_check_ins(table, "evt", [
+        _scan("t1", LATER, by="gate-b"),
+        _scan("t1", NOW, email="ann@example.com", by="gate-a"),
+    ], "account")
+
+    assert [result.outcome for result in results] == ["duplicate", "updated"]
+    item = table.get_item(Key={"PK": "TICKET#t1", "SK": "CUSTOMER#ann@example.com"})["Item"]
+    assert (item["checked_in_by"], item["check_in_count"]) == ("gate-a", 1)
+
+def test_bulk_emails_resolved_from_event_listing_for_large_batches(fake, table):
+    for n in range(BULK_TICKET_LOOKUP_THRESHOLD):
+        _put(table, f"b{n:02d}", f"b{n}@example.com")
+    fake.reset_calls()
+
+    results = apply_check_ins(table, "evt", [_scan(f"b{n:02d}", NOW) for n in range(BULK_TICKET_LOOKUP_THRESHOLD)], "account")
+
+    assert all(result.success for result in results)
+    assert fake.calls["update_item"] == BULK_TICKET_LOOKUP_THRESHOLD
+    assert fake.calls["query"] == 1
+
+def test_bulk_transient_errors_are_retryable_and_do_not_stop_the_batch(fake, table):
+    _put(table, "t2", "bob@example.com")
+    fake.inject_error("update_item", "ProvisionedThroughputExceededException", times=1)
+
+    results = apply_check_ins(table, "evt", [_scan("t1", NOW, email="ann@example.com"), _scan("t2", NOW, email="bob@example.com")], "account", max_workers=1)
+
+    assert [result.outcome for result in results] == ["error", "updated"]